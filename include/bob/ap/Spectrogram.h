@@ -221,9 +221,17 @@ class Spectrogram: public Energy
     void hammingWindow(blitz::Array<double,1> &data) const;
 
     /**
-     * @brief Computes the power-spectrum of the FFT of the input frame
+     * @brief Extracts and normalizes the frames i0, i0+1, ... of the input
+     * signal into the rows of the given 2D array
      */
-    void powerSpectrumFFT(blitz::Array<double,1>& x);
+    void extractNormalizeFrames(const blitz::Array<double,1>& input,
+      const size_t i0, blitz::Array<double,2>& frames) const;
+    /**
+     * @brief Pre-emphasises and windows each frame (row) of the input array,
+     * and replaces its first half by the power-spectrum of its FFT. All the
+     * frames are transformed at once.
+     */
+    void powerSpectrumFFT(blitz::Array<double,2>& frames);
     /**
      * @brief Applies the triangular filter bank
      */
@@ -282,8 +290,14 @@ class Spectrogram: public Energy
     std::vector<blitz::Array<double,1> > m_filter_bank;
     bob::sp::FFT1D m_fft;
 
-    mutable blitz::Array<std::complex<double>,1> m_cache_frame_c1;
-    mutable blitz::Array<std::complex<double>,1> m_cache_frame_c2;
+    /**
+     * Number of frames processed at once
+     */
+    static const int s_n_frames_block = 64;
+
+    mutable blitz::Array<double,2> m_cache_frames_d;
+    mutable blitz::Array<std::complex<double>,2> m_cache_frames_c1;
+    mutable blitz::Array<std::complex<double>,2> m_cache_frames_c2;
     mutable blitz::Array<double,1> m_cache_filters;
 };
 
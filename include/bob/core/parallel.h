@@ -0,0 +1,87 @@
+/**
+ * @file bob/core/parallel.h
+ * @date Sun Oct 18 13:20:15 2026 +0200
+ *
+ * @brief This file defines helpers to split a computation over several
+ * threads
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ * 
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ * 
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#ifndef BOB_CORE_PARALLEL_H
+#define BOB_CORE_PARALLEL_H
+
+#include <cstddef>
+#include <blitz/array.h>
+#include <boost/function.hpp>
+
+namespace bob { namespace core {
+/**
+ * @ingroup CORE
+ * @{
+ */
+
+/**
+ * @brief Calls f(0), ..., f(n_threads-1) concurrently, each call in its own
+ * thread (f(0) being called from the current thread), and returns once all
+ * of them are done. If some of the calls throw, a std::runtime_error with
+ * the message of the first exception is thrown after all the threads have
+ * been joined.
+ *
+ * @warning The reference counts of blitz++ arrays are not thread-safe: the
+ * calls must not create, copy or release references to arrays which are
+ * used by other threads. Arrays can be shared through unsharedView().
+ */
+void parallel(const size_t n_threads,
+  const boost::function<void (size_t)>& f);
+
+/**
+ * @brief Returns the i'th of n_shards contiguous ranges of (nearly) equal
+ * lengths splitting [0, n). n_shards should not be larger than n.
+ */
+blitz::Range shard(const int n, const size_t n_shards, const size_t i);
+
+/**
+ * @brief Returns the number of threads which can run concurrently on this
+ * machine (at least 1)
+ */
+size_t getHardwareConcurrency();
+
+namespace array {
+
+  /**
+   * @brief Returns a (zero-based) view of the data of an array, which has
+   * its own reference count. Views and copies of the returned array can
+   * then be created in another thread without altering the reference count
+   * of the original array.
+   *
+   * @warning The data is not copied, and is not owned by the returned
+   * array: the original array must outlive it.
+   */
+  template <typename T, int N>
+  blitz::Array<T,N> unsharedView(const blitz::Array<T,N>& a)
+  {
+    return blitz::Array<T,N>(const_cast<T*>(a.data()), a.shape(), a.stride(),
+      blitz::neverDeleteData);
+  }
+
+}
+
+/**
+ * @}
+ */
+}}
+
+#endif /* BOB_CORE_PARALLEL_H */
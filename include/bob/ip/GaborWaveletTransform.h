@@ -25,8 +25,10 @@
 #define BOB_IP_GABOR_WAVELET_TRANSFORM_H
 
 #include <vector>
+#include <map>
 #include <utility>
 #include <stdexcept>
+#include <numeric>
 #include <blitz/array.h>
 
 #include "bob/io/HDF5File.h"
@@ -70,6 +72,16 @@ namespace bob {
           blitz::Array<std::complex<double>,2>& transformed_frequency_domain_image
         ) const;
 
+        //! \brief Gabor transforms the given image (in frequency domain) and performs the
+        //! inverse Fourier transform along the y axis only, for the requested rows.
+        //! Each row of row_factors holds the factors exp(2 i pi k y / height) of one requested row y.
+        //! Each row of the result is still in frequency domain along the x axis.
+        void transformRows(
+          const blitz::Array<std::complex<double>,2>& frequency_domain_image,
+          const blitz::Array<std::complex<double>,2>& row_factors,
+          blitz::Array<std::complex<double>,2>& transformed_rows
+        ) const;
+
       private:
         // the Gabor wavelet, stored as pairs of indices and values
         std::vector<std::pair<blitz::TinyVector<unsigned,2>, double> > m_kernel_pixel;
@@ -156,6 +168,88 @@ namespace bob {
           bool do_normalize = true
         );
 
+        //! \brief performs Gabor wavelet transform and creates 4D image
+        //! (absolute part and phase part) in single precision
+        void computeJetImage(
+          const blitz::Array<std::complex<double>,2>& gray_image,
+          blitz::Array<float,4>& jet_image,
+          bool do_normalize = true
+        );
+
+        //! \brief performs Gabor wavelet transform and creates 3D image
+        //! (absolute parts of the responses only) in single precision
+        void computeJetImage(
+          const blitz::Array<std::complex<double>,2>& gray_image,
+          blitz::Array<float,3>& jet_image,
+          bool do_normalize = true
+        );
+
+        //! \brief performs Gabor wavelet transform of a stack of images of the same size
+        //! (first dimension), and returns one vector of complex images per image.
+        //! The images are split over n_threads threads.
+        void performGWT(
+          const blitz::Array<std::complex<double>,3>& gray_images,
+          blitz::Array<std::complex<double>,4>& trafo_images,
+          const size_t n_threads = 1
+        );
+
+        //! \brief performs Gabor wavelet transform of a stack of images of the same size
+        //! (first dimension), and creates one 4D jet image (absolute part and phase part) per image.
+        //! The images are split over n_threads threads.
+        void computeJetImages(
+          const blitz::Array<std::complex<double>,3>& gray_images,
+          blitz::Array<double,5>& jet_images,
+          bool do_normalize = true,
+          const size_t n_threads = 1
+        );
+
+        //! \brief performs Gabor wavelet transform of a stack of images of the same size
+        //! (first dimension), and creates one 3D jet image (absolute parts only) per image.
+        //! The images are split over n_threads threads.
+        void computeJetImages(
+          const blitz::Array<std::complex<double>,3>& gray_images,
+          blitz::Array<double,4>& jet_images,
+          bool do_normalize = true,
+          const size_t n_threads = 1
+        );
+
+        //! \brief same as above, with jet images in single precision
+        void computeJetImages(
+          const blitz::Array<std::complex<double>,3>& gray_images,
+          blitz::Array<float,5>& jet_images,
+          bool do_normalize = true,
+          const size_t n_threads = 1
+        );
+
+        //! \brief same as above, with jet images in single precision
+        void computeJetImages(
+          const blitz::Array<std::complex<double>,3>& gray_images,
+          blitz::Array<float,4>& jet_images,
+          bool do_normalize = true,
+          const size_t n_threads = 1
+        );
+
+        //! \brief performs Gabor wavelet transform at the given positions only
+        //! (one (y,x) position per row), and creates one Gabor jet per position
+        //! (absolute part and phase part). No full-image inverse FFT is performed,
+        //! which is much faster when jets are required at a few positions only.
+        void computeJets(
+          const blitz::Array<std::complex<double>,2>& gray_image,
+          const blitz::Array<int,2>& positions,
+          blitz::Array<double,3>& jets,
+          bool do_normalize = true
+        );
+
+        //! \brief performs Gabor wavelet transform at the given positions only
+        //! (one (y,x) position per row), and creates one Gabor jet per position
+        //! (absolute parts of the responses only)
+        void computeJets(
+          const blitz::Array<std::complex<double>,2>& gray_image,
+          const blitz::Array<int,2>& positions,
+          blitz::Array<double,2>& jets,
+          bool do_normalize = true
+        );
+
         //! \brief saves the parameters of this Gabor wavelet family to file
         void save(bob::io::HDF5File& file) const;
 
@@ -166,12 +260,34 @@ namespace bob {
 
         void computeKernelFrequencies();
 
+        template <typename T, int N>
+        void jetImage(
+          const blitz::Array<std::complex<double>,2>& gray_image,
+          blitz::Array<T,N>& jet_image,
+          bool do_normalize
+        );
+
+        template <typename T, int N>
+        void transformStack(
+          const blitz::Array<std::complex<double>,3>& gray_images,
+          blitz::Array<T,N>& output,
+          bool do_normalize,
+          const size_t n_threads
+        );
+
+        void computeResponses(
+          const blitz::Array<std::complex<double>,2>& gray_image,
+          const blitz::Array<int,2>& positions
+        );
+
         double m_sigma;
         double m_pow_of_k;
         double m_k_max;
         double m_k_fac;
         bool m_dc_free;
         std::vector<GaborKernel> m_gabor_kernels;
+        //! The kernels generated for other resolutions, which are reused when the resolution changes back
+        std::map<std::pair<unsigned,unsigned>, std::vector<GaborKernel> > m_kernel_cache;
 
         std::vector<blitz::TinyVector<double,2> > m_kernel_frequencies;
 
@@ -180,6 +296,9 @@ namespace bob {
 
         blitz::Array<std::complex<double>,2> m_temp_array, m_frequency_image;
 
+        //! The responses of all kernels (columns) at the requested positions (rows)
+        blitz::Array<std::complex<double>,2> m_responses;
+
         //! The number of scales (levels, frequencies) of this family
         unsigned m_number_of_scales;
         //! The number of directions (orientations) of this family
@@ -187,10 +306,19 @@ namespace bob {
     }; // class GaborWaveletTransform
 
     //! Normalizes a Gabor jet (vector of absolute values) to unit length
-    void normalizeGaborJet(blitz::Array<double,1>& gabor_jet);
-
-    //! Normalizes a Gabor jet (vector of absolute and phase values) to unit length
-    void normalizeGaborJet(blitz::Array<double,2>& gabor_jet);
+    template <typename T>
+    void normalizeGaborJet(blitz::Array<T,1>& gabor_jet){
+      double norm = sqrt(std::inner_product(gabor_jet.begin(), gabor_jet.end(), gabor_jet.begin(), 0.));
+      // normalize the absolute parts of the jets
+      gabor_jet /= norm;
+    }
+
+    //! Normalizes a Gabor jet (vector of absolute and phase values) to unit length, the phase values being left unaltered
+    template <typename T>
+    void normalizeGaborJet(blitz::Array<T,2>& gabor_jet){
+      blitz::Array<T,1> abs_jet = gabor_jet(0, blitz::Range::all());
+      normalizeGaborJet(abs_jet);
+    }
 
   } // namespace ip
 
@@ -237,6 +237,47 @@ class GMMMachine: public Machine<blitz::Array<double,1>, double>
      */
     double logLikelihood_(const blitz::Array<double, 1> &x) const;
 
+    /**
+     * Output the log likelihood of each sample of X, i.e. log(p(x|GMMMachine))
+     * for each row x of X. The samples are processed by blocks, using matrix
+     * products rather than evaluating each Gaussian separately.
+     * @param[in]  X                                 The samples (one per row)
+     * @param[out] log_weighted_gaussian_likelihoods For each sample t and
+     *   Gaussian i: log(weight_i*p(x_t|Gaussian_i))
+     * @param[out] log_likelihoods                   For each sample t:
+     *   log(p(x_t|GMMMachine))
+     * Dimensions of the parameters are checked
+     */
+    void logLikelihood(const blitz::Array<double,2> &X,
+      blitz::Array<double,2> &log_weighted_gaussian_likelihoods,
+      blitz::Array<double,1> &log_likelihoods) const;
+
+    /**
+     * Output the log likelihood of each sample of X, i.e. log(p(x|GMMMachine))
+     * for each row x of X.
+     * @see logLikelihood(const blitz::Array<double,2> &X, blitz::Array<double,2> &log_weighted_gaussian_likelihoods, blitz::Array<double,1> &log_likelihoods)
+     * @warning Dimensions of the parameters are not checked
+     */
+    void logLikelihood_(const blitz::Array<double,2> &X,
+      blitz::Array<double,2> &log_weighted_gaussian_likelihoods,
+      blitz::Array<double,1> &log_likelihoods) const;
+
+    /**
+     * Output the log likelihood of each sample of X, i.e. log(p(x|GMMMachine))
+     * for each row x of X.
+     * Dimensions of the parameters are checked
+     */
+    void logLikelihood(const blitz::Array<double,2> &X,
+      blitz::Array<double,1> &log_likelihoods) const;
+
+    /**
+     * Output the log likelihood of each sample of X, i.e. log(p(x|GMMMachine))
+     * for each row x of X.
+     * @warning Dimensions of the parameters are not checked
+     */
+    void logLikelihood_(const blitz::Array<double,2> &X,
+      blitz::Array<double,1> &log_likelihoods) const;
+
     /**
      * Output the log likelihood of the sample, x
      * (overrides Machine::forward)
@@ -253,6 +294,9 @@ class GMMMachine: public Machine<blitz::Array<double,1>, double>
 
     /**
      * Accumulates the GMM statistics over a set of samples.
+     * The samples are processed by blocks: the responsibilities and the
+     * zeroth, first and second order statistics are computed with matrix
+     * operations.
      * @see bool accStatistics(const blitz::Array<double,1> &x, GMMStats stats)
      * Dimensions of the parameters are checked
      */
@@ -296,6 +340,8 @@ class GMMMachine: public Machine<blitz::Array<double,1>, double>
      * @param[in] i The index of the Gaussian component
      * @return A smart pointer to the i'th Gaussian component
      *         if it exists, otherwise throws an exception
+     * @warning The cached supervectors are invalidated, and are recomputed
+     *          the next time they are needed
      */
     boost::shared_ptr<bob::machine::Gaussian> updateGaussian(const size_t i);
 
@@ -373,6 +419,27 @@ class GMMMachine: public Machine<blitz::Array<double,1>, double>
     void accStatisticsInternal(const blitz::Array<double,1> &x,
       GMMStats &stats, const double log_likelihood) const;
 
+    /**
+     * Computes the log likelihoods of a block of samples.
+     * Called by logLikelihood_() and accStatistics_() over 2D arrays
+     *
+     * @param[in]  X  The samples (one per row)
+     * @param[out] xx The squared samples (working array of the same size
+     *   as X, provided by the caller)
+     * @param[out] L  The log weighted Gaussian likelihoods of each sample
+     * @param[out] ll The log likelihood of each sample
+     * @warning Dimensions of the parameters are not checked
+     */
+    void logLikelihoodBlock(const blitz::Array<double,2> &X,
+      blitz::Array<double,2> &xx, blitz::Array<double,2> &L,
+      blitz::Array<double,1> &ll) const;
+
+    /**
+     * The maximum number of samples processed at once by the 2D
+     * logLikelihood_() and accStatistics_() methods
+     */
+    static const int s_block_size;
+
 
     /// Some cache arrays to avoid re-allocation when computing log-likelihoods
     mutable blitz::Array<double,1> m_cache_log_weights;
@@ -384,6 +451,15 @@ class GMMMachine: public Machine<blitz::Array<double,1>, double>
     mutable blitz::Array<double,1> m_cache_variance_supervector;
     mutable bool m_cache_supervector;
 
+    /// Some cache arrays used to compute the log-likelihoods of several
+    /// samples at once, which are updated together with the supervectors:
+    /// - the inverse variances, 1/sigma_i (one row per Gaussian)
+    /// - the means divided by the variances, mu_i/sigma_i
+    /// - the constant terms, -1/2*(g_norm_i + sum(mu_i^2/sigma_i))
+    mutable blitz::Array<double,2> m_cache_inv_variances;
+    mutable blitz::Array<double,2> m_cache_weighted_means;
+    mutable blitz::Array<double,1> m_cache_gaussian_constants;
+
 };
 
 /**
@@ -88,6 +88,24 @@ namespace bob{ namespace machine {
         blitz::Array<double,2>& graph_jets
       ) const;
 
+      //! \brief extracts the Gabor jets of the graph directly from the image,
+      //! performing the Gabor wavelet transform at the node positions only
+      void extract(
+        bob::ip::GaborWaveletTransform& gwt,
+        const blitz::Array<std::complex<double>,2>& image,
+        blitz::Array<double,3>& graph_jets,
+        bool do_normalize = true
+      ) const;
+
+      //! \brief extracts the Gabor jets (abs part only) of the graph directly from the image,
+      //! performing the Gabor wavelet transform at the node positions only
+      void extract(
+        bob::ip::GaborWaveletTransform& gwt,
+        const blitz::Array<std::complex<double>,2>& image,
+        blitz::Array<double,2>& graph_jets,
+        bool do_normalize = true
+      ) const;
+
       //! averages multiple Gabor graphs into one
       void average(
         const blitz::Array<double,4>& many_graph_jets,
@@ -21,7 +21,9 @@
 #ifndef BOB_MACHINE_IVECTOR_H
 #define BOB_MACHINE_IVECTOR_H
 
+#include <vector>
 #include <blitz/array.h>
+#include <boost/shared_ptr.hpp>
 #include "Machine.h"
 #include "GMMMachine.h"
 #include "GMMStats.h"
@@ -229,6 +231,26 @@ class IVectorMachine: public bob::machine::Machine<bob::machine::GMMStats, blitz
      */
     void computeTtSigmaInvFnorm(const bob::machine::GMMStats& input, blitz::Array<double,1>& output) const;
 
+    /**
+     * @brief Computes \f$(Id + \sum_{c=1}^{C} N_{i,j,c} T^{T} \Sigma_{c}^{-1} T)\f$
+     * for a block of utterances at once, from their zeroth order statistics
+     * (one utterance per row of N, n x C). Each row of the output (n x rt*rt)
+     * is one of these matrices, stored in row-major order. The cached
+     * \f$T_{c}^{T} \Sigma_{c}^{-1} T_{c}\f$ blocks are combined with a single
+     * matrix product.
+     * @warning No check is perform
+     */
+    void computeIdTtSigmaInvT(const blitz::Array<double,2>& N, blitz::Array<double,2>& output) const;
+
+    /**
+     * @brief Computes \f$T^{T} \Sigma^{-1} \sum_{c=1}^{C} (F_c - N_c ubmmean_{c})\f$
+     * for a block of utterances at once, from their centered first order
+     * statistics (one utterance per row of Fnorm, n x CD). The output is
+     * n x rt.
+     * @warning No check is perform
+     */
+    void computeTtSigmaInvFnorm(const blitz::Array<double,2>& Fnorm, blitz::Array<double,2>& output) const;
+
     /**
      * @brief Extracts an ivector from the input GMM statistics
      *
@@ -246,6 +268,31 @@ class IVectorMachine: public bob::machine::Machine<bob::machine::GMMStats, blitz
      */
     void forward_(const bob::machine::GMMStats& input, blitz::Array<double,1>& output) const;
 
+    /**
+     * @brief Extracts the ivectors of several GMM statistics at once. The
+     * statistics are processed by tiles of utterances, for which the
+     * systems to solve are computed with matrix products, and the
+     * utterances are split over several threads.
+     *
+     * @param input GMM statistics to be used by the machine
+     * @param output I-vectors computed by the machine (one per row)
+     * @param n_threads number of threads the utterances are split over
+     */
+    void forward(const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& input,
+      blitz::Array<double,2>& output, const size_t n_threads=1) const;
+
+    /**
+     * @brief Extracts the ivectors of several utterances at once, whose
+     * statistics are stacked in arrays. See the previous method.
+     *
+     * @param n zeroth order statistics (one utterance per row, n x C)
+     * @param sumPx first order statistics (n x C x D)
+     * @param output I-vectors computed by the machine (one per row)
+     * @param n_threads number of threads the utterances are split over
+     */
+    void forward(const blitz::Array<double,2>& n, const blitz::Array<double,3>& sumPx,
+      blitz::Array<double,2>& output, const size_t n_threads=1) const;
+
   protected:
     /**
      * @brief Apply the variance flooring thresholds.
@@ -258,11 +305,7 @@ class IVectorMachine: public bob::machine::Machine<bob::machine::GMMStats, blitz
      */
     void resizeCache();
     /**
-     * @brief Resize working arrays
-     */
-    void resizeTmp();
-    /**
-     * @brief Resize cache and working arrays before updating cache
+     * @brief Resize cache before updating cache
      */
     void resizePrecompute();
 
@@ -280,11 +323,7 @@ class IVectorMachine: public bob::machine::Machine<bob::machine::GMMStats, blitz
 
     blitz::Array<double,3> m_cache_Tct_sigmacInv;
     blitz::Array<double,3> m_cache_Tct_sigmacInv_Tc;
-
-    mutable blitz::Array<double,1> m_tmp_d;
-    mutable blitz::Array<double,1> m_tmp_t1;
-    mutable blitz::Array<double,1> m_tmp_t2;
-    mutable blitz::Array<double,2> m_tmp_tt;
+    blitz::Array<double,2> m_cache_sigmaInvT; ///< \f$\Sigma^{-1} T\f$ (CD x rt)
 };
 
 /**
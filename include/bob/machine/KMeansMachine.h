@@ -171,6 +171,25 @@ class KMeansMachine: public Machine<blitz::Array<double,1>, double> {
     void getClosestMean(const blitz::Array<double,1>& x, 
       size_t &closest_mean, double &min_distance) const;
     
+    /**
+     * Calculate the index of the mean that is closest (in terms of Square 
+     * Euclidean distance) to each data sample (row) of x, as well as the
+     * distance of the sample from this mean. The distances are estimated by
+     * blocks of samples, using the expansion
+     * ||x-mean||^2 = ||x||^2 - 2 x.mean + ||mean||^2
+     * which loses precision when the data is far from the origin compared
+     * with its spread. The exact distances are hence computed for the means
+     * which are the closest ones up to the rounding errors of this
+     * expansion, so that the results are the ones of getClosestMean().
+     * @param x The data samples (one per row)
+     * @param closest_means (output) The indices of the closest means
+     * @param min_distances (output) The distances of the samples from the 
+     *   closest means
+     */
+    void getClosestMeans(const blitz::Array<double,2>& x,
+      blitz::Array<int,1>& closest_means,
+      blitz::Array<double,1>& min_distances) const;
+
     /**
      * Output the minimum (Square Euclidean) distance between the input and 
      * one of the means
@@ -255,6 +274,11 @@ class KMeansMachine: public Machine<blitz::Array<double,1>, double> {
      * cache to avoid re-allocation
      */
     mutable blitz::Array<double,2> m_cache_means;
+
+    /**
+     * The number of samples processed at once by getClosestMeans()
+     */
+    static const int s_block_size;
 };
 
 /**
@@ -280,8 +280,6 @@ namespace bob { namespace machine {
       blitz::Array<double, 2> m_weight; ///< weights
       blitz::Array<double, 1> m_bias; ///< biases for the output
       boost::shared_ptr<Activation> m_activation; ///< currently set activation type
-
-      mutable blitz::Array<double, 1> m_buffer; ///< a buffer for speed
   
   };
 
@@ -34,6 +34,10 @@ namespace bob { namespace machine {
 /**
  * Compute a matrix of scores using linear scoring.
  *
+ * The models and the test statistics are packed into contiguous matrices,
+ * and the scores are computed by tiles of test trials with a matrix
+ * product. The test trials may be split over several threads.
+ *
  * @warning Each GMM must have the same size.
  * 
  * @param models        list of mean supervector for the client models
@@ -43,6 +47,7 @@ namespace bob { namespace machine {
  * @param test_channelOffset  list of channel offset if any (for JFA/ISA for instance)
  * @param frame_length_normalisation   perform a normalisation by the number of feature vectors
  * @param[out] scores 2D matrix of scores, <tt>scores[m, s]</tt> is the score for model @c m against statistics @c s
+ * @param n_threads   number of threads the test trials are split over
  * @warning the output scores matrix should have the correct size (number of models x number of test_stats)
  */
 void linearScoring(const std::vector<blitz::Array<double,1> >& models,
@@ -50,12 +55,14 @@ void linearScoring(const std::vector<blitz::Array<double,1> >& models,
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const std::vector<blitz::Array<double, 1> >& test_channelOffset,
                    const bool frame_length_normalisation,
-                   blitz::Array<double,2>& scores);
+                   blitz::Array<double,2>& scores,
+                   const size_t n_threads=1);
 void linearScoring(const std::vector<blitz::Array<double,1> >& models,
                    const blitz::Array<double,1>& ubm_mean, const blitz::Array<double,1>& ubm_variance,
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const bool frame_length_normalisation,
-                   blitz::Array<double,2>& scores);
+                   blitz::Array<double,2>& scores,
+                   const size_t n_threads=1);
 
 /**
  * Compute a matrix of scores using linear scoring.
@@ -67,13 +74,15 @@ void linearScoring(const std::vector<blitz::Array<double,1> >& models,
  * @param test_stats  list of accumulate statistics for each test trial
  * @param frame_length_normalisation   perform a normalisation by the number of feature vectors
  * @param[out] scores 2D matrix of scores, <tt>scores[m, s]</tt> is the score for model @c m against statistics @c s
+ * @param n_threads   number of threads the test trials are split over
  * @warning the output scores matrix should have the correct size (number of models x number of test_stats)
  */
 void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMachine> >& models,
                    const bob::machine::GMMMachine& ubm,
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const bool frame_length_normalisation,
-                   blitz::Array<double,2>& scores);
+                   blitz::Array<double,2>& scores,
+                   const size_t n_threads=1);
 /**
  * Compute a matrix of scores using linear scoring.
  *
@@ -85,6 +94,7 @@ void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMa
  * @param test_channelOffset  list of channel offset if any (for JFA/ISA for instance)
  * @param frame_length_normalisation   perform a normalisation by the number of feature vectors
  * @param[out] scores 2D matrix of scores, <tt>scores[m, s]</tt> is the score for model @c m against statistics @c s
+ * @param n_threads   number of threads the test trials are split over
  * @warning the output scores matrix should have the correct size (number of models x number of test_stats)
  */
 void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMachine> >& models,
@@ -92,7 +102,8 @@ void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMa
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const std::vector<blitz::Array<double, 1> >& test_channelOffset,
                    const bool frame_length_normalisation,
-                   blitz::Array<double,2>& scores);
+                   blitz::Array<double,2>& scores,
+                   const size_t n_threads=1);
 
 /**
  * Compute a score using linear scoring.
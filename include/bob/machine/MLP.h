@@ -377,6 +377,21 @@ namespace bob { namespace machine {
        */
       void randomize(double lower_bound=-0.1, double upper_bound=+0.1);
 
+    private: //methods
+
+      /**
+       * Allocates the buffers for the outputs of each layer (but the last)
+       */
+      void allocateBuffer(std::vector<blitz::Array<double,1> >& buffer) const;
+
+      /**
+       * Forwards data through the network, the outputs of each layer being
+       * stored in the given buffers (see allocateBuffer())
+       */
+      void forward_ (const blitz::Array<double,1>& input,
+          blitz::Array<double,1>& output,
+          std::vector<blitz::Array<double,1> >& buffer) const;
+
     private: //representation
 
       blitz::Array<double, 1> m_input_sub; ///< input subtraction
@@ -385,7 +400,6 @@ namespace bob { namespace machine {
       std::vector<blitz::Array<double, 1> > m_bias; ///< biases for the output
       boost::shared_ptr<Activation> m_hidden_activation; ///< currently set activation type
       boost::shared_ptr<Activation> m_output_activation; ///< currently set activation type
-      mutable std::vector<blitz::Array<double, 1> > m_buffer; ///< buffer for the outputs of each layer
   
   };
 
@@ -28,7 +28,9 @@
 #include <blitz/array.h>
 #include <bob/io/HDF5File.h>
 #include <map>
+#include <vector>
 #include <iostream>
+#include <boost/shared_ptr.hpp>
 
 namespace bob { namespace machine {
 /**
@@ -412,12 +414,9 @@ class PLDABase
      */
     std::map<size_t, double> m_cache_loglike_constterm;
 
-    // working arrays
-    mutable blitz::Array<double,1> m_tmp_d_1; ///< Cache vector of size dim_d
-    mutable blitz::Array<double,1> m_tmp_d_2; ///< Cache vector of size dim_d
-    mutable blitz::Array<double,2> m_tmp_d_ng_1; ///< Cache matrix of size dim_d x dim_g
-    mutable blitz::Array<double,2> m_tmp_nf_nf_1; ///< Cache matrix of size dim_f x dim_f
-    mutable blitz::Array<double,2> m_tmp_ng_ng_1; ///< Cache matrix of size dim_g x dim_g
+    // working arrays (of the non-const precomputations only)
+    blitz::Array<double,2> m_tmp_d_ng_1; ///< Cache matrix of size dim_d x dim_g
+    blitz::Array<double,2> m_tmp_ng_ng_1; ///< Cache matrix of size dim_g x dim_g
 
     // private methods
     void resizeNoInit(const size_t dim_d, const size_t dim_f, const size_t dim_g);
@@ -693,24 +692,27 @@ class PLDAMachine: public Machine<blitz::Array<double,1>, double>
      */
     std::map<size_t, double> m_cache_loglike_constterm;
 
-
-    // working arrays
-    mutable blitz::Array<double,1> m_tmp_d_1; ///< Cache vector of size dim_d
-    mutable blitz::Array<double,1> m_tmp_d_2; ///< Cache vector of size dim_d
-    mutable blitz::Array<double,1> m_tmp_nf_1; ///< Cache vector of size dim_f
-    mutable blitz::Array<double,1> m_tmp_nf_2; ///< Cache vector of size dim_f
-    mutable blitz::Array<double,2> m_tmp_nf_nf_1; ///< Cache vector of size dim_f dim_f
-
     /** 
      * @brief Resizes the PLDAMachine
      */
     void resize(const size_t dim_d, const size_t dim_f, const size_t dim_g);
-    /**
-     * @brief Resize working arrays
-     */
-    void resizeTmp();
 };
 
+/**
+ * @brief Computes the log-likelihood ratio scores of several enrolled PLDA
+ * models against several probe samples at once: scores(m,p) is the score
+ * of models[m] against the sample probes(p,:), as returned by forward().
+ *
+ * The terms of the scores which do not depend on the probes are computed
+ * once per model, and the probes are then scored by tiles with matrix
+ * products, split into contiguous shards over n_threads threads.
+ *
+ * @warning All the models should share the same PLDABase.
+ */
+void pldaScoring(const std::vector<boost::shared_ptr<const PLDAMachine> >& models,
+  const blitz::Array<double,2>& probes, blitz::Array<double,2>& scores,
+  const size_t n_threads=1);
+
 /**
  * @}
  */
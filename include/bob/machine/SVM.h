@@ -25,7 +25,6 @@
 
 #include <svm.h>
 #include <boost/shared_ptr.hpp>
-#include <boost/shared_array.hpp>
 #include <blitz/array.h>
 #include <fstream>
 #include <bob/io/HDF5File.h>
@@ -380,7 +379,6 @@ namespace bob { namespace machine {
     private: //representation
 
       boost::shared_ptr<svm_model> m_model; ///< libsvm model pointer
-      mutable boost::shared_array<svm_node> m_input_cache; ///< cache
       size_t m_input_size; ///< vector size expected as input for the SVM's
       blitz::Array<double,1> m_input_sub; ///< scaling: subtraction
       blitz::Array<double,1> m_input_div; ///< scaling: division
@@ -219,9 +219,6 @@ class WienerMachine: Machine<blitz::Array<double,2>, blitz::Array<double,2> >
     blitz::Array<double, 2> m_W; ///< Wiener filter in the frequency domain (W=1/(1+Pn/Ps))
     bob::sp::FFT2D m_fft;
     bob::sp::IFFT2D m_ifft;
-
-    mutable blitz::Array<std::complex<double>, 2> m_buffer1; ///< a buffer for speed
-    mutable blitz::Array<std::complex<double>, 2> m_buffer2; ///< a buffer for speed
 };
 
 /**
@@ -23,6 +23,7 @@
 #define BOB_MACHINE_ZTNORM_H
 
 #include <blitz/array.h>
+#include <bob/io/File.h>
 
 namespace bob { namespace machine {
 /**
@@ -33,6 +34,9 @@ namespace bob { namespace machine {
 /**
  * Normalise raw scores with ZT-Norm
  *
+ * The T-Norm statistics are computed in a single pass over the tnorm
+ * scores, and the rows of the raw scores are then normalised independently.
+ *
  * @exception std::runtime_error matrix sizes are not consistent
  * 
  * @param rawscores_probes_vs_models
@@ -41,6 +45,7 @@ namespace bob { namespace machine {
  * @param rawscores_zprobes_vs_tmodels
  * @param mask_zprobes_vs_tmodels_istruetrial
  * @param[out] normalizedscores normalized scores
+ * @param n_threads number of threads the rows of the scores are split over
  * @warning The destination score array should have the correct size
  *          (Same size as rawscores_probes_vs_models)
  */
@@ -49,7 +54,8 @@ void ztNorm(const blitz::Array<double, 2>& rawscores_probes_vs_models,
             const blitz::Array<double, 2>& rawscores_probes_vs_tmodels,
             const blitz::Array<double, 2>& rawscores_zprobes_vs_tmodels,
             const blitz::Array<bool,   2>& mask_zprobes_vs_tmodels_istruetrial,
-            blitz::Array<double, 2>& normalizedscores);
+            blitz::Array<double, 2>& normalizedscores,
+            const size_t n_threads=1);
 
 /**
  * Normalise raw scores with ZT-Norm.
@@ -62,6 +68,7 @@ void ztNorm(const blitz::Array<double, 2>& rawscores_probes_vs_models,
  * @param rawscores_probes_vs_tmodels
  * @param rawscores_zprobes_vs_tmodels
  * @param[out] normalizedscores normalized scores
+ * @param n_threads number of threads the rows of the scores are split over
  * @warning The destination score array should have the correct size
  *          (Same size as rawscores_probes_vs_models)
  */
@@ -69,7 +76,8 @@ void ztNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
             const blitz::Array<double,2>& rawscores_zprobes_vs_models,
             const blitz::Array<double,2>& rawscores_probes_vs_tmodels,
             const blitz::Array<double,2>& rawscores_zprobes_vs_tmodels,
-            blitz::Array<double,2>& normalizedscores);
+            blitz::Array<double,2>& normalizedscores,
+            const size_t n_threads=1);
 
 /**
  * Normalise raw scores with T-Norm.
@@ -79,12 +87,14 @@ void ztNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
  * @param rawscores_probes_vs_models
  * @param rawscores_probes_vs_tmodels
  * @param[out] normalizedscores normalized scores
+ * @param n_threads number of threads the rows of the scores are split over
  * @warning The destination score array should have the correct size
  *          (Same size as rawscores_probes_vs_models)
  */
 void tNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
            const blitz::Array<double,2>& rawscores_probes_vs_tmodels,
-           blitz::Array<double,2>& normalizedscores);
+           blitz::Array<double,2>& normalizedscores,
+           const size_t n_threads=1);
 
 /**
  * Normalise raw scores with Z-Norm.
@@ -94,12 +104,77 @@ void tNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
  * @param rawscores_probes_vs_models
  * @param rawscores_zprobes_vs_models
  * @param[out] normalizedscores normalized scores
+ * @param n_threads number of threads the rows of the scores are split over
  * @warning The destination score array should have the correct size
  *          (Same size as rawscores_probes_vs_models)
  */
 void zNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
            const blitz::Array<double,2>& rawscores_zprobes_vs_models,
-           blitz::Array<double,2>& normalizedscores);
+           blitz::Array<double,2>& normalizedscores,
+           const size_t n_threads=1);
+
+/**
+ * Normalise raw scores with ZT-Norm, reading the matrices from files
+ * (e.g. HDF5 files) which store them as sequences of rows. The tnorm scores
+ * are read once to compute the T-Norm statistics, and the raw scores are
+ * then normalised by blocks of rows, which are appended to the output file.
+ * Only a block of rows of the raw scores is hence held in memory.
+ *
+ * @exception std::runtime_error matrix sizes are not consistent
+ *
+ * @param rawscores_probes_vs_models
+ * @param rawscores_zprobes_vs_models
+ * @param rawscores_probes_vs_tmodels
+ * @param rawscores_zprobes_vs_tmodels
+ * @param mask_zprobes_vs_tmodels_istruetrial
+ * @param[out] normalizedscores file the normalized scores are appended to
+ * @param block_size number of rows normalised at once
+ * @param n_threads number of threads the rows of a block are split over
+ */
+void ztNorm(bob::io::File& rawscores_probes_vs_models,
+            bob::io::File& rawscores_zprobes_vs_models,
+            bob::io::File& rawscores_probes_vs_tmodels,
+            bob::io::File& rawscores_zprobes_vs_tmodels,
+            bob::io::File& mask_zprobes_vs_tmodels_istruetrial,
+            bob::io::File& normalizedscores,
+            const size_t block_size=1024,
+            const size_t n_threads=1);
+
+/**
+ * Normalise raw scores with ZT-Norm, reading the matrices from files.
+ * Assume that znorm and tnorm have no common subject id.
+ *
+ * @see ztNorm()
+ */
+void ztNorm(bob::io::File& rawscores_probes_vs_models,
+            bob::io::File& rawscores_zprobes_vs_models,
+            bob::io::File& rawscores_probes_vs_tmodels,
+            bob::io::File& rawscores_zprobes_vs_tmodels,
+            bob::io::File& normalizedscores,
+            const size_t block_size=1024,
+            const size_t n_threads=1);
+
+/**
+ * Normalise raw scores with T-Norm, reading the matrices from files.
+ *
+ * @see ztNorm()
+ */
+void tNorm(bob::io::File& rawscores_probes_vs_models,
+           bob::io::File& rawscores_probes_vs_tmodels,
+           bob::io::File& normalizedscores,
+           const size_t block_size=1024,
+           const size_t n_threads=1);
+
+/**
+ * Normalise raw scores with Z-Norm, reading the matrices from files.
+ *
+ * @see ztNorm()
+ */
+void zNorm(bob::io::File& rawscores_probes_vs_models,
+           bob::io::File& rawscores_zprobes_vs_models,
+           bob::io::File& normalizedscores,
+           const size_t block_size=1024,
+           const size_t n_threads=1);
 
 /**
  * @}
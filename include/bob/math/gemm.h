@@ -0,0 +1,59 @@
+/**
+ * @file bob/math/gemm.h
+ * @date Sun Oct 18 11:02:47 2026 +0200
+ *
+ * @brief This file defines a function to multiply 2D blitz array matrices
+ * with the BLAS dgemm function.
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ * 
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ * 
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#ifndef BOB_MATH_GEMM_H
+#define BOB_MATH_GEMM_H
+
+#include <blitz/array.h>
+
+namespace bob { namespace math {
+/**
+ * @ingroup MATH
+ * @{
+ */
+
+/**
+ * @brief Function which computes C = alpha*op(A)*op(B) + beta*C, where
+ *   op(X) is either X or its transpose, using the dgemm BLAS function.
+ *   Contrary to prod(), this is efficient for large matrices.
+ * @param A The A matrix (size MxK, or KxM if transA is set)
+ * @param B The B matrix (size KxN, or NxK if transB is set)
+ * @param C The C matrix (size MxN)
+ * @param transA Whether A should be transposed
+ * @param transB Whether B should be transposed
+ * @param alpha The scaling factor of the product
+ * @param beta The scaling factor of the initial content of C (which is
+ *   ignored if beta is 0)
+ */
+void gemm(const blitz::Array<double,2>& A, const blitz::Array<double,2>& B,
+  blitz::Array<double,2>& C, const bool transA=false, const bool transB=false,
+  const double alpha=1., const double beta=0.);
+void gemm_(const blitz::Array<double,2>& A, const blitz::Array<double,2>& B,
+  blitz::Array<double,2>& C, const bool transA=false, const bool transB=false,
+  const double alpha=1., const double beta=0.);
+
+/**
+ * @}
+ */
+}}
+
+#endif /* BOB_MATH_GEMM_H */
@@ -24,6 +24,9 @@
 #define BOB_MEASURE_ERROR_H
 
 #include <blitz/array.h>
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
 #include <utility>
 #include <vector>
 
@@ -120,59 +123,90 @@ namespace bob { namespace measure {
       return blitz::Array<bool,1>(negatives < threshold);
     }
 
-  /**
-   * Recursively minimizes w.r.t. to the given predicate method. Please refer
-   * to minimizingThreshold() for a full explanation. This method is only
-   * supposed to be used through that method.
-   */
-  template <typename T>
-  static double recursive_minimization(const blitz::Array<double,1>& negatives,
-      const blitz::Array<double,1>& positives, T& predicate,
-      double min, double max, size_t steps) {
-    static const double QUIT_THRESHOLD = 1e-10;
-    const double diff = max - min;
-    const double too_small = std::abs(diff/max);
-
-    //if the difference between max and min is too small, we quit.
-    if ( too_small < QUIT_THRESHOLD ) return min; //or max, does not matter...
-
-    double step_size = diff/(double)steps;
-    double min_value = predicate(1.0, 0.0); ///< to the left of the range
-
-    //the accumulator holds the thresholds that given the minimum value for the
-    //input predicate.
-    std::vector<double> accumulator;
-    accumulator.reserve(steps);
-
-    for (size_t i=0; i<steps; ++i) {
-      double threshold = ((double)i * step_size) + min;
-
-      std::pair<double, double> ratios =
-        farfrr(negatives, positives, threshold);
-
-      double current_cost = predicate(ratios.first, ratios.second);
-
-      if (current_cost < min_value) {
-        min_value = current_cost;
-        accumulator.clear(); ///< clean-up, we got a better minimum
-        accumulator.push_back(threshold); ///< remember this threshold
+  namespace detail {
+
+    /**
+     * Copies the given scores into a std::vector and sorts them ascendingly.
+     * This is the first step of every method that sweeps over the scores.
+     */
+    void sortScores(const blitz::Array<double,1>& scores,
+        std::vector<double>& sorted);
+
+    /**
+     * Returns a threshold strictly above the highest of the given sorted
+     * (distinct) scores, even if there is a single one.
+     */
+    double thresholdAbove(const std::vector<double>& scores);
+
+    /**
+     * Minimizes the given predicate w.r.t. the threshold, using scores that
+     * were already sorted ascendingly (see sortScores()). Please refer to
+     * minimizingThreshold() for a full explanation.
+     *
+     * The false-acceptance and false-rejection ratios only change at the
+     * (distinct) score values, so it is sufficient to evaluate the predicate
+     * once per distinct score, plus once above the highest score. This is done
+     * in a single linear pass over both sorted score lists.
+     */
+    template <typename T> double
+      sortedMinimizingThreshold(const std::vector<double>& negatives,
+          const std::vector<double>& positives, T& predicate) {
+        // all distinct score values, in ascending order
+        std::vector<double> scores(negatives.size() + positives.size());
+        std::merge(negatives.begin(), negatives.end(),
+            positives.begin(), positives.end(), scores.begin());
+        scores.erase(std::unique(scores.begin(), scores.end()), scores.end());
+
+        if (scores.empty())
+          throw std::runtime_error("cannot compute a threshold without scores");
+
+        const double total_negatives = negatives.size() ? negatives.size() : 1;
+        const double total_positives = positives.size() ? positives.size() : 1;
+
+        // the interval k contains the thresholds in (scores[k-1], scores[k]];
+        // the last interval (k == scores.size()) lies above the highest score.
+        // the accumulator holds the intervals that give the minimum value for
+        // the input predicate.
+        std::vector<size_t> accumulator;
+        double min_value = 0.;
+        size_t below_negatives = 0; ///< negatives smaller than the threshold
+        size_t below_positives = 0; ///< positives smaller than the threshold
+
+        for (size_t k=0; k<=scores.size(); ++k) {
+          if (k < scores.size()) {
+            while (below_negatives < negatives.size() &&
+                negatives[below_negatives] < scores[k]) ++below_negatives;
+            while (below_positives < positives.size() &&
+                positives[below_positives] < scores[k]) ++below_positives;
+          }
+          else {
+            below_negatives = negatives.size();
+            below_positives = positives.size();
+          }
+
+          double current_cost = predicate(
+              (negatives.size() - below_negatives) / total_negatives,
+              below_positives / total_positives);
+
+          if (!k || current_cost < min_value) {
+            min_value = current_cost;
+            accumulator.clear(); ///< clean-up, we got a better minimum
+            accumulator.push_back(k); ///< remember this interval
+          }
+          else if (std::abs(current_cost - min_value) < 1e-16) {
+            //accumulate to later decide...
+            accumulator.push_back(k);
+          }
+        }
+
+        // if the minimum lies in several intervals, the center one is picked up
+        const size_t k = accumulator[accumulator.size()/2];
+        if (k == 0) return scores.front();
+        if (k == scores.size()) return thresholdAbove(scores);
+        // the middle of the interval
+        return 0.5 * (scores[k-1] + scores[k]);
       }
-      else if (std::abs(current_cost - min_value) < 1e-16) {
-        //accumulate to later decide...
-        accumulator.push_back(threshold);
-      }
-    }
-
-    //we stop when it doesn't matter anymore to threshold.
-    if (accumulator.size() != steps) {
-      //still needs some refinement: pick-up the middle of the range and go
-      return recursive_minimization(negatives, positives, predicate,
-          accumulator[accumulator.size()/2]-step_size,
-          accumulator[accumulator.size()/2]+step_size,
-          steps);
-    }
 
-    return accumulator[accumulator.size()/2];
   }
 
   /**
@@ -188,31 +222,24 @@ namespace bob { namespace measure {
    *
    * double predicate(double fa_ratio, double fr_ratio);
    *
-   * Please note that this method will only work with single-minimum smooth
-   * predicates.
+   * The minimization is exact: the scores are sorted once and the predicate
+   * is evaluated at every distinct score value, in a single linear pass (see
+   * detail::sortedMinimizingThreshold()). The overall complexity is
+   * O(N log N), where N is the total number of scores, and the predicate does
+   * not need to be smooth or to have a single minimum.
    *
-   * The minimization is carried out in a recursive manner. First, we identify
-   * the threshold that minimizes the predicate given a set of N (N=100)
-   * thresholds between the min(negatives, positives) and the max(negatives,
-   * positives). If the minimum lies in a range of values, the center value is
-   * picked up.
-   *
-   * In a second round of minimization new minimum and maximum bounds are
-   * defined based on the center value plus/minus the step (max-min/N) and a
-   * new minimization round is restarted for N samples within the new bounds.
-   *
-   * The procedure continues until all calculated predicates in a given round
-   * give the same minimum. At this point, the center threshold is picked up and
-   * returned.
+   * The returned threshold lies in the middle between the score that
+   * minimizes the predicate and the next lower score. If the minimum is
+   * reached in several places, the center one is picked up.
    */
   template <typename T> double
     minimizingThreshold(const blitz::Array<double,1>& negatives,
         const blitz::Array<double,1>& positives, T& predicate) {
-      const size_t N = 100; ///< number of steps in each iteration
-      double min = std::min(blitz::min(negatives), blitz::min(positives));
-      double max = std::max(blitz::max(negatives), blitz::max(positives));
-      return recursive_minimization(negatives, positives, predicate, min,
-          max, N);
+      std::vector<double> negatives_, positives_;
+      detail::sortScores(negatives, negatives_);
+      detail::sortScores(positives, positives_);
+      return detail::sortedMinimizingThreshold(negatives_, positives_,
+          predicate);
     }
 
   /**
@@ -289,6 +316,10 @@ namespace bob { namespace measure {
    * The points in which the ROC curve are calculated are distributed
    * uniformly in the range [min(negatives, positives), max(negatives,
    * positives)].
+   *
+   * The scores are sorted only once, so the complexity is O(N log N) for
+   * sorting plus O(points log N) for evaluating all points, where N is the
+   * total number of scores.
    */
   blitz::Array<double,2> roc
     (const blitz::Array<double,1>& negatives,
@@ -300,7 +331,7 @@ namespace bob { namespace measure {
    * doubles that express the X (precision) and Y (recall) coordinates in this order.
    * The points in which the curve is calculated are distributed
    * uniformly in the range [min(negatives, positives), max(negatives,
-   * positives)].
+   * positives)]. As for roc(), the scores are sorted only once.
    */
   blitz::Array<double,2> precision_recall_curve
     (const blitz::Array<double,1>& negatives,
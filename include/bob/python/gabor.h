@@ -0,0 +1,59 @@
+/**
+ * @date Sun Oct 18 20:41:06 2026 +0200
+ *
+ * @brief Conversion of the images given to the Gabor wavelet transform
+ * bindings, shared by the ip and machine bindings.
+ */
+
+#ifndef BOB_PYTHON_GABOR_H
+#define BOB_PYTHON_GABOR_H
+
+#include <complex>
+#include <stdexcept>
+#include <blitz/array.h>
+
+#include "bob/python/ndarray.h"
+#include "bob/core/cast.h"
+#include "bob/ip/color.h"
+
+namespace bob { namespace python {
+
+  namespace detail {
+
+    template <typename T>
+    inline blitz::Array<std::complex<double>,2> color_to_complex(const_ndarray input) {
+      blitz::Array<T,2> gray(input.type().shape[1], input.type().shape[2]);
+      bob::ip::rgb_to_gray(input.bz<T,3>(), gray);
+      return bob::core::array::cast<std::complex<double> >(gray);
+    }
+
+  }
+
+  /**
+   * @brief Converts a gray or color image (uint8, uint16 or float64, or a
+   * gray complex128 image) into the complex gray image processed by the
+   * Gabor wavelet transform. Call it before releasing the GIL.
+   */
+  inline blitz::Array<std::complex<double>,2> convert_gabor_image(const_ndarray input) {
+    if (input.type().nd == 3) {
+      // perform color type conversion
+      switch (input.type().dtype) {
+        case bob::core::array::t_uint8: return detail::color_to_complex<uint8_t>(input);
+        case bob::core::array::t_uint16: return detail::color_to_complex<uint16_t>(input);
+        case bob::core::array::t_float64: return detail::color_to_complex<double>(input);
+        default: throw std::runtime_error("unsupported input data type");
+      }
+    } else {
+      switch (input.type().dtype) {
+        case bob::core::array::t_uint8: return bob::core::array::cast<std::complex<double> >(input.bz<uint8_t,2>());
+        case bob::core::array::t_uint16: return bob::core::array::cast<std::complex<double> >(input.bz<uint16_t,2>());
+        case bob::core::array::t_float64: return bob::core::array::cast<std::complex<double> >(input.bz<double,2>());
+        case bob::core::array::t_complex128: return input.bz<std::complex<double>,2>();
+        default: throw std::runtime_error("unsupported input data type");
+      }
+    }
+  }
+
+}}
+
+#endif /* BOB_PYTHON_GABOR_H */
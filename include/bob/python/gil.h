@@ -40,7 +40,10 @@ namespace bob { namespace python {
   };
 
   /**
-   * @brief Unlocks the Python GIL
+   * @brief Unlocks the Python GIL. Bindings to compute-heavy methods create
+   * one of these around the C++ call, once the arguments are converted and the
+   * outputs allocated: no Python object may be touched until the end of the
+   * scope.
    */
   class no_gil {
 
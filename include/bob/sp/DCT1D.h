@@ -25,6 +25,7 @@
 #define BOB_SP_DCT1D_H
 
 #include <blitz/array.h>
+#include <bob/sp/fftw.h>
 
 namespace bob { namespace sp {
 /**
@@ -76,6 +77,13 @@ class DCT1DAbstract
     virtual void operator()(const blitz::Array<double,1>& src, 
       blitz::Array<double,1>& dst) const = 0;
 
+    /**
+     * @brief process a stack of 1D arrays (the rows of a 2D array) by
+     * applying the DCT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<double,2>& src,
+      blitz::Array<double,2>& dst) const = 0;
+
     /**
      * @brief Reset the DCT1D object for the given 1D shape
      */
@@ -108,6 +116,13 @@ class DCT1DAbstract
      */
     size_t m_length;
 
+    /**
+     * Cached FFTW plans (single and batched transforms), which may be
+     * executed concurrently
+     */
+    mutable detail::FFTWPlan m_plan;
+    mutable detail::FFTWPlan m_plan_many;
+
     /**
      * Normalization factors
      */
@@ -150,6 +165,13 @@ class DCT1D: public DCT1DAbstract
      */
     virtual void operator()(const blitz::Array<double,1>& src, 
       blitz::Array<double,1>& dst) const;
+
+    /**
+     * @brief process a stack of 1D arrays (the rows of a 2D array) by
+     * applying the direct DCT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<double,2>& src,
+      blitz::Array<double,2>& dst) const;
 };
 
 
@@ -185,6 +207,13 @@ class IDCT1D: public DCT1DAbstract
      */
     virtual void operator()(const blitz::Array<double,1>& src, 
       blitz::Array<double,1>& dst) const;
+
+    /**
+     * @brief process a stack of 1D arrays (the rows of a 2D array) by
+     * applying the inverse DCT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<double,2>& src,
+      blitz::Array<double,2>& dst) const;
 };
 
 /**
@@ -25,6 +25,7 @@
 #define BOB_SP_DCT2D_H
 
 #include <blitz/array.h>
+#include <bob/sp/fftw.h>
 
 namespace bob { namespace sp {
 /**
@@ -75,6 +76,13 @@ class DCT2DAbstract
     virtual void operator()(const blitz::Array<double,2>& src, 
       blitz::Array<double,2>& dst) const = 0;
 
+    /**
+     * @brief process a stack of 2D arrays (a 3D array) by applying the
+     * DCT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<double,3>& src,
+      blitz::Array<double,3>& dst) const = 0;
+
     /**
      * @brief Reset the DCT2D object for the given 2D shape
      */
@@ -104,12 +112,24 @@ class DCT2DAbstract
     void reset();
 
   protected:
+    /**
+     * @brief Returns the shape of the FFTW plans
+     */
+    std::vector<int> planShape() const;
+
     /**
      * Private attributes
      */
     size_t m_height;
     size_t m_width;
 
+    /**
+     * Cached FFTW plans (single and batched transforms), which may be
+     * executed concurrently
+     */
+    mutable detail::FFTWPlan m_plan;
+    mutable detail::FFTWPlan m_plan_many;
+
     /**
      * Normalization factors
      */
@@ -152,6 +172,13 @@ class DCT2D: public DCT2DAbstract
      */
     virtual void operator()(const blitz::Array<double,2>& src, 
       blitz::Array<double,2>& dst) const;
+
+    /**
+     * @brief process a stack of 2D arrays (a 3D array) by applying the
+     * direct DCT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<double,3>& src,
+      blitz::Array<double,3>& dst) const;
 };
 
 
@@ -187,6 +214,13 @@ class IDCT2D: public DCT2DAbstract
      */
     virtual void operator()(const blitz::Array<double,2>& src, 
       blitz::Array<double,2>& dst) const;
+
+    /**
+     * @brief process a stack of 2D arrays (a 3D array) by applying the
+     * inverse DCT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<double,3>& src,
+      blitz::Array<double,3>& dst) const;
 };
 
 /**
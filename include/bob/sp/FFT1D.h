@@ -26,6 +26,7 @@
 
 #include <complex>
 #include <blitz/array.h>
+#include <bob/sp/fftw.h>
 
 namespace bob { namespace sp {
 /**
@@ -77,6 +78,13 @@ class FFT1DAbstract
     virtual void operator()(const blitz::Array<std::complex<double>,1>& src, 
       blitz::Array<std::complex<double>,1>& dst) const = 0;
 
+    /**
+     * @brief process a stack of 1D arrays (the rows of a 2D array) by
+     * applying the FFT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<std::complex<double>,2>& src,
+      blitz::Array<std::complex<double>,2>& dst) const = 0;
+
     /**
      * @brief Reset the FFT1D object for the given 1D shape
      */
@@ -96,6 +104,13 @@ class FFT1DAbstract
      * Private attributes
      */
     size_t m_length;
+
+    /**
+     * Cached FFTW plans (single and batched transforms), which may be
+     * executed concurrently
+     */
+    mutable detail::FFTWPlan m_plan;
+    mutable detail::FFTWPlan m_plan_many;
 };
 
 
@@ -131,6 +146,13 @@ class FFT1D: public FFT1DAbstract
      */
     virtual void operator()(const blitz::Array<std::complex<double>,1>& src, 
       blitz::Array<std::complex<double>,1>& dst) const;
+
+    /**
+     * @brief process a stack of 1D arrays (the rows of a 2D array) by
+     * applying the direct FFT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<std::complex<double>,2>& src,
+      blitz::Array<std::complex<double>,2>& dst) const;
 };
 
 
@@ -166,6 +188,13 @@ class IFFT1D: public FFT1DAbstract
      */
     virtual void operator()(const blitz::Array<std::complex<double>,1>& src, 
       blitz::Array<std::complex<double>,1>& dst) const;
+
+    /**
+     * @brief process a stack of 1D arrays (the rows of a 2D array) by
+     * applying the inverse FFT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<std::complex<double>,2>& src,
+      blitz::Array<std::complex<double>,2>& dst) const;
 };
 
 /**
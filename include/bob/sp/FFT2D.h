@@ -26,6 +26,7 @@
 
 #include <complex>
 #include <blitz/array.h>
+#include <bob/sp/fftw.h>
 
 namespace bob { namespace sp {
 /**
@@ -76,6 +77,13 @@ class FFT2DAbstract
     virtual void operator()(const blitz::Array<std::complex<double>,2>& src, 
       blitz::Array<std::complex<double>,2>& dst) const = 0;
 
+    /**
+     * @brief process a stack of 2D arrays (a 3D array) by applying the
+     * FFT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<std::complex<double>,3>& src,
+      blitz::Array<std::complex<double>,3>& dst) const = 0;
+
     /**
      * @brief process an array by applying the FFT inplace
      */
@@ -99,11 +107,23 @@ class FFT2DAbstract
     void setWidth(const size_t width);
 
   protected:
+    /**
+     * @brief Returns the shape of the FFTW plans
+     */
+    std::vector<int> planShape() const;
+
     /**
      * Private attributes
      */
     size_t m_height;
     size_t m_width;
+
+    /**
+     * Cached FFTW plans (single and batched transforms), which may be
+     * executed concurrently
+     */
+    mutable detail::FFTWPlan m_plan;
+    mutable detail::FFTWPlan m_plan_many;
 };
 
 
@@ -140,6 +160,13 @@ class FFT2D: public FFT2DAbstract
     virtual void operator()(const blitz::Array<std::complex<double>,2>& src, 
       blitz::Array<std::complex<double>,2>& dst) const;
 
+    /**
+     * @brief process a stack of 2D arrays (a 3D array) by applying the
+     * direct FFT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<std::complex<double>,3>& src,
+      blitz::Array<std::complex<double>,3>& dst) const;
+
     /**
      * @brief process an array by applying the FFT inplace
      */
@@ -180,6 +207,13 @@ class IFFT2D: public FFT2DAbstract
     virtual void operator()(const blitz::Array<std::complex<double>,2>& src, 
       blitz::Array<std::complex<double>,2>& dst) const;
 
+    /**
+     * @brief process a stack of 2D arrays (a 3D array) by applying the
+     * inverse FFT to each of them, using batched FFTW plans
+     */
+    virtual void operator()(const blitz::Array<std::complex<double>,3>& src,
+      blitz::Array<std::complex<double>,3>& dst) const;
+
     /**
      * @brief process an array by applying the inverse FFT inplace
      */
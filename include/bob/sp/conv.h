@@ -116,6 +116,50 @@ namespace detail {
     }
   }
 
+  /**
+   * @brief Fast convolution paths, which are only implemented for double
+   * arrays (see the overloads below). This generic version returns false,
+   * so that the direct convolution is used.
+   */
+  template <typename T>
+  bool convFast(const blitz::Array<T,1>&, const blitz::Array<T,1>&,
+    blitz::Array<T,1>&, const Conv::SizeOption)
+  {
+    return false;
+  }
+
+  template <typename T>
+  bool convFast(const blitz::Array<T,2>&, const blitz::Array<T,2>&,
+    blitz::Array<T,2>&, const Conv::SizeOption)
+  {
+    return false;
+  }
+
+  /**
+   * @brief Convolves a with a kernel b of at least convFastMinKernelSize
+   * elements using FFTs (overlap-add). Returns false for smaller kernels,
+   * in which case the direct convolution is faster.
+   */
+  bool convFast(const blitz::Array<double,1>& a,
+    const blitz::Array<double,1>& b, blitz::Array<double,1>& c,
+    const Conv::SizeOption size_opt);
+
+  /**
+   * @brief Convolves A with a kernel B of at least convFastMinKernelSize
+   * elements, either as two 1D convolutions if B is separable, or using
+   * FFTs (overlap-add) otherwise. Returns false for smaller kernels, in
+   * which case the direct convolution is faster.
+   */
+  bool convFast(const blitz::Array<double,2>& A,
+    const blitz::Array<double,2>& B, blitz::Array<double,2>& C,
+    const Conv::SizeOption size_opt);
+
+  /**
+   * @brief Minimal number of elements of a kernel for the fast convolution
+   * paths to be used
+   */
+  static const int convFastMinKernelSize = 64;
+
 }
 
 /**
@@ -280,6 +324,9 @@ void conv(const blitz::Array<T,1> a, const blitz::Array<T,1> b,
     throw std::runtime_error(m.str());
   }
 
+  // Large kernels are processed with FFTs
+  if (detail::convFast(a, b, c, size_opt)) return;
+
   if (size_opt == Conv::Full)
     detail::convInternal(a, b, c, N-1, 1);
   else if (size_opt == Conv::Same)
@@ -317,6 +364,10 @@ void conv(const blitz::Array<T,2> A, const blitz::Array<T,2> B,
     throw std::runtime_error(m.str());
   }
 
+  // Large kernels are processed as two 1D convolutions when separable, or
+  // with FFTs otherwise
+  if (detail::convFast(A, B, C, size_opt)) return;
+
   if (size_opt == Conv::Full)
     detail::convInternal(A, B, C, N0-1, 1, N1-1, 1);
   else if (size_opt == Conv::Same)
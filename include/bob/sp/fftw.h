@@ -0,0 +1,192 @@
+/**
+ * @file bob/sp/fftw.h
+ * @date Sat Oct 17 10:12:31 2026 +0200
+ *
+ * @brief Thread-safe cache of FFTW plans shared by the FFTW-based
+ * transforms of bob::sp, executed on per-thread aligned working buffers
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#ifndef BOB_SP_FFTW_H
+#define BOB_SP_FFTW_H
+
+#include <string>
+#include <vector>
+#include <complex>
+#include <boost/shared_ptr.hpp>
+#include <boost/thread/mutex.hpp>
+
+namespace bob { namespace sp {
+/**
+ * @ingroup SP
+ * @{
+ */
+
+/**
+ * @brief Enumerations of the FFTW planning rigor levels. A higher rigor
+ * takes longer to plan, but may lead to faster transforms.
+ */
+namespace FFTW {
+  typedef enum PlanningRigor_ {
+    Estimate,
+    Measure,
+    Patient,
+    Exhaustive
+  } PlanningRigor;
+}
+
+/**
+ * @brief Sets the rigor used to create the FFTW plans of all transforms.
+ * Plans which are already cached are kept, and new ones are created with
+ * the new rigor.
+ */
+void setFFTWPlanningRigor(const FFTW::PlanningRigor rigor);
+
+/**
+ * @brief Gets the rigor used to create the FFTW plans (Estimate by default)
+ */
+FFTW::PlanningRigor getFFTWPlanningRigor();
+
+/**
+ * @brief Imports FFTW wisdom from the given file, accumulating it with the
+ * wisdom already known.
+ */
+void importFFTWWisdom(const std::string& filename);
+
+/**
+ * @brief Exports the current FFTW wisdom to the given file
+ */
+void exportFFTWWisdom(const std::string& filename);
+
+/**
+ * @brief Releases all the FFTW plans of the cache. Transforms which still
+ * hold a plan keep on using it until they are reset.
+ */
+void clearFFTWPlanCache();
+
+/**
+ * @brief Returns the number of FFTW plans currently cached
+ */
+size_t getFFTWPlanCacheSize();
+
+namespace detail {
+
+  /**
+   * @brief An FFTW plan shared through the plan cache (opaque)
+   */
+  struct FFTWPlanHandle;
+
+  /**
+   * @brief The state of a prepared FFTW plan (opaque)
+   */
+  struct FFTWPlanState;
+
+  /**
+   * @brief This class holds the FFTW plan of a transform of a given kind and
+   * shape. The plan is fetched from the cache (or created) the first time
+   * the transform is executed, and is kept until the shape changes.
+   *
+   * The plans are executed on aligned working buffers owned by the calling
+   * thread, and the plan held is only replaced under a lock. A given
+   * instance may hence be executed concurrently by several threads, as the
+   * const operators of the transforms do.
+   */
+  class FFTWPlan
+  {
+    public:
+      /**
+       * @brief Constructor
+       */
+      FFTWPlan();
+
+      /**
+       * @brief Copy constructor
+       */
+      FFTWPlan(const FFTWPlan& other);
+
+      /**
+       * @brief Destructor
+       */
+      ~FFTWPlan();
+
+      /**
+       * @brief Assignment operator
+       */
+      FFTWPlan& operator=(const FFTWPlan& other);
+
+      /**
+       * @brief Releases the plan, which will be fetched again at the next
+       * execution
+       */
+      void reset();
+
+      /**
+       * @brief Executes a complex DFT of the given shape from src to dst
+       * (which may be the same array), sign being either FFTW_FORWARD or
+       * FFTW_BACKWARD
+       */
+      void executeDFT(const std::vector<int>& shape, const int sign,
+        const std::complex<double>* src, std::complex<double>* dst);
+
+      /**
+       * @brief Executes a real-to-real transform of the given shape from src
+       * to dst (which may be the same array), using the given fftw_r2r_kind
+       * along each dimension
+       */
+      void executeR2R(const std::vector<int>& shape, const int kind,
+        const double* src, double* dst);
+
+      /**
+       * @brief Executes complex DFTs of count contiguous frames of the given
+       * shape from src to dst (which may be the same array), by batches
+       * sharing a single plan
+       */
+      void executeManyDFT(const std::vector<int>& shape, const int sign,
+        const std::complex<double>* src, std::complex<double>* dst,
+        const size_t count);
+
+      /**
+       * @brief Executes real-to-real transforms of count contiguous frames of
+       * the given shape from src to dst (which may be the same array), by
+       * batches sharing a single plan
+       */
+      void executeManyR2R(const std::vector<int>& shape, const int kind,
+        const double* src, double* dst, const size_t count);
+
+    private:
+      boost::shared_ptr<const FFTWPlanState> acquire(
+        const std::vector<int>& key, const size_t frame_size,
+        const size_t howmany, const size_t element_size);
+
+      template <typename T>
+      void run(const int type, const int param, const std::vector<int>& shape,
+        const T* src, T* dst, const size_t count, const bool many);
+
+      /**
+       * Private attributes
+       */
+      boost::shared_ptr<const FFTWPlanState> m_state;
+      boost::mutex m_mutex;
+  };
+
+}
+
+/**
+ * @}
+ */
+}}
+
+#endif /* BOB_SP_FFTW_H */
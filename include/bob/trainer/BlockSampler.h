@@ -0,0 +1,152 @@
+/**
+ * @file bob/trainer/BlockSampler.h
+ * @date Sun Oct 18 11:05:47 2026 +0200
+ *
+ * @brief Streams blocks of samples from a list of files, for training sets
+ * that do not fit in memory
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#ifndef BOB_TRAINER_BLOCKSAMPLER_H
+#define BOB_TRAINER_BLOCKSAMPLER_H
+
+#include <vector>
+#include <string>
+#include <blitz/array.h>
+#include <boost/shared_ptr.hpp>
+#include <boost/random.hpp>
+#include <bob/io/File.h>
+
+namespace bob { namespace trainer {
+  /**
+   * @ingroup TRAINER
+   * @{
+   */
+
+  /**
+   * @brief A block sampler gives access to the samples stored in a list of
+   * files, without loading them all in memory. Each file is read as a
+   * sequence of 1D arrays (e.g. the rows of a 2D HDF5 dataset), which are
+   * the samples. The samples of all the files are concatenated, and may be
+   * read by blocks of consecutive samples, or at random.
+   *
+   * The files are read sequentially, and a sampler should therefore not be
+   * used concurrently by several threads.
+   */
+  class BlockSampler {
+
+    public: //api
+
+      /**
+       * @brief Constructs a sampler from a list of opened files
+       */
+      BlockSampler(const std::vector<boost::shared_ptr<bob::io::File> >& files,
+          const size_t block_size=4096);
+
+      /**
+       * @brief Constructs a sampler from a list of filenames, which are
+       * opened for reading
+       */
+      BlockSampler(const std::vector<std::string>& filenames,
+          const size_t block_size=4096);
+
+      /**
+       * @brief Copy constructor. The files are shared with the other sampler.
+       */
+      BlockSampler(const BlockSampler& other);
+
+      /**
+       * @brief Destructor
+       */
+      virtual ~BlockSampler();
+
+      /**
+       * @brief Assignment. The files are shared with the other sampler.
+       */
+      BlockSampler& operator=(const BlockSampler& other);
+
+      /**
+       * @brief The total number of samples
+       */
+      size_t getNSamples() const { return m_offsets.back(); }
+
+      /**
+       * @brief The dimensionality of the samples
+       */
+      size_t getNInputs() const { return m_n_inputs; }
+
+      /**
+       * @brief The number of samples of a block (only the last block may be
+       * smaller)
+       */
+      size_t getBlockSize() const { return m_block_size; }
+
+      /**
+       * @brief Sets the number of samples of a block
+       */
+      void setBlockSize(const size_t block_size);
+
+      /**
+       * @brief The number of blocks
+       */
+      size_t getNBlocks() const
+      { return (getNSamples() + m_block_size - 1) / m_block_size; }
+
+      /**
+       * @brief The files the samples are read from
+       */
+      const std::vector<boost::shared_ptr<bob::io::File> >& getFiles() const
+      { return m_files; }
+
+      /**
+       * @brief Reads the i-th block of samples. The block is resized to the
+       * number of samples of this block if required.
+       */
+      void getBlock(const size_t i, blitz::Array<double,2>& block) const;
+
+      /**
+       * @brief Reads the samples of the given (global) indices, in this
+       * order. The samples are resized if required.
+       */
+      void getSamples(const std::vector<size_t>& indices,
+          blitz::Array<double,2>& samples) const;
+
+      /**
+       * @brief Reads n distinct samples drawn uniformly at random, or all the
+       * samples if there are less than n. The samples are returned in the
+       * order they are stored in the files.
+       */
+      void getRandomSamples(boost::mt19937& rng, const size_t n,
+          blitz::Array<double,2>& samples) const;
+
+    private: //representation
+
+      void initialize();
+      void readSample(const size_t index, blitz::Array<double,1>& sample) const;
+
+      std::vector<boost::shared_ptr<bob::io::File> > m_files;
+      std::vector<size_t> m_offsets; ///< index of the first sample of each file (and total)
+      size_t m_n_inputs;
+      size_t m_block_size;
+
+  };
+
+  /**
+   * @}
+   */
+}}
+
+#endif /* BOB_TRAINER_BLOCKSAMPLER_H */
@@ -32,6 +32,8 @@
 #include <bob/core/logging.h>
 #include <boost/shared_ptr.hpp>
 #include <boost/random.hpp>
+#include <boost/function.hpp>
+#include <boost/bind.hpp>
 
 
 namespace bob { namespace trainer {
@@ -65,6 +67,7 @@ namespace bob { namespace trainer {
         m_convergence_threshold = other.m_convergence_threshold;
         m_max_iterations = other.m_max_iterations;
         m_rng = other.m_rng;
+        m_n_threads = other.m_n_threads;
       }
       return *this;
     }
@@ -121,51 +124,9 @@ namespace bob { namespace trainer {
       // Initialization
       initialize(machine, sampler);
       // Do the Expectation-Maximization algorithm
-      double average_output_previous;
-      double average_output = - std::numeric_limits<double>::max();
-      
-      // - eStep
-      eStep(machine, sampler);
-   
-      if(m_compute_likelihood)
-        average_output = computeLikelihood(machine);
-
-      // - iterates...
-      for(size_t iter=0; ; ++iter) {
-        
-        // - saves average output from last iteration
-        average_output_previous = average_output;
-       
-        // - mStep
-        mStep(machine, sampler);
-        
-        // - eStep
-        eStep(machine, sampler);
-   
-        // - Computes log likelihood if required
-        if(m_compute_likelihood) {
-          average_output = computeLikelihood(machine);
-        
-          bob::core::info << "# Iteration " << iter+1 << ": " 
-            << average_output_previous << " -> " 
-            << average_output << std::endl;
-        
-          // - Terminates if converged (and likelihood computation is set)
-          if(fabs((average_output_previous - average_output)/average_output_previous) <= m_convergence_threshold) {
-            bob::core::info << "# EM terminated: likelihood converged" << std::endl;
-            break;
-          }
-        }
-        else
-          bob::core::info << "# Iteration " << iter+1 << std::endl;
-        
-        // - Terminates if maximum number of iterations has been reached
-        if(m_max_iterations > 0 && iter+1 >= m_max_iterations) {
-          bob::core::info << "# EM terminated: maximum number of iterations reached." << std::endl;
-          break;
-        }
-      }
-
+      iterate(machine,
+        boost::bind(&EMTrainer::eStep, this, boost::ref(machine), boost::cref(sampler)),
+        boost::bind(&EMTrainer::mStep, this, boost::ref(machine), boost::cref(sampler)));
       // Finalization
       finalize(machine, sampler);
     }
@@ -236,6 +197,20 @@ namespace bob { namespace trainer {
     size_t getMaxIterations() const 
     { return m_max_iterations; }
 
+    /**
+     * @brief Sets the number of threads used by the E-step (1 by default).
+     * The data is then split into as many shards, which are processed
+     * concurrently, and the resulting statistics are summed.
+     */
+    void setNThreads(const size_t n_threads)
+    { m_n_threads = n_threads > 0 ? n_threads : 1; }
+
+    /**
+     * @brief Gets the number of threads used by the E-step
+     */
+    size_t getNThreads() const
+    { return m_n_threads; }
+
     /** 
      * @brief Sets the Random Number Generator
      */
@@ -253,6 +228,62 @@ namespace bob { namespace trainer {
     double m_convergence_threshold; ///< convergence threshold
     size_t m_max_iterations; ///< maximum number of EM iterations
     boost::shared_ptr<boost::mt19937> m_rng; ///< The random number generator for the inialization
+    size_t m_n_threads; ///< number of threads used by the E-step
+
+    /**
+     * @brief Runs the iterations of the EM algorithm, the E- and M-steps
+     * being performed by the given functions. This lets derived classes
+     * train from other kinds of data than T_sampler (e.g. blocks of samples
+     * streamed from files).
+     */
+    void iterate(T_machine& machine, const boost::function<void ()>& e_step,
+      const boost::function<void ()>& m_step)
+    {
+      double average_output_previous;
+      double average_output = - std::numeric_limits<double>::max();
+      
+      // - eStep
+      e_step();
+   
+      if(m_compute_likelihood)
+        average_output = computeLikelihood(machine);
+
+      // - iterates...
+      for(size_t iter=0; ; ++iter) {
+        
+        // - saves average output from last iteration
+        average_output_previous = average_output;
+       
+        // - mStep
+        m_step();
+        
+        // - eStep
+        e_step();
+   
+        // - Computes log likelihood if required
+        if(m_compute_likelihood) {
+          average_output = computeLikelihood(machine);
+        
+          bob::core::info << "# Iteration " << iter+1 << ": " 
+            << average_output_previous << " -> " 
+            << average_output << std::endl;
+        
+          // - Terminates if converged (and likelihood computation is set)
+          if(fabs((average_output_previous - average_output)/average_output_previous) <= m_convergence_threshold) {
+            bob::core::info << "# EM terminated: likelihood converged" << std::endl;
+            break;
+          }
+        }
+        else
+          bob::core::info << "# Iteration " << iter+1 << std::endl;
+        
+        // - Terminates if maximum number of iterations has been reached
+        if(m_max_iterations > 0 && iter+1 >= m_max_iterations) {
+          bob::core::info << "# EM terminated: maximum number of iterations reached." << std::endl;
+          break;
+        }
+      }
+    }
 
     /**
      * @brief Protected constructor to be called in the constructor of derived
@@ -263,7 +294,8 @@ namespace bob { namespace trainer {
       m_compute_likelihood(compute_likelihood), 
       m_convergence_threshold(convergence_threshold), 
       m_max_iterations(max_iterations),
-      m_rng(new boost::mt19937())
+      m_rng(new boost::mt19937()),
+      m_n_threads(1)
     {
     }
   };
@@ -27,6 +27,7 @@
 #include "EMTrainer.h"
 #include <bob/machine/GMMMachine.h>
 #include <bob/machine/GMMStats.h>
+#include <bob/trainer/BlockSampler.h>
 #include <limits>
 
 namespace bob { namespace trainer {
@@ -80,6 +81,27 @@ class GMMTrainer: public EMTrainer<bob::machine::GMMMachine, blitz::Array<double
     virtual void eStep(bob::machine::GMMMachine& gmm,
       const blitz::Array<double,2>& data);
 
+    /**
+     * @brief Calculates the statistics across the samples of a block
+     * sampler, block by block, and saves these as m_ss.
+     */
+    void eStep(bob::machine::GMMMachine& gmm,
+      const bob::trainer::BlockSampler& sampler);
+
+    /**
+     * @brief Trains the machine using the samples of a block sampler, which
+     * are read block by block at each iteration. This gives the same
+     * result as training on all the samples at once, without loading them
+     * in memory.
+     */
+    void train(bob::machine::GMMMachine& gmm,
+      const bob::trainer::BlockSampler& sampler);
+
+    /**
+     * @brief Trains the machine using the samples of an in-memory array
+     */
+    using EMTrainer<bob::machine::GMMMachine, blitz::Array<double,2> >::train;
+
     /**
      * @brief Computes the likelihood using current estimates of the latent
      * variables
@@ -127,6 +149,13 @@ class GMMTrainer: public EMTrainer<bob::machine::GMMMachine, blitz::Array<double
     void setGMMStats(const bob::machine::GMMStats& stats); 
      
   protected:
+    /**
+     * @brief Accumulates the statistics of the given samples in m_ss,
+     * without resetting them
+     */
+    void accumulateStatistics(const bob::machine::GMMMachine& gmm,
+      const blitz::Array<double,2>& data);
+
     /**
      * These are the sufficient statistics, calculated during the
      * E-step and used during the M-step
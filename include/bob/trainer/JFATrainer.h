@@ -33,6 +33,7 @@
 #include <string>
 #include <bob/core/array_copy.h>
 #include <boost/shared_ptr.hpp>
+#include <boost/function.hpp>
 #include <bob/core/logging.h>
 
 namespace bob { namespace trainer { 
@@ -90,6 +91,22 @@ class FABaseTrainer
      */
     void resetXYZ();
 
+    /**
+     * @brief Sets the number of threads used to update the speaker factors
+     * and to compute the accumulators (1 by default). The identities are
+     * then split into as many shards, which are processed concurrently, and
+     * the resulting accumulators are summed.
+     */
+    void setNThreads(const size_t n_threads)
+    { m_n_threads = n_threads > 0 ? n_threads : 1; }
+
+    /**
+     * @brief Gets the number of threads used to update the speaker factors
+     * and to compute the accumulators
+     */
+    size_t getNThreads() const
+    { return m_n_threads; }
+
 
     /**** Y and V functions ****/
     /**
@@ -129,6 +146,13 @@ class FABaseTrainer
      */
     void computeAccumulatorsV(const bob::machine::FABase& m, 
       const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
+    /**
+     * @brief Updates y and computes the accumulators m_acc_V_A1 and
+     * m_acc_V_A2 in a single pass over the identities (same as updateY()
+     * followed by computeAccumulatorsV())
+     */
+    void updateYAndComputeAccumulatorsV(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
     /**
      * @brief Updates V from the accumulators m_acc_V_A1 and m_acc_V_A2 
      */
@@ -172,6 +196,20 @@ class FABaseTrainer
      */
     void computeAccumulatorsU(const bob::machine::FABase& m,
       const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
+    /**
+     * @brief Updates x and computes the accumulators m_acc_U_A1 and
+     * m_acc_U_A2 in a single pass over the identities (same as updateX()
+     * followed by computeAccumulatorsU())
+     */
+    void updateXAndComputeAccumulatorsU(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
+    /**
+     * @brief Updates x and z, and computes the accumulators m_acc_U_A1 and
+     * m_acc_U_A2 in a single pass over the identities (same as updateX(),
+     * followed by updateZ() and computeAccumulatorsU())
+     */
+    void updateXZAndComputeAccumulatorsU(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
     /**
      * @brief Updates U from the accumulators m_acc_U_A1 and m_acc_U_A2
      */
@@ -215,6 +253,13 @@ class FABaseTrainer
      */
     void computeAccumulatorsD(const bob::machine::FABase& m,
       const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
+    /**
+     * @brief Updates z and computes the accumulators m_acc_D_A1 and
+     * m_acc_D_A2 in a single pass over the identities (same as updateZ()
+     * followed by computeAccumulatorsD())
+     */
+    void updateZAndComputeAccumulatorsD(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats);
     /**
      * @brief Updates d from the accumulators m_acc_D_A1 and m_acc_D_A2
      */
@@ -318,6 +363,55 @@ class FABaseTrainer
 
 
   private:
+    typedef boost::function<void (FABaseTrainer&, const bob::machine::FABase&,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >&)> estep_function;
+
+    /**
+     * @brief Loops over the identities, updating y and/or accumulating the
+     * statistics for V
+     */
+    void estepY(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+      const bool update_y, const bool acc_v);
+    /**
+     * @brief Loops over the identities, updating x and z and/or accumulating
+     * the statistics for U. The inverses (I+Ut*diag(sigma)^-1*N_{i,h}*U)^-1
+     * only depend on the occupancies of the sessions, and are computed once
+     * per session.
+     */
+    void estepXZ(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+      const bool update_x, const bool update_z, const bool acc_u);
+    /**
+     * @brief Accumulates the statistics for U of the given session, with
+     * the cache values m_cache_IdPlusUProd_ih and m_cache_Fn_x_ih
+     */
+    void accumulateU_ih(const size_t id, const size_t h,
+      const blitz::Array<double,1>& Nih);
+    /**
+     * @brief Loops over the identities, updating z and/or accumulating the
+     * statistics for d
+     */
+    void estepZ(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+      const bool update_z, const bool acc_d);
+    /**
+     * @brief Runs f over the identities, on m_n_threads threads, and sums
+     * the requested accumulators of the threads
+     */
+    void parallelize(const bob::machine::FABase& m,
+      const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+      const estep_function& f, const bool acc_v, const bool acc_u,
+      const bool acc_d);
+    /**
+     * @brief Makes this trainer process the given range of identities of
+     * the other one. The speaker factors, the sums of the statistics and the
+     * subspace caches are views of the ones of the other trainer, which do
+     * not share their reference counts.
+     */
+    void initShard(const FABaseTrainer& other, const blitz::Range& r);
+
+    size_t m_n_threads; // Number of threads
     size_t m_Nid; // Number of identities 
     size_t m_dim_C; // Number of Gaussian components of the UBM GMM
     size_t m_dim_D; // Dimensionality of the feature space
@@ -418,6 +512,20 @@ class JFATrainer
     size_t getMaxIterations() const 
     { return m_max_iterations; }
 
+    /**
+     * @brief Sets the number of threads used by the E-steps (1 by default).
+     * The identities are then split into as many shards, which are
+     * processed concurrently.
+     */
+    void setNThreads(const size_t n_threads)
+    { m_base_trainer.setNThreads(n_threads); }
+
+    /**
+     * @brief Gets the number of threads used by the E-steps
+     */
+    size_t getNThreads() const
+    { return m_base_trainer.getNThreads(); }
+
     /**
      * @brief This methods performs some initialization before the EM loop.
      */
@@ -23,6 +23,7 @@
 
 #include <bob/machine/KMeansMachine.h>
 #include <bob/trainer/EMTrainer.h>
+#include <bob/trainer/BlockSampler.h>
 #include <boost/version.hpp>
 
 namespace bob { namespace trainer {
@@ -110,6 +111,14 @@ class KMeansTrainer: public EMTrainer<bob::machine::KMeansMachine, blitz::Array<
      * - zeroeth and first order statistics
      * - average (Square Euclidean) distance from the closest mean 
      * Implements EMTrainer::eStep(double &)
+     *
+     * Within train(), the assignments of the samples to the means are kept
+     * from one iteration to the next, together with bounds of the distances
+     * of the samples from the means (Hamerly, "Making k-means even faster",
+     * SDM 2010). The bounds tell which samples cannot have changed of
+     * closest mean, without computing their distance from the other means.
+     * Outside of train(), every E-step searches the closest means of all
+     * the samples.
      */
     virtual void eStep(bob::machine::KMeansMachine& kmeans,
       const blitz::Array<double,2>& data);
@@ -131,6 +140,47 @@ class KMeansTrainer: public EMTrainer<bob::machine::KMeansMachine, blitz::Array<
      */
     virtual void finalize(bob::machine::KMeansMachine& kMeansMachine, const blitz::Array<double,2>& sampler);
 
+    /**
+     * @brief Trains the machine using the samples of a block sampler, which
+     * are read block by block at each iteration. This gives the same
+     * result as training on all the samples at once, without loading them
+     * in memory.
+     */
+    void train(bob::machine::KMeansMachine& kmeans,
+      const bob::trainer::BlockSampler& sampler);
+
+    /**
+     * @brief Trains the machine using the samples of an in-memory array.
+     * The E-steps of the iterations reuse the bounds of the previous ones.
+     */
+    virtual void train(bob::machine::KMeansMachine& kmeans,
+      const blitz::Array<double,2>& data);
+
+    /**
+     * @brief Initialises the means using a random subset of the samples
+     * of a block sampler, of the size of a block.
+     */
+    void initialize(bob::machine::KMeansMachine& kmeans,
+      const bob::trainer::BlockSampler& sampler);
+
+    /**
+     * @brief Accumulates the statistics across the samples of a block 
+     * sampler, block by block
+     */
+    void eStep(bob::machine::KMeansMachine& kmeans,
+      const bob::trainer::BlockSampler& sampler);
+
+    /**
+     * @brief Trains the machine with the mini-batch k-means algorithm: at
+     * each iteration, a random batch of samples is drawn, and each mean is
+     * moved to the average of all the samples assigned to it so far.
+     * There are max_iterations batches, or as many batches as required to
+     * go once through the data if max_iterations is 0.
+     * @details See Sculley, "Web-scale k-means clustering", WWW 2010
+     */
+    void trainMiniBatch(bob::machine::KMeansMachine& kmeans,
+      const bob::trainer::BlockSampler& sampler, const size_t batch_size=1024);
+
     /**
      * @brief Reset the statistics accumulators
      * to the correct size and a value of zero.
@@ -174,6 +224,13 @@ class KMeansTrainer: public EMTrainer<bob::machine::KMeansMachine, blitz::Array<
 
 
   protected:
+    /**
+     * @brief Accumulates the statistics over the given samples, without
+     * resetting them nor normalizing the average distance
+     */
+    void accumulateStatistics(const bob::machine::KMeansMachine& kmeans,
+      const blitz::Array<double,2>& data);
+
     /**
      * @brief The initialization method
      * Check that there is no duplicated means during the random initialization
@@ -203,6 +260,27 @@ class KMeansTrainer: public EMTrainer<bob::machine::KMeansMachine, blitz::Array<
      * equation 9.4, Bishop, "Pattern recognition and machine learning", 2006
      */
     blitz::Array<double,2> m_firstOrderStats;
+
+    /**
+     * @brief Assignments of the samples to the means, with the upper bounds
+     * of their distances from the assigned means and the lower bounds of
+     * their distances from the other means, as computed by the last E-step
+     */
+    blitz::Array<int,1> m_closest_means;
+    blitz::Array<double,1> m_upper_bounds;
+    blitz::Array<double,1> m_lower_bounds;
+
+    /**
+     * @brief The means the bounds refer to, if they are valid
+     */
+    blitz::Array<double,2> m_bounds_means;
+    bool m_bounds_valid;
+
+    /**
+     * @brief Tells if the E-steps may reuse the bounds of the previous one,
+     * which is only the case during train(), as the data is not modified
+     */
+    bool m_use_bounds;
 };
 
 /**
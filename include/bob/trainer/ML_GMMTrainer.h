@@ -73,6 +73,21 @@ class ML_GMMTrainer: public GMMTrainer {
     virtual void mStep(bob::machine::GMMMachine& gmm,
       const blitz::Array<double,2>& data);
  
+    /**
+     * @brief Trains the machine with the stepwise online EM algorithm: at
+     * each iteration, the statistics of a random batch of samples are
+     * interpolated with the running statistics, with a weight of
+     * (k+2)^(-alpha) for the k-th batch, and the parameters are updated
+     * from the running statistics. alpha should lie in ]0.5,1].
+     * There are max_iterations batches, or as many batches as required to
+     * go once through the data if max_iterations is 0.
+     * @details See Liang and Klein, "Online EM for unsupervised models",
+     *   NAACL 2009
+     */
+    void trainOnline(bob::machine::GMMMachine& gmm,
+      const bob::trainer::BlockSampler& sampler, const size_t batch_size=1024,
+      const double alpha=0.7);
+
     /**
      * @brief Assigns from a different ML_GMMTrainer
      */
@@ -85,10 +85,23 @@ namespace bob { namespace visioner {
        * @param scale_variation scale variation in pixels
        * @param clustering overlapping threshold for clustering detections
        * @param detection_method Scanning or GroundTruth
+       * @param threads number of threads used for scanning (0 to scan in the
+       * current thread)
        */
       CVDetector(const std::string& model, double threshold=0.0,
           uint64_t levels=0, uint64_t scale_variation=2, double clustering=0.05,
-          Type detection_method=GroundTruth);
+          Type detection_method=GroundTruth, size_t threads=0);
+
+      /**
+       * Copy constructor: the per-thread copies of the model are not shared
+       * with <other>, but cloned again at the next scan
+       */
+      CVDetector(const CVDetector& other);
+
+      /**
+       * Assignment operator (see the copy constructor)
+       */
+      CVDetector& operator=(const CVDetector& other);
 
       // Load an image (build the image pyramid)
       bool load(const std::string& ifile, const std::string& gfile);
@@ -97,6 +110,8 @@ namespace bob { namespace visioner {
 
       // Detect objects
       // NB: The detections are thresholded and clustered!
+      // NB: The sub-windows are split in bands of rows (of every scale) and
+      //  scanned by m_threads threads, if any.
       bool scan(std::vector<detection_t>& detections) const;
 
       // Label detections
@@ -134,6 +149,8 @@ namespace bob { namespace visioner {
       // Getters and setters
       void set_scan_levels(uint64_t levels);
       uint64_t get_scan_levels() const { return m_levels; }
+      void set_scan_threads(size_t threads) { m_threads = threads; }
+      size_t get_scan_threads() const { return m_threads; }
 
       // Process detections
       static void sort_asc(std::vector<detection_t>& detections);
@@ -162,6 +179,29 @@ namespace bob { namespace visioner {
 
     private:
 
+      // Band of rows [y_begin, y_end) of the sub-windows of a given scale
+      struct band_t
+      {
+        uint64_t        m_scale;
+        int             m_y_begin;
+        int             m_y_end;
+      };
+
+      // Detections and statistics of the bands processed by a thread
+      struct band_result_t
+      {
+        std::vector<detection_t> m_detections;
+        stats_t         m_stats;
+      };
+
+      // Scan the given band of rows with a model preprocessed for its scale
+      void scan(const Model& model, const band_t& band,
+          std::vector<detection_t>& detections, stats_t& stats) const;
+
+      // Scan a range of bands (thread ith), using its own copy of the model
+      void th_scan(uint64_t ith, std::pair<uint64_t, uint64_t> brange,
+          const std::vector<band_t>& bands, band_result_t& result) const;
+
       static void threshold(std::vector<detection_t>& detections, double thres);
       static void cluster(std::vector<detection_t>& detections, double thres, uint64_t n_outputs);                 
 
@@ -184,6 +224,8 @@ namespace bob { namespace visioner {
       Matrix<uint64_t> m_lmodel_begins; ///< Level classifiers for each output:
       Matrix<uint64_t> m_lmodel_ends;   ///< [begin, end) LUT range
       uint64_t			m_levels;	       ///< number of levels (speed-up scanning)
+      size_t      m_threads;       ///< number of scanning threads (0: current)
+      mutable std::vector<boost::shared_ptr<Model> > m_th_models; ///< Per-thread copies of the model
       ipyramid_t  m_ipyramid;	     ///< Pyramid of images
       mutable stats_t m_stats;     ///< Scanning statistics
 
@@ -69,10 +69,10 @@ namespace bob { namespace visioner {
        * This sampling method will sample within the available sampling pool
        * (all available samples - remember this is different then the number of
        * input images available as it also accounts for scaled versions of each
-       * image) uniformily by dividing the available sampling set in T disjunct
-       * subsets (T = number of threads to use) and sampling randomly, with
-       * replacement each of the subsets. The subsets are then merged before
-       * this method returns.
+       * image) uniformily by dividing the available sampling set in 4 x T
+       * disjunct subsets (T = number of threads to use) and sampling randomly,
+       * with replacement each of the subsets. The subsets are distributed
+       * dynamically to the threads and merged before this method returns.
        *
        * Because of the way it is coded, this method cannot guarantee (even if
        * the seed is set on the constructor), that it responds the same way
@@ -81,7 +81,7 @@ namespace bob { namespace visioner {
        * of sampling subsets and, therefore, how samples will be picked. If you
        * call this method with the same number of threads though, given the
        * same initial conditions (e.g., first time in the program), it should
-       * reply in the same manner.
+       * reply in the same manner, whichever thread processes each subset.
        *
        * Also note that, because of the way this method is implemented, it
        * cannot guarantee that the exact number of samples requested will be
@@ -186,29 +186,36 @@ namespace bob { namespace visioner {
       // Reset to a set of listfiles
       void load(const std::vector<std::string>& listfiles);
 
+      // Copies of a model used by the worker threads
+      class ModelCache;
+
       /**
-       * Uniform sampling worker thread
+       * Uniform sampling worker thread. The random draws of a range are
+       * seeded with (seed + first sample of the range).
        */
-      void th_usample(uint64_t ith, std::pair<uint64_t, uint64_t> srange, 
+      void th_usample(std::pair<uint64_t, uint64_t> srange,
+          boost::mt19937::result_type seed,
           std::vector<uint64_t>& samples) const;
 
       /**
-       * Error-based sampling worker thread
+       * Error-based sampling worker thread. The random draws of a range are
+       * seeded with (seed + first sample of the range).
        */
-      void th_esample(uint64_t ith, std::pair<uint64_t, uint64_t> srange, 
-          const Model& model, std::vector<uint64_t>& samples) const;
+      void th_esample(uint64_t ith, std::pair<uint64_t, uint64_t> srange,
+          boost::mt19937::result_type seed,
+          ModelCache& models, std::vector<uint64_t>& samples) const;
 
       /**
        * Evaluation thread
        */
-      void th_errors(std::pair<uint64_t, uint64_t> srange, const Model& model,
-          std::vector<double>& terrors) const;
+      void th_errors(uint64_t ith, std::pair<uint64_t, uint64_t> srange,
+          ModelCache& models, std::vector<double>& terrors) const;
 
       /**
        * Mapping thread (samples to dataset)
        */
-      void th_map(std::pair<uint64_t, uint64_t> srange, 
-          const std::vector<uint64_t>& samples, const Model& model,
+      void th_map(uint64_t ith, std::pair<uint64_t, uint64_t> srange, 
+          const std::vector<uint64_t>& samples, ModelCache& models,
           std::vector<uint64_t>& types, DataSet& data) const;
 
     private: //representation
@@ -229,7 +236,7 @@ namespace bob { namespace visioner {
 
       std::vector<uint64_t> m_tcounts; ///< # of times / distinct target type
       mutable std::vector<double> m_sprobs; ///< base sampling probability / distinct target type
-      mutable std::vector<boost::mt19937> m_rgens; ///< Random number generators (per thread)
+      mutable std::vector<boost::mt19937> m_rgens; ///< Random number generators (the first one seeds the sampling rounds)
 
   };
 
@@ -26,10 +26,11 @@
 #define BOB_VISIONER_UTIL_THREADS_H
 
 #include <vector>
+#include <algorithm>
 
 #include <boost/thread.hpp>
+#include <boost/function.hpp>
 #include <boost/lambda/bind.hpp>
-#include <boost/shared_array.hpp>
 
 namespace bob { namespace visioner {
 
@@ -37,26 +38,71 @@ namespace bob { namespace visioner {
   void thread_split(uint64_t n_objects, std::vector<uint64_t>& sbegins, 
       std::vector<uint64_t>& sends, size_t num_of_threads);
 
+  // Run a loop computation of the given size using multiple threads
+  // NB: The loop is split in chunks (a few per thread), processed by the
+  //  workers of a persistent pool shared by all the visioner components,
+  //  the current thread being the first of them. Each thread starts with a
+  //  contiguous set of chunks and then steals the remaining chunks of the
+  //  other threads, which keeps them busy even if the chunks have uneven
+  //  costs: op(thread_index, <begin, end>) is called for each chunk, never
+  //  concurrently for the same thread index.
+  // NB: If some of the calls throw, a std::runtime_error with the message of
+  //  the first exception is thrown once all the chunks have been processed.
+  // NB: The loops run concurrently by several threads share the workers of
+  //  the pool, which join them in turn: each loop is at least processed by
+  //  the thread running it. A loop run from within a loop is processed by
+  //  the current thread only.
+  void thread_run(
+      const boost::function<void (uint64_t, std::pair<uint64_t, uint64_t>)>& op,
+      uint64_t size, size_t num_of_threads);
+
+  namespace detail {
+
+    // Adapters of the loop operators to the thread_run() interface
+    template <typename TOp> struct loop_op {
+      loop_op(const TOp& op) : m_op(op) {}
+      void operator()(uint64_t, std::pair<uint64_t, uint64_t> range) const {
+        m_op(range);
+      }
+      TOp m_op;
+    };
+
+    template <typename TOp> struct iloop_op {
+      iloop_op(const TOp& op) : m_op(op) {}
+      void operator()(uint64_t ith, std::pair<uint64_t, uint64_t> range) const {
+        m_op(ith, range);
+      }
+      TOp m_op;
+    };
+
+    template <typename TOp, typename TResult> struct result_loop_op {
+      result_loop_op(const TOp& op, std::vector<TResult>& results)
+        : m_op(op), m_results(&results) {}
+      void operator()(uint64_t ith, std::pair<uint64_t, uint64_t> range) const {
+        m_op(range, (*m_results)[ith]);
+      }
+      TOp m_op;
+      std::vector<TResult>* m_results;
+    };
+
+    template <typename TOp, typename TResult> struct result_iloop_op {
+      result_iloop_op(const TOp& op, std::vector<TResult>& results)
+        : m_op(op), m_results(&results) {}
+      void operator()(uint64_t ith, std::pair<uint64_t, uint64_t> range) const {
+        m_op(ith, range, (*m_results)[ith]);
+      }
+      TOp m_op;
+      std::vector<TResult>* m_results;
+    };
+
+  }
+
   // Split a loop computation of the given size using multiple threads
   // NB: Stateless threads: op(<begin, end>)
   template <typename TOp> void thread_loop(TOp op, uint64_t size,
       size_t num_of_threads=boost::thread::hardware_concurrency()) {
-    
-    boost::shared_array<boost::thread> threads(new boost::thread[num_of_threads]);
-    std::vector<uint64_t> th_begins; th_begins.reserve(num_of_threads);
-    std::vector<uint64_t> th_ends; th_ends.reserve(num_of_threads);
-
-    thread_split(size, th_begins, th_ends, num_of_threads);		
 
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      std::pair<uint64_t, uint64_t> range(th_begins[ith], th_ends[ith]);
-      boost::thread t(boost::bind(op, range));
-      threads[ith] = boost::move(t);
-    }
-
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      threads[ith].join();
-    }
+    thread_run(detail::loop_op<TOp>(op), size, num_of_threads);
 
   }
 
@@ -65,69 +111,31 @@ namespace bob { namespace visioner {
   template <typename TOp> void thread_iloop(TOp op, uint64_t size,
       size_t num_of_threads=boost::thread::hardware_concurrency()) {
 
-    boost::shared_array<boost::thread> threads(new boost::thread[num_of_threads]);
-    std::vector<uint64_t> th_begins; th_begins.reserve(num_of_threads);
-    std::vector<uint64_t> th_ends; th_ends.reserve(num_of_threads);
-
-    thread_split(size, th_begins, th_ends, num_of_threads);		
-
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      std::pair<uint64_t, uint64_t> range(th_begins[ith], th_ends[ith]);
-      boost::thread t(boost::bind(op, ith, range));
-      threads[ith] = boost::move(t);
-    }
-
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      threads[ith].join();
-    }
+    thread_run(detail::iloop_op<TOp>(op), size, num_of_threads);
 
   }
 
   // Split a loop computation of the given size using multiple threads
   // NB: State threads: op(<begin, end>, result&)
+  // NB: The result of a thread accumulates all the chunks it processes.
   template <typename TOp, typename TResult> void thread_loop(TOp op, uint64_t size, std::vector<TResult>& results, size_t num_of_threads=boost::thread::hardware_concurrency()) {
 
-    boost::shared_array<boost::thread> threads(new boost::thread[num_of_threads]);
-    std::vector<uint64_t> th_begins; th_begins.reserve(num_of_threads);
-    std::vector<uint64_t> th_ends; th_ends.reserve(num_of_threads);
-
-    thread_split(size, th_begins, th_ends, num_of_threads);		
-
-    results.resize(num_of_threads);
-
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      std::pair<uint64_t, uint64_t> range(th_begins[ith], th_ends[ith]);
-      boost::thread t(boost::bind(op, range, boost::ref(results[ith])));
-      threads[ith] = boost::move(t);
-    }
+    results.resize(std::max(num_of_threads, (size_t)1));
 
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      threads[ith].join();
-    }
+    thread_run(detail::result_loop_op<TOp, TResult>(op, results), size,
+        num_of_threads);
 
   }
 
   // Split a loop computation of the given size using multiple threads
   // NB: State threads: op(thread_index, <begin, end>, result&)
+  // NB: The result of a thread accumulates all the chunks it processes.
   template <typename TOp, typename TResult> void thread_iloop(TOp op, uint64_t size, std::vector<TResult>& results, size_t num_of_threads=boost::thread::hardware_concurrency()) {
 
-    boost::shared_array<boost::thread> threads(new boost::thread[num_of_threads]);
-    std::vector<uint64_t> th_begins; th_begins.reserve(num_of_threads);
-    std::vector<uint64_t> th_ends; th_ends.reserve(num_of_threads);
-
-    thread_split(size, th_begins, th_ends, num_of_threads);		
-
-    results.resize(num_of_threads);
-
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      std::pair<uint64_t, uint64_t> range(th_begins[ith], th_ends[ith]);
-      boost::thread t(boost::bind(op, ith, range, boost::ref(results[ith])));
-      threads[ith] = boost::move(t);
-    }
+    results.resize(std::max(num_of_threads, (size_t)1));
 
-    for (uint64_t ith = 0; ith < num_of_threads; ith ++) {
-      threads[ith].join();
-    }
+    thread_run(detail::result_iloop_op<TOp, TResult>(op, results), size,
+        num_of_threads);
 
   }
 
@@ -26,6 +26,9 @@ import bob
 import numpy
 import tempfile
 import pkg_resources
+import threading
+
+from ...test import utils as test_utils
 
 def F(f):
   """Returns the test file on the "data" subdirectory"""
@@ -229,3 +232,148 @@ class GMMMachineTest(unittest.TestCase):
     # implementation
     matlab_ll_ref = -2.361583051672024e+02
     self.assertTrue( abs(gmm(data) - matlab_ll_ref) < 1e-10)
+
+  def test05_GMMMachine(self):
+    """Test a GMMMachine (batch log-likelihood and statistics)"""
+
+    data = bob.io.load(F('data.hdf5'))
+    gmm = bob.machine.GMMMachine(2, 50)
+    gmm.weights   = bob.io.load(F('weights.hdf5'))
+    gmm.means     = bob.io.load(F('means.hdf5'))
+    gmm.variances = bob.io.load(F('variances.hdf5'))
+
+    # Several samples, and more than a block of them
+    numpy.random.seed(0)
+    samples = data + numpy.random.normal(0, 0.1, (600,50))
+
+    ll = gmm.log_likelihood(samples)
+    self.assertEqual(ll.shape, (600,))
+    lwgl = numpy.ndarray((600,2), 'float64')
+    ll2 = gmm.log_likelihood(samples, lwgl)
+    self.assertTrue( numpy.allclose(ll, ll2, rtol=1e-10, atol=1e-10) )
+    lwgl_ref = numpy.ndarray((2,), 'float64')
+    for i in range(samples.shape[0]):
+      ll_ref = gmm.log_likelihood(samples[i,:], lwgl_ref)
+      self.assertTrue( abs(ll[i] - ll_ref) < 1e-8 )
+      self.assertTrue( numpy.allclose(lwgl[i,:], lwgl_ref, rtol=1e-10, atol=1e-8) )
+
+    # The statistics accumulated over the whole array are the same as the
+    # ones accumulated sample by sample
+    stats = bob.machine.GMMStats(2, 50)
+    gmm.acc_statistics(samples, stats)
+    stats_ref = bob.machine.GMMStats(2, 50)
+    for i in range(samples.shape[0]):
+      gmm.acc_statistics(samples[i,:], stats_ref)
+    self.assertEqual(stats.t, stats_ref.t)
+    self.assertTrue( stats.is_similar_to(stats_ref, 1e-8, 1e-8) )
+
+    # The cached parameters are updated when a Gaussian is modified
+    gmm.update_gaussian(0).mean = gmm.means[1,:]
+    self.assertTrue( abs(gmm.log_likelihood(samples)[0] - gmm.log_likelihood(samples[0,:])) < 1e-8 )
+
+  def test06_GMMMachine_threads(self):
+    """Test the concurrent computation of log-likelihoods and statistics,
+    which runs without the global interpreter lock"""
+
+    numpy.random.seed(0)
+    gmm = bob.machine.GMMMachine(16, 10)
+    gmm.means = numpy.random.normal(0, 1, (16,10))
+    gmm.variances = numpy.random.uniform(0.5, 1.5, (16,10))
+    samples = numpy.random.normal(0, 1, (2000,10))
+
+    # Serial results
+    ll_ref = gmm.log_likelihood(samples)
+    ll_ref_ = gmm.log_likelihood_(samples)
+    stats_ref = bob.machine.GMMStats(16, 10)
+    gmm.acc_statistics(samples, stats_ref)
+
+    # Each thread works on its own copy of the machine, and repeats the calls
+    # so that they overlap with the ones of the other threads
+    n_threads = 4
+    errors = []
+    def run():
+      try:
+        machine = bob.machine.GMMMachine(gmm)
+        for k in range(5):
+          ll = machine.log_likelihood(samples)
+          ll_ = machine.log_likelihood_(samples)
+          stats = bob.machine.GMMStats(16, 10)
+          machine.acc_statistics(samples, stats)
+          if not numpy.array_equal(ll, ll_ref) or \
+              not numpy.array_equal(ll_, ll_ref_) or stats != stats_ref:
+            errors.append('the results of a thread differ from the serial ones')
+      except Exception as e:
+        errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for i in range(n_threads)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    self.assertEqual(errors, [])
+
+  def test07_GMMMachine_threads_benchmark(self):
+    """Time the computation of log-likelihoods from several Python threads,
+    each thread working on its own copy of the machine"""
+
+    rng = numpy.random.RandomState(0)
+    gmm = bob.machine.GMMMachine(64, 40)
+    gmm.means = rng.normal(size=(64,40))
+    gmm.variances = rng.uniform(0.5, 1.5, (64,40))
+    samples = rng.normal(size=(5000,40))
+    n_calls = 8
+
+    def run(n_threads):
+      results = []
+      def thread_run(calls):
+        machine = bob.machine.GMMMachine(gmm)
+        for k in range(calls):
+          results.append(machine.log_likelihood(samples))
+      # The calls are split as evenly as possible among the threads
+      threads = [threading.Thread(target=thread_run,
+        args=((n_calls + i) // n_threads,)) for i in range(n_threads)]
+      for t in threads: t.start()
+      for t in threads: t.join()
+      return results
+
+    def compare(results, reference):
+      return len(results) == n_calls and \
+          all(numpy.array_equal(r, reference[0]) for r in results)
+
+    timings = test_utils.thread_timings(run, compare,
+        label='%d calls' % n_calls)
+    self.assertEqual(len(timings), len(test_utils.default_thread_numbers()))
+
+  def test08_GMMMachine_threads_shared(self):
+    """Test the concurrent computation of log-likelihoods and statistics by
+    a single machine shared by several threads"""
+
+    numpy.random.seed(0)
+    gmm = bob.machine.GMMMachine(16, 10)
+    gmm.means = numpy.random.normal(0, 1, (16,10))
+    gmm.variances = numpy.random.uniform(0.5, 1.5, (16,10))
+    samples = numpy.random.normal(0, 1, (2000,10))
+
+    # Serial results, computed by a copy of the machine
+    serial = bob.machine.GMMMachine(gmm)
+    ll_ref = serial.log_likelihood(samples)
+    stats_ref = bob.machine.GMMStats(16, 10)
+    serial.acc_statistics(samples, stats_ref)
+
+    # The supervectors of the shared machine are out of date when the threads
+    # start (they are lazily updated)
+    gmm.means = gmm.means
+    errors = []
+    def run():
+      try:
+        for k in range(5):
+          ll = gmm.log_likelihood(samples)
+          stats = bob.machine.GMMStats(16, 10)
+          gmm.acc_statistics(samples, stats)
+          if not numpy.array_equal(ll, ll_ref) or stats != stats_ref:
+            errors.append('the results of a thread differ from the serial ones')
+      except Exception as e:
+        errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for i in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    self.assertEqual(errors, [])
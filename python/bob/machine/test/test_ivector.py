@@ -166,3 +166,32 @@ class IVectorTests(unittest.TestCase):
     wij = mc.forward(gs)
     self.assertTrue(numpy.allclose(wij_ref, wij, 1e-5))
 
+
+  def test02_machine_batch(self):
+    # Ubm
+    ubm = bob.machine.GMMMachine(2,3)
+    ubm.weights = numpy.array([0.4,0.6])
+    ubm.means = numpy.array([[1.,7,4],[4,5,3]])
+    ubm.variances = numpy.array([[0.5,1.,1.5],[1.,1.5,2.]])
+
+    mc = bob.machine.IVectorMachine(ubm, 2)
+    mc.t = numpy.array([[1.,2],[4,1],[0,3],[5,8],[7,10],[11,1]])
+    mc.sigma = numpy.array([1.,2.,1.,3.,2.,4.])
+
+    # Random statistics (more than a tile of utterances)
+    numpy.random.seed(5)
+    n_utts = 300
+    n = numpy.random.uniform(0., 2., (n_utts,2))
+    sumpx = numpy.random.normal(0., 3., (n_utts,2,3))
+    stats = []
+    for i in range(n_utts):
+      gs = bob.machine.GMMStats(2,3)
+      gs.t = 1
+      gs.n = n[i,:]
+      gs.sum_px = sumpx[i,:,:]
+      stats.append(gs)
+
+    ref = numpy.array([mc.forward(gs) for gs in stats])
+    for n_threads in (1, 3):
+      self.assertTrue(numpy.allclose(mc.forward(stats, n_threads), ref, 1e-8))
+      self.assertTrue(numpy.allclose(mc(n, sumpx, n_threads), ref, 1e-8))
@@ -85,3 +85,56 @@ class KMeansMachineTest(unittest.TestCase):
 
     # Clean-up
     os.unlink(filename)
+
+  def test02_KMeansMachine_closest_means(self):
+    """Test the closest means of several samples at once"""
+
+    numpy.random.seed(1)
+    km = bob.machine.KMeansMachine(numpy.random.randn(7, 5))
+    # Several blocks of samples, the last one being incomplete
+    data = numpy.random.randn(600, 5)
+    (indices, dists) = km.get_closest_means(data)
+    self.assertEqual(indices.shape, (600,))
+    self.assertEqual(dists.shape, (600,))
+    for i in range(data.shape[0]):
+      (index, dist) = km.get_closest_mean(data[i,:])
+      self.assertEqual(indices[i], index)
+      self.assertTrue( equals(dists[i], dist, 1e-10) )
+
+  def test03_KMeansMachine_closest_means_offset(self):
+    """Test the closest means of samples far from the origin"""
+
+    numpy.random.seed(2)
+    # The expansion ||x||^2 - 2 x.mean + ||mean||^2 cancels here
+    offset = 1e8
+    km = bob.machine.KMeansMachine(offset + numpy.random.randn(7, 5))
+    data = offset + numpy.random.randn(300, 5)
+    (indices, dists) = km.get_closest_means(data)
+    for i in range(data.shape[0]):
+      (index, dist) = km.get_closest_mean(data[i,:])
+      self.assertEqual(indices[i], index)
+      self.assertEqual(dists[i], dist)
+
+  def test04_KMeansMachine_threads_shared(self):
+    """Test the closest means computed by a machine shared by several threads"""
+
+    import threading
+    numpy.random.seed(3)
+    km = bob.machine.KMeansMachine(numpy.random.randn(7, 5))
+    data = numpy.random.randn(1000, 5)
+    (indices_ref, dists_ref) = km.get_closest_means(data)
+
+    errors = []
+    def run():
+      try:
+        for k in range(5):
+          (indices, dists) = km.get_closest_means(data)
+          if not (indices == indices_ref).all() or not (dists == dists_ref).all():
+            errors.append('the results of a thread differ from the serial ones')
+      except Exception as e:
+        errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for i in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    self.assertEqual(errors, [])
@@ -239,3 +239,30 @@ class MachineTest(unittest.TestCase):
     self.assertTrue( m1 != m6 )
     self.assertFalse( m1.is_similar_to(m6) )
 
+
+  def test05_threads_shared(self):
+    """Test the outputs computed by a machine shared by several threads"""
+
+    import threading
+    numpy.random.seed(0)
+    m = bob.machine.LinearMachine(numpy.random.randn(20, 5))
+    m.input_subtract = numpy.random.randn(20)
+    m.input_divide = numpy.random.uniform(0.5, 1.5, (20,))
+    m.biases = numpy.random.randn(5)
+    m.activation = bob.machine.HyperbolicTangentActivation()
+    data = numpy.random.randn(1000, 20)
+    output_ref = m(data)
+
+    errors = []
+    def run():
+      try:
+        for k in range(5):
+          if not (m(data) == output_ref).all():
+            errors.append('the outputs of a thread differ from the serial ones')
+      except Exception as e:
+        errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for i in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    self.assertEqual(errors, [])
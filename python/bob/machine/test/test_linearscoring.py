@@ -138,3 +138,31 @@ class LinearScoringTest(unittest.TestCase):
     self.assertTrue(abs(score - ref_scores_11[1,1]) < 1e-7)
     score = bob.machine.linear_scoring(model2.mean_supervector, ubm.mean_supervector, ubm.variance_supervector, stats3, test_channeloffset[2], True)
     self.assertTrue(abs(score - ref_scores_11[1,2]) < 1e-7)
+
+  def test02_LinearScoring_tiles(self):
+    # More test trials than a tile, scored with several threads
+    numpy.random.seed(0)
+    ubm = bob.machine.GMMMachine(4, 3)
+    ubm.means = numpy.random.normal(0, 1, (4,3))
+    ubm.variances = numpy.random.uniform(0.5, 1.5, (4,3))
+    models = [numpy.random.normal(0, 1, (12,)) for i in range(5)]
+    stats = []
+    offsets = []
+    for i in range(600):
+      s = bob.machine.GMMStats(4, 3)
+      s.n = numpy.random.uniform(0, 10, (4,))
+      s.sum_px = numpy.random.normal(0, 10, (4,3))
+      s.t = 0 if i == 10 else int(s.n.sum())
+      stats.append(s)
+      offsets.append(numpy.random.normal(0, 0.1, (12,)))
+
+    for frame_length_normalisation in (False, True):
+      scores = bob.machine.linear_scoring(models, ubm.mean_supervector, ubm.variance_supervector, stats, offsets, frame_length_normalisation)
+      self.assertEqual(scores.shape, (5,600))
+      for m in range(5):
+        for i in (0, 10, 255, 256, 599):
+          score = bob.machine.linear_scoring(models[m], ubm.mean_supervector, ubm.variance_supervector, stats[i], offsets[i], frame_length_normalisation)
+          self.assertTrue(abs(scores[m,i] - score) < 1e-8)
+      for n_threads in (2, 3, 8):
+        scores_t = bob.machine.linear_scoring(models, ubm.mean_supervector, ubm.variance_supervector, stats, offsets, frame_length_normalisation, n_threads)
+        self.assertTrue(numpy.allclose(scores, scores_t, rtol=1e-12, atol=1e-12))
@@ -287,3 +287,27 @@ def test_randomness():
 
     for b1, b2 in zip(m1.biases, m2.biases):
       assert (b1 == b2).all() == False
+
+def test_threads_shared():
+
+  # a single machine may be used by several threads at once
+  import threading
+  numpy.random.seed(0)
+  m = MLP((20, 10, 7, 5))
+  m.randomize()
+  data = numpy.random.randn(1000, 20)
+  output_ref = m(data)
+
+  errors = []
+  def run():
+    try:
+      for k in range(5):
+        if not (m(data) == output_ref).all():
+          errors.append('the outputs of a thread differ from the serial ones')
+    except Exception as e:
+      errors.append(str(e))
+
+  threads = [threading.Thread(target=run) for i in range(2)]
+  for t in threads: t.start()
+  for t in threads: t.join()
+  nose.tools.eq_(errors, [])
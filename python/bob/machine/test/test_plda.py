@@ -562,3 +562,73 @@ class PLDAMachineTest(unittest.TestCase):
     # and [x3] separately
     llr_ref = -4.43695386675
     self.assertTrue(abs((llX - (llY + llZ)) - llr_ref) < 1e-10)
+
+  def test06_plda_scoring(self):
+    # Defines base machine
+    numpy.random.seed(0)
+    mb = bob.machine.PLDABase(C_dim_d, C_dim_f, C_dim_g)
+    mb.mu = numpy.random.randn(C_dim_d)
+    mb.f = C_F
+    mb.g = C_G
+    mb.sigma = numpy.random.uniform(0.5, 1.5, (C_dim_d,))
+
+    # Defines enrolled machines with various numbers of enrolled samples
+    models = []
+    for n_samples in (0, 1, 3, 3, 5):
+      m = bob.machine.PLDAMachine(mb)
+      m.n_samples = n_samples
+      m.w_sum_xit_beta_xi = -numpy.random.uniform(0, 10)
+      m.weighted_sum = numpy.random.randn(C_dim_f)
+      m.log_likelihood = -numpy.random.uniform(0, 10)
+      models.append(m)
+
+    # More probes than a tile, scored with one or several threads
+    probes = numpy.random.randn(300, C_dim_d)
+    scores = bob.machine.plda_scoring(models, probes)
+    self.assertEqual(scores.shape, (5, 300))
+    for i, m in enumerate(models):
+      for p in (0, 1, 255, 256, 299):
+        self.assertTrue(abs(scores[i,p] - m.forward(probes[p,:])) < 1e-10)
+    scores_t = bob.machine.plda_scoring(models, probes, 3)
+    self.assertTrue(equals(scores, scores_t, 1e-10))
+
+    # The machines should share the same base
+    other = bob.machine.PLDAMachine(bob.machine.PLDABase(mb))
+    self.assertRaises(RuntimeError, bob.machine.plda_scoring, models + [other], probes)
+
+  def test07_plda_threads_shared(self):
+    # Machines (and their base) shared by several threads
+    import threading
+    numpy.random.seed(0)
+    mb = bob.machine.PLDABase(C_dim_d, C_dim_f, C_dim_g)
+    mb.mu = numpy.random.randn(C_dim_d)
+    mb.f = C_F
+    mb.g = C_G
+    mb.sigma = numpy.random.uniform(0.5, 1.5, (C_dim_d,))
+    m = bob.machine.PLDAMachine(mb)
+    m.n_samples = 2
+    m.w_sum_xit_beta_xi = -numpy.random.uniform(0, 10)
+    m.weighted_sum = numpy.random.randn(C_dim_f)
+    m.log_likelihood = -numpy.random.uniform(0, 10)
+    # A copy sharing the base
+    m2 = bob.machine.PLDAMachine(m)
+    samples = numpy.random.randn(50, C_dim_d)
+
+    ll_ref = m.compute_log_likelihood(samples)
+    scores_ref = [m.forward(samples[k,:]) for k in range(samples.shape[0])]
+
+    errors = []
+    def run(machine):
+      try:
+        for k in range(5):
+          ll = machine.compute_log_likelihood(samples)
+          scores = [machine.forward(samples[j,:]) for j in range(samples.shape[0])]
+          if ll != ll_ref or scores != scores_ref:
+            errors.append('the results of a thread differ from the serial ones')
+      except Exception as e:
+        errors.append(str(e))
+
+    threads = [threading.Thread(target=run, args=(x,)) for x in (m, m, m2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    self.assertEqual(errors, [])
@@ -23,6 +23,7 @@
 
 import os, sys
 import unittest
+import tempfile
 import numpy
 import bob
 import pkg_resources
@@ -136,3 +137,43 @@ class ZTNormTest(unittest.TestCase):
     empty = numpy.zeros(shape=(0,0), dtype=numpy.float64)
     zA = bob.machine.ztnorm(my_A, my_B, empty, empty)
     self.assertTrue((abs(zA - zA_py) < 1e-7).all())
+
+  def test05_ztnorm_files(self):
+    my_A = bob.io.load(F("ztnorm_eval_eval.mat"))
+    my_B = bob.io.load(F("ztnorm_znorm_eval.mat"))
+    my_C = bob.io.load(F("ztnorm_eval_tnorm.mat"))
+    my_D = bob.io.load(F("ztnorm_znorm_tnorm.mat"))
+    numpy.random.seed(0)
+    my_mask = numpy.random.uniform(0, 1, my_D.shape) < 0.1
+
+    # The rows may be normalised by several threads
+    ref_scores = bob.machine.ztnorm(my_A, my_B, my_C, my_D, my_mask)
+    scores = bob.machine.ztnorm(my_A, my_B, my_C, my_D, my_mask, n_threads=3)
+    self.assertTrue((abs(scores - ref_scores) < 1e-10).all())
+
+    # The score matrices may be read from files, by blocks of rows
+    filenames = {}
+    for name, data in (('A', my_A), ('B', my_B), ('C', my_C), ('D', my_D), ('mask', my_mask)):
+      filenames[name] = str(tempfile.mkstemp(".hdf5")[1])
+      bob.io.save(data, filenames[name])
+    files = dict((name, bob.io.File(filename, 'r')) for name, filename in filenames.items())
+
+    def normalise(function, names, reference):
+      output = str(tempfile.mkstemp(".hdf5")[1])
+      os.unlink(output)
+      f = bob.io.File(output, 'w')
+      function(*([files[name] for name in names] + [f]), block_size=7, n_threads=2)
+      del f
+      scores = bob.io.load(output)
+      os.unlink(output)
+      self.assertEqual(scores.shape, reference.shape)
+      self.assertTrue((abs(scores - reference) < 1e-10).all())
+
+    normalise(bob.machine.ztnorm, ('A', 'B', 'C', 'D', 'mask'), ref_scores)
+    normalise(bob.machine.ztnorm, ('A', 'B', 'C', 'D'), bob.machine.ztnorm(my_A, my_B, my_C, my_D))
+    normalise(bob.machine.tnorm, ('A', 'C'), bob.machine.tnorm(my_A, my_C))
+    normalise(bob.machine.znorm, ('A', 'B'), bob.machine.znorm(my_A, my_B))
+
+    del files
+    for filename in filenames.values():
+      os.unlink(filename)
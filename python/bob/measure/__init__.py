@@ -65,25 +65,27 @@ def relevance (input, machine):
 
   return retval
 
+def _grouped(cmc_scores):
+  """Returns the given CMC scores as a bob.measure.load.GroupedScores object"""
+  if isinstance(cmc_scores, load.GroupedScores): return cmc_scores
+  return load.GroupedScores.from_list(cmc_scores)
+
 def recognition_rate(cmc_scores):
   """Calculates the recognition rate from the given input, which is identical to the rank 1 (C)MC value.
   The input has a specific format, which is a list of two-element tuples.
   Each of the tuples contains the negative and the positive scores for one test item.
   To read the lists from score files in 4 or 5 column format, please use the bob.measure.load.cmc_four_column or bob.measure.load.cmc_five_column function.
+  These functions return a bob.measure.load.GroupedScores object, for which the computation is done for all test items at once.
 
   The recognition rate is defined as the number of test items,
   for which the positive score is greater than or equal to all negative scores,
   divided by the number of all test items.
   If several positive scores for one test item exist, the *highest* score is taken.
   """
-  correct = 0.
-  for neg, pos in cmc_scores:
-    # get the maximum positive score for the current probe item
-    # (usually, there is only one positive score, but just in case...)
-    max_pos = numpy.max(pos)
-    # check if the positive score is smaller than all negative scores
-    if (neg <= max_pos).all():
-      correct += 1
+  cmc_scores = _grouped(cmc_scores)
+  # a test item is correctly recognized if no negative score is higher than
+  # the best positive score
+  correct = numpy.sum(cmc_scores.ranks() == 0)
 
   # return relative number of
   return correct / float(len(cmc_scores))
@@ -93,30 +95,20 @@ def cmc(cmc_scores):
   The input has a specific format, which is a list of two-element tuples.
   Each of the tuples contains the negative and the positive scores for one test item.
   To read the lists from score files in 4 or 5 column format, please use the bob.measure.load.cmc_four_column or bob.measure.load.cmc_five_column function.
+  These functions return a bob.measure.load.GroupedScores object, for which the computation is done for all test items at once.
 
   For each test item the probability that the rank r of the positive score is calculated.
   The rank is computed as the number of negative scores that are higher than the positive score.
   If several positive scores for one test item exist, the *highest* positive score is taken.
   The CMC finally computes, how many test items have rank r or higher.
   """
+  cmc_scores = _grouped(cmc_scores)
   # compute MC
-  match_characteristic = numpy.zeros((max([len(neg) for (neg,pos) in cmc_scores])+1,), numpy.int)
-  for neg, pos in cmc_scores:
-    # get the maximum positive score for the current probe item
-    # (usually, there is only one positive score, but just in case...)
-    max_pos = numpy.max(pos)
-    # count the number of negative scores that are higher than the best positive score
-    index = numpy.sum(neg > max_pos)
-    match_characteristic[index] += 1
+  max_rank = numpy.diff(cmc_scores.negative_offsets).max()
+  match_characteristic = numpy.bincount(cmc_scores.ranks(), minlength=max_rank+1)
 
   # cumulate
   probe_count = float(len(cmc_scores))
-  cumulative_match_characteristic = numpy.ndarray(match_characteristic.shape, numpy.float64)
-  count = 0.
-  for i in range(match_characteristic.shape[0]):
-    count += match_characteristic[i]
-    cumulative_match_characteristic[i] = count / probe_count
-
-  return cumulative_match_characteristic
+  return numpy.cumsum(match_characteristic) / probe_count
 
 __all__ = [k for k in dir() if not k.startswith('_')]
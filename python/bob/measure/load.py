@@ -4,10 +4,215 @@
 # Mon 23 May 2011 16:23:05 CEST
 
 """A set of utilities to load score files with different formats.
+
+All loaders in this module share the same parsing core, which reads the score
+files in chunks of (about) ``CHUNK_SIZE`` bytes, so that only a bounded
+number of lines is held in memory at any time. Scores are accumulated in
+growable float64 buffers, which are then handed over to numpy without
+copying.
 """
 
+import os
+import array
 import numpy
 
+CHUNK_SIZE = 1 << 20
+"""The default number of bytes read at once from score files"""
+
+def _iterate(filename, columns, chunk_size=CHUNK_SIZE):
+  """Parsing core shared by all loaders in this module.
+
+  Reads the given score file in chunks of (about) ``chunk_size`` bytes and
+  yields, for each chunk, a list with the fields of every valid line. Only the
+  first ``columns`` fields of each line are kept and the last of these, the
+  score, is converted to float. Empty lines and comments are skipped.
+  """
+
+  i = 0
+  with open(filename, 'rt') as f:
+    while True:
+      lines = f.readlines(chunk_size)
+      if not lines: break
+      chunk = []
+      for l in lines:
+        s = l.strip()
+        if len(s) != 0 and s[0] != '#': #not empty nor comment
+          field = s.split()[:columns]
+          if len(field) < columns:
+            raise SyntaxError, 'Line %d of file "%s" is invalid: %s' % \
+                (i, filename, l)
+          try:
+            field[-1] = float(field[-1])
+          except:
+            raise SyntaxError, 'Cannot convert score to float at line %d of file "%s": %s' % (i, filename, l)
+          chunk.append(field)
+        i += 1
+      yield chunk
+
+def _split(filename, columns, real_id, chunk_size=CHUNK_SIZE):
+  """Yields, for each chunk of the given score file, a tuple (negatives,
+  positives) of float64 buffers (``array.array``). Scores for which the
+  claimed identity (column 0) equals the real identity (column ``real_id``)
+  are positives."""
+
+  for chunk in _iterate(filename, columns, chunk_size):
+    neg = array.array('d')
+    pos = array.array('d')
+    for field in chunk:
+      if field[0] == field[real_id]:
+        pos.append(field[-1])
+      else:
+        neg.append(field[-1])
+    yield (neg, pos)
+
+def _to_numpy(buf):
+  """Wraps a float64 buffer (``array.array``) as a numpy array, without
+  copying"""
+
+  if not len(buf): return numpy.ndarray((0,), numpy.float64)
+  return numpy.frombuffer(buf, numpy.float64)
+
+def _split_all(filename, columns, real_id):
+  """Loads all scores of the given file, splitting them into negatives and
+  positives, see split_four_column()."""
+
+  neg = array.array('d')
+  pos = array.array('d')
+  for block_neg, block_pos in _split(filename, columns, real_id):
+    neg.extend(block_neg)
+    pos.extend(block_pos)
+  return (_to_numpy(neg), _to_numpy(pos))
+
+def _split_blocks(filename, columns, real_id, chunk_size):
+  """Generator version of _split_all(), yielding numpy arrays per chunk"""
+
+  for neg, pos in _split(filename, columns, real_id, chunk_size):
+    yield (_to_numpy(neg), _to_numpy(pos))
+
+class GroupedScores(object):
+  """Scores to compute CMC curves, grouped by probe.
+
+  Instead of one (negatives, positives) tuple of arrays per probe, the scores
+  of all probes are held in two flat arrays, ``negatives`` and ``positives``.
+  The scores of probe ``i`` are ``negatives[negative_offsets[i]:
+  negative_offsets[i+1]]`` and ``positives[positive_offsets[i]:
+  positive_offsets[i+1]]``. This allows bob.measure.cmc() and
+  bob.measure.recognition_rate() to compute the ranks of all probes at once.
+
+  For compatibility, objects of this class also behave like the list of
+  (negatives, positives) tuples used before: they can be indexed and
+  iterated over, and ``len()`` gives the number of probes.
+  """
+
+  def __init__(self, negatives, negative_offsets, positives, positive_offsets):
+    self.negatives = numpy.asarray(negatives, numpy.float64)
+    self.negative_offsets = numpy.asarray(negative_offsets, numpy.int64)
+    self.positives = numpy.asarray(positives, numpy.float64)
+    self.positive_offsets = numpy.asarray(positive_offsets, numpy.int64)
+    if len(self.negative_offsets) != len(self.positive_offsets):
+      raise ValueError, 'The offsets of negatives and positives must have the same length'
+
+  @classmethod
+  def from_list(cls, cmc_scores):
+    """Creates the grouped representation from a list of (negatives,
+    positives) tuples, one per probe"""
+
+    negatives = [numpy.atleast_1d(numpy.asarray(neg, numpy.float64)) for neg, _ in cmc_scores]
+    positives = [numpy.atleast_1d(numpy.asarray(pos, numpy.float64)) for _, pos in cmc_scores]
+    def offsets(scores):
+      retval = numpy.zeros((len(scores)+1,), numpy.int64)
+      numpy.cumsum([len(k) for k in scores], out=retval[1:])
+      return retval
+    def concatenate(scores):
+      if not scores: return numpy.ndarray((0,), numpy.float64)
+      return numpy.concatenate(scores)
+    return cls(concatenate(negatives), offsets(negatives),
+        concatenate(positives), offsets(positives))
+
+  def __len__(self):
+    return len(self.negative_offsets) - 1
+
+  def __getitem__(self, index):
+    if index < 0: index += len(self)
+    if index < 0 or index >= len(self): raise IndexError, index
+    return (self.negatives[self.negative_offsets[index]:self.negative_offsets[index+1]],
+        self.positives[self.positive_offsets[index]:self.positive_offsets[index+1]])
+
+  def __iter__(self):
+    for index in range(len(self)): yield self[index]
+
+  def ranks(self):
+    """Returns, for every probe, the number of negative scores that are
+    higher than the best positive score"""
+
+    probes = len(self)
+    if not probes: return numpy.ndarray((0,), numpy.int64)
+    if (numpy.diff(self.positive_offsets) == 0).any():
+      raise ValueError, 'Every probe needs at least one positive score'
+
+    # the best positive score of every probe
+    max_positives = numpy.maximum.reduceat(self.positives, self.positive_offsets[:-1])
+    # the probe of every negative score
+    negative_probes = numpy.repeat(numpy.arange(probes), numpy.diff(self.negative_offsets))
+    higher = self.negatives > max_positives[negative_probes]
+    return numpy.bincount(negative_probes[higher], minlength=probes)
+
+def _group(negatives, negative_probes, positives, positive_probes, names):
+  """Groups negative and positive scores by probe, where the probe of every
+  score is given as an index into the list of probe ``names``. Probes are
+  sorted by name, and probes with only negative or only positive scores are
+  ignored. Returns a GroupedScores object."""
+
+  import logging
+  logger = logging.getLogger('bob')
+
+  # the position of every name in the sorted list of names
+  order = sorted(range(len(names)), key=names.__getitem__)
+  rank = numpy.zeros((len(names),), numpy.int64)
+  rank[order] = numpy.arange(len(names))
+
+  negative_keys = rank[numpy.asarray(negative_probes, numpy.int64)]
+  positive_keys = rank[numpy.asarray(positive_probes, numpy.int64)]
+  negative_counts = numpy.bincount(negative_keys, minlength=len(names))
+  positive_counts = numpy.bincount(positive_keys, minlength=len(names))
+
+  for key in numpy.flatnonzero((positive_counts > 0) & (negative_counts == 0)):
+    logger.warn('For probe name "%s" there are only positive scores. This probe name is ignored.' % names[order[key]])
+  # test if there are probes for which only negatives exist
+  for key in numpy.flatnonzero((negative_counts > 0) & (positive_counts == 0)):
+    logger.warn('For probe name "%s" there are only negative scores. This probe name is ignored.' % names[order[key]])
+
+  keep = (negative_counts > 0) & (positive_counts > 0)
+
+  def select(scores, keys, counts):
+    # sorts the scores by probe, keeping their original order within a probe
+    mask = keep[keys]
+    keys = keys[mask]
+    scores = numpy.asarray(scores, numpy.float64)[mask]
+    offsets = numpy.zeros((keep.sum()+1,), numpy.int64)
+    numpy.cumsum(counts[keep], out=offsets[1:])
+    return scores[numpy.argsort(keys, kind='mergesort')], offsets
+
+  negatives, negative_offsets = select(negatives, negative_keys, negative_counts)
+  positives, positive_offsets = select(positives, positive_keys, positive_counts)
+  return GroupedScores(negatives, negative_offsets, positives, positive_offsets)
+
+def _cmc(filename, columns, real_id, probe_name_id):
+  """Loads scores to compute CMC curves, see cmc_four_column()."""
+
+  names = {}
+  scores = (array.array('d'), array.array('d')) #negatives, positives
+  probes = (array.array('l'), array.array('l'))
+  for chunk in _iterate(filename, columns):
+    for field in chunk:
+      is_positive = int(field[0] == field[real_id])
+      scores[is_positive].append(field[-1])
+      probes[is_positive].append(names.setdefault(field[probe_name_id], len(names)))
+
+  words = [None] * len(names)
+  for word, code in names.items(): words[code] = word
+  return _group(_to_numpy(scores[0]), probes[0], _to_numpy(scores[1]), probes[1], words)
+
 def four_column(filename):
   """Loads a score set from a single file to memory.
 
@@ -26,20 +231,8 @@ def four_column(filename):
   """
 
   retval = []
-  for i, l in enumerate(open(filename, 'rt')):
-    s = l.strip()
-    if len(s) == 0 or s[0] == '#': continue #empty or comment
-    field = [k.strip() for k in s.split()]
-    if len(field) < 4:
-      raise SyntaxError, 'Line %d of file "%s" is invalid: %s' % \
-          (i, filename, l)
-    try:
-      score = float(field[3])
-      t = (field[0], field[1], field[2], score)
-      retval.append(t)
-    except:
-      raise SyntaxError, 'Cannot convert score to float at line %d of file "%s": %s' % (i, filename, l)
-
+  for chunk in _iterate(filename, 4):
+    retval.extend(tuple(field) for field in chunk)
   return retval
 
 def split_four_column(filename):
@@ -54,71 +247,84 @@ def split_four_column(filename):
   arrays of float64.
   """
 
-  # read four column list
-  scores_list = four_column(filename)
+  return _split_all(filename, 4, 1)
 
-  # split in positives and negatives
-  neg = []
-  pos = []
-  for (client_id, probe_id, _, score_str) in scores_list:
-    try:
-      score = float(score_str)
-      if client_id == probe_id:
-        pos.append(score)
-      else:
-        neg.append(score)
-    except:
-      raise SyntaxError, 'Cannot convert score "%s" to float' % score_str
+def split_four_column_blocks(filename, chunk_size=CHUNK_SIZE):
+  """Generator that reads a score set in the 4 column format, as defined in
+  the method four_column(), chunk by chunk.
+
+  For every chunk of (about) ``chunk_size`` bytes of the file, yields a python
+  tuple (negatives, positives), as split_four_column() would return for that
+  part of the file. Use this method to process score files that do not fit in
+  memory.
+  """
+
+  return _split_blocks(filename, 4, 1, chunk_size)
 
-  return (numpy.array(neg, numpy.float64), numpy.array(pos, numpy.float64))
+def _load_npy(filename):
+  """Memory-maps an array saved with numpy.save(), if possible"""
+
+  try:
+    return numpy.load(filename, mmap_mode='r')
+  except ValueError: #empty arrays cannot be mapped
+    return numpy.load(filename)
+
+def split_cached(filename, parser=split_four_column, cache_directory=None):
+  """Loads a score set with the given parser, e.g., split_four_column(), and
+  returns the negatives and positives sorted ascendingly.
+
+  If a ``cache_directory`` is given, the sorted scores are saved there, keyed
+  by the absolute path of the score file and the name of the parser. As long
+  as the modification time and the size of the score file do not change,
+  later calls memory-map the cached scores instead of parsing and sorting
+  them again. The parser needs to be importable by name (not a lambda).
+
+  Returns a python tuple (negatives, positives). The values are 1-D numpy
+  arrays of float64.
+  """
+
+  if cache_directory is None:
+    negatives, positives = parser(filename)
+    return (numpy.sort(negatives), numpy.sort(positives))
+
+  import hashlib
+  filename = os.path.abspath(filename)
+  name = '%s.%s' % (parser.__module__, parser.__name__)
+  stat = os.stat(filename)
+  stamp = '%s\n%s\n%r\n%d\n' % (filename, name, stat.st_mtime, stat.st_size)
+  key = hashlib.md5(('%s\n%s' % (filename, name)).encode('utf-8')).hexdigest()
+  base = os.path.join(cache_directory, key)
+
+  if os.path.exists(base + '.key'):
+    with open(base + '.key', 'rt') as f:
+      if f.read() == stamp:
+        return (_load_npy(base + '-negatives.npy'), _load_npy(base + '-positives.npy'))
+
+  negatives, positives = parser(filename)
+  negatives = numpy.sort(negatives)
+  positives = numpy.sort(positives)
+
+  if not os.path.exists(cache_directory): os.makedirs(cache_directory)
+  numpy.save(base + '-negatives.npy', negatives)
+  numpy.save(base + '-positives.npy', positives)
+  # the key is written last, so that incomplete entries are never used
+  with open(base + '.key', 'wt') as f: f.write(stamp)
+
+  return (negatives, positives)
 
 def cmc_four_column(filename):
   """Loads scores to compute CMC curves from a file in four column format.
   The four column file needs to be in the same format as described in the four_column function,
   and the "test label" (column 3) has to contain the test/probe file name.
 
-  This function returns a list of tuples.
+  This function returns a GroupedScores object, which behaves like a list of tuples.
   For each probe file, the tuple consists of a list of negative scores and a list of positive scores.
   Usually, the list of positive scores should contain only one element, but more are allowed.
 
   The result of this function can directly be passed to, e.g., the bob.measure.cmc function.
   """
-  # read four column list
-  all_list = four_column(filename)
-  # extract positives and negatives
-  pos_dict = {}
-  neg_dict = {}
-  for (client_id, probe_id, probe_name, score_str) in all_list:
-    try:
-      score = float(score_str)
-      # check in which dict we have to put the score
-      if client_id == probe_id:
-        correct_dict = pos_dict
-      else:
-        correct_dict = neg_dict
-      # append score
-      if probe_name in correct_dict:
-        correct_dict[probe_name].append(score)
-      else:
-        correct_dict[probe_name] = [score]
-    except:
-      raise SyntaxError, "Cannot convert score '%s' to float" % score_str
-
-  # convert to lists of tuples of ndarrays
-  retval = []
-  import logging
-  logger = logging.getLogger('bob')
-  for probe_name in sorted(pos_dict.keys()):
-    if probe_name in neg_dict:
-      retval.append((numpy.array(neg_dict[probe_name], numpy.float64), numpy.array(pos_dict[probe_name], numpy.float64)))
-    else:
-      logger.warn('For probe name "%s" there are only positive scores. This probe name is ignored.' % probe_name)
-  # test if there are probes for which only negatives exist
-  for probe_name in sorted(neg_dict.keys()):
-    if not probe_name in pos_dict.keys():
-       logger.warn('For probe name "%s" there are only negative scores. This probe name is ignored.' % probe_name)
 
-  return retval
+  return _cmc(filename, 4, 1, 2)
 
 def five_column(filename):
   """Loads a score set from a single file to memory.
@@ -140,20 +346,8 @@ def five_column(filename):
   """
 
   retval = []
-  for i, l in enumerate(open(filename, 'rt')):
-    s = l.strip()
-    if len(s) == 0 or s[0] == '#': continue #empty or comment
-    field = [k.strip() for k in s.split()]
-    if len(field) < 5:
-      raise SyntaxError, 'Line %d of file "%s" is invalid: %s' % \
-          (i, filename, l)
-    try:
-      score = float(field[4])
-      t = (field[0], field[1], field[2], field[3], score)
-      retval.append(t)
-    except:
-      raise SyntaxError, 'Cannot convert score to float at line %d of file "%s": %s' % (i, filename, l)
-
+  for chunk in _iterate(filename, 5):
+    retval.extend(tuple(field) for field in chunk)
   return retval
 
 def split_five_column(filename):
@@ -168,67 +362,208 @@ def split_five_column(filename):
   arrays of float64.
   """
 
-  # read five column list
-  scores_list = five_column(filename)
+  return _split_all(filename, 5, 2)
 
-  # split in positives and negatives
-  neg = []
-  pos = []
-  for (client_id, _, probe_id, _, score_str) in scores_list:
-    try:
-      score = float(score_str)
-      if client_id == probe_id:
-        pos.append(score)
-      else:
-        neg.append(score)
-    except:
-      raise SyntaxError, 'Cannot convert score "%s" to float' % score_str
+def split_five_column_blocks(filename, chunk_size=CHUNK_SIZE):
+  """Generator that reads a score set in the 5 column format, as defined in
+  the method five_column(), chunk by chunk.
+
+  For every chunk of (about) ``chunk_size`` bytes of the file, yields a python
+  tuple (negatives, positives), as split_five_column() would return for that
+  part of the file. Use this method to process score files that do not fit in
+  memory.
+  """
 
-  return (numpy.array(neg, numpy.float64), numpy.array(pos, numpy.float64))
+  return _split_blocks(filename, 5, 2, chunk_size)
 
 def cmc_five_column(filename):
   """Loads scores to compute CMC curves from a file in five column format.
   The four column file needs to be in the same format as described in the five_column function,
   and the "test label" (column 4) has to contain the test/probe file name.
 
-  This function returns a list of tuples.
+  This function returns a GroupedScores object, which behaves like a list of tuples.
   For each probe file, the tuple consists of a list of negative scores and a list of positive scores.
   Usually, the list of positive scores should contain only one element, but more are allowed.
 
   The result of this function can directly be passed to, e.g., the bob.measure.cmc function.
   """
-  # read four column list
-  all_list = five_column(filename)
-
-  pos_dict = {}
-  neg_dict = {}
-  for (client_id, _, probe_id, probe_name, score_str) in all_list:
-    try:
-      score = float(score_str)
-      # check in which dict we have to put the score
-      if client_id == probe_id:
-        correct_dict = pos_dict
-      else:
-        correct_dict = neg_dict
-      # append score
-      if probe_name in correct_dict:
-        correct_dict[probe_name].append(score)
-      else:
-        correct_dict[probe_name] = [score]
-    except:
-      raise SyntaxError, 'Cannot convert score "%s" to float' % score_str
 
-  # convert to lists of tuples of ndarrays
-  retval = []
-  import logging
-  logger = logging.getLogger('bob')
-  for probe_name in sorted(pos_dict.keys()):
-    if probe_name in neg_dict:
-      retval.append((numpy.array(neg_dict[probe_name], numpy.float64), numpy.array(pos_dict[probe_name], numpy.float64)))
-    else:
-      logger.warn('For probe name "%s" there are only positive scores. This probe name is ignored.' % probe_name)
-  # test if there are probes for which only negatives exist
-  for probe_name in sorted(neg_dict.keys()):
-    if not probe_name in pos_dict.keys():
-       logger.warn('For probe name "%s" there are only negative scores. This probe name is ignored.' % probe_name)
-  return retval
+  return _cmc(filename, 5, 2, 3)
+
+BINARY_MAGIC = b'BOBSCORE'
+"""The first bytes of every score file in binary format"""
+
+BINARY_VERSION = 1
+"""The version of the binary score format written by this module"""
+
+_BINARY_HEADER = 8
+"""The number of 64-bit unsigned integers following the magic bytes"""
+
+def _binary_layout(columns):
+  """Returns the indices of the real identity and of the test label columns
+  for score files with the given number of columns"""
+
+  if columns == 4: return (1, 2)
+  if columns == 5: return (2, 3)
+  raise ValueError, 'Binary score files only support 4 or 5 columns, not %d' % columns
+
+def _convert(input, output, columns):
+  """Converts a text score file into the binary format, see
+  convert_four_column()."""
+
+  real_id, _ = _binary_layout(columns)
+
+  dictionary = {}
+  scores = (array.array('d'), array.array('d')) #negatives, positives
+  codes = ([array.array('i') for k in range(columns-1)],
+      [array.array('i') for k in range(columns-1)])
+
+  for chunk in _iterate(input, columns):
+    for field in chunk:
+      is_positive = int(field[0] == field[real_id])
+      scores[is_positive].append(field[-1])
+      for k in range(columns-1):
+        codes[is_positive][k].append(dictionary.setdefault(field[k], len(dictionary)))
+
+  words = [None] * len(dictionary)
+  for word, code in dictionary.items(): words[code] = word
+  words = '\n'.join(words)
+  if not isinstance(words, bytes): words = words.encode('utf-8') #python 3
+
+  rows = len(scores[0]) + len(scores[1])
+  codes_offset = len(BINARY_MAGIC) + 8 * _BINARY_HEADER + 8 * rows
+  dictionary_offset = codes_offset + 4 * (columns-1) * rows
+  header = numpy.array([BINARY_VERSION, columns, rows, len(scores[1]),
+    len(dictionary), codes_offset, dictionary_offset, len(words)], '<u8')
+
+  with open(output, 'wb') as f:
+    f.write(BINARY_MAGIC)
+    header.tofile(f)
+    # positives come first, so that they can be mapped without copying
+    numpy.array(scores[1], '<f8').tofile(f)
+    numpy.array(scores[0], '<f8').tofile(f)
+    for k in range(columns-1):
+      numpy.array(codes[1][k], '<i4').tofile(f)
+      numpy.array(codes[0][k], '<i4').tofile(f)
+    f.write(words)
+
+def convert_four_column(input, output):
+  """Converts a score file in the 4 column format, as defined in the method
+  four_column(), into the binary format, which is much faster to load.
+
+  The binary format holds all scores as a contiguous float64 column that is
+  memory-mapped by split_binary() and cmc_binary(), while the identity and
+  label columns are dictionary-encoded as 32-bit integers. The scores of
+  positives are stored before the ones of negatives, in their original
+  order.
+  """
+
+  _convert(input, output, 4)
+
+def convert_five_column(input, output):
+  """Converts a score file in the 5 column format, as defined in the method
+  five_column(), into the binary format. See convert_four_column() for
+  details.
+  """
+
+  _convert(input, output, 5)
+
+def is_binary(filename):
+  """Returns True if the given file is a score file in binary format"""
+
+  with open(filename, 'rb') as f:
+    return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+def _binary_header(filename):
+  """Reads the header of a binary score file and returns it as a dictionary"""
+
+  with open(filename, 'rb') as f:
+    if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+      raise IOError, 'File "%s" is not a score file in binary format' % filename
+    header = numpy.fromfile(f, '<u8', _BINARY_HEADER)
+
+  if len(header) != _BINARY_HEADER:
+    raise IOError, 'File "%s" has a truncated header' % filename
+  if header[0] > BINARY_VERSION:
+    raise IOError, 'File "%s" uses version %d of the binary score format, but only versions up to %d are supported' % (filename, header[0], BINARY_VERSION)
+
+  keys = ('version', 'columns', 'rows', 'positives', 'words',
+      'codes_offset', 'dictionary_offset', 'dictionary_size')
+  return dict(zip(keys, [int(k) for k in header]))
+
+def _binary_scores(filename, header):
+  """Memory-maps the score column of a binary score file"""
+
+  if not header['rows']: return numpy.ndarray((0,), numpy.float64)
+  return numpy.memmap(filename, '<f8', 'r',
+      offset=len(BINARY_MAGIC) + 8 * _BINARY_HEADER, shape=(header['rows'],))
+
+def _binary_codes(filename, header):
+  """Memory-maps the dictionary-encoded string columns of a binary score file,
+  as a 2D array with one row per column"""
+
+  if not header['rows']:
+    return numpy.ndarray((header['columns']-1, 0), numpy.int32)
+  return numpy.memmap(filename, '<i4', 'r', offset=header['codes_offset'],
+      shape=(header['columns']-1, header['rows']))
+
+def _binary_dictionary(filename, header):
+  """Reads the list of strings used by the encoded columns of a binary score
+  file"""
+
+  if not header['words']: return []
+  with open(filename, 'rb') as f:
+    f.seek(header['dictionary_offset'])
+    words = f.read(header['dictionary_size'])
+  if not isinstance(words, str): words = words.decode('utf-8') #python 3
+  return words.split('\n')
+
+def binary(filename):
+  """Loads a score set in binary format (see convert_four_column()) from a
+  single file to memory.
+
+  Returns a python list of tuples containing the fields of the original text
+  format, see four_column() and five_column(). The scores of positives come
+  first.
+  """
+
+  header = _binary_header(filename)
+  words = _binary_dictionary(filename, header)
+  scores = _binary_scores(filename, header)
+  codes = _binary_codes(filename, header)
+
+  return [tuple(words[c] for c in codes[:,k]) + (float(scores[k]),)
+      for k in range(header['rows'])]
+
+def split_binary(filename):
+  """Loads a score set in binary format (see convert_four_column()) and
+  splits the scores between positives and negatives.
+
+  The scores are memory-mapped from the file, without copying nor parsing.
+
+  Returns a python tuple (negatives, positives). The values are 1-D
+  (read-only) numpy arrays of float64.
+  """
+
+  header = _binary_header(filename)
+  scores = _binary_scores(filename, header)
+  return (scores[header['positives']:], scores[:header['positives']])
+
+def cmc_binary(filename):
+  """Loads scores to compute CMC curves from a file in binary format (see
+  convert_four_column()). The "test label" column has to contain the
+  test/probe file name.
+
+  This function returns the same GroupedScores object as cmc_four_column().
+  The result can directly be passed to, e.g., the bob.measure.cmc function.
+  """
+
+  header = _binary_header(filename)
+  words = _binary_dictionary(filename, header)
+  scores = _binary_scores(filename, header)
+  _, probe_name_id = _binary_layout(header['columns'])
+  probes = _binary_codes(filename, header)[probe_name_id]
+
+  positives = header['positives']
+  return _group(scores[positives:], probes[positives:],
+      scores[:positives], probes[:positives], words)
@@ -39,6 +39,10 @@ Examples:
   3. Don't plot (only calculate thresholds)
 
      $ %(prog)s --no-plot --devel=dev.scores --test=test.scores
+
+  4. Cache the parsed scores, so that reruns are faster
+
+     $ %(prog)s --cache-directory=cache --devel=dev.scores --test=test.scores
 """
 
 import sys, os, bob
@@ -162,6 +166,8 @@ def get_options(user_input):
       help="Name of the output file that will contain the plots (defaults to %(default)s)", metavar="FILE")
   parser.add_argument('-x', '--no-plot', dest="doplot", default=True,
       action='store_false', help="If set, then I'll execute no plotting")
+  parser.add_argument('-C', '--cache-directory', dest="cache", default=None,
+      help="Name of a directory where parsed and sorted scores are cached, so that they are only parsed again when the score files change (defaults to %(default)s)", metavar="DIR")
   parser.add_argument('-p', '--parser', dest="parser", default="4column",
       help="Name of a known parser or of a python-importable function that can parse your input files and return a tuple (negatives, positives) as blitz 1-D arrays of 64-bit floats. Consult the API of bob.measure.load.split_four_column() for details", metavar="NAME.FUNCTION")
 
@@ -190,9 +196,11 @@ def get_options(user_input):
     args.parser = bob.measure.load.split_four_column
   elif args.parser.lower() in ('5column', '5col'):
     args.parser = bob.measure.load.split_five_column
+  elif args.parser.lower() in ('binary', 'bin'):
+    args.parser = bob.measure.load.split_binary
   else: #try an import
     if args.parser.find('.') == -1:
-      parser.error("parser module should be either '4column', '5column' or a valid python function identifier in the format 'module.function': '%s' is invalid" % arg.parser)
+      parser.error("parser module should be either '4column', '5column', 'binary' or a valid python function identifier in the format 'module.function': '%s' is invalid" % arg.parser)
 
     mod, fct = args.parser.rsplit('.', 1)
     try:
@@ -206,8 +214,10 @@ def main(user_input=None):
 
   options = get_options(user_input)
 
-  dev_neg, dev_pos = options.parser(options.dev)
-  test_neg, test_pos = options.parser(options.test)
+  dev_neg, dev_pos = bob.measure.load.split_cached(options.dev,
+      options.parser, options.cache)
+  test_neg, test_pos = bob.measure.load.split_cached(options.test,
+      options.parser, options.cache)
 
   print_crit(dev_neg, dev_pos, test_neg, test_pos, 'EER')
   print_crit(dev_neg, dev_pos, test_neg, test_pos, 'Min. HTER')
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# vim: set fileencoding=utf-8 :
+#
+# Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""This script converts a score file in four or five column format into the
+binary score format, which is much faster to load. All bob_* measure scripts
+accept files in binary format with the option --parser=binary."""
+
+__epilog__ = """
+Examples:
+
+  1. Convert a score file in the 4-column format
+
+     $ %(prog)s --scores=dev.scores --output=dev.bin
+
+  2. Convert a score file in the 5-column format
+
+     $ %(prog)s --scores=dev.scores --output=dev.bin --parser=5column
+"""
+
+import sys, os, bob
+
+def get_options(user_input):
+  """Parse the program options"""
+
+  usage = 'usage: %s [arguments]' % os.path.basename(sys.argv[0])
+
+  import argparse
+  parser = argparse.ArgumentParser(usage=usage,
+      description=(__doc__ % {'prog': os.path.basename(sys.argv[0])}),
+      epilog=(__epilog__ % {'prog': os.path.basename(sys.argv[0])}),
+      formatter_class=argparse.RawDescriptionHelpFormatter)
+
+  parser.add_argument('-s', '--scores', dest="ifile", default=None,
+      help="Name of the file containing the scores in text format (defaults to %(default)s)",
+      metavar="FILE")
+  parser.add_argument('-o', '--output', dest="ofile", default=None,
+      help="Name of the binary score file to write (defaults to %(default)s)",
+      metavar="FILE")
+  parser.add_argument('-p', '--parser', dest="parser", default="4column",
+      choices=('4column', '5column'),
+      help="The format of the input score file (defaults to %(default)s)")
+
+  # This option is not normally shown to the user...
+  parser.add_argument("--self-test",
+      action="store_true", dest="test", default=False, help=argparse.SUPPRESS)
+      #help="if set, runs an internal verification test and erases any output")
+
+  args = parser.parse_args(args=user_input)
+
+  if args.test:
+    # then we go into test mode, all input is preset
+    import tempfile
+    outputdir = tempfile.mkdtemp(prefix='bobtest_')
+    args.ofile = os.path.join(outputdir, "scores.bin")
+
+  if args.ifile is None:
+    parser.error("you should give an input score set with --scores")
+
+  if args.ofile is None:
+    parser.error("you should give an output file with --output")
+
+  return args
+
+def main(user_input=None):
+
+  options = get_options(user_input)
+
+  convert = {
+      '4column': bob.measure.load.convert_four_column,
+      '5column': bob.measure.load.convert_five_column,
+      }[options.parser]
+  convert(options.ifile, options.ofile)
+
+  neg, pos = bob.measure.load.split_binary(options.ofile)
+  print("Converted %d negative and %d positive scores => '%s'" % \
+      (neg.shape[0], pos.shape[0], options.ofile))
+
+  if options.test: #remove output file + tmp directory
+    import shutil
+    shutil.rmtree(os.path.dirname(options.ofile))
+
+  return 0
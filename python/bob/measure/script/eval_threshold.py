@@ -104,9 +104,11 @@ def get_options(user_input):
     args.parser = bob.measure.load.split_four_column
   elif args.parser.lower() in ('5column', '5col'):
     args.parser = bob.measure.load.split_five_column
+  elif args.parser.lower() in ('binary', 'bin'):
+    args.parser = bob.measure.load.split_binary
   else: #try an import
     if args.parser.find('.') == -1:
-      parser.error("parser module should be either '4column', '5column' or a valid python function identifier in the format 'module.function': '%s' is invalid" % args.parser)
+      parser.error("parser module should be either '4column', '5column', 'binary' or a valid python function identifier in the format 'module.function': '%s' is invalid" % args.parser)
 
     mod, fct = args.parser.rsplit('.', 2)
     import imp
@@ -18,7 +18,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """This script computes and plot a cumulative rank characteristics (CMC) curve
-from a score file in four or five column format.
+from a score file in four or five column format, or in binary format.
 
 Note: The score file has to contain the exact probe file names as the 3rd (4column) or 4th (5column) column.
 """
@@ -37,11 +37,11 @@ def parse_command_line(command_line_options):
 
   # This option is not normally shown to the user...
   parser.add_argument('--self-test', action = 'store_true', help = argparse.SUPPRESS)
-  parser.add_argument('-s', '--score-file', required = True, help = 'The score file in 4 or 5 column format to test.')
+  parser.add_argument('-s', '--score-file', required = True, help = 'The score file in 4 or 5 column or binary format to test.')
   parser.add_argument('-o', '--output-pdf-file', default = 'cmc.pdf', help = 'The PDF file to write.')
   parser.add_argument('-l', '--log-x-scale', action='store_true', help = 'Plot logarithmic Rank axis.')
   parser.add_argument('-x', '--no-plot', action = 'store_true', help = 'Do not print a PDF file, but only report the results.')
-  parser.add_argument('-p', '--parser', default = '4column', choices = ('4column', '5column'), help = 'The type of the score file.')
+  parser.add_argument('-p', '--parser', default = '4column', choices = ('4column', '5column', 'binary'), help = 'The type of the score file.')
 
   args = parser.parse_args(command_line_options)
 
@@ -61,7 +61,7 @@ def main(command_line_options = None):
   # read data
   if not os.path.isfile(args.score_file): raise IOError("The given score file does not exist")
   # pythonic way: create inline dictionary "{...}", index with desired value "[...]", execute function "(...)"
-  data = {'4column' : bob.measure.load.cmc_four_column, '5column' : bob.measure.load.cmc_five_column}[args.parser](args.score_file)
+  data = {'4column' : bob.measure.load.cmc_four_column, '5column' : bob.measure.load.cmc_five_column, 'binary' : bob.measure.load.cmc_binary}[args.parser](args.score_file)
 
   # compute recognition rate
   rr = bob.measure.recognition_rate(data)
@@ -35,6 +35,10 @@ information are given in columns:
 
 The measure type of the development set can be changed to compute "HTER" or
 "FAR" thresholds instead, using the --criterion option.
+
+The directories can be evaluated in parallel using the --parallel option. With
+the --cache-directory option, parsed and sorted scores are cached, so that a
+rerun only parses score files that have changed.
 """
 
 
@@ -72,6 +76,11 @@ def get_args():
   parser.add_argument('-o', '--output', dest="output",
       help="Name of the output file that will contain the HTER scores")
 
+  parser.add_argument('-j', '--parallel', type=int, default=1, metavar="INT",
+                      help = "The number of processes to evaluate the directories with")
+  parser.add_argument('-C', '--cache-directory', dest="cache", metavar="DIR",
+                      help = "Directory where parsed and sorted scores are cached between runs")
+
   parser.add_argument('--self-test', action='store_true', help=argparse.SUPPRESS)
 
   parser.add_argument('-p', '--parser', dest="parser", default="4column", metavar="NAME.FUNCTION",
@@ -85,9 +94,11 @@ def get_args():
     args.parser = bob.measure.load.split_four_column
   elif args.parser.lower() in ('5column', '5col'):
     args.parser = bob.measure.load.split_five_column
+  elif args.parser.lower() in ('binary', 'bin'):
+    args.parser = bob.measure.load.split_binary
   else: #try an import
     if args.parser.find('.') == -1:
-      parser.error("parser module should be either '4column', '5column' or a valid python function identifier in the format 'module.function': '%s' is invalid" % args.parser)
+      parser.error("parser module should be either '4column', '5column', 'binary' or a valid python function identifier in the format 'module.function': '%s' is invalid" % args.parser)
 
     mod, fct = args.parser.rsplit('.', 2)
     import imp
@@ -116,8 +127,11 @@ class Result:
     self.ztnorm_dev = None
     self.ztnorm_eval = None
 
+  def __load__(self, score_file):
+    return bob.measure.load.split_cached(score_file, self.m_args.parser, self.m_args.cache)
+
   def __calculate__(self, dev_file, eval_file = None):
-    dev_neg, dev_pos = self.m_args.parser(dev_file)
+    dev_neg, dev_pos = self.__load__(dev_file)
 
     # switch which threshold function to use;
     # THIS f***ing piece of code really is what python authors propose:
@@ -132,7 +146,7 @@ class Result:
     dev_hter = (dev_far + dev_frr)/2.0
 
     if eval_file:
-      eval_neg, eval_pos = self.m_args.parser(eval_file)
+      eval_neg, eval_pos = self.__load__(eval_file)
       eval_far, eval_frr = bob.measure.farfrr(eval_neg, eval_pos, threshold)
       eval_hter = (eval_far + eval_frr)/2.0
     else:
@@ -185,22 +199,27 @@ def add_results(args, nonorm, ztnorm = None):
       else:
         r.ztnorm(dev_file)
 
-  results.append(r)
+  return r
 
-def recurse(args, path):
+def evaluate(job):
+  """Evaluates the results of a single directory, given as a tuple (args,
+  nonorm, ztnorm); this is what worker processes run"""
+  return add_results(*job)
+
+def recurse(args, path, jobs):
   dir_list = os.listdir(path)
 
   # check if the score directories are included in the current path
   if args.nonorm in dir_list:
     if args.ztnorm in dir_list:
-      add_results(args, os.path.join(path, args.nonorm), os.path.join(path, args.ztnorm))
+      jobs.append((args, os.path.join(path, args.nonorm), os.path.join(path, args.ztnorm)))
     else:
-      add_results(args, os.path.join(path, args.nonorm))
+      jobs.append((args, os.path.join(path, args.nonorm), None))
 
   for e in dir_list:
     real_path = os.path.join(path, e)
     if os.path.isdir(real_path):
-      recurse(args, real_path)
+      recurse(args, real_path, jobs)
 
 
 def table():
@@ -213,7 +232,17 @@ def table():
 def main():
   args = get_args()
 
-  recurse(args, args.directory)
+  jobs = []
+  recurse(args, args.directory, jobs)
+
+  if args.parallel > 1 and len(jobs) > 1:
+    import multiprocessing
+    pool = multiprocessing.Pool(args.parallel)
+    results.extend(pool.map(evaluate, jobs))
+    pool.close()
+    pool.join()
+  else:
+    results.extend(evaluate(job) for job in jobs)
 
   if args.sort:
     import operator
@@ -157,12 +157,13 @@ class ErrorTest(unittest.TestCase):
 
     # If the set is separable, the calculation of the threshold is a little bit
     # trickier, as you have no points in the middle of the range to compare
-    # things to. This is where the currently used recursive algorithm seems to
-    # do better. Let's verify
+    # things to. The exact minimization picks up the middle of the gap between
+    # the highest negative and the lowest positive score. Let's verify
     positives = bob.io.load(F('linsep-positives.hdf5'))
     negatives = bob.io.load(F('linsep-negatives.hdf5'))
     threshold = bob.measure.eer_threshold(negatives, positives)
-    # the result here is 3.242 (which is what is expect ;-)
+    # the result here is 3.2 (which is what is expect ;-)
+    self.assertEqual(threshold, (negatives.max() + positives.min()) / 2.)
 
     # Of course we have to make sure that will set the EER correctly:
     ccp = count(bob.measure.correctly_classified_positives(positives,threshold))
@@ -172,7 +173,7 @@ class ErrorTest(unittest.TestCase):
     # The second option for the calculation of the threshold is to use the
     # minimum HTER.
     threshold2 = bob.measure.min_hter_threshold(negatives, positives)
-    # the result here is 3.242 (which is what is expect ;-)
+    # the result here is 3.2 (which is what is expect ;-)
     self.assertEqual(threshold, threshold2) #in this particular case
 
     # Of course we have to make sure that will set the EER correctly:
@@ -223,6 +224,32 @@ class ErrorTest(unittest.TestCase):
     xyref = bob.io.load(F('nonsep-epc.hdf5'))
     self.assertTrue( numpy.allclose(xy, xyref, atol=1e-15) )
 
+  def test04b_sortedCurves(self):
+
+    # The curve functions sort the scores once and then search for each
+    # threshold; make sure this gives exactly the same results as calling
+    # farfrr() and precision_recall() on every point, unsorted data included.
+    positives = bob.io.load(F('nonsep-positives.hdf5'))
+    negatives = bob.io.load(F('nonsep-negatives.hdf5'))
+    numpy.random.seed(42)
+    negatives = numpy.random.permutation(negatives)
+    positives = numpy.random.permutation(positives)
+
+    npoints = 37
+    minimum = min(positives.min(), negatives.min())
+    maximum = max(positives.max(), negatives.max())
+    step = (maximum - minimum) / (npoints - 1.)
+
+    roc = bob.measure.roc(negatives, positives, npoints)
+    prc = bob.measure.precision_recall_curve(negatives, positives, npoints)
+    for i in range(npoints):
+      far, frr = bob.measure.farfrr(negatives, positives, minimum + i*step)
+      self.assertEqual(roc[0,i], frr)
+      self.assertEqual(roc[1,i], far)
+      prec, recall = bob.measure.precision_recall(negatives, positives, minimum + i*step)
+      self.assertEqual(prc[0,i], prec)
+      self.assertEqual(prc[1,i], recall)
+
   def test05_rocch(self):
 
     # This example will demonstrate and check the use of eer_rocch_threshold() to
@@ -276,6 +303,16 @@ class ErrorTest(unittest.TestCase):
     cmc = bob.measure.cmc(data)
     self.assertTrue((cmc == desired_cmc).all())
 
+    # the grouped scores must give the same results as the list of tuples
+    self.assertTrue(isinstance(data, bob.measure.load.GroupedScores))
+    self.assertEqual(len(data), 100)
+    self.assertEqual(bob.measure.recognition_rate(list(data)), desired_rr)
+    self.assertTrue((bob.measure.cmc(list(data)) == desired_cmc).all())
+    grouped = bob.measure.load.GroupedScores.from_list(test_data)
+    self.assertEqual(len(grouped), 4)
+    self.assertTrue((grouped.ranks() == [1, 2, 0, 0]).all())
+    self.assertTrue((grouped[2][1] == [-0.8, 1.8]).all())
+
     data = bob.measure.load.cmc_five_column(pkg_resources.resource_filename(__name__, os.path.join('data','scores-cmc-5col.txt')))
     rr = bob.measure.recognition_rate(data)
     self.assertEqual(rr, desired_rr)
@@ -308,3 +345,77 @@ class ErrorTest(unittest.TestCase):
     self.assertAlmostEqual(min_cllr, 0.337364136)
 
 
+
+  def test08_load(self):
+    # Tests that the chunked loaders give the same scores as the full ones
+    for columns, split, blocks in (
+        ('4col', bob.measure.load.split_four_column, bob.measure.load.split_four_column_blocks),
+        ('5col', bob.measure.load.split_five_column, bob.measure.load.split_five_column_blocks),
+        ):
+      negatives, positives = split(F('dev-%s.txt' % columns))
+      self.assertEqual(negatives.dtype, numpy.float64)
+      self.assertEqual(positives.dtype, numpy.float64)
+      self.assertEqual(negatives.shape[0] + positives.shape[0], 910)
+
+      # use tiny chunks, so that the file is read in many pieces
+      data = list(blocks(F('dev-%s.txt' % columns), chunk_size=200))
+      self.assertTrue(len(data) > 1)
+      self.assertTrue( numpy.array_equal(numpy.hstack([n for n, p in data]), negatives) )
+      self.assertTrue( numpy.array_equal(numpy.hstack([p for n, p in data]), positives) )
+
+  def test09_binary(self):
+    # Tests that score files in binary format give the same scores as the
+    # text files they were converted from
+    import tempfile, shutil
+    temp_dir = tempfile.mkdtemp(prefix="bobtest_")
+    try:
+      binary = os.path.join(temp_dir, 'scores.bin')
+      for columns, convert, split, cmc in (
+          ('4col', bob.measure.load.convert_four_column, bob.measure.load.split_four_column, bob.measure.load.cmc_four_column),
+          ('5col', bob.measure.load.convert_five_column, bob.measure.load.split_five_column, bob.measure.load.cmc_five_column),
+          ):
+        convert(F('scores-cmc-%s.txt' % columns), binary)
+        self.assertTrue(bob.measure.load.is_binary(binary))
+        self.assertFalse(bob.measure.load.is_binary(F('scores-cmc-%s.txt' % columns)))
+
+        negatives, positives = split(F('scores-cmc-%s.txt' % columns))
+        bin_negatives, bin_positives = bob.measure.load.split_binary(binary)
+        self.assertTrue( numpy.array_equal(bin_negatives, negatives) )
+        self.assertTrue( numpy.array_equal(bin_positives, positives) )
+        self.assertEqual(len(bob.measure.load.binary(binary)), negatives.shape[0] + positives.shape[0])
+
+        data = cmc(F('scores-cmc-%s.txt' % columns))
+        bin_data = bob.measure.load.cmc_binary(binary)
+        self.assertEqual(len(bin_data), len(data))
+        for (n, p), (bin_n, bin_p) in zip(data, bin_data):
+          self.assertTrue( numpy.array_equal(bin_n, n) )
+          self.assertTrue( numpy.array_equal(bin_p, p) )
+        self.assertEqual(bob.measure.recognition_rate(bin_data), 0.76)
+    finally:
+      shutil.rmtree(temp_dir)
+
+  def test10_cache(self):
+    # Tests that cached scores are sorted and identical to the parsed ones
+    import tempfile, shutil
+    temp_dir = tempfile.mkdtemp(prefix="bobtest_")
+    try:
+      negatives, positives = bob.measure.load.split_four_column(F('dev-4col.txt'))
+      for k in range(2): #the second time, scores come from the cache
+        cached = bob.measure.load.split_cached(F('dev-4col.txt'),
+            bob.measure.load.split_four_column, temp_dir)
+        self.assertTrue( numpy.array_equal(cached[0], numpy.sort(negatives)) )
+        self.assertTrue( numpy.array_equal(cached[1], numpy.sort(positives)) )
+        self.assertEqual(len(os.listdir(temp_dir)), 3)
+    finally:
+      shutil.rmtree(temp_dir)
+
+  def test11_threshold_above_equal_scores(self):
+    # If all scores are equal and the minimum lies above them, the threshold
+    # must reject all of them
+    negatives = numpy.ones((5,), 'float64')
+    positives = numpy.ones((3,), 'float64')
+    threshold = bob.measure.min_weighted_error_rate_threshold(negatives, positives, 1.)
+    self.assertTrue(threshold > 1.)
+    far, frr = bob.measure.farfrr(negatives, positives, threshold)
+    self.assertEqual(far, 0.)
+    self.assertEqual(frr, 1.)
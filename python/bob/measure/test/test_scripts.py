@@ -88,3 +88,32 @@ class MeasureScriptTest(unittest.TestCase):
     self.assertEqual(main(['--self-test', '--score-file', SCORES_4COL_CMC, '--log-x-scale']), 0)
     self.assertEqual(main(['--self-test', '--score-file', SCORES_5COL_CMC, '--parser', '5column']), 0)
 
+
+  def test06_binary(self):
+
+    # sanity checks
+    self.assertTrue(os.path.exists(DEV_SCORES))
+    self.assertTrue(os.path.exists(TEST_SCORES))
+
+    from bob.measure.script.convert_scores import main
+    cmdline = '--scores=%s --self-test' % (DEV_SCORES,)
+    self.assertEqual(main(cmdline.split()), 0)
+
+    import tempfile, shutil
+    temp_dir = tempfile.mkdtemp(prefix="bobtest_")
+    try:
+      dev = os.path.join(temp_dir, 'dev.bin')
+      test = os.path.join(temp_dir, 'test.bin')
+      cmc = os.path.join(temp_dir, 'cmc.bin')
+      self.assertEqual(main(['--scores', DEV_SCORES, '--output', dev]), 0)
+      self.assertEqual(main(['--scores', TEST_SCORES_5COL, '--output', test, '--parser', '5column']), 0)
+      self.assertEqual(main(['--scores', SCORES_4COL_CMC, '--output', cmc]), 0)
+
+      from bob.measure.script.compute_perf import main
+      cmdline = '--devel=%s --test=%s --parser=binary --self-test' % (dev, test)
+      self.assertEqual(main(cmdline.split()), 0)
+
+      from bob.measure.script.plot_cmc import main
+      self.assertEqual(main(['--self-test', '--score-file', cmc, '--parser', 'binary']), 0)
+    finally:
+      shutil.rmtree(temp_dir)
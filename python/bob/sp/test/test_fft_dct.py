@@ -219,3 +219,100 @@ class TransformTest(unittest.TestCase):
 
       # call the test function
       _fft2D(M, N, t, 1e-3, self)
+
+
+##################### FFTW plan cache Tests ##################
+  def test_fftw_plan_cache(self):
+    # Transforms of the same kind and shape share a single cached plan,
+    # and keep on producing the same results when reused or reset
+    clear_fftw_plan_cache()
+    self.assertEqual(fftw_plan_cache_size(), 0)
+    t = numpy.array([random.uniform(1, 10) for i in range(32)], 'complex128')
+    fft = FFT1D(32)
+    ref = fft(t)
+    self.assertEqual(fftw_plan_cache_size(), 1)
+    for i in range(3):
+      self.assertTrue(numpy.allclose(FFT1D(32)(t), ref))
+    self.assertEqual(fftw_plan_cache_size(), 1)
+    fft.reset(16)
+    self.assertTrue(numpy.allclose(fft(t[:16]), FFT1D(16)(t[:16])))
+    self.assertEqual(fftw_plan_cache_size(), 2)
+    self.assertTrue(numpy.allclose(IFFT1D(32)(ref), t))
+
+    # The rigor is part of the cache key, and the plans are created again
+    # once the cache is cleared
+    d = numpy.array([random.uniform(1, 10) for i in range(24)], 'float64').reshape(4, 6)
+    ref = DCT2D(4, 6)(d)
+    set_fftw_planning_rigor(FFTWPlanningRigor.Measure)
+    try:
+      self.assertEqual(get_fftw_planning_rigor(), FFTWPlanningRigor.Measure)
+      self.assertTrue(numpy.allclose(DCT2D(4, 6)(d), ref))
+      self.assertTrue(numpy.allclose(IDCT2D(4, 6)(ref), d))
+    finally:
+      set_fftw_planning_rigor(FFTWPlanningRigor.Estimate)
+    clear_fftw_plan_cache()
+    self.assertEqual(fftw_plan_cache_size(), 0)
+    self.assertTrue(numpy.allclose(fft(t[:16]), FFT1D(16)(t[:16])))
+
+  def test_fftw_wisdom(self):
+    import tempfile
+    (fd, filename) = tempfile.mkstemp('.wisdom', 'bobtest_')
+    os.close(fd)
+    try:
+      set_fftw_planning_rigor(FFTWPlanningRigor.Measure)
+      try:
+        DCT1D(40)(numpy.ones((40,), 'float64'))
+      finally:
+        set_fftw_planning_rigor(FFTWPlanningRigor.Estimate)
+      export_fftw_wisdom(filename)
+      self.assertTrue(os.path.getsize(filename) > 0)
+      import_fftw_wisdom(filename)
+    finally:
+      os.unlink(filename)
+    self.assertRaises(RuntimeError, import_fftw_wisdom, filename)
+
+  def test_batched_transforms(self):
+    # Transforming a stack of signals at once gives the same results as
+    # transforming each of them separately
+    for n in (1, 3, 70):
+      s1 = numpy.array([random.uniform(1, 10) for i in range(n*20)], 'float64').reshape(n, 20)
+      for (cls, data) in ((DCT1D, s1), (IDCT1D, s1), (FFT1D, s1.astype('complex128')), (IFFT1D, s1.astype('complex128'))):
+        op = cls(20)
+        out = op(data)
+        self.assertEqual(out.shape, data.shape)
+        for k in range(n):
+          self.assertTrue(numpy.allclose(out[k], op(data[k])))
+      s2 = numpy.array([random.uniform(1, 10) for i in range(n*24)], 'float64').reshape(n, 4, 6)
+      for (cls, data) in ((DCT2D, s2), (IDCT2D, s2), (FFT2D, s2.astype('complex128')), (IFFT2D, s2.astype('complex128'))):
+        op = cls(4, 6)
+        out = numpy.zeros_like(data)
+        op(data, out)
+        for k in range(n):
+          self.assertTrue(numpy.allclose(out[k], op(data[k])))
+
+  def test_shared_transforms_threads(self):
+    # A transform may be called concurrently from several threads, which
+    # execute its plans on their own working buffers
+    import threading
+    numpy.random.seed(0)
+    s1 = numpy.random.uniform(1, 10, (50, 32))
+    s2 = numpy.random.uniform(1, 10, (5, 8, 12))
+    ops = [(DCT1D(32), s1), (IDCT1D(32), s1), (FFT1D(32), s1.astype('complex128')),
+        (IFFT1D(32), s1.astype('complex128')), (DCT2D(8, 12), s2),
+        (IDCT2D(8, 12), s2), (FFT2D(8, 12), s2.astype('complex128')),
+        (IFFT2D(8, 12), s2.astype('complex128'))]
+    references = [op(data) for (op, data) in ops]
+    singles = [op(data[0]) for (op, data) in ops]
+
+    errors = []
+    def run():
+      for k in range(20):
+        for (op, data), ref, single in zip(ops, references, singles):
+          if not numpy.array_equal(op(data), ref) or \
+              not numpy.array_equal(op(data[0]), single):
+            errors.append('the results of %s differ from the serial ones' % type(op).__name__)
+
+    threads = [threading.Thread(target=run) for i in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    self.assertEqual(errors, [])
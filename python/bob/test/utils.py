@@ -7,6 +7,7 @@
 """
 
 import os
+import time
 import tempfile
 import pkg_resources
 import functools
@@ -49,6 +50,61 @@ def temporary_filename(prefix='bobtest_', suffix='.hdf5'):
   os.unlink(name)
   return name
 
+def default_thread_numbers():
+  """Returns the numbers of threads timed by the thread benchmarks: 1 and the
+  number of processors (at least 2)"""
+
+  import multiprocessing
+  return [1, max(2, multiprocessing.cpu_count())]
+
+def thread_timings(run, compare, threads=None, label='run'):
+  """Times a computation for several numbers of threads
+
+  The results of each number of threads are compared to the ones of the first
+  number of threads, and the timings are reported on the standard output.
+
+  Keyword attributes
+
+  run: callable
+    Runs the computation, called as ``run(n_threads)``, and returns its
+    results.
+
+  compare: callable
+    Called as ``compare(results, reference)``, returns ``True`` if the
+    results are equal to the reference ones.
+
+  threads: list of int, optional
+    The numbers of threads to time. By default, uses
+    :py:func:`default_thread_numbers`.
+
+  label: str, optional
+    What a single call to ``run`` computes, used in the report.
+
+  Returns a list of tuples ``(n_threads, elapsed, speedup)``. Raises an
+  ``AssertionError`` if the results of a number of threads differ from the
+  reference ones.
+  """
+
+  if threads is None: threads = default_thread_numbers()
+
+  timings = []
+  reference = None
+  for n_threads in threads:
+    start = time.time()
+    results = run(n_threads)
+    elapsed = time.time() - start
+
+    if reference is None:
+      reference = results
+      serial = elapsed
+    elif not compare(results, reference):
+      raise AssertionError("the results with %d threads differ from the ones with %d thread(s)" % (n_threads, threads[0]))
+    speedup = serial / elapsed if elapsed > 0 else 1.
+    print("%3d thread(s): %.3f s per %s (x%.2f)" % (n_threads, elapsed, label, speedup))
+    timings.append((n_threads, elapsed, speedup))
+
+  return timings
+
 # Here is a table of ffmpeg versions against libavcodec, libavformat and
 # libavutil versions
 ffmpeg_versions = {
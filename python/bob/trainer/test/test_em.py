@@ -25,6 +25,7 @@ import bob
 import random
 import numpy
 import pkg_resources
+import tempfile
 
 def F(f, module=None):
   """Returns the test file on the "data" subdirectory"""
@@ -260,3 +261,56 @@ class GMMTest(unittest.TestCase):
     
     for i in range(0, 2):
       self.assertTrue((ar[i+1] == machine.means[i, :]).all())
+
+  def test08_gmm_ML_threads(self):
+
+    # Trains a GMMMachine with ML_GMMTrainer, splitting the E-step over
+    # several threads
+
+    ar = bob.io.load(F("faithful.torch3_f64.hdf5"))
+
+    gmm = loadGMM()
+    ml_gmmtrainer = bob.trainer.ML_GMMTrainer(True, True, True)
+    ml_gmmtrainer.train(gmm, ar)
+
+    gmm_threads = loadGMM()
+    ml_gmmtrainer_threads = bob.trainer.ML_GMMTrainer(True, True, True)
+    ml_gmmtrainer_threads.n_threads = 3
+    ml_gmmtrainer_threads.train(gmm_threads, ar)
+
+    self.assertTrue(gmm.is_similar_to(gmm_threads, 1e-8, 1e-8))
+    self.assertTrue(ml_gmmtrainer.gmm_statistics.is_similar_to(
+      ml_gmmtrainer_threads.gmm_statistics, 1e-8, 1e-8))
+    self.assertEqual(ml_gmmtrainer.gmm_statistics.t, ar.shape[0])
+    self.assertEqual(ml_gmmtrainer_threads.gmm_statistics.t, ar.shape[0])
+
+  def test09_gmm_ML_block_sampler(self):
+
+    # Trains a GMMMachine with ML_GMMTrainer from samples read by blocks,
+    # and with the online EM algorithm
+
+    ar = bob.io.load(F("faithful.torch3_f64.hdf5"))
+    filename = str(tempfile.mkstemp(".hdf5")[1])
+    bob.io.save(ar, filename)
+    sampler = bob.trainer.BlockSampler([bob.io.File(filename, 'r')], 50)
+
+    gmm = loadGMM()
+    ml_gmmtrainer = bob.trainer.ML_GMMTrainer(True, True, True)
+    ml_gmmtrainer.train(gmm, ar)
+
+    gmm_blocks = loadGMM()
+    ml_gmmtrainer_blocks = bob.trainer.ML_GMMTrainer(True, True, True)
+    ml_gmmtrainer_blocks.train(gmm_blocks, sampler)
+
+    self.assertTrue(gmm.is_similar_to(gmm_blocks, 1e-8, 1e-8))
+    self.assertEqual(ml_gmmtrainer_blocks.gmm_statistics.t, ar.shape[0])
+
+    gmm_online = loadGMM()
+    ml_gmmtrainer_online = bob.trainer.ML_GMMTrainer(True, True, True)
+    ml_gmmtrainer_online.max_iterations = 20
+    ml_gmmtrainer_online.train_online(gmm_online, sampler, 100)
+    self.assertFalse(numpy.isnan(gmm_online.means).any())
+    self.assertTrue(abs(gmm_online.weights.sum() - 1.) < 1e-8)
+    self.assertRaises(RuntimeError, ml_gmmtrainer_online.train_online, gmm_online, sampler, 100, 0.4)
+
+    os.unlink(filename)
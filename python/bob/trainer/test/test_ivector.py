@@ -255,6 +255,22 @@ class IVectorTests(unittest.TestCase):
       trainer.m_step(m, data)
       self.assertTrue(numpy.allclose(t_ref[it], m.t, 1e-5))
 
+    # C++ implementation, with the E-step split over two threads
+    m = bob.machine.IVectorMachine(ubm, 2)
+    trainer = bob.trainer.IVectorTrainer()
+    trainer.n_threads = 2
+    trainer.initialize(m, data)
+    m.t = t 
+    m.sigma = sigma
+    for it in range(2):
+      trainer.e_step(m, data)
+      for k in acc_Nij_Sigma_wij2_ref[it]:
+        self.assertTrue(numpy.allclose(acc_Nij_Sigma_wij2_ref[it][k], trainer.acc_nij_wij2[k], 1e-5))
+      for k in acc_Fnorm_Sigma_wij_ref[it]:
+        self.assertTrue(numpy.allclose(acc_Fnorm_Sigma_wij_ref[it][k], trainer.acc_fnormij_wij[k], 1e-5))
+      trainer.m_step(m, data)
+      self.assertTrue(numpy.allclose(t_ref[it], m.t, 1e-5))
+
 
   def test02_trainer_update_sigma(self):
     # Ubm
@@ -268,3 +268,61 @@ class FATrainerTest(unittest.TestCase):
     t.enrol(m, gse, 5)
     self.assertTrue( numpy.allclose(m.z, z_ref, eps) )
 
+
+  def test06_FATrainers_threads(self):
+    # The identities split over several threads give the same subspaces
+
+    numpy.random.seed(5)
+    stats = []
+    for i in range(7):
+      stats_i = []
+      for h in range(1+i%3):
+        gs = bob.machine.GMMStats(2,3)
+        gs.n = numpy.random.uniform(0.1, 1., size=2)
+        gs.sum_px = numpy.random.uniform(size=(2,3))
+        stats_i.append(gs)
+      stats.append(stats_i)
+
+    ubm = bob.machine.GMMMachine(2,3)
+    ubm.mean_supervector = UBM_MEAN
+    ubm.variance_supervector = UBM_VAR
+
+    # ISV
+    mb1 = bob.machine.ISVBase(ubm,2)
+    mb3 = bob.machine.ISVBase(ubm,2)
+    t1 = bob.trainer.ISVTrainer(5, 4.)
+    t3 = bob.trainer.ISVTrainer(5, 4.)
+    t3.n_threads = 3
+    self.assertEqual(t3.n_threads, 3)
+    for t, mb in ((t1, mb1), (t3, mb3)):
+      t.initialize(mb, stats)
+      mb.u = M_u
+      for i in range(5):
+        t.e_step(mb, stats)
+        t.m_step(mb, stats)
+    self.assertTrue( numpy.allclose(mb1.u, mb3.u, 1e-10) )
+    self.assertTrue( numpy.allclose(t1.acc_u_a1, t3.acc_u_a1, 1e-10) )
+    self.assertTrue( numpy.allclose(t1.acc_u_a2, t3.acc_u_a2, 1e-10) )
+    for z1, z3 in zip(t1.__Z__, t3.__Z__):
+      self.assertTrue( numpy.allclose(z1, z3, 1e-10) )
+
+    # JFA
+    mb1 = bob.machine.JFABase(ubm, 2, 2)
+    mb3 = bob.machine.JFABase(ubm, 2, 2)
+    t1 = bob.trainer.JFATrainer(5)
+    t3 = bob.trainer.JFATrainer(5)
+    t3.n_threads = 3
+    self.assertEqual(t3.n_threads, 3)
+    for t, mb in ((t1, mb1), (t3, mb3)):
+      t.initialize(mb, stats)
+      mb.u = M_u
+      mb.v = M_v
+      mb.d = M_d
+      t.train_loop(mb, stats)
+    self.assertTrue( numpy.allclose(mb1.v, mb3.v, 1e-10) )
+    self.assertTrue( numpy.allclose(mb1.u, mb3.u, 1e-10) )
+    self.assertTrue( numpy.allclose(mb1.d, mb3.d, 1e-10) )
+    for x1, x3 in zip(t1.__X__, t3.__X__):
+      self.assertTrue( numpy.allclose(x1, x3, 1e-10) )
+    for y1, y3 in zip(t1.__Y__, t3.__Y__):
+      self.assertTrue( numpy.allclose(y1, y3, 1e-10) )
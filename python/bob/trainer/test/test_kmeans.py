@@ -25,6 +25,7 @@ import bob
 import random
 import numpy
 import pkg_resources
+import tempfile
 
 def F(f, module=None):
   """Returns the test file on the "data" subdirectory"""
@@ -197,3 +198,115 @@ class KMeansTest(unittest.TestCase):
     trainer.train(machine, data)
     self.assertFalse( numpy.isnan(machine.means).any())
 
+
+  def test04_kmeans_threads(self):
+
+    # The E-step split over several threads gives the same means
+    (arStd,std) = NormalizeStdArray(F("faithful.torch3.hdf5"))
+
+    machine1 = bob.machine.KMeansMachine(3, 2)
+    trainer1 = bob.trainer.KMeansTrainer()
+    trainer1.rng = bob.core.random.mt19937(5)
+    trainer1.train(machine1, arStd)
+
+    machine4 = bob.machine.KMeansMachine(3, 2)
+    trainer4 = bob.trainer.KMeansTrainer()
+    trainer4.rng = bob.core.random.mt19937(5)
+    trainer4.n_threads = 4
+    self.assertEqual(trainer4.n_threads, 4)
+    trainer4.train(machine4, arStd)
+
+    self.assertTrue(equals(machine1.means, machine4.means, 1e-8))
+    self.assertTrue(equals(trainer1.zeroeth_order_statistics, trainer4.zeroeth_order_statistics, 1e-8))
+
+  def test05_kmeans_block_sampler(self):
+
+    # Trains from samples read by blocks from several files
+    (arStd,std) = NormalizeStdArray(F("faithful.torch3.hdf5"))
+    filenames = [str(tempfile.mkstemp(".hdf5")[1]) for i in range(2)]
+    bob.io.save(arStd[:100], filenames[0])
+    bob.io.save(arStd[100:], filenames[1])
+
+    sampler = bob.trainer.BlockSampler(filenames, 64)
+    self.assertEqual(sampler.n_samples, arStd.shape[0])
+    self.assertEqual(sampler.n_inputs, 2)
+    self.assertEqual(sampler.n_blocks, 5)
+    blocks = [sampler.block(i) for i in range(sampler.n_blocks)]
+    self.assertEqual(blocks[-1].shape, (arStd.shape[0] - 4*64, 2))
+    self.assertTrue(equals(numpy.vstack(blocks), arStd, 1e-12))
+    self.assertTrue(equals(sampler.samples([150, 3]), arStd[[150, 3], :], 1e-12))
+
+    # The E-step over the blocks gives the same statistics as over the
+    # whole array
+    machine = bob.machine.KMeansMachine(3, 2)
+    trainer = bob.trainer.KMeansTrainer()
+    trainer.rng = bob.core.random.mt19937(5)
+    trainer.train(machine, arStd)
+    trainer.e_step(machine, arStd)
+
+    machine_s = bob.machine.KMeansMachine(3, 2)
+    trainer_s = bob.trainer.KMeansTrainer()
+    trainer_s.initialize(machine_s, sampler)
+    machine_s.means = machine.means
+    trainer_s.e_step(machine_s, sampler)
+    self.assertTrue(equals(trainer.zeroeth_order_statistics, trainer_s.zeroeth_order_statistics, 1e-8))
+    self.assertTrue(equals(trainer.first_order_statistics, trainer_s.first_order_statistics, 1e-8))
+    self.assertTrue(abs(trainer.average_min_distance - trainer_s.average_min_distance) < 1e-8)
+
+    # Full training and mini-batch training
+    machine_s = bob.machine.KMeansMachine(3, 2)
+    trainer_s.train(machine_s, sampler)
+    self.assertFalse(numpy.isnan(machine_s.means).any())
+
+    machine_mb = bob.machine.KMeansMachine(3, 2)
+    trainer_mb = bob.trainer.KMeansTrainer()
+    trainer_mb.max_iterations = 20
+    trainer_mb.train_mini_batch(machine_mb, sampler, 64)
+    self.assertFalse(numpy.isnan(machine_mb.means).any())
+    self.assertTrue((machine_mb.means >= arStd.min(axis=0)).all())
+    self.assertTrue((machine_mb.means <= arStd.max(axis=0)).all())
+
+    for filename in filenames: os.unlink(filename)
+
+  def test06_kmeans_bounds(self):
+
+    # The statistics of the last E-step of a training, which relies on the
+    # bounds of the previous E-steps, are the ones of the final means
+    numpy.random.seed(3)
+    data = numpy.vstack([numpy.random.randn(200, 4) + 3 * numpy.random.randn(4) for i in range(5)])
+
+    for n_threads in (1, 3):
+      machine = bob.machine.KMeansMachine(20, 4)
+      trainer = bob.trainer.KMeansTrainer()
+      trainer.rng = bob.core.random.mt19937(7)
+      trainer.n_threads = n_threads
+      trainer.max_iterations = 20
+      trainer.train(machine, data)
+
+      fresh = bob.trainer.KMeansTrainer()
+      fresh.initialize(bob.machine.KMeansMachine(20, 4), data)
+      fresh.e_step(machine, data)
+      self.assertTrue(equals(trainer.zeroeth_order_statistics, fresh.zeroeth_order_statistics, 1e-8))
+      self.assertTrue(equals(trainer.first_order_statistics, fresh.first_order_statistics, 1e-8))
+      self.assertTrue(abs(trainer.average_min_distance - fresh.average_min_distance) < 1e-8)
+
+  def test07_kmeans_e_step_exact(self):
+
+    # Outside of train(), the E-steps do not reuse the bounds, even if the
+    # data is modified in place between them
+    numpy.random.seed(5)
+    data = numpy.random.randn(300, 3)
+    machine = bob.machine.KMeansMachine(6, 3)
+    trainer = bob.trainer.KMeansTrainer()
+    trainer.initialize(machine, data)
+    trainer.e_step(machine, data)
+    machine.means = machine.means + 0.1
+    data *= 2.
+
+    trainer.e_step(machine, data)
+    fresh = bob.trainer.KMeansTrainer()
+    fresh.initialize(bob.machine.KMeansMachine(6, 3), data)
+    fresh.e_step(machine, data)
+    self.assertTrue(equals(trainer.zeroeth_order_statistics, fresh.zeroeth_order_statistics, 1e-8))
+    self.assertTrue(equals(trainer.first_order_statistics, fresh.first_order_statistics, 1e-8))
+    self.assertTrue(abs(trainer.average_min_distance - fresh.average_min_distance) < 1e-8)
@@ -24,6 +24,8 @@ import sys, unittest
 import bob
 import numpy, numpy.linalg
 
+from ...test import utils as test_utils
+
 class PythonPLDATrainer():
   """A simplified (and slower) version of the PLDATrainer"""
 
@@ -744,3 +746,67 @@ class PLDATrainerTest(unittest.TestCase):
     self.assertFalse( t1 == t2 )
     self.assertTrue(  t1 != t2 )
     self.assertFalse( t1.is_similar_to(t2) )
+
+  def test05_plda_threads(self):
+
+    # The E-step split over several threads gives the same estimates
+    D = 7
+    nf = 2
+    ng = 3
+    numpy.random.seed(12)
+    l = [numpy.random.normal(size=(1+i%4,D)) for i in range(20)]
+
+    for use_sum_second_order in (True, False):
+      t1 = bob.trainer.PLDATrainer(5, use_sum_second_order)
+      t3 = bob.trainer.PLDATrainer(5, use_sum_second_order)
+      t3.n_threads = 3
+      self.assertEqual(t3.n_threads, 3)
+      self.assertEqual(bob.trainer.PLDATrainer(t3).n_threads, 3)
+      m1 = bob.machine.PLDABase(D,nf,ng)
+      m3 = bob.machine.PLDABase(D,nf,ng)
+      t1.rng.seed(37)
+      t3.rng.seed(37)
+      t1.train(m1, l)
+      t3.train(m3, l)
+      self.assertTrue(numpy.allclose(m1.f, m3.f, 1e-10))
+      self.assertTrue(numpy.allclose(m1.g, m3.g, 1e-10))
+      self.assertTrue(numpy.allclose(m1.sigma, m3.sigma, 1e-10))
+      for z1, z3 in zip(t1.z_first_order, t3.z_first_order):
+        self.assertTrue(numpy.allclose(z1, z3, 1e-10))
+      self.assertTrue(numpy.allclose(t1.z_second_order_sum, t3.z_second_order_sum, 1e-10))
+      if not use_sum_second_order:
+        for z1, z3 in zip(t1.z_second_order, t3.z_second_order):
+          self.assertTrue(numpy.allclose(z1, z3, 1e-10))
+
+  def test06_plda_benchmark(self):
+    """Time the E-step of the PLDA trainer for several numbers of threads"""
+
+    # Synthetic data drawn from a PLDA model x_ij = mu + F.h_i + G.w_ij + e_ij,
+    # each identity getting between 2 and 5 samples
+    dim_d, dim_f, dim_g = 20, 5, 5
+    rng = numpy.random.RandomState(0)
+    mu = rng.normal(size=dim_d)
+    F = rng.normal(size=(dim_d,dim_f))
+    G = 0.5 * rng.normal(size=(dim_d,dim_g))
+    data = []
+    for i in range(2000):
+      n_i = rng.randint(2, 6)
+      h = rng.normal(size=dim_f)
+      w = rng.normal(size=(n_i,dim_g))
+      e = numpy.sqrt(0.1) * rng.normal(size=(n_i,dim_d))
+      data.append(mu + numpy.dot(F,h) + numpy.dot(w,G.T) + e)
+
+    trainer = bob.trainer.PLDATrainer(1)
+    machine = bob.machine.PLDABase(dim_d, dim_f, dim_g)
+    trainer.initialize(machine, data)
+
+    def run(n_threads):
+      trainer.n_threads = n_threads
+      trainer.e_step(machine, data)
+      return trainer.z_second_order_sum.copy()
+
+    def compare(stats, reference):
+      return numpy.allclose(stats, reference, 1e-10)
+
+    timings = test_utils.thread_timings(run, compare, label='E-step')
+    self.assertEqual(len(timings), len(test_utils.default_thread_numbers()))
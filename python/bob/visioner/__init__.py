@@ -6,6 +6,9 @@
 from ..core import __from_extension_import__
 __from_extension_import__('._visioner', __package__, locals())
 from pkg_resources import resource_filename
+import math
+import numpy
+from .. import ip
 
 DEFAULT_DETECTION_MODEL = resource_filename(__name__, 'detection.gz')
 """Default classification model for basic face detection"""
@@ -13,13 +16,83 @@ DEFAULT_DETECTION_MODEL = resource_filename(__name__, 'detection.gz')
 DEFAULT_LOCALIZATION_MODEL = resource_filename(__name__, 'localization.gz')
 """Default keypoint localization model. TODO: How many points?"""
 
+class _Tracker(object):
+  """Keeps the last detection on a sequence of video frames, so that the next
+  frames are only scanned around it, at neighbouring scales. A frame is
+  scanned completely every rescan_period frames, or if no object is found
+  around the last detection."""
+
+  def __init__(self, rescan_period, margin):
+
+    self.rescan_period = rescan_period
+    self.margin = margin
+    self.reset()
+
+  def reset(self):
+    """Forgets the last detection: the next frame is scanned completely"""
+
+    self.last = None
+    self.age = 0
+
+  def region(self, image, min_rows, min_cols):
+    """Returns the region of the image to scan as a tuple (region, x, y,
+    x_scale, y_scale), where (x, y) is the upper left corner of the region in
+    the image, and the scales are the factors applied to the region. The
+    region is downscaled (if required) so that the last detection is 1.25
+    times as large as the (min_rows, min_cols) sub-windows, which are then
+    scanned from 80% up to (1 + 2 * margin) times the last detection size.
+
+    Returns None if the image should be scanned completely."""
+
+    if self.last is None or self.age >= self.rescan_period: return None
+
+    x, y, width, height = self.last[:4]
+    x0 = max(0, int(x - self.margin * width))
+    y0 = max(0, int(y - self.margin * height))
+    x1 = min(image.shape[1], int(math.ceil(x + (1 + self.margin) * width)))
+    y1 = min(image.shape[0], int(math.ceil(y + (1 + self.margin) * height)))
+    if y1 - y0 < min_rows or x1 - x0 < min_cols: return None
+
+    region = image[y0:y1, x0:x1]
+    scale = min(1., 1.25 * max(float(min_rows) / height, float(min_cols) / width))
+    if scale < 1.:
+      rows = max(min_rows, int(round(scale * region.shape[0])))
+      cols = max(min_cols, int(round(scale * region.shape[1])))
+      scaled = numpy.ndarray((rows, cols), 'float64')
+      ip.scale(region, scaled)
+      region = numpy.round(scaled).astype('uint8')
+    else:
+      region = numpy.ascontiguousarray(region)
+
+    return (region, x0, y0, float(region.shape[1]) / (x1 - x0),
+        float(region.shape[0]) / (y1 - y0))
+
+  def update(self, bbox, tracked):
+    """Keeps the given detection (or None if no object was found), which was
+    either tracked or found by scanning the whole image"""
+
+    self.last = bbox
+    self.age = self.age + 1 if tracked else 0
+
+def _map_point(point, x0, y0, x_scale, y_scale):
+  """Maps a point of a region (see _Tracker.region) back to the image"""
+
+  return (x0 + point[0] / x_scale, y0 + point[1] / y_scale)
+
+def _map_bbox(bbox, x0, y0, x_scale, y_scale):
+  """Maps a bounding box of a region (see _Tracker.region) back to the
+  image, keeping the elements which follow the box (e.g. the score)"""
+
+  return _map_point(bbox, x0, y0, x_scale, y_scale) + \
+      (bbox[2] / x_scale, bbox[3] / y_scale) + tuple(bbox[4:])
+
 class MaxDetector(CVDetector):
   """A class that bridges the Visioner to bob so as to detect the most
   face-like object in still images or video frames"""
 
   def __init__(self, model_file=None, threshold=0.0, scanning_levels=0, 
       scale_variation=2, clustering=0.05,
-      method=DetectionMethod.Scanning):
+      method=DetectionMethod.Scanning, threads=0):
     """Creates a new face localization object by loading object classification
     and keypoint localization models from visioner model files.
 
@@ -43,12 +116,16 @@ class MaxDetector(CVDetector):
     method
       Scanning (default) or GroundTruth (note: this option does not work for
       the time being)
+
+    threads
+      number of threads used for scanning (0, the default, to scan in the
+      current thread)
     """
 
     if model_file is None: model_file = DEFAULT_DETECTION_MODEL
 
     CVDetector.__init__(self, model_file, threshold, scanning_levels,
-        scale_variation, clustering, method)
+        scale_variation, clustering, method, threads)
 
   def __call__(self, image):
     """Runs the detection machinery, returns a single bounding box
@@ -63,13 +140,74 @@ class MaxDetector(CVDetector):
 
     return self.detect_max(image)
 
+class MaxTracker(MaxDetector):
+  """A MaxDetector for the successive frames of a video: once an object is
+  detected, the next frames are only scanned around it, at neighbouring
+  scales. A frame is scanned completely every rescan_period frames, or if no
+  object is found around the last detection."""
+
+  def __init__(self, model_file=None, threshold=0.0, scanning_levels=0,
+      scale_variation=2, clustering=0.05,
+      method=DetectionMethod.Scanning, threads=0, rescan_period=25,
+      margin=0.5):
+    """Creates a new face tracking object by loading an object classification
+    model from a visioner model file.
+
+    Keyword Parameters:
+
+    model, threshold, scanning_levels, scale_variation, clustering, method,
+    threads
+      see MaxDetector
+
+    rescan_period
+      number of frames after which the whole frame is scanned again
+
+    margin
+      the region scanned around the last detection is enlarged by this
+      fraction of its size on every side
+    """
+
+    MaxDetector.__init__(self, model_file, threshold, scanning_levels,
+        scale_variation, clustering, method, threads)
+    self.tracker = _Tracker(rescan_period, margin)
+
+  def reset(self):
+    """Forgets the last detection, to be called before processing a new
+    video: the next frame is scanned completely"""
+
+    self.tracker.reset()
+
+  def __call__(self, image):
+    """Runs the detection machinery on the next frame, returns a single
+    bounding box
+
+    Keyword parameters:
+
+    image
+      A gray-scaled image (2D array) with dtype=uint8.
+
+    Returns a single (highest scored) detection as a bounding box.
+    """
+
+    region = self.tracker.region(image, self.param.rows, self.param.cols)
+    if region is not None:
+      detection = self.detect_max(region[0])
+      if detection is not None:
+        detection = _map_bbox(detection, *region[1:])
+        self.tracker.update(detection, True)
+        return detection
+
+    detection = self.detect_max(image)
+    self.tracker.update(detection, False)
+    return detection
+
 class Detector(CVDetector):
   """A class that bridges the Visioner to bob so as to detect faces in 
   still images or video frames"""
 
   def __init__(self, model_file=None, threshold=0.0, scanning_levels=0, 
       scale_variation=2, clustering=0.05,
-      method=DetectionMethod.Scanning):
+      method=DetectionMethod.Scanning, threads=0):
     """Creates a new face localization object by loading object classification
     and keypoint localization models from visioner model files.
 
@@ -93,12 +231,16 @@ class Detector(CVDetector):
     method
       Scanning (default) or GroundTruth (note: this option does not work for
       the time being)
+
+    threads
+      number of threads used for scanning (0, the default, to scan in the
+      current thread)
     """
 
     if model_file is None: model_file = DEFAULT_DETECTION_MODEL
 
     CVDetector.__init__(self, model_file, threshold, scanning_levels,
-        scale_variation, clustering, method)
+        scale_variation, clustering, method, threads)
 
   def __call__(self, image):
     """Runs the detection machinery, returns all bounding boxes above
@@ -123,7 +265,7 @@ class Localizer(CVLocalizer):
 
   def __init__(self, model_file=None,
       method=LocalizationMethod.MultipleShots_Median,
-      detector=None):
+      detector=None, tracking_period=0, tracking_margin=0.5):
     """Creates a new face localization object by loading object classification
     and keypoint localization models from visioner model files.
 
@@ -140,6 +282,17 @@ class Localizer(CVLocalizer):
       Path to a file or a CVDetector (or Max/Detector) object to be used as the
       basis for the localization procedure. If None is given (the default), use
       the default detector. 
+
+    tracking_period
+      If set to a positive value, the localizer processes the successive
+      frames of a video: once a face is found, the next frames are only
+      scanned around it, at neighbouring scales. A frame is scanned completely
+      every tracking_period frames, or if no face is found around the last
+      one. If set to 0 (the default), every image is scanned completely.
+
+    tracking_margin
+      In tracking mode, the region scanned around the last face is enlarged
+      by this fraction of its size on every side
     """
 
     if model_file is None: model_file = DEFAULT_LOCALIZATION_MODEL
@@ -154,6 +307,14 @@ class Localizer(CVLocalizer):
     else:
       raise RuntimeError, 'input detector has to be either None, a file path or Detector object'
 
+    self.tracker = _Tracker(tracking_period, tracking_margin)
+
+  def reset(self):
+    """Forgets the last face found in tracking mode, to be called before
+    processing a new video: the next frame is scanned completely"""
+
+    self.tracker.reset()
+
   def __call__(self, image):
     """Runs the localization machinery, returns the bounding box and points
  
@@ -165,7 +326,21 @@ class Localizer(CVLocalizer):
     Returns a bounding box and a set of keypoints.
     """
 
-    return self.locate(self.detector, image)
+    rows = max(self.detector.param.rows, self.param.rows)
+    cols = max(self.detector.param.cols, self.param.cols)
+    region = self.tracker.region(image, rows, cols)
+    if region is not None:
+      result = self.locate(self.detector, region[0])
+      if result is not None:
+        result = (_map_bbox(result[0], *region[1:]),
+            tuple(_map_point(k, *region[1:]) for k in result[1]))
+        self.tracker.update(result[0], True)
+        return result
+
+    result = self.locate(self.detector, image)
+    if self.tracker.rescan_period > 0:
+      self.tracker.update(result[0] if result is not None else None, False)
+    return result
 
 def param_setattr(self, key, value):
   if not hasattr(self, key):
@@ -40,6 +40,12 @@ __epilog__ = """Example usage:
 4. Detect faces in an image, imprint results on output image
 
   $ %(prog)s myimage.jpg result.png
+
+5. Detect faces in a video, scanning the frames completely only once every
+   25 frames (or when the face is lost), and only around the last detection
+   otherwise
+
+  $ %(prog)s --tracking-period=25 myvideo.mov
 """
 
 import os
@@ -193,6 +199,9 @@ def main(user_input=None):
   parser.add_argument("-s", "--scanning-levels", dest="scan_levels",
       default=10, type=int, metavar='INT>=0',
       help="scan levels (the higher, the faster - defaults to %(default)s)")
+  parser.add_argument("-t", "--tracking-period", dest="tracking_period",
+      default=0, type=int, metavar='INT>=0',
+      help="if set, video frames are only scanned around the last detection, and completely once every given number of frames or when the face is lost (defaults to %(default)s, which scans every frame completely)")
   parser.add_argument("-v", "--verbose", dest="verbose",
       default=False, action='store_true',
       help="enable verbose output")
@@ -210,6 +219,9 @@ def main(user_input=None):
   if args.scan_levels < 0:
     parser.error("scanning levels have to be greater or equal 0")
 
+  if args.tracking_period < 0:
+    parser.error("tracking period has to be greater or equal 0")
+
   if args.selftest == 1:
     (fd, filename) = tempfile.mkstemp('.avi', 'bobtest_')
     os.close(fd)
@@ -229,8 +241,12 @@ def main(user_input=None):
     args.dump_scores = True
 
   start = time.clock() 
-  args.processor = bob.visioner.MaxDetector(model_file=args.model,
-      scanning_levels=args.scan_levels)
+  if args.tracking_period > 0:
+    args.processor = bob.visioner.MaxTracker(model_file=args.model,
+        scanning_levels=args.scan_levels, rescan_period=args.tracking_period)
+  else:
+    args.processor = bob.visioner.MaxDetector(model_file=args.model,
+        scanning_levels=args.scan_levels)
   total = time.clock() - start
 
   if args.verbose:
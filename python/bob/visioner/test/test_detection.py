@@ -81,3 +81,107 @@ def test_thourough():
   for image in images:
     locdata = processor(image)
     assert locdata is not None
+
+@utils.visioner_available
+def test_threads():
+
+  from .. import Detector
+  image = ip.rgb_to_gray(io.load(IMAGE))
+  processor = Detector(scanning_levels=10)
+  expected = processor(image)
+  assert expected is not None
+
+  # the detections should not depend on the number of scanning threads
+  for threads in (1, 2, 5):
+    processor.threads = threads
+    nose.tools.eq_(processor.threads, threads)
+    detections = processor(image)
+    nose.tools.eq_(sorted(detections), sorted(expected))
+
+  processor = Detector(scanning_levels=10, threads=3)
+  nose.tools.eq_(sorted(processor(image)), sorted(expected))
+
+@utils.visioner_available
+@utils.ffmpeg_found()
+def test_tracking():
+
+  from .. import MaxDetector, MaxTracker
+  video = io.VideoReader(TEST_VIDEO)
+  images = [ip.rgb_to_gray(k) for k in video[:20]]
+  detector = MaxDetector(scanning_levels=10)
+  tracker = MaxTracker(scanning_levels=10, rescan_period=10)
+
+  # the tracked faces should overlap the ones found scanning every frame
+  for image in images:
+    expected = detector(image)
+    locdata = tracker(image)
+    assert locdata is not None
+    assert abs(locdata[0] - expected[0]) < 0.25 * expected[2]
+    assert abs(locdata[1] - expected[1]) < 0.25 * expected[3]
+    assert abs(locdata[2] - expected[2]) < 0.25 * expected[2]
+
+  # once reset, the next frame is scanned completely
+  tracker.reset()
+  nose.tools.eq_(tracker(images[0]), detector(images[0]))
+
+@utils.visioner_available
+def test_tracker_region():
+
+  import numpy
+  from .. import _Tracker, _map_bbox
+  image = numpy.zeros((240, 320), 'uint8')
+  bbox = (100., 80., 80., 80., 1.)
+  tracker = _Tracker(rescan_period=3, margin=0.5)
+  assert tracker.region(image, 20, 20) is None
+
+  # the region is twice as large as the last detection, downscaled so that
+  # the detection is 1.25 times as large as the sub-windows
+  tracker.update(bbox, False)
+  region = tracker.region(image, 20, 20)
+  assert region is not None
+  (data, x0, y0, x_scale, y_scale) = region
+  nose.tools.eq_((x0, y0), (60, 40))
+  nose.tools.eq_(data.shape, (50, 50))
+  nose.tools.eq_(data.dtype, numpy.uint8)
+  nose.tools.eq_((x_scale, y_scale), (50. / 160, 50. / 160))
+  nose.tools.eq_(_map_bbox((12.5, 12.5, 25., 25., 1.), *region[1:]), bbox)
+
+  # the image is scanned completely once rescan_period frames were tracked
+  for k in range(3):
+    assert tracker.region(image, 20, 20) is not None
+    tracker.update(bbox, True)
+  assert tracker.region(image, 20, 20) is None
+
+  # ... or once reset
+  tracker.update(bbox, False)
+  assert tracker.region(image, 20, 20) is not None
+  tracker.reset()
+  assert tracker.region(image, 20, 20) is None
+
+@utils.visioner_available
+@utils.ffmpeg_found()
+def test_tracking_region():
+
+  from .. import MaxTracker
+  video = io.VideoReader(TEST_VIDEO)
+  images = [ip.rgb_to_gray(k) for k in video[:3]]
+  tracker = MaxTracker(scanning_levels=10, rescan_period=10)
+
+  # records the images scanned by the tracker
+  scanned = []
+  detect_max = tracker.detect_max
+  def recording_detect_max(image):
+    scanned.append(image.shape)
+    return detect_max(image)
+  tracker.detect_max = recording_detect_max
+
+  # the first frame is scanned completely, and the next ones only around the
+  # last detection
+  assert tracker(images[0]) is not None
+  nose.tools.eq_(scanned, [images[0].shape])
+  for k, image in enumerate(images[1:]):
+    del scanned[:]
+    assert tracker(image) is not None
+    nose.tools.eq_(len(scanned), 1)
+    assert scanned[0][0] < image.shape[0] and scanned[0][1] < image.shape[1]
+    nose.tools.eq_(tracker.tracker.age, k + 1)
@@ -83,3 +83,22 @@ def test_thorough():
   for image in images:
     locdata = processor(image)
     assert locdata is not None
+
+@utils.visioner_available
+@utils.ffmpeg_found()
+def test_tracking():
+
+  from .. import Localizer
+  video = io.VideoReader(TEST_VIDEO)
+  images = [ip.rgb_to_gray(k) for k in video[:20]]
+  processor = Localizer(tracking_period=10)
+  processor.detector.scanning_levels = 10
+
+  # find faces on the video, the keypoints being within the face boxes
+  for image in images:
+    locdata = processor(image)
+    assert locdata is not None
+    x, y, width, height = locdata[0]
+    for px, py in locdata[1]:
+      assert x - 0.25 * width <= px <= x + 1.25 * width
+      assert y - 0.25 * height <= py <= y + 1.25 * height
@@ -44,3 +44,11 @@ def test_keypoint_localization_on_image():
   assert os.path.exists(IMAGE)
   cmdline = '%s --self-test=2' % (IMAGE)
   assert facepoints.main(cmdline.split()) == 0
+
+@utils.visioner_available
+@utils.ffmpeg_found()
+def test_face_track_on_movie():
+
+  assert os.path.exists(MOVIE)
+  cmdline = '%s --tracking-period=2 --self-test=1' % (MOVIE)
+  assert facebox.main(cmdline.split()) == 0
@@ -222,6 +222,7 @@ CONSOLE_SCRIPTS = [
   'bob_eval_threshold.py = bob.measure.script.eval_threshold:main',
   'bob_apply_threshold.py = bob.measure.script.apply_threshold:main',
   'bob_plot_cmc.py = bob.measure.script.plot_cmc:main',
+  'bob_convert_scores.py = bob.measure.script.convert_scores:main',
   'bob_face_detect.py = bob.visioner.script.facebox:main',
   'bob_face_keypoints.py = bob.visioner.script.facepoints:main',
   'bob_visioner_trainer.py = bob.visioner.script.trainer:main',
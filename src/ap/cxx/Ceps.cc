@@ -25,6 +25,7 @@
 #include <bob/ap/Ceps.h>
 #include <bob/core/assert.h>
 #include <bob/core/cast.h>
+#include <algorithm>
 
 bob::ap::Ceps::Ceps(const double sampling_frequency,
     const double win_length_ms, const double win_shift_ms,
@@ -155,26 +156,35 @@ void bob::ap::Ceps::operator()(const blitz::Array<double,1>& input,
   int n_frames=feature_shape(0);
 
   blitz::Range r1(0,m_n_ceps-1);
-  for (int i=0; i<n_frames; ++i) 
+  blitz::Range rall = blitz::Range::all();
+  for (int i0=0; i0<n_frames; i0+=s_n_frames_block)
   {
-    // Set padded frame to zero
-    extractNormalizeFrame(input, i, m_cache_frame_d);
+    // Extract and normalize a block of frames
+    const int n_block = std::min(s_n_frames_block, n_frames-i0);
+    blitz::Array<double,2> frames(m_cache_frames_d(blitz::Range(0,n_block-1),rall));
+    extractNormalizeFrames(input, i0, frames);
 
     // Update output with energy if required
     if (m_with_energy)
-      ceps_matrix(i,(int)m_n_ceps) = logEnergy(m_cache_frame_d);
-
-    // Apply pre-emphasis
-    pre_emphasis(m_cache_frame_d);
-    // Apply the Hamming window
-    hammingWindow(m_cache_frame_d);
-    // Take the power spectrum of the first part of the FFT
-    powerSpectrumFFT(m_cache_frame_d);
-    // Filter with the triangular filter bank (either in linear or Mel domain)
-    filterBank(m_cache_frame_d);
-    // Apply DCT kernel and update the output 
-    blitz::Array<double,1> ceps_matrix_row(ceps_matrix(i,r1));
-    applyDct(ceps_matrix_row);
+      for (int i=0; i<n_block; ++i)
+      {
+        blitz::Array<double,1> frame(frames(i,rall));
+        ceps_matrix(i0+i,(int)m_n_ceps) = logEnergy(frame);
+      }
+
+    // Take the power spectrum of the first part of the FFT, after
+    // pre-emphasis and windowing
+    powerSpectrumFFT(frames);
+
+    for (int i=0; i<n_block; ++i)
+    {
+      blitz::Array<double,1> frame(frames(i,rall));
+      // Filter with the triangular filter bank (either in linear or Mel domain)
+      filterBank(frame);
+      // Apply DCT kernel and update the output 
+      blitz::Array<double,1> ceps_matrix_row(ceps_matrix(i0+i,r1));
+      applyDct(ceps_matrix_row);
+    }
   }
 
   //compute the center of the cut-off frequencies
@@ -24,6 +24,9 @@
 #include <bob/core/check.h>
 #include <bob/core/assert.h>
 #include <bob/core/cast.h>
+#include <algorithm>
+
+const int bob::ap::Spectrogram::s_n_frames_block;
 
 bob::ap::Spectrogram::Spectrogram(const double sampling_frequency,
     const double win_length_ms, const double win_shift_ms,
@@ -277,8 +280,9 @@ void bob::ap::Spectrogram::initWinSize()
 {
   bob::ap::Energy::initWinSize();
   m_fft.reset(m_win_size);
-  m_cache_frame_c1.resize(m_win_size);
-  m_cache_frame_c2.resize(m_win_size);
+  m_cache_frames_d.resize(s_n_frames_block, m_win_size);
+  m_cache_frames_c1.resize(s_n_frames_block, m_win_size);
+  m_cache_frames_c2.resize(s_n_frames_block, m_win_size);
 }
 
 void bob::ap::Spectrogram::pre_emphasis(blitz::Array<double,1> &data) const
@@ -300,16 +304,44 @@ void bob::ap::Spectrogram::hammingWindow(blitz::Array<double,1> &data) const
   data(r) *= m_hamming_kernel;
 }
 
-void bob::ap::Spectrogram::powerSpectrumFFT(blitz::Array<double,1>& x)
+void bob::ap::Spectrogram::extractNormalizeFrames(
+  const blitz::Array<double,1>& input, const size_t i0,
+  blitz::Array<double,2>& frames) const
+{
+  for (int i=0; i<frames.extent(0); ++i)
+  {
+    blitz::Array<double,1> frame(frames(i, blitz::Range::all()));
+    extractNormalizeFrame(input, i0+i, frame);
+  }
+}
+
+void bob::ap::Spectrogram::powerSpectrumFFT(blitz::Array<double,2>& frames)
 {
-  // Apply the FFT
-  m_cache_frame_c1 = bob::core::array::cast<std::complex<double> >(x);
-  m_fft(m_cache_frame_c1, m_cache_frame_c2);
+  const int n_frames = frames.extent(0);
+  blitz::Range rall = blitz::Range::all();
+  blitz::Range rf(0, n_frames-1);
+  blitz::Array<std::complex<double>,2> frames_c1(m_cache_frames_c1(rf,rall));
+  blitz::Array<std::complex<double>,2> frames_c2(m_cache_frames_c2(rf,rall));
+
+  for (int i=0; i<n_frames; ++i)
+  {
+    blitz::Array<double,1> frame(frames(i,rall));
+    // Apply pre-emphasis
+    pre_emphasis(frame);
+    // Apply the Hamming window
+    hammingWindow(frame);
+    // Copy the frame into the complex input of the FFT
+    for (int j=0; j<(int)m_win_size; ++j)
+      frames_c1(i,j) = frame(j);
+  }
+
+  // Apply the FFT to all the frames at once
+  m_fft(frames_c1, frames_c2);
 
   // Take the the power spectrum of the first part of the output of the FFT
   blitz::Range r(0,(int)m_win_size/2);
-  blitz::Array<double,1> x_half(x(r));
-  blitz::Array<std::complex<double>,1> complex_half(m_cache_frame_c2(r));
+  blitz::Array<double,2> x_half(frames(rall,r));
+  blitz::Array<std::complex<double>,2> complex_half(frames_c2(rall,r));
   x_half = blitz::abs(complex_half);
   if (m_energy_filter) // Apply the filter bank to the energy
     x_half = blitz::pow2(x_half);
@@ -355,28 +387,30 @@ void bob::ap::Spectrogram::operator()(const blitz::Array<double,1>& input,
   blitz::Range r1 = blitz::Range(0,m_win_size/2);
   if (m_energy_bands)
     r1 = blitz::Range(0,m_n_filters-1);
-  for (int i=0; i<n_frames; ++i)
+  blitz::Range rall = blitz::Range::all();
+  for (int i0=0; i0<n_frames; i0+=s_n_frames_block)
   {
-    // Extract and normalize frame
-    extractNormalizeFrame(input, i, m_cache_frame_d);
-
-    // Apply pre-emphasis
-    pre_emphasis(m_cache_frame_d);
-    // Apply the Hamming window
-    hammingWindow(m_cache_frame_d);
-    // Take the power spectrum of the first part of the FFT
-    powerSpectrumFFT(m_cache_frame_d);
-
-    // Filter with the triangular filter bank (either in linear or Mel domain)
-    if (m_energy_bands)
-      filterBank(m_cache_frame_d);
-
-    blitz::Array<double,1> spec_matrix_row(spectrogram_matrix(i,r1));
-    if (m_energy_bands)
-      spec_matrix_row = m_cache_filters(r1);
-    else
-      spec_matrix_row = m_cache_frame_d(r1);
+    // Extract and normalize a block of frames
+    const int n_block = std::min(s_n_frames_block, n_frames-i0);
+    blitz::Array<double,2> frames(m_cache_frames_d(blitz::Range(0,n_block-1),rall));
+    extractNormalizeFrames(input, i0, frames);
+
+    // Take the power spectrum of the first part of the FFT, after
+    // pre-emphasis and windowing
+    powerSpectrumFFT(frames);
+
+    for (int i=0; i<n_block; ++i)
+    {
+      blitz::Array<double,1> frame(frames(i,rall));
+      // Filter with the triangular filter bank (either in linear or Mel domain)
+      if (m_energy_bands)
+        filterBank(frame);
+
+      blitz::Array<double,1> spec_matrix_row(spectrogram_matrix(i0+i,r1));
+      if (m_energy_bands)
+        spec_matrix_row = m_cache_filters(r1);
+      else
+        spec_matrix_row = frame(r1);
+    }
   }
 }
-
-
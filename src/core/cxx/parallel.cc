@@ -0,0 +1,102 @@
+/**
+ * @file core/cxx/parallel.cc
+ * @date Sun Oct 18 13:20:15 2026 +0200
+ *
+ * @brief Helpers to split a computation over several threads
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ * 
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ * 
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <bob/core/parallel.h>
+#include <string>
+#include <stdexcept>
+#include <boost/bind.hpp>
+#include <boost/thread/thread.hpp>
+#include <boost/thread/mutex.hpp>
+#include <boost/thread/locks.hpp>
+
+/**
+ * Keeps the message of the first exception thrown by one of the threads
+ */
+struct first_error {
+  first_error(): raised(false) {}
+
+  void set(const std::string& m) {
+    boost::lock_guard<boost::mutex> lock(mutex);
+    if (!raised) {
+      raised = true;
+      message = m;
+    }
+  }
+
+  boost::mutex mutex;
+  bool raised;
+  std::string message;
+};
+
+static void run(const boost::function<void (size_t)>& f, const size_t i,
+  first_error& error)
+{
+  try {
+    f(i);
+  }
+  catch (std::exception& e) {
+    error.set(e.what());
+  }
+  catch (...) {
+    error.set("unknown exception raised by a thread");
+  }
+}
+
+void bob::core::parallel(const size_t n_threads,
+  const boost::function<void (size_t)>& f)
+{
+  // Single thread: no need to catch the exceptions
+  if (n_threads <= 1) {
+    if (n_threads == 1) f(0);
+    return;
+  }
+
+  first_error error;
+  boost::thread_group threads;
+  try {
+    for (size_t i=1; i<n_threads; ++i)
+      threads.create_thread(boost::bind(&run, boost::cref(f), i,
+        boost::ref(error)));
+  }
+  catch (...) {
+    // The threads already started refer to local variables
+    threads.join_all();
+    throw;
+  }
+  run(f, 0, error);
+  threads.join_all();
+
+  if (error.raised) throw std::runtime_error(error.message);
+}
+
+blitz::Range bob::core::shard(const int n, const size_t n_shards,
+  const size_t i)
+{
+  const int begin = static_cast<int>((static_cast<size_t>(n) * i) / n_shards);
+  const int end = static_cast<int>((static_cast<size_t>(n) * (i+1)) / n_shards);
+  return blitz::Range(begin, end-1);
+}
+
+size_t bob::core::getHardwareConcurrency()
+{
+  const size_t n = boost::thread::hardware_concurrency();
+  return n > 0 ? n : 1;
+}
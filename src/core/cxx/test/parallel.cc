@@ -0,0 +1,78 @@
+/**
+ * @file core/cxx/test/parallel.cc
+ * @date Sun Oct 18 13:20:15 2026 +0200
+ *
+ * @brief Test the helpers splitting a computation over several threads
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ * 
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ * 
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#define BOOST_TEST_DYN_LINK
+#define BOOST_TEST_MODULE Core-parallel Tests
+#define BOOST_TEST_MAIN
+#include <boost/test/unit_test.hpp>
+#include <boost/bind.hpp>
+#include <stdexcept>
+#include <vector>
+#include <blitz/array.h>
+#include <bob/core/parallel.h>
+
+static void sum_rows(const std::vector<blitz::Array<double,2> >& shards,
+  blitz::Array<double,1>& sums, const size_t i)
+{
+  blitz::secondIndex j;
+  blitz::Array<double,1> rows(shards[i].extent(0));
+  rows = blitz::sum(shards[i], j);
+  sums(i) = blitz::sum(rows);
+}
+
+static void fail(const size_t i)
+{
+  if (i == 2) throw std::runtime_error("shard 2 failed");
+}
+
+BOOST_AUTO_TEST_CASE( test_shard )
+{
+  // The shards cover the whole range, without overlapping
+  int next = 0;
+  for (size_t i=0; i<3; ++i) {
+    blitz::Range r = bob::core::shard(10, 3, i);
+    BOOST_CHECK_EQUAL(r.first(), next);
+    BOOST_CHECK(r.length() == 3 || r.length() == 4);
+    next = r.last() + 1;
+  }
+  BOOST_CHECK_EQUAL(next, 10);
+  BOOST_CHECK(bob::core::getHardwareConcurrency() >= 1);
+}
+
+BOOST_AUTO_TEST_CASE( test_parallel )
+{
+  blitz::Array<double,2> data(100, 7);
+  blitz::firstIndex i;
+  blitz::secondIndex j;
+  data = i * 7 + j;
+
+  const size_t n_threads = 4;
+  std::vector<blitz::Array<double,2> > shards;
+  for (size_t t=0; t<n_threads; ++t)
+    shards.push_back(bob::core::array::unsharedView(
+      data(bob::core::shard(data.extent(0), n_threads, t), blitz::Range::all())));
+  blitz::Array<double,1> sums(n_threads);
+  bob::core::parallel(n_threads, boost::bind(&sum_rows, boost::cref(shards),
+    boost::ref(sums), _1));
+  BOOST_CHECK_EQUAL(blitz::sum(sums), blitz::sum(data));
+
+  BOOST_CHECK_THROW(bob::core::parallel(n_threads, &fail), std::runtime_error);
+}
@@ -67,7 +67,11 @@ struct iterator_wrapper {
 
     //load the next frame: if an error is detected internally, throw
     bob::python::py_array retval(reader->frame_type());
-    bool ok = o.read(retval); //note that this will advance the iterator
+    bool ok;
+    {
+      bob::python::no_gil unlock;
+      ok = o.read(retval); //note that this will advance the iterator
+    }
     if (!ok) PYTHON_ERROR(StopIteration, "iteration finished");
     return retval.pyobject();
   }
@@ -98,9 +102,12 @@ static object videoreader_getitem (bob::io::VideoReader& v, object intobj) {
   }
 
   bob::python::py_array retval(v.frame_type());
-  bob::io::VideoReader::const_iterator it = v.begin();
-  it += frame;
-  it.read(retval); //read and throw if a problem occurs
+  {
+    bob::python::no_gil unlock;
+    bob::io::VideoReader::const_iterator it = v.begin();
+    it += frame;
+    it.read(retval); //read and throw if a problem occurs
+  }
   return retval.pyobject();
 }
 
@@ -146,7 +153,10 @@ static object videoreader_getslice (bob::io::VideoReader& v, slice sobj) {
   for (size_t i=start; it.parent() && i<stop; i+=step, it+=(step-1)) {
     bob::python::check_signals(); //catches keyboard interruption
     bob::python::py_array tmp(v.frame_type());
-    it.read(tmp); //throw if a problem occurs while reading the video
+    {
+      bob::python::no_gil unlock;
+      it.read(tmp); //throw if a problem occurs while reading the video
+    }
     retval.append(tmp.pyobject());
   }
  
@@ -154,11 +164,22 @@ static object videoreader_getslice (bob::io::VideoReader& v, slice sobj) {
   return py_retval.pyobject();
 }
 
+/**
+ * Checks for keyboard interruptions from code running without the GIL
+ */
+static void check_signals_unlocked() {
+  bob::python::gil lock;
+  bob::python::check_signals();
+}
+
 static object videoreader_load(bob::io::VideoReader& reader, 
   bool raise_on_error=false) {
   bob::python::py_array tmp(reader.video_type());
   size_t frames_read = 0;
-  frames_read = reader.load(tmp, raise_on_error, bob::python::check_signals);
+  {
+    bob::python::no_gil unlock;
+    frames_read = reader.load(tmp, raise_on_error, check_signals_unlocked);
+  }
   return make_tuple(frames_read, tmp.pyobject());
 }
 
@@ -170,11 +191,13 @@ static void videowriter_append(bob::io::VideoWriter& writer, object a) {
   if (result != bob::python::IMPOSSIBLE) {
     bob::python::dtype dtype(writer.frame_type().dtype);
     bob::python::py_array tmp(a, dtype.self());
+    bob::python::no_gil unlock;
     writer.append(tmp);
   }
   else {
     bob::python::dtype dtype(writer.video_type().dtype);
     bob::python::py_array tmp(a, dtype.self());
+    bob::python::no_gil unlock;
     writer.append(tmp);
   }
 }
@@ -22,13 +22,21 @@
 
 #include "bob/core/assert.h"
 #include "bob/core/array_copy.h"
+#include "bob/core/check.h"
+#include "bob/core/parallel.h"
 #include "bob/ip/GaborWaveletTransform.h"
+#include <boost/bind.hpp>
 #include <numeric>
+#include <algorithm>
 #include <sstream>
 #include <fstream>
+#include <map>
 
 static inline double sqr(double x){return x*x;}
 
+//! The maximum number of resolutions whose Gabor kernels are kept in the cache
+static const size_t s_max_cached_resolutions = 8;
+
 /**
  * Generates a Gabor kernel.
  * @param resolution The resolution of the image to generate
@@ -179,6 +187,34 @@ void bob::ip::GaborKernel::transform(
   }
 }
 
+/**
+ * Performs the convolution of the given image with this Gabor kernel, followed by the inverse Fourier transform along the y axis for some rows only.
+ * Only the pixels of the Gabor wavelet which are not zero are visited.
+ * @param frequency_domain_image  The image in frequency domain
+ * @param row_factors  The factors exp(2 i pi k y / height) of the inverse Fourier transform, one row per requested row y
+ * @param transformed_rows  The transformed rows (one per requested row), still in frequency domain along the x axis
+ */
+void bob::ip::GaborKernel::transformRows(
+  const blitz::Array<std::complex<double>,2>& frequency_domain_image,
+  const blitz::Array<std::complex<double>,2>& row_factors,
+  blitz::Array<std::complex<double>,2>& transformed_rows
+) const
+{
+  // assert correct sizes
+  bob::core::array::assertSameShape(transformed_rows, blitz::shape(row_factors.extent(0), frequency_domain_image.extent(1)));
+  transformed_rows = std::complex<double>(0);
+  const int rows = row_factors.extent(0);
+  // iterate through the kernel pixels and accumulate their contributions to each row
+  std::vector<std::pair<blitz::TinyVector<unsigned,2>, double> >::const_iterator it = m_kernel_pixel.begin(), it_end = m_kernel_pixel.end();
+  for (; it < it_end; ++it){
+    const std::complex<double> value = frequency_domain_image(it->first) * it->second;
+    const int ky = it->first[0], kx = it->first[1];
+    for (int r = 0; r < rows; ++r){
+      transformed_rows(r, kx) += value * row_factors(r, ky);
+    }
+  }
+}
+
 /**
  * Generates and returns the image for the current kernel.
  * @return The kernel image in frequency domain.
@@ -311,6 +347,9 @@ bob::ip::GaborWaveletTransform::operator !=
  * Private function that computes the frequency vectors of the Gabor kernels
  */
 void bob::ip::GaborWaveletTransform::computeKernelFrequencies(){
+  // the kernels need to be generated again
+  m_gabor_kernels.clear();
+  m_kernel_cache.clear();
   // reserve enough space
   m_kernel_frequencies.clear();
   m_kernel_frequencies.reserve(m_number_of_scales * m_number_of_directions);
@@ -342,13 +381,26 @@ void bob::ip::GaborWaveletTransform::generateKernels(
   blitz::TinyVector<unsigned,2> resolution
 )
 {
-  if (resolution[1] != m_fft.getWidth() || resolution[0] != m_fft.getHeight()){
-    // new kernels need to be generated
+  if (resolution[1] != m_fft.getWidth() || resolution[0] != m_fft.getHeight() || m_gabor_kernels.size() != m_kernel_frequencies.size()){
+    // keep the kernels of the previous resolution, in case it is used again
+    if (!m_gabor_kernels.empty()){
+      if (m_kernel_cache.size() >= s_max_cached_resolutions) m_kernel_cache.clear();
+      m_kernel_cache[std::make_pair((unsigned)m_fft.getHeight(), (unsigned)m_fft.getWidth())].swap(m_gabor_kernels);
+    }
     m_gabor_kernels.clear();
-    m_gabor_kernels.reserve(m_kernel_frequencies.size());
 
-    for (unsigned j = 0; j < m_kernel_frequencies.size(); ++j){
-      m_gabor_kernels.push_back(bob::ip::GaborKernel(resolution, m_kernel_frequencies[j], m_sigma, m_pow_of_k, m_dc_free));
+    std::map<std::pair<unsigned,unsigned>, std::vector<GaborKernel> >::iterator cached = m_kernel_cache.find(std::make_pair(resolution[0], resolution[1]));
+    if (cached != m_kernel_cache.end()){
+      // reuse the kernels generated before for this resolution
+      m_gabor_kernels.swap(cached->second);
+      m_kernel_cache.erase(cached);
+    } else {
+      // new kernels need to be generated
+      m_gabor_kernels.reserve(m_kernel_frequencies.size());
+
+      for (unsigned j = 0; j < m_kernel_frequencies.size(); ++j){
+        m_gabor_kernels.push_back(bob::ip::GaborKernel(resolution, m_kernel_frequencies[j], m_sigma, m_pow_of_k, m_dc_free));
+      }
     }
 
     // reset fft sizes
@@ -403,14 +455,69 @@ void bob::ip::GaborWaveletTransform::performGWT(
 }
 
 /**
- * Computes the Gabor jets including absolute values and phases for the given image (in spatial domain).
+ * Writes the response of the j-th kernel into the jet image (absolute and phase part)
+ */
+template <typename T>
+static void setJetLayer(const blitz::Array<std::complex<double>,2>& response, const int j, blitz::Array<T,4>& jet_image){
+  blitz::Array<T,2> abs_part(jet_image(blitz::Range::all(), blitz::Range::all(), 0, j));
+  abs_part = blitz::abs(response);
+  blitz::Array<T,2> phase_part(jet_image(blitz::Range::all(), blitz::Range::all(), 1, j));
+  phase_part = blitz::arg(response);
+}
+
+/**
+ * Writes the response of the j-th kernel into the jet image (absolute part only)
+ */
+template <typename T>
+static void setJetLayer(const blitz::Array<std::complex<double>,2>& response, const int j, blitz::Array<T,3>& jet_image){
+  blitz::Array<T,2> abs_part(jet_image(blitz::Range::all(), blitz::Range::all(), j));
+  abs_part = blitz::abs(response);
+}
+
+/**
+ * Normalizes the absolute parts of all Gabor jets of the jet image to unit length
+ */
+template <typename T>
+static void normalizeJetImage(blitz::Array<T,4>& jet_image){
+  for (int y = jet_image.extent(0); y--;){
+    for (int x = jet_image.extent(1); x--;){
+      blitz::Array<T,2> jet(jet_image(y,x,blitz::Range::all(),blitz::Range::all()));
+      bob::ip::normalizeGaborJet(jet);
+    }
+  }
+}
+
+template <typename T>
+static void normalizeJetImage(blitz::Array<T,3>& jet_image){
+  for (int y = jet_image.extent(0); y--;){
+    for (int x = jet_image.extent(1); x--;){
+      blitz::Array<T,1> jet(jet_image(y,x,blitz::Range::all()));
+      bob::ip::normalizeGaborJet(jet);
+    }
+  }
+}
+
+/**
+ * Checks that the jet image has the correct shape for an image of the given size
+ */
+template <typename T, int N>
+static void checkJetImage(const blitz::Array<T,N>& jet_image, const int height, const int width, const int kernels){
+  bob::core::array::assertSameDimensionLength(jet_image.extent(0), height);
+  bob::core::array::assertSameDimensionLength(jet_image.extent(1), width);
+  if (N == 4) bob::core::array::assertSameDimensionLength(jet_image.extent(2), 2);
+  bob::core::array::assertSameDimensionLength(jet_image.extent(N-1), kernels);
+}
+
+/**
+ * Computes the Gabor jet image of the given image (in spatial domain), with or without phases.
  * @param gray_image  The source image in spatial domain
- * @param jet_image   The resulting Gabor jet image, including absolute values and phases for each pixel
+ * @param jet_image   The resulting Gabor jet image
  * @param do_normalize Shall the Gabor jets be normalized?
  */
-void bob::ip::GaborWaveletTransform::computeJetImage(
+template <typename T, int N>
+void bob::ip::GaborWaveletTransform::jetImage(
   const blitz::Array<std::complex<double>,2>& gray_image,
-  blitz::Array<double,4>& jet_image,
+  blitz::Array<T,N>& jet_image,
   bool do_normalize
 )
 {
@@ -421,7 +528,7 @@ void bob::ip::GaborWaveletTransform::computeJetImage(
   m_fft(gray_image, m_frequency_image);
 
   // check that the shape is correct
-  bob::core::array::assertSameShape(jet_image, blitz::shape(gray_image.extent(0), gray_image.extent(1), 2, m_kernel_frequencies.size()));
+  checkJetImage(jet_image, gray_image.extent(0), gray_image.extent(1), m_kernel_frequencies.size());
 
   // now, let each kernel compute the transformation result
   for (int j = 0; j < (int)m_gabor_kernels.size(); ++j){
@@ -429,25 +536,30 @@ void bob::ip::GaborWaveletTransform::computeJetImage(
     m_gabor_kernels[j].transform(m_frequency_image, m_temp_array);
     // perform ifft of transformed image
     m_ifft(m_temp_array);
-    // convert into absolute and phase part
-    blitz::Array<double,2> abs_part(jet_image(blitz::Range::all(), blitz::Range::all(), 0, j));
-    abs_part = blitz::abs(m_temp_array);
-    blitz::Array<double,2> phase_part(jet_image(blitz::Range::all(), blitz::Range::all(), 1, j));
-    phase_part = blitz::arg(m_temp_array);
+    // convert into absolute (and phase) part
+    setJetLayer(m_temp_array, j, jet_image);
   } // for j
 
   if (do_normalize){
-    // iterate the positions
-    for (int y = jet_image.extent(0); y--;){
-      for (int x = jet_image.extent(1); x--;){
-        // normalize jet
-        blitz::Array<double,2> jet(jet_image(y,x,blitz::Range::all(),blitz::Range::all()));
-        bob::ip::normalizeGaborJet(jet);
-      }
-    }
+    normalizeJetImage(jet_image);
   }
 }
 
+/**
+ * Computes the Gabor jets including absolute values and phases for the given image (in spatial domain).
+ * @param gray_image  The source image in spatial domain
+ * @param jet_image   The resulting Gabor jet image, including absolute values and phases for each pixel
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::ip::GaborWaveletTransform::computeJetImage(
+  const blitz::Array<std::complex<double>,2>& gray_image,
+  blitz::Array<double,4>& jet_image,
+  bool do_normalize
+)
+{
+  jetImage(gray_image, jet_image, do_normalize);
+}
+
 /**
  * Computes the Gabor jets including absolute values only for the given image (in spatial domain).
  * @param gray_image  The source image in spatial domain
@@ -459,35 +571,394 @@ void bob::ip::GaborWaveletTransform::computeJetImage(
   blitz::Array<double,3>& jet_image,
   bool do_normalize
 )
+{
+  jetImage(gray_image, jet_image, do_normalize);
+}
+
+/**
+ * Computes the Gabor jets including absolute values and phases for the given image (in spatial domain), in single precision.
+ * @param gray_image  The source image in spatial domain
+ * @param jet_image   The resulting Gabor jet image, including absolute values and phases for each pixel
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::ip::GaborWaveletTransform::computeJetImage(
+  const blitz::Array<std::complex<double>,2>& gray_image,
+  blitz::Array<float,4>& jet_image,
+  bool do_normalize
+)
+{
+  jetImage(gray_image, jet_image, do_normalize);
+}
+
+/**
+ * Computes the Gabor jets including absolute values only for the given image (in spatial domain), in single precision.
+ * @param gray_image  The source image in spatial domain
+ * @param jet_image   The resulting Gabor jet image, including only absolute values for each pixel
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::ip::GaborWaveletTransform::computeJetImage(
+  const blitz::Array<std::complex<double>,2>& gray_image,
+  blitz::Array<float,3>& jet_image,
+  bool do_normalize
+)
+{
+  jetImage(gray_image, jet_image, do_normalize);
+}
+
+/**
+ * Returns an (unshared) view of the i-th layer of the given array along its first dimension,
+ * which needs to be zero-based
+ */
+template <typename T, int N>
+static blitz::Array<T,N-1> layerOf(const blitz::Array<T,N>& a, const int i){
+  blitz::TinyVector<int,N-1> shape, stride;
+  for (int d = 1; d < N; ++d){
+    shape[d-1] = a.extent(d);
+    stride[d-1] = a.stride(d);
+  }
+  return blitz::Array<T,N-1>(const_cast<T*>(a.data()) + i * a.stride(0), shape, stride, blitz::neverDeleteData);
+}
+
+/**
+ * Returns an (unshared) view of the given range of the given array along its first dimension,
+ * which needs to be zero-based
+ */
+template <typename T, int N>
+static blitz::Array<T,N> rangeOf(const blitz::Array<T,N>& a, const blitz::Range& r){
+  blitz::TinyVector<int,N> shape = a.shape();
+  shape[0] = r.length();
+  return blitz::Array<T,N>(const_cast<T*>(a.data()) + r.first() * a.stride(0), shape, a.stride(), blitz::neverDeleteData);
+}
+
+/**
+ * Gabor transforms a stack of images, writing one vector of complex images per image
+ */
+static void transformImages(
+  const std::vector<bob::ip::GaborKernel>& kernels,
+  const blitz::Array<std::complex<double>,3>& images,
+  blitz::Array<std::complex<double>,4>& trafo_images,
+  bool
+)
+{
+  const int height = images.extent(1), width = images.extent(2);
+  // transform all images at once
+  bob::sp::FFT2D fft(height, width);
+  bob::sp::IFFT2D ifft(height, width);
+  blitz::Array<std::complex<double>,3> frequency_images(images.shape());
+  fft(images, frequency_images);
+
+  blitz::Array<std::complex<double>,2> temp(height, width);
+  for (int i = 0; i < images.extent(0); ++i){
+    const blitz::Array<std::complex<double>,2> frequency_image = layerOf(frequency_images, i);
+    blitz::Array<std::complex<double>,3> trafo_image = layerOf(trafo_images, i);
+    for (int j = 0; j < (int)kernels.size(); ++j){
+      kernels[j].transform(frequency_image, temp);
+      blitz::Array<std::complex<double>,2> layer = layerOf(trafo_image, j);
+      ifft(temp, layer);
+    }
+  }
+}
+
+/**
+ * Gabor transforms a stack of images, writing one jet image per image
+ */
+template <typename T, int N>
+static void transformImages(
+  const std::vector<bob::ip::GaborKernel>& kernels,
+  const blitz::Array<std::complex<double>,3>& images,
+  blitz::Array<T,N>& jet_images,
+  bool do_normalize
+)
+{
+  const int height = images.extent(1), width = images.extent(2);
+  // transform all images at once
+  bob::sp::FFT2D fft(height, width);
+  bob::sp::IFFT2D ifft(height, width);
+  blitz::Array<std::complex<double>,3> frequency_images(images.shape());
+  fft(images, frequency_images);
+
+  blitz::Array<std::complex<double>,2> temp(height, width);
+  for (int i = 0; i < images.extent(0); ++i){
+    const blitz::Array<std::complex<double>,2> frequency_image = layerOf(frequency_images, i);
+    blitz::Array<T,N-1> jet_image = layerOf(jet_images, i);
+    for (int j = 0; j < (int)kernels.size(); ++j){
+      kernels[j].transform(frequency_image, temp);
+      ifft(temp);
+      setJetLayer(temp, j, jet_image);
+    }
+    if (do_normalize){
+      normalizeJetImage(jet_image);
+    }
+  }
+}
+
+/**
+ * The images transformed by a thread, and the part of the output it writes
+ */
+template <typename T, int N>
+struct gwt_shard {
+  blitz::Array<std::complex<double>,3> images;
+  blitz::Array<T,N> output;
+};
+
+template <typename T, int N>
+static void transformShard(
+  const std::vector<bob::ip::GaborKernel>& kernels,
+  std::vector<gwt_shard<T,N> >& shards,
+  const bool do_normalize,
+  const size_t i
+)
+{
+  transformImages(kernels, shards[i].images, shards[i].output, do_normalize);
+}
+
+/**
+ * Transforms a stack of images of the same size, which are split over several threads.
+ * The kernels are generated once, and are shared by all threads; each thread uses its own FFTs.
+ * @param gray_images  The source images in spatial domain (one per layer)
+ * @param output       The resulting trafo images or jet images (one per image)
+ * @param do_normalize Shall the Gabor jets be normalized?
+ * @param n_threads    The number of threads the images are split over
+ */
+template <typename T, int N>
+void bob::ip::GaborWaveletTransform::transformStack(
+  const blitz::Array<std::complex<double>,3>& gray_images,
+  blitz::Array<T,N>& output,
+  bool do_normalize,
+  const size_t n_threads_max
+)
 {
   // first, check if we need to reset the kernels
-  generateKernels(blitz::TinyVector<int,2>(gray_image.extent(0),gray_image.extent(1)));
+  generateKernels(blitz::TinyVector<unsigned,2>(gray_images.extent(1),gray_images.extent(2)));
+
+  // check the shapes; the output is written through views, and hence needs to be contiguous
+  bob::core::array::assertCZeroBaseContiguous(output);
+  bob::core::array::assertSameDimensionLength(output.extent(0), gray_images.extent(0));
+  blitz::Array<std::complex<double>,3> images;
+  if (bob::core::array::isCZeroBaseContiguous(gray_images)) images.reference(gray_images);
+  else images.reference(bob::core::array::ccopy(gray_images));
+
+  const int count = images.extent(0);
+  const size_t n_threads = std::min(n_threads_max, static_cast<size_t>(count));
+  if (n_threads <= 1){
+    transformImages(m_gabor_kernels, images, output, do_normalize);
+    return;
+  }
+
+  // each thread transforms a contiguous part of the stack
+  std::vector<gwt_shard<T,N> > shards(n_threads);
+  for (size_t i = 0; i < n_threads; ++i){
+    const blitz::Range r = bob::core::shard(count, n_threads, i);
+    shards[i].images.reference(rangeOf(images, r));
+    shards[i].output.reference(rangeOf(output, r));
+  }
+  bob::core::parallel(n_threads, boost::bind(&transformShard<T,N>, boost::cref(m_gabor_kernels), boost::ref(shards), do_normalize, _1));
+}
+
+/**
+ * Computes the Gabor wavelet transformation for the given stack of images (in spatial domain)
+ * @param gray_images  The source images in spatial domain (one per layer)
+ * @param trafo_images The convolution results, in spatial domain (one trafo image per image)
+ * @param n_threads    The number of threads the images are split over
+ */
+void bob::ip::GaborWaveletTransform::performGWT(
+  const blitz::Array<std::complex<double>,3>& gray_images,
+  blitz::Array<std::complex<double>,4>& trafo_images,
+  const size_t n_threads
+)
+{
+  // check that the shape is correct
+  bob::core::array::assertSameShape(trafo_images, blitz::shape(gray_images.extent(0), m_kernel_frequencies.size(), gray_images.extent(1), gray_images.extent(2)));
+  transformStack(gray_images, trafo_images, false, n_threads);
+}
+
+/**
+ * Computes the Gabor jet images including absolute values and phases for the given stack of images (in spatial domain).
+ * @param gray_images  The source images in spatial domain (one per layer)
+ * @param jet_images   The resulting Gabor jet images (one per image)
+ * @param do_normalize Shall the Gabor jets be normalized?
+ * @param n_threads    The number of threads the images are split over
+ */
+void bob::ip::GaborWaveletTransform::computeJetImages(
+  const blitz::Array<std::complex<double>,3>& gray_images,
+  blitz::Array<double,5>& jet_images,
+  bool do_normalize,
+  const size_t n_threads
+)
+{
+  bob::core::array::assertSameShape(jet_images, blitz::shape(gray_images.extent(0), gray_images.extent(1), gray_images.extent(2), 2, m_kernel_frequencies.size()));
+  transformStack(gray_images, jet_images, do_normalize, n_threads);
+}
+
+/**
+ * Computes the Gabor jet images including absolute values only for the given stack of images (in spatial domain).
+ * @param gray_images  The source images in spatial domain (one per layer)
+ * @param jet_images   The resulting Gabor jet images (one per image)
+ * @param do_normalize Shall the Gabor jets be normalized?
+ * @param n_threads    The number of threads the images are split over
+ */
+void bob::ip::GaborWaveletTransform::computeJetImages(
+  const blitz::Array<std::complex<double>,3>& gray_images,
+  blitz::Array<double,4>& jet_images,
+  bool do_normalize,
+  const size_t n_threads
+)
+{
+  bob::core::array::assertSameShape(jet_images, blitz::shape(gray_images.extent(0), gray_images.extent(1), gray_images.extent(2), m_kernel_frequencies.size()));
+  transformStack(gray_images, jet_images, do_normalize, n_threads);
+}
+
+/**
+ * Computes the Gabor jet images including absolute values and phases for the given stack of images (in spatial domain), in single precision.
+ * @param gray_images  The source images in spatial domain (one per layer)
+ * @param jet_images   The resulting Gabor jet images (one per image)
+ * @param do_normalize Shall the Gabor jets be normalized?
+ * @param n_threads    The number of threads the images are split over
+ */
+void bob::ip::GaborWaveletTransform::computeJetImages(
+  const blitz::Array<std::complex<double>,3>& gray_images,
+  blitz::Array<float,5>& jet_images,
+  bool do_normalize,
+  const size_t n_threads
+)
+{
+  bob::core::array::assertSameShape(jet_images, blitz::shape(gray_images.extent(0), gray_images.extent(1), gray_images.extent(2), 2, m_kernel_frequencies.size()));
+  transformStack(gray_images, jet_images, do_normalize, n_threads);
+}
+
+/**
+ * Computes the Gabor jet images including absolute values only for the given stack of images (in spatial domain), in single precision.
+ * @param gray_images  The source images in spatial domain (one per layer)
+ * @param jet_images   The resulting Gabor jet images (one per image)
+ * @param do_normalize Shall the Gabor jets be normalized?
+ * @param n_threads    The number of threads the images are split over
+ */
+void bob::ip::GaborWaveletTransform::computeJetImages(
+  const blitz::Array<std::complex<double>,3>& gray_images,
+  blitz::Array<float,4>& jet_images,
+  bool do_normalize,
+  const size_t n_threads
+)
+{
+  bob::core::array::assertSameShape(jet_images, blitz::shape(gray_images.extent(0), gray_images.extent(1), gray_images.extent(2), m_kernel_frequencies.size()));
+  transformStack(gray_images, jet_images, do_normalize, n_threads);
+}
+
+/**
+ * Computes the responses of all Gabor kernels at the given positions only, into m_responses.
+ * The inverse Fourier transform is restricted to these positions: it is first performed along
+ * the y axis for the rows holding a position, and then along the x axis for each position only.
+ * @param gray_image  The source image in spatial domain
+ * @param positions   The (y,x) positions to compute the responses at, one per row
+ */
+void bob::ip::GaborWaveletTransform::computeResponses(
+  const blitz::Array<std::complex<double>,2>& gray_image,
+  const blitz::Array<int,2>& positions
+)
+{
+  // first, check if we need to reset the kernels
+  generateKernels(blitz::TinyVector<unsigned,2>(gray_image.extent(0),gray_image.extent(1)));
 
   // perform Fourier transformation to image
   m_fft(gray_image, m_frequency_image);
 
-  // check that the shape is correct
-  bob::core::array::assertSameShape(jet_image, blitz::shape(gray_image.extent(0), gray_image.extent(1), m_kernel_frequencies.size()));
+  const int height = gray_image.extent(0), width = gray_image.extent(1);
+  const int count = positions.extent(0);
+  for (int i = 0; i < count; ++i){
+    if (positions(i,0) < 0 || positions(i,0) >= height || positions(i,1) < 0 || positions(i,1) >= width)
+      throw std::runtime_error((boost::format("The position (%i,%i) is out of the image boundaries %i x %i") % positions(i,0) % positions(i,1) % height % width).str());
+  }
 
-  // now, let each kernel compute the transformation result
+  // collect the distinct rows and columns of the positions
+  std::map<int,int> rows, columns;
+  for (int i = 0; i < count; ++i){
+    rows.insert(std::make_pair(positions(i,0), (int)rows.size()));
+    columns.insert(std::make_pair(positions(i,1), (int)columns.size()));
+  }
+
+  // the factors of the inverse Fourier transform; the normalization is included in the column factors
+  blitz::Array<std::complex<double>,2> row_factors(rows.size(), height), column_factors(columns.size(), width);
+  for (std::map<int,int>::const_iterator it = rows.begin(); it != rows.end(); ++it)
+    for (int k = 0; k < height; ++k)
+      row_factors(it->second, k) = std::polar(1., 2. * M_PI * ((k * it->first) % height) / height);
+  for (std::map<int,int>::const_iterator it = columns.begin(); it != columns.end(); ++it)
+    for (int k = 0; k < width; ++k)
+      column_factors(it->second, k) = std::polar(1. / (height * width), 2. * M_PI * ((k * it->first) % width) / width);
+
+  // now, let each kernel compute the transformation result at the positions
+  blitz::Array<std::complex<double>,2> transformed_rows(rows.size(), width);
+  m_responses.resize(count, m_gabor_kernels.size());
   for (int j = 0; j < (int)m_gabor_kernels.size(); ++j){
-    // get a reference to the current layer of the trafo image
-    m_gabor_kernels[j].transform(m_frequency_image, m_temp_array);
-    // perform ifft of transformed image
-    m_ifft(m_temp_array);
-    // convert into absolute part
-    blitz::Array<double,2> abs_part(jet_image(blitz::Range::all(), blitz::Range::all(), j));
-    abs_part = blitz::abs(m_temp_array);
+    m_gabor_kernels[j].transformRows(m_frequency_image, row_factors, transformed_rows);
+    for (int i = 0; i < count; ++i){
+      const int r = rows[positions(i,0)], c = columns[positions(i,1)];
+      std::complex<double> response(0.);
+      for (int k = 0; k < width; ++k)
+        response += transformed_rows(r, k) * column_factors(c, k);
+      m_responses(i, j) = response;
+    }
   } // for j
+}
+
+/**
+ * Computes the Gabor jets including absolute values and phases at the given positions of the given image (in spatial domain).
+ * @param gray_image  The source image in spatial domain
+ * @param positions   The (y,x) positions to compute the Gabor jets at, one per row
+ * @param jets        The resulting Gabor jets, one per position
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::ip::GaborWaveletTransform::computeJets(
+  const blitz::Array<std::complex<double>,2>& gray_image,
+  const blitz::Array<int,2>& positions,
+  blitz::Array<double,3>& jets,
+  bool do_normalize
+)
+{
+  // check that the shape is correct
+  bob::core::array::assertSameShape(jets, blitz::shape(positions.extent(0), 2, m_kernel_frequencies.size()));
+
+  computeResponses(gray_image, positions);
+
+  // convert into absolute and phase part
+  blitz::Array<double,2> abs_part(jets(blitz::Range::all(), 0, blitz::Range::all()));
+  abs_part = blitz::abs(m_responses);
+  blitz::Array<double,2> phase_part(jets(blitz::Range::all(), 1, blitz::Range::all()));
+  phase_part = blitz::arg(m_responses);
 
   if (do_normalize){
-    // iterate the positions
-    for (int y = jet_image.extent(0); y--;){
-      for (int x = jet_image.extent(1); x--;){
-        // normalize jet
-        blitz::Array<double,1> jet(jet_image(y,x,blitz::Range::all()));
-        bob::ip::normalizeGaborJet(jet);
-      }
+    for (int i = jets.extent(0); i--;){
+      blitz::Array<double,2> jet(jets(i,blitz::Range::all(),blitz::Range::all()));
+      bob::ip::normalizeGaborJet(jet);
+    }
+  }
+}
+
+/**
+ * Computes the Gabor jets including absolute values only at the given positions of the given image (in spatial domain).
+ * @param gray_image  The source image in spatial domain
+ * @param positions   The (y,x) positions to compute the Gabor jets at, one per row
+ * @param jets        The resulting Gabor jets, one per position
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::ip::GaborWaveletTransform::computeJets(
+  const blitz::Array<std::complex<double>,2>& gray_image,
+  const blitz::Array<int,2>& positions,
+  blitz::Array<double,2>& jets,
+  bool do_normalize
+)
+{
+  // check that the shape is correct
+  bob::core::array::assertSameShape(jets, blitz::shape(positions.extent(0), m_kernel_frequencies.size()));
+
+  computeResponses(gray_image, positions);
+
+  // convert into absolute part
+  jets = blitz::abs(m_responses);
+
+  if (do_normalize){
+    for (int i = jets.extent(0); i--;){
+      blitz::Array<double,1> jet(jets(i,blitz::Range::all()));
+      bob::ip::normalizeGaborJet(jet);
     }
   }
 }
@@ -513,25 +984,3 @@ void bob::ip::GaborWaveletTransform::load(bob::io::HDF5File& file){
 
   computeKernelFrequencies();
 }
-
-/**
- * Normalizes the given Gabor jet (absolute values only) to unit length.
- * @param gabor_jet The Gabor jet to be normalized.
- */
-void bob::ip::normalizeGaborJet(blitz::Array<double,1>& gabor_jet){
-  double norm = sqrt(std::inner_product(gabor_jet.begin(), gabor_jet.end(), gabor_jet.begin(), 0.));
-  // normalize the absolute parts of the jets
-  gabor_jet /= norm;
-}
-
-
-/**
- * Normalizes the given Gabor jet to unit length.
- * @param gabor_jet The Gabor jet to be normalized, including the phase values (which will not be altered).
- */
-void bob::ip::normalizeGaborJet(blitz::Array<double,2>& gabor_jet){
-  blitz::Array<double,1> abs_jet = gabor_jet(0, blitz::Range::all());
-  double norm = sqrt(std::inner_product(abs_jet.begin(), abs_jet.end(), abs_jet.begin(), 0.));
-  // normalize the absolute parts of the jets
-  abs_jet /= norm;
-}
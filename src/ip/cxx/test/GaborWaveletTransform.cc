@@ -232,4 +232,89 @@ BOOST_AUTO_TEST_CASE( test_GWT_output )
 
 }
 
+BOOST_AUTO_TEST_CASE( test_GWT_sparse_jets )
+{
+  // create a random-like image of odd width
+  int v_res = 48, h_res = 37;
+  blitz::Array<std::complex<double>,2> image(v_res, h_res);
+  for (int y = 0; y < v_res; ++y)
+    for (int x = 0; x < h_res; ++x)
+      image(y,x) = (y * 7 + x * 13 + (x * y) % 11) % 256;
+
+  // compute the full jet images
+  bob::ip::GaborWaveletTransform gwt;
+  blitz::Array<double,4> jet_image(v_res, h_res, 2, gwt.numberOfKernels());
+  gwt.computeJetImage(image, jet_image, true);
+  blitz::Array<double,3> abs_jet_image(v_res, h_res, gwt.numberOfKernels());
+  gwt.computeJetImage(image, abs_jet_image, false);
+
+  // compute the jets at some positions only, some of them sharing rows or columns
+  blitz::Array<int,2> positions(5,2);
+  positions = 0, 0,
+              10, 20,
+              10, 36,
+              47, 20,
+              23, 5;
+  blitz::Array<double,3> jets(5, 2, gwt.numberOfKernels());
+  gwt.computeJets(image, positions, jets, true);
+  blitz::Array<double,2> abs_jets(5, gwt.numberOfKernels());
+  gwt.computeJets(image, positions, abs_jets, false);
+
+  for (int i = 0; i < 5; ++i){
+    for (int j = 0; j < (int)gwt.numberOfKernels(); ++j){
+      BOOST_CHECK_SMALL(jets(i,0,j) - jet_image(positions(i,0), positions(i,1), 0, j), epsilon);
+      BOOST_CHECK_SMALL(abs_jets(i,j) - abs_jet_image(positions(i,0), positions(i,1), j), epsilon);
+      // phases are only compared where the response is not vanishing
+      if (jets(i,0,j) > epsilon){
+        double diff = std::abs(jets(i,1,j) - jet_image(positions(i,0), positions(i,1), 1, j));
+        BOOST_CHECK_SMALL(std::min(diff, 2. * M_PI - diff), epsilon);
+      }
+    }
+  }
+}
+
+BOOST_AUTO_TEST_CASE( test_GWT_stack )
+{
+  // create a stack of random-like images
+  int count = 5, v_res = 32, h_res = 29;
+  blitz::Array<std::complex<double>,3> images(count, v_res, h_res);
+  for (int i = 0; i < count; ++i)
+    for (int y = 0; y < v_res; ++y)
+      for (int x = 0; x < h_res; ++x)
+        images(i,y,x) = (y * 7 + x * 13 + i * 31 + (x * y * (i+1)) % 11) % 256;
+
+  bob::ip::GaborWaveletTransform gwt;
+  int kernels = gwt.numberOfKernels();
+  for (int n_threads = 1; n_threads <= 3; n_threads += 2){
+    blitz::Array<std::complex<double>,4> trafo_images(count, kernels, v_res, h_res);
+    gwt.performGWT(images, trafo_images, n_threads);
+    blitz::Array<double,5> jet_images(count, v_res, h_res, 2, kernels);
+    gwt.computeJetImages(images, jet_images, true, n_threads);
+    blitz::Array<float,4> float_jet_images(count, v_res, h_res, kernels);
+    gwt.computeJetImages(images, float_jet_images, true, n_threads);
+
+    for (int i = 0; i < count; ++i){
+      // transform the image alone, after transforming an image of another size,
+      // so that the kernels are taken from the cache
+      blitz::Array<std::complex<double>,2> other(v_res+1, h_res);
+      other = 0.;
+      blitz::Array<double,3> other_jets(v_res+1, h_res, kernels);
+      gwt.computeJetImage(other, other_jets, false);
+
+      blitz::Array<std::complex<double>,2> image = images(i, blitz::Range::all(), blitz::Range::all());
+      blitz::Array<std::complex<double>,3> trafo_image(kernels, v_res, h_res);
+      gwt.performGWT(image, trafo_image);
+      blitz::Array<double,4> jet_image(v_res, h_res, 2, kernels);
+      gwt.computeJetImage(image, jet_image, true);
+
+      test_close(blitz::Array<std::complex<double>,3>(trafo_images(i, blitz::Range::all(), blitz::Range::all(), blitz::Range::all())), trafo_image, epsilon);
+      test_close(blitz::Array<double,4>(jet_images(i, blitz::Range::all(), blitz::Range::all(), blitz::Range::all(), blitz::Range::all())), jet_image, epsilon);
+      for (int y = 0; y < v_res; ++y)
+        for (int x = 0; x < h_res; ++x)
+          for (int j = 0; j < kernels; ++j)
+            BOOST_CHECK_SMALL(float_jet_images(i,y,x,j) - jet_image(y,x,0,j), 1e-5);
+    }
+  }
+}
+
 BOOST_AUTO_TEST_SUITE_END()
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/DCTFeatures.h>
 
 using namespace boost::python;
@@ -36,7 +37,11 @@ template <typename T> static object py_inner_2d_dct_apply(
     const blitz::TinyVector<int,3> shape = dct_features.get3DOutputShape(src.bz<T,2>());
     bob::python::ndarray dst(bob::core::array::t_float64, shape(0), shape(1), shape(2));
     blitz::Array<double,3> dst_ = dst.bz<double,3>();
-    dct_features(src.bz<T,2>(), dst_);
+    blitz::Array<T,2> src_ = src.bz<T,2>();
+    {
+      bob::python::no_gil unlock;
+      dct_features(src_, dst_);
+    }
     return dst.self();
   }
   else
@@ -44,7 +49,11 @@ template <typename T> static object py_inner_2d_dct_apply(
     const blitz::TinyVector<int,2> shape = dct_features.get2DOutputShape(src.bz<T,2>());
     bob::python::ndarray dst(bob::core::array::t_float64, shape(0), shape(1));
     blitz::Array<double,2> dst_ = dst.bz<double,2>();
-    dct_features(src.bz<T,2>(), dst_);
+    blitz::Array<T,2> src_ = src.bz<T,2>();
+    {
+      bob::python::no_gil unlock;
+      dct_features(src_, dst_);
+    }
     return dst.self();
   }
 }
@@ -70,7 +79,11 @@ template <typename T, int N> static object c_inner_dct_apply(
   bob::python::ndarray dst)
 {
   blitz::Array<double,N> dst_ = dst.bz<double,N>();
-  dct_features(src.bz<T,2>(), dst_);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    dct_features(src_, dst_);
+  }
   return dst.self();
 }
 
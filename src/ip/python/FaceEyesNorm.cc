@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/FaceEyesNorm.h>
 
 using namespace boost::python;
@@ -33,7 +34,9 @@ static void inner_call1(bob::ip::FaceEyesNorm& obj,
   double e1y, double e1x, double e2y, double e2x)
 {
   blitz::Array<double,2> output_ = output.bz<double,2>();
-  obj(input.bz<T,2>(), output_, e1y, e1x, e2y, e2x);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj(input_, output_, e1y, e1x, e2y, e2x);
 }
 
 static void call1(bob::ip::FaceEyesNorm& obj, bob::python::const_ndarray input,
@@ -58,7 +61,11 @@ static object inner_call1b(bob::ip::FaceEyesNorm& op,
   bob::python::ndarray dst(bob::core::array::t_float64, op.getCropHeight(), 
     op.getCropWidth());
   blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<T,2>(), dst_, e1y, e1x, e2y, e2x);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst_, e1y, e1x, e2y, e2x);
+  }
   return dst.self();
 }
 
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/GLCM.h>
 #include <boost/make_shared.hpp>
 
@@ -38,7 +39,9 @@ template <typename T>
 static void call_glcm(const bob::ip::GLCM<T>& op, bob::python::const_ndarray input, bob::python::ndarray output) 
 {
   blitz::Array<double,3> output_ = output.bz<double,3>();
-  op(input.bz<T,2>(), output_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  op(input_, output_);
 }
 
 template <typename T>
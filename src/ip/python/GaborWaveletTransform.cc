@@ -23,6 +23,8 @@
 
 #include <boost/python.hpp>
 #include "bob/python/ndarray.h"
+#include "bob/python/gil.h"
+#include "bob/python/gabor.h"
 #include "bob/core/array_type.h"
 
 #include "bob/ip/GaborWaveletTransform.h"
@@ -33,33 +35,6 @@
 #include "bob/ip/color.h"
 
 
-template <class T>
-static inline const blitz::Array<std::complex<double>,2> complex_cast (bob::python::const_ndarray input){
-  blitz::Array<T,2> gray(input.type().shape[1],input.type().shape[2]);
-  bob::ip::rgb_to_gray(input.bz<T,3>(), gray);
-  return bob::core::array::cast<std::complex<double> >(gray);
-}
-
-static inline const blitz::Array<std::complex<double>, 2> convert_image(bob::python::const_ndarray input){
-  if (input.type().nd == 3){
-    // perform color type conversion
-    switch (input.type().dtype){
-      case bob::core::array::t_uint8: return complex_cast<uint8_t>(input);
-      case bob::core::array::t_uint16: return complex_cast<uint16_t>(input);
-      case bob::core::array::t_float64: return complex_cast<double>(input);
-      default: throw std::runtime_error("unsupported input data type");
-    }
-  } else {
-    switch (input.type().dtype){
-      case bob::core::array::t_uint8: return bob::core::array::cast<std::complex<double> >(input.bz<uint8_t,2>());
-      case bob::core::array::t_uint16: return bob::core::array::cast<std::complex<double> >(input.bz<uint16_t,2>());
-      case bob::core::array::t_float64: return bob::core::array::cast<std::complex<double> >(input.bz<double,2>());
-      case bob::core::array::t_complex128: return input.bz<std::complex<double>,2>();
-      default: throw std::runtime_error("unsupported input data type");
-    }
-  }
-}
-
 static inline void transform (bob::ip::GaborKernel& kernel, blitz::Array<std::complex<double>,2>& input, blitz::Array<std::complex<double>,2>& output){
  // perform fft on input image
   bob::sp::FFT2D fft(input.extent(0), input.extent(1));
@@ -75,21 +50,25 @@ static inline void transform (bob::ip::GaborKernel& kernel, blitz::Array<std::co
 
 static void gabor_wavelet_transform_1 (bob::ip::GaborKernel& kernel, bob::python::const_ndarray input_image, bob::python::ndarray output_image){
   // convert input image into complex type
-  blitz::Array<std::complex<double>,2> input = convert_image(input_image);
+  blitz::Array<std::complex<double>,2> input = bob::python::convert_gabor_image(input_image);
   // cast output image to complex type
   blitz::Array<std::complex<double>,2> output = output_image.bz<std::complex<double>,2>();
   // transform input to output
+  bob::python::no_gil unlock;
   transform(kernel, input, output);
 }
 
 static blitz::Array<std::complex<double>,2> gabor_wavelet_transform_2 (bob::ip::GaborKernel& kernel, bob::python::const_ndarray input_image){
   // convert input ndarray to complex blitz array
-  blitz::Array<std::complex<double>,2> input = convert_image(input_image);
+  blitz::Array<std::complex<double>,2> input = bob::python::convert_gabor_image(input_image);
   // allocate output array
   blitz::Array<std::complex<double>,2> output(input.extent(0), input.extent(1));
 
   // transform input to output
-  transform(kernel, input, output);
+  {
+    bob::python::no_gil unlock;
+    transform(kernel, input, output);
+  }
 
   // return the nd array
   return output;
@@ -103,36 +82,66 @@ static blitz::Array<std::complex<double>,3> empty_trafo_image (bob::ip::GaborWav
 }
 
 static void perform_gwt_1 (bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_image, bob::python::ndarray output_trafo_image){
-  const blitz::Array<std::complex<double>,2>& image = convert_image(input_image);
+  const blitz::Array<std::complex<double>,2>& image = bob::python::convert_gabor_image(input_image);
   blitz::Array<std::complex<double>,3> trafo_image = output_trafo_image.bz<std::complex<double>,3>();
+  bob::python::no_gil unlock;
   gwt.performGWT(image, trafo_image);
 }
 
 static blitz::Array<std::complex<double>,3> perform_gwt_2 (bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_image){
-  const blitz::Array<std::complex<double>,2>& image = convert_image(input_image);
+  const blitz::Array<std::complex<double>,2>& image = bob::python::convert_gabor_image(input_image);
   blitz::Array<std::complex<double>,3> trafo_image(gwt.numberOfKernels(), image.shape()[0], image.shape()[1]);
-  gwt.performGWT(image, trafo_image);
+  {
+    bob::python::no_gil unlock;
+    gwt.performGWT(image, trafo_image);
+  }
   return trafo_image;
 }
 
 static bob::python::ndarray empty_jet_image(bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_image, bool include_phases){
-  const blitz::Array<std::complex<double>,2>& image = convert_image(input_image);
+  const blitz::Array<std::complex<double>,2>& image = bob::python::convert_gabor_image(input_image);
   if (include_phases)
     return bob::python::ndarray (bob::core::array::t_float64, image.extent(0), image.extent(1), 2, (int)gwt.numberOfKernels());
   else
     return bob::python::ndarray (bob::core::array::t_float64, image.extent(0), image.extent(1), (int)gwt.numberOfKernels());
 }
 
+template <typename T>
+static void compute_jets_typed(bob::ip::GaborWaveletTransform& gwt, const blitz::Array<std::complex<double>,2>& image, bob::python::ndarray output_jet_image, bool normalized){
+  if (output_jet_image.type().nd == 3){
+    blitz::Array<T,3> jet_image = output_jet_image.bz<T,3>();
+    bob::python::no_gil unlock;
+    gwt.computeJetImage(image, jet_image, normalized);
+  } else if (output_jet_image.type().nd == 4){
+    blitz::Array<T,4> jet_image = output_jet_image.bz<T,4>();
+    bob::python::no_gil unlock;
+    gwt.computeJetImage(image, jet_image, normalized);
+  } else {
+    boost::format m("parameter `output_jet_image' has an unexpected shape: %s");
+    m % output_jet_image.type().str();
+    throw std::runtime_error(m.str());
+  }
+}
+
 static void compute_jets_1(bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_image, bob::python::ndarray output_jet_image, bool normalized){
-  const blitz::Array<std::complex<double>,2>& image = convert_image(input_image);
+  const blitz::Array<std::complex<double>,2>& image = bob::python::convert_gabor_image(input_image);
 
-  if (output_jet_image.type().nd == 3){
+  if (output_jet_image.type().dtype == bob::core::array::t_float32){
+    // jet image in single precision
+    compute_jets_typed<float>(gwt, image, output_jet_image, normalized);
+  } else if (output_jet_image.type().nd == 3){
     // compute jet image with absolute values only
     blitz::Array<double,3> jet_image = output_jet_image.bz<double,3>();
-    gwt.computeJetImage(image, jet_image, normalized);
+    {
+      bob::python::no_gil unlock;
+      gwt.computeJetImage(image, jet_image, normalized);
+    }
   } else if (output_jet_image.type().nd == 4){
     blitz::Array<double,4> jet_image = output_jet_image.bz<double,4>();
-    gwt.computeJetImage(image, jet_image, normalized);
+    {
+      bob::python::no_gil unlock;
+      gwt.computeJetImage(image, jet_image, normalized);
+    }
   } else {
     boost::format m("parameter `output_jet_image' has an unexpected shape: %s");
     m % output_jet_image.type().str();
@@ -146,6 +155,83 @@ static bob::python::ndarray compute_jets_2(bob::ip::GaborWaveletTransform& gwt,
   return output_jet_image;
 }
 
+static const blitz::Array<std::complex<double>,3> convert_images(bob::python::const_ndarray input){
+  if (input.type().nd != 3){
+    boost::format m("parameter `input_images' should be a 3D stack of gray images, but it has shape %s");
+    m % input.type().str();
+    throw std::runtime_error(m.str());
+  }
+  switch (input.type().dtype){
+    case bob::core::array::t_uint8: return bob::core::array::cast<std::complex<double> >(input.bz<uint8_t,3>());
+    case bob::core::array::t_uint16: return bob::core::array::cast<std::complex<double> >(input.bz<uint16_t,3>());
+    case bob::core::array::t_float64: return bob::core::array::cast<std::complex<double> >(input.bz<double,3>());
+    case bob::core::array::t_complex128: return input.bz<std::complex<double>,3>();
+    default: throw std::runtime_error("unsupported input data type");
+  }
+}
+
+static bob::python::ndarray perform_gwt_stack(bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_images, const size_t n_threads){
+  const blitz::Array<std::complex<double>,3> images = convert_images(input_images);
+  bob::python::ndarray output(bob::core::array::t_complex128, images.extent(0), (int)gwt.numberOfKernels(), images.extent(1), images.extent(2));
+  blitz::Array<std::complex<double>,4> trafo_images = output.bz<std::complex<double>,4>();
+  {
+    bob::python::no_gil unlock;
+    gwt.performGWT(images, trafo_images, n_threads);
+  }
+  return output;
+}
+
+template <typename T>
+static bob::python::ndarray compute_jets_stack_typed(bob::ip::GaborWaveletTransform& gwt, const blitz::Array<std::complex<double>,3>& images, bool include_phases, bool normalized, const size_t n_threads){
+  const bob::core::array::ElementType dtype = bob::core::array::getElementType<T>();
+  if (include_phases){
+    bob::python::ndarray output(dtype, images.extent(0), images.extent(1), images.extent(2), 2, (int)gwt.numberOfKernels());
+    blitz::Array<T,5> jet_images = output.bz<T,5>();
+    {
+      bob::python::no_gil unlock;
+      gwt.computeJetImages(images, jet_images, normalized, n_threads);
+    }
+    return output;
+  } else {
+    bob::python::ndarray output(dtype, images.extent(0), images.extent(1), images.extent(2), (int)gwt.numberOfKernels());
+    blitz::Array<T,4> jet_images = output.bz<T,4>();
+    {
+      bob::python::no_gil unlock;
+      gwt.computeJetImages(images, jet_images, normalized, n_threads);
+    }
+    return output;
+  }
+}
+
+static bob::python::ndarray compute_jets_stack(bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_images, bool include_phases, bool normalized, bool single_precision, const size_t n_threads){
+  const blitz::Array<std::complex<double>,3> images = convert_images(input_images);
+  if (single_precision)
+    return compute_jets_stack_typed<float>(gwt, images, include_phases, normalized, n_threads);
+  else
+    return compute_jets_stack_typed<double>(gwt, images, include_phases, normalized, n_threads);
+}
+
+static bob::python::ndarray compute_jets_at(bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_image, bob::python::const_ndarray positions, bool include_phases, bool normalized){
+  const blitz::Array<std::complex<double>,2>& image = bob::python::convert_gabor_image(input_image);
+  const blitz::Array<int32_t,2> positions_ = positions.bz<int32_t,2>();
+  if (include_phases){
+    bob::python::ndarray output_jets(bob::core::array::t_float64, positions_.extent(0), 2, (int)gwt.numberOfKernels());
+    blitz::Array<double,3> jets = output_jets.bz<double,3>();
+    {
+      bob::python::no_gil unlock;
+      gwt.computeJets(image, positions_, jets, normalized);
+    }
+    return output_jets;
+  } else {
+    bob::python::ndarray output_jets(bob::core::array::t_float64, positions_.extent(0), (int)gwt.numberOfKernels());
+    blitz::Array<double,2> jets = output_jets.bz<double,2>();
+    {
+      bob::python::no_gil unlock;
+      gwt.computeJets(image, positions_, jets, normalized);
+    }
+    return output_jets;
+  }
+}
 
 static void normalize_gabor_jet(bob::python::ndarray gabor_jet){
   if (gabor_jet.type().nd == 1){
@@ -308,7 +394,7 @@ void bind_ip_gabor_wavelet_transform() {
     "compute_jets",
     &compute_jets_1,
     (boost::python::arg("self"), boost::python::arg("input_image"), boost::python::arg("output_jet_image"), boost::python::arg("normalized")=true),
-    "Performs a Gabor wavelet transform and fills given image of Gabor jets. If the normalized parameter is set to True (the default), the absolute parts of the Gabor jets are normalized to unit Euclidean length."
+    "Performs a Gabor wavelet transform and fills given image of Gabor jets, which may be of type float64 or float32. If the normalized parameter is set to True (the default), the absolute parts of the Gabor jets are normalized to unit Euclidean length."
   )
 
   .def(
@@ -316,6 +402,27 @@ void bind_ip_gabor_wavelet_transform() {
     &compute_jets_2,
     (boost::python::arg("self"), boost::python::arg("input_image"), boost::python::arg("include_phases")=true, boost::python::arg("normalized")=true),
     "Performs a Gabor wavelet transform and returns the image of Gabor jets, with or without Gabor phases. If the normalized parameter is set to True (the default), the absolute parts of the Gabor jets are normalized to unit Euclidean length."
+  )
+
+  .def(
+    "perform_gwt_stack",
+    &perform_gwt_stack,
+    (boost::python::arg("self"), boost::python::arg("input_images"), boost::python::arg("n_threads")=1),
+    "Performs a Gabor wavelet transform of each gray image of the given 3D stack of images of the same size, and returns a 4D array with one trafo image per image. The Fourier transforms of the images are batched, the Gabor wavelets are generated once, and the images are split over n_threads threads."
+  )
+
+  .def(
+    "compute_jets_stack",
+    &compute_jets_stack,
+    (boost::python::arg("self"), boost::python::arg("input_images"), boost::python::arg("include_phases")=true, boost::python::arg("normalized")=true, boost::python::arg("single_precision")=false, boost::python::arg("n_threads")=1),
+    "Performs a Gabor wavelet transform of each gray image of the given 3D stack of images of the same size, and returns one image of Gabor jets per image, with or without Gabor phases. If single_precision is set to True, the jet images are returned as float32, which halves their memory. The images are split over n_threads threads."
+  )
+
+  .def(
+    "compute_jets_at",
+    &compute_jets_at,
+    (boost::python::arg("self"), boost::python::arg("input_image"), boost::python::arg("positions"), boost::python::arg("include_phases")=true, boost::python::arg("normalized")=true),
+    "Performs a Gabor wavelet transform at the given (y,x) positions only (a 2D int32 array with one position per row), and returns one Gabor jet per position, with or without Gabor phases. No full-image inverse FFT is performed, which is much faster than compute_jets() when only a few jets are required."
   );
 
   boost::python::def(
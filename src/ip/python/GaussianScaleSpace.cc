@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/GaussianScaleSpace.h>
 #include <boost/python/stl_iterator.hpp>
 
@@ -49,7 +50,9 @@ static void inner_call_c(const bob::ip::GaussianScaleSpace& op,
   for(std::vector<bob::python::const_ndarray>::iterator it=ndst.begin(); 
     it!=ndst.end(); ++it)
   vdst.push_back(it->bz<double,3>());
-  op(src.bz<T,2>(), vdst);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  bob::python::no_gil unlock;
+  op(src_, vdst);
 }
 
 static void call_c(bob::ip::GaussianScaleSpace& op, 
@@ -82,7 +85,11 @@ static object inner_call_p(const bob::ip::GaussianScaleSpace& op,
     dst_p.append(dst_i);
     dst.push_back(dst_i.bz<double,3>());
   }
-  op(src.bz<T,2>(), dst);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst);
+  }
   return dst_p;
 }
 
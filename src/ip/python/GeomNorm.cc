@@ -35,7 +35,9 @@ static void inner_call1(bob::ip::GeomNorm& obj,
   const double a, const double b)
 {
   blitz::Array<double,2> output_ = output.bz<double,2>();
-  obj(input.bz<T,2>(), output_, a,b);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj(input_, output_, a,b);
 }
 
 static void call1(bob::ip::GeomNorm& obj, bob::python::const_ndarray input,
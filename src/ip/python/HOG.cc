@@ -22,6 +22,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/core/cast.h>
 #include <bob/ip/HOG.h>
 
@@ -241,7 +242,9 @@ static void inner_gradient_maps_call1(bob::ip::GradientMaps& obj,
 {
   blitz::Array<double,2> magnitude_ = magnitude.bz<double,2>();
   blitz::Array<double,2> orientation_ = orientation.bz<double,2>();
-  obj.forward(input.bz<T,2>(), magnitude_, orientation_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj.forward(input_, magnitude_, orientation_);
 }
 
 static void gradient_maps_call1(bob::ip::GradientMaps& obj, 
@@ -300,7 +303,9 @@ static void inner_gradient_maps_call2(bob::ip::GradientMaps& obj,
 {
   blitz::Array<double,2> magnitude_ = magnitude.bz<double,2>();
   blitz::Array<double,2> orientation_ = orientation.bz<double,2>();
-  obj.forward_(input.bz<T,2>(), magnitude_, orientation_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj.forward_(input_, magnitude_, orientation_);
 }
 
 static void gradient_maps_call2(bob::ip::GradientMaps& obj, 
@@ -359,7 +364,9 @@ static void inner_hog_call1(bob::ip::HOG<double>& obj,
   bob::python::const_ndarray input, bob::python::ndarray output)
 {
   blitz::Array<double,3> output_ = output.bz<double,3>();
-  obj.forward(input.bz<T,2>(), output_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj.forward(input_, output_);
 }
 
 template <typename T> 
@@ -421,7 +428,9 @@ static void inner_hog_call2(bob::ip::HOG<double>& obj,
   bob::python::const_ndarray input, bob::python::ndarray output)
 {
   blitz::Array<T,3> output_ = output.bz<T,3>();
-  obj.forward_(input.bz<T,2>(), output_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj.forward_(input_, output_);
 }
 
 template <typename T> 
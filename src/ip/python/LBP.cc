@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 
 #include <stdint.h>
 #include <vector>
@@ -34,7 +35,9 @@ using namespace boost::python;
 template <typename T>
 static void inner_call_inout (const bob::ip::LBP& lbp, bob::python::const_ndarray input, bob::python::ndarray output) {
   blitz::Array<uint16_t,2> out_ = output.bz<uint16_t,2>();
-  lbp(input.bz<T,2>(), out_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  bob::python::no_gil unlock;
+  lbp(input_, out_);
 }
 
 static void call_inout (const bob::ip::LBP& lbp, bob::python::const_ndarray input, bob::python::ndarray output) {
@@ -61,7 +64,11 @@ static object inner_call_alloc (const bob::ip::LBP& lbp, bob::python::const_ndar
   blitz::TinyVector<int,2> shape = lbp.getLBPShape(i_);
   bob::python::ndarray out(bob::core::array::t_uint16, shape(0), shape(1));
   blitz::Array<uint16_t,2> out_ = out.bz<uint16_t,2>();
-  lbp(input.bz<T,2>(), out_);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    lbp(input_, out_);
+  }
   return out.self();
 }
 
@@ -93,7 +100,9 @@ static void inner_call_lbptop (const bob::ip::LBPTop& op, bob::python::const_nda
   blitz::Array<uint16_t,3> xy_ = xy.bz<uint16_t,3>();
   blitz::Array<uint16_t,3> xt_ = xt.bz<uint16_t,3>();
   blitz::Array<uint16_t,3> yt_ = yt.bz<uint16_t,3>();
-  op(input.bz<T,3>(), xy_, xt_, yt_);
+  blitz::Array<T,3> input_ = input.bz<T,3>();
+  bob::python::no_gil unlock;
+  op(input_, xy_, xt_, yt_);
 }
 
 static void call_lbptop (const bob::ip::LBPTop& op, bob::python::const_ndarray input, bob::python::ndarray xy, bob::python::ndarray xt, bob::python::ndarray yt) {
@@ -109,7 +118,11 @@ static void call_lbptop (const bob::ip::LBPTop& op, bob::python::const_ndarray i
 template <typename T>
 static object inner_lbp_apply (bob::ip::LBPHSFeatures& op, bob::python::const_ndarray input) {
   std::vector<blitz::Array<uint64_t,1> > dst;
-  op(input.bz<T,2>(), dst);
+  blitz::Array<T,2> input_ = input.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    op(input_, dst);
+  }
   list t;
   for(size_t i=0; i<dst.size(); ++i) t.append(dst[i]);
   return t;
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/MultiscaleRetinex.h>
 
 using namespace boost::python;
@@ -30,7 +31,9 @@ static void inner_call1(bob::ip::MultiscaleRetinex& op,
     bob::python::const_ndarray src, bob::python::ndarray dst) 
 {
   blitz::Array<double,N> dst_ = dst.bz<double,N>();
-  op(src.bz<T,N>(), dst_);
+  blitz::Array<T,N> src_ = src.bz<T,N>();
+  bob::python::no_gil unlock;
+  op(src_, dst_);
 }
 
 static void py_call1(bob::ip::MultiscaleRetinex& op, bob::python::const_ndarray src,
@@ -72,7 +75,11 @@ static object inner_call2_2d(bob::ip::MultiscaleRetinex& op,
   bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0], 
     info.shape[1]);
   blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<T,2>(), dst_);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst_);
+  }
   return dst.self();
 }
 
@@ -84,7 +91,11 @@ static object inner_call2_3d(bob::ip::MultiscaleRetinex& op,
   bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0], 
     info.shape[1], info.shape[3]);
   blitz::Array<double,3> dst_ = dst.bz<double,3>();
-  op(src.bz<T,3>(), dst_);
+  blitz::Array<T,3> src_ = src.bz<T,3>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst_);
+  }
   return dst.self();
 }
 
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/Sobel.h>
 
 using namespace boost::python;
@@ -29,7 +30,9 @@ static void call_gs1(bob::ip::Sobel& op,
   bob::python::const_ndarray src, bob::python::ndarray dst) 
 {
   blitz::Array<double,3> dst_ = dst.bz<double,3>(); 
-  op(src.bz<double,2>(), dst_);
+  blitz::Array<double,2> src_ = src.bz<double,2>();
+  bob::python::no_gil unlock;
+  op(src_, dst_);
 }
 
 
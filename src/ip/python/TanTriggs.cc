@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/TanTriggs.h>
 
 using namespace boost::python;
@@ -32,7 +33,9 @@ static void inner_call1(bob::ip::TanTriggs& obj,
   bob::python::const_ndarray src, bob::python::ndarray dst) 
 {
   blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  obj(src.bz<T,2>(), dst_);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  bob::python::no_gil unlock;
+  obj(src_, dst_);
 }
 
 static void call1(bob::ip::TanTriggs& obj, bob::python::const_ndarray src,
@@ -58,7 +61,11 @@ static object inner_call2(bob::ip::TanTriggs& op,
   bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0], 
     info.shape[1]);
   blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<T,2>(), dst_);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst_);
+  }
   return dst.self();
 }
 
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/WeightedGaussian.h>
 
 using namespace boost::python;
@@ -30,7 +31,9 @@ static void inner_call_wgs_C(bob::ip::WeightedGaussian& op,
   bob::python::const_ndarray src, bob::python::ndarray dst) 
 {
   blitz::Array<double,N> dst_ = dst.bz<double,N>();
-  op(src.bz<T,N>(), dst_);
+  blitz::Array<T,N> src_ = src.bz<T,N>();
+  bob::python::no_gil unlock;
+  op(src_, dst_);
 }
 
 static void call_wgs_C(bob::ip::WeightedGaussian& op, 
@@ -81,7 +84,11 @@ static object inner_call_wgs_P_2d(bob::ip::WeightedGaussian& op,
   bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0], 
     info.shape[1]);
   blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<T,2>(), dst_);
+  blitz::Array<T,2> src_ = src.bz<T,2>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst_);
+  }
   return dst.self();
 }
 
@@ -93,7 +100,11 @@ static object inner_call_wgs_P_3d(bob::ip::WeightedGaussian& op,
   bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0], 
     info.shape[1], info.shape[2]);
   blitz::Array<double,3> dst_ = dst.bz<double,3>();
-  op(src.bz<T,3>(), dst_);
+  blitz::Array<T,3> src_ = src.bz<T,3>();
+  {
+    bob::python::no_gil unlock;
+    op(src_, dst_);
+  }
   return dst.self();
 }
 
@@ -22,6 +22,7 @@
 
 #include <bob/ip/HornAndSchunckFlow.h>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/core/cast.h>
 
 using namespace boost::python;
@@ -38,11 +39,20 @@ static tuple vanillahs_call(const bob::ip::optflow::VanillaHornAndSchunckFlow& f
   v_ = 0;
   switch (info.nd) {
     case bob::core::array::t_uint8:
-      f(alpha, iterations, bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>()), 
-          bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>()), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>());
+        const blitz::Array<double,2> i2_ = bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>());
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, u_, v_);
+      }
       break;
     case bob::core::array::t_float64:
-      f(alpha, iterations, i1.bz<double,2>(), i2.bz<double,2>(), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = i1.bz<double,2>();
+        const blitz::Array<double,2> i2_ = i2.bz<double,2>();
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, u_, v_);
+      }
       break;
     default:
       PYTHON_ERROR(TypeError, "vanilla Horn&Schunck operator does not support array with type '%s'", info.str().c_str());
@@ -57,11 +67,20 @@ static void vanillahs_call2(const bob::ip::optflow::VanillaHornAndSchunckFlow& f
   blitz::Array<double,2> v_ = v.bz<double,2>();
   switch (i1.type().dtype) {
     case bob::core::array::t_uint8:
-      f(alpha, iterations, bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>()), 
-          bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>()), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>());
+        const blitz::Array<double,2> i2_ = bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>());
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, u_, v_);
+      }
       break;
     case bob::core::array::t_float64:
-      f(alpha, iterations, i1.bz<double,2>(), i2.bz<double,2>(), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = i1.bz<double,2>();
+        const blitz::Array<double,2> i2_ = i2.bz<double,2>();
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, u_, v_);
+      }
       break;
     default:
       PYTHON_ERROR(TypeError, "vanilla Horn&Schunck operator does not support array with type '%s'", i1.type().str().c_str());
@@ -110,13 +129,22 @@ static tuple hs_call(const bob::ip::optflow::HornAndSchunckFlow& f,
   v_ = 0;
   switch (info.nd) {
     case bob::core::array::t_uint8:
-      f(alpha, iterations, bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>()), 
-          bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>()), 
-          bob::core::array::cast<double,uint8_t>(i3.bz<uint8_t,2>()), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>());
+        const blitz::Array<double,2> i2_ = bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>());
+        const blitz::Array<double,2> i3_ = bob::core::array::cast<double,uint8_t>(i3.bz<uint8_t,2>());
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, i3_, u_, v_);
+      }
       break;
     case bob::core::array::t_float64:
-      f(alpha, iterations, i1.bz<double,2>(), i2.bz<double,2>(), 
-          i3.bz<double,2>(), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = i1.bz<double,2>();
+        const blitz::Array<double,2> i2_ = i2.bz<double,2>();
+        const blitz::Array<double,2> i3_ = i3.bz<double,2>();
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, i3_, u_, v_);
+      }
       break;
     default:
       PYTHON_ERROR(TypeError, "Horn&Schunck operator does not support array with type '%s'", info.str().c_str());
@@ -131,13 +159,22 @@ static void hs_call2(const bob::ip::optflow::HornAndSchunckFlow& f,
   blitz::Array<double,2> v_ = v.bz<double,2>();
   switch (i1.type().dtype) {
     case bob::core::array::t_uint8:
-      f(alpha, iterations, bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>()), 
-          bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>()), 
-          bob::core::array::cast<double,uint8_t>(i3.bz<uint8_t,2>()), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = bob::core::array::cast<double,uint8_t>(i1.bz<uint8_t,2>());
+        const blitz::Array<double,2> i2_ = bob::core::array::cast<double,uint8_t>(i2.bz<uint8_t,2>());
+        const blitz::Array<double,2> i3_ = bob::core::array::cast<double,uint8_t>(i3.bz<uint8_t,2>());
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, i3_, u_, v_);
+      }
       break;
     case bob::core::array::t_float64:
-      f(alpha, iterations, i1.bz<double,2>(), i2.bz<double,2>(),
-          i3.bz<double,2>(), u_, v_);
+      {
+        const blitz::Array<double,2> i1_ = i1.bz<double,2>();
+        const blitz::Array<double,2> i2_ = i2.bz<double,2>();
+        const blitz::Array<double,2> i3_ = i3.bz<double,2>();
+        bob::python::no_gil unlock;
+        f(alpha, iterations, i1_, i2_, i3_, u_, v_);
+      }
       break;
     default:
       PYTHON_ERROR(TypeError, "Horn&Schunck operator does not support array with type '%s'", i1.type().str().c_str());
@@ -197,14 +234,22 @@ static object flow_error(bob::python::const_ndarray i1, bob::python::const_ndarr
 static object laplacian_avg_hs_opencv(bob::python::const_ndarray i) {
   bob::python::ndarray o(i.type());
   blitz::Array<double,2> o_ = o.bz<double,2>();
-  bob::ip::optflow::laplacian_avg_hs_opencv(i.bz<double,2>(), o_);
+  blitz::Array<double,2> i_ = i.bz<double,2>();
+  {
+    bob::python::no_gil unlock;
+    bob::ip::optflow::laplacian_avg_hs_opencv(i_, o_);
+  }
   return o.self();
 }
 
 static object laplacian_avg_hs(bob::python::const_ndarray i) {
   bob::python::ndarray o(i.type());
   blitz::Array<double,2> o_ = o.bz<double,2>();
-  bob::ip::optflow::laplacian_avg_hs(i.bz<double,2>(), o_);
+  blitz::Array<double,2> i_ = i.bz<double,2>();
+  {
+    bob::python::no_gil unlock;
+    bob::ip::optflow::laplacian_avg_hs(i_, o_);
+  }
   return o.self();
 }
 
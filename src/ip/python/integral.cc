@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/integral.h>
 
 using namespace boost::python;
@@ -28,7 +29,9 @@ using namespace boost::python;
 template <typename T, typename U, int N>
 static void inner_integral (bob::python::const_ndarray src, bob::python::ndarray dst, bool b) {
   blitz::Array<U,N> dst_ = dst.bz<U,N>();
-  bob::ip::integral(src.bz<T,N>(), dst_, b);
+  blitz::Array<T,N> src_ = src.bz<T,N>();
+  bob::python::no_gil unlock;
+  bob::ip::integral(src_, dst_, b);
 }
 
 template <typename T, int N>
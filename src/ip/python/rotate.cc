@@ -23,6 +23,7 @@
 
 #include <bob/ip/rotate.h>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 
 static boost::python::tuple get_rotated_output_shape(
   bob::python::const_ndarray input, double angle, bool angle_in_degrees)
@@ -62,13 +63,21 @@ static void inner_rotate(bob::python::const_ndarray input,
     case 2:
       {
         blitz::Array<double,2> output_ = output.bz<double,2>();
-        bob::ip::rotate(input.bz<T,2>(), output_, angle, rotation_algorithm);
+        blitz::Array<T,2> input_ = input.bz<T,2>();
+        {
+          bob::python::no_gil unlock;
+          bob::ip::rotate(input_, output_, angle, rotation_algorithm);
+        }
         break;
       }
     case 3:
       {
         blitz::Array<double,3> output_ = output.bz<double,3>();
-        bob::ip::rotate(input.bz<T,3>(), output_, angle, rotation_algorithm);
+        blitz::Array<T,3> input_ = input.bz<T,3>();
+        {
+          bob::python::no_gil unlock;
+          bob::ip::rotate(input_, output_, angle, rotation_algorithm);
+        }
         break;
       }
     default:
@@ -112,7 +121,11 @@ static boost::python::object inner_rotate_p(bob::python::const_ndarray input,
         const blitz::TinyVector<int,2> shape = bob::ip::getRotatedShape<T>(input.bz<T,2>(), angle);
         bob::python::ndarray output(bob::core::array::t_float64, shape(0), shape(1));
         blitz::Array<double,2> output_ = output.bz<double,2>();
-        bob::ip::rotate(input.bz<T,2>(), output_, angle, rotation_algorithm);
+        blitz::Array<T,2> input_ = input.bz<T,2>();
+        {
+          bob::python::no_gil unlock;
+          bob::ip::rotate(input_, output_, angle, rotation_algorithm);
+        }
         return output.self();
       }
     case 3:
@@ -120,7 +133,11 @@ static boost::python::object inner_rotate_p(bob::python::const_ndarray input,
         const blitz::TinyVector<int,3> shape = bob::ip::getRotatedShape<T>(input.bz<T,3>(), angle);
         bob::python::ndarray output(bob::core::array::t_float64, shape(0), shape(1), shape(2));
         blitz::Array<double,3> output_ = output.bz<double,3>();
-        bob::ip::rotate(input.bz<T,3>(), output_, angle, rotation_algorithm);
+        blitz::Array<T,3> input_ = input.bz<T,3>();
+        {
+          bob::python::no_gil unlock;
+          bob::ip::rotate(input_, output_, angle, rotation_algorithm);
+        }
         return output.self();
       }
     default:
@@ -160,13 +177,21 @@ static void inner_rotate_with_mask(bob::python::const_ndarray input,
     case 2:
       {
         blitz::Array<double,2> output_ = output.bz<double,2>();
-        bob::ip::rotate(input.bz<T,2>(), output_, angle, rotation_algorithm);
+        blitz::Array<T,2> input_ = input.bz<T,2>();
+        {
+          bob::python::no_gil unlock;
+          bob::ip::rotate(input_, output_, angle, rotation_algorithm);
+        }
         break;
       }
     case 3:
       {
         blitz::Array<double,3> output_ = output.bz<double,3>();
-        bob::ip::rotate(input.bz<T,3>(), output_, angle, rotation_algorithm);
+        blitz::Array<T,3> input_ = input.bz<T,3>();
+        {
+          bob::python::no_gil unlock;
+          bob::ip::rotate(input_, output_, angle, rotation_algorithm);
+        }
         break;
       }
     default:
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/ip/scale.h>
 
 using namespace boost::python;
@@ -30,7 +31,9 @@ static void inner_scale(bob::python::const_ndarray src,
   bob::python::ndarray dst, bob::ip::Rescale::Algorithm algo)
 {
   blitz::Array<double,N> dst_ = dst.bz<double,N>();
-  bob::ip::scale(src.bz<T,N>(), dst_, algo);
+  blitz::Array<T,N> src_ = src.bz<T,N>();
+  bob::python::no_gil unlock;
+  bob::ip::scale(src_, dst_, algo);
 }
 
 static void scale(bob::python::const_ndarray src, bob::python::ndarray dst,
@@ -82,7 +85,10 @@ static void inner_scale2(bob::python::const_ndarray src,
 {
   blitz::Array<double,N> dst_ = dst.bz<double,N>();
   blitz::Array<bool,N> dmask_ = dmask.bz<bool,N>();
-  bob::ip::scale(src.bz<T,N>(), smask.bz<bool,N>(), dst_, dmask_, algo);
+  blitz::Array<T,N> src_ = src.bz<T,N>();
+  blitz::Array<bool,N> smask_ = smask.bz<bool,N>();
+  bob::python::no_gil unlock;
+  bob::ip::scale(src_, smask_, dst_, dmask_, algo);
 }
 
 static void scale2(bob::python::const_ndarray src, 
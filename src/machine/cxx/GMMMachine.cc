@@ -22,6 +22,11 @@
 #include <bob/machine/GMMMachine.h>
 #include <bob/core/assert.h>
 #include <bob/math/log.h>
+#include <bob/math/gemm.h>
+#include <algorithm>
+#include <cmath>
+
+const int bob::machine::GMMMachine::s_block_size = 256;
 
 bob::machine::GMMMachine::GMMMachine(): m_gaussians(0) {
   resize(0,0);
@@ -269,6 +274,91 @@ double bob::machine::GMMMachine::logLikelihood_(const blitz::Array<double, 1> &x
   return logLikelihood_(x,m_cache_log_weighted_gaussian_likelihoods);
 }
 
+void bob::machine::GMMMachine::logLikelihood(const blitz::Array<double,2> &X,
+  blitz::Array<double,2> &log_weighted_gaussian_likelihoods,
+  blitz::Array<double,1> &log_likelihoods) const
+{
+  // Check dimensions
+  bob::core::array::assertSameDimensionLength(X.extent(1), m_n_inputs);
+  bob::core::array::assertSameDimensionLength(log_weighted_gaussian_likelihoods.extent(0), X.extent(0));
+  bob::core::array::assertSameDimensionLength(log_weighted_gaussian_likelihoods.extent(1), m_n_gaussians);
+  bob::core::array::assertSameDimensionLength(log_likelihoods.extent(0), X.extent(0));
+  logLikelihood_(X, log_weighted_gaussian_likelihoods, log_likelihoods);
+}
+
+void bob::machine::GMMMachine::logLikelihood_(const blitz::Array<double,2> &X,
+  blitz::Array<double,2> &log_weighted_gaussian_likelihoods,
+  blitz::Array<double,1> &log_likelihoods) const
+{
+  // The working array is allocated once per call (rather than in the machine)
+  // such that this method may be called concurrently
+  blitz::Array<double,2> xx(std::min(s_block_size, X.extent(0)), m_n_inputs);
+  blitz::Range a = blitz::Range::all();
+  for (int t=0; t<X.extent(0); t+=s_block_size) {
+    const int n = std::min(s_block_size, X.extent(0)-t);
+    blitz::Range r(t, t+n-1);
+    blitz::Array<double,2> L = log_weighted_gaussian_likelihoods(r,a);
+    blitz::Array<double,1> ll = log_likelihoods(r);
+    blitz::Array<double,2> xx_n = xx(blitz::Range(0,n-1), a);
+    logLikelihoodBlock(X(r,a), xx_n, L, ll);
+  }
+}
+
+void bob::machine::GMMMachine::logLikelihood(const blitz::Array<double,2> &X,
+  blitz::Array<double,1> &log_likelihoods) const
+{
+  // Check dimensions
+  bob::core::array::assertSameDimensionLength(X.extent(1), m_n_inputs);
+  bob::core::array::assertSameDimensionLength(log_likelihoods.extent(0), X.extent(0));
+  logLikelihood_(X, log_likelihoods);
+}
+
+void bob::machine::GMMMachine::logLikelihood_(const blitz::Array<double,2> &X,
+  blitz::Array<double,1> &log_likelihoods) const
+{
+  // The log weighted Gaussian likelihoods are discarded. The working arrays
+  // are allocated once per call, such that this method may be called
+  // concurrently
+  const int n_max = std::min(s_block_size, X.extent(0));
+  blitz::Array<double,2> xx(n_max, m_n_inputs);
+  blitz::Array<double,2> L(n_max, m_n_gaussians);
+  blitz::Range a = blitz::Range::all();
+  for (int t=0; t<X.extent(0); t+=s_block_size) {
+    const int n = std::min(s_block_size, X.extent(0)-t);
+    blitz::Range r(t, t+n-1), b(0, n-1);
+    blitz::Array<double,2> xx_n = xx(b,a);
+    blitz::Array<double,2> L_n = L(b,a);
+    blitz::Array<double,1> ll = log_likelihoods(r);
+    logLikelihoodBlock(X(r,a), xx_n, L_n, ll);
+  }
+}
+
+void bob::machine::GMMMachine::logLikelihoodBlock(const blitz::Array<double,2> &X,
+  blitz::Array<double,2> &xx, blitz::Array<double,2> &L,
+  blitz::Array<double,1> &ll) const
+{
+  // Expanding the Mahalanobis distance of each Gaussian i,
+  //   log(weight_i*p(x|Gaussian_i)) = log(weight_i) + constant_i
+  //     + sum_d (x_d*mu_id/sigma_id - 1/2*x_d^2/sigma_id),
+  // the log likelihoods of all the samples are obtained with two matrix
+  // products
+  reloadCacheSupervectors();
+  xx = blitz::pow2(X);
+  bob::math::gemm_(X, m_cache_weighted_means, L, false, true);
+  bob::math::gemm_(xx, m_cache_inv_variances, L, false, true,
+    -0.5, 1.);
+  blitz::secondIndex j;
+  L += m_cache_gaussian_constants(j) + m_cache_log_weights(j);
+
+  // log(sum_i(weight_i*p(x|Gaussian_i))), relatively to the largest term
+  for (int t=0; t<L.extent(0); ++t) {
+    blitz::Array<double,1> l = L(t, blitz::Range::all());
+    const double l_max = blitz::max(l);
+    if (l_max <= bob::math::Log::LogZero) ll(t) = bob::math::Log::LogZero;
+    else ll(t) = l_max + std::log(blitz::sum(blitz::exp(l - l_max)));
+  }
+}
+
 void bob::machine::GMMMachine::forward(const blitz::Array<double,1>& input, double& output) const {
   if(static_cast<size_t>(input.extent(0)) != m_n_inputs) {
     boost::format m("expected input size (%u) does not match the size of input array (%d)");
@@ -286,24 +376,55 @@ void bob::machine::GMMMachine::forward_(const blitz::Array<double,1>& input,
 
 void bob::machine::GMMMachine::accStatistics(const blitz::Array<double,2>& input,
     bob::machine::GMMStats& stats) const {
-  // iterate over data
-  blitz::Range a = blitz::Range::all();
-  for(int i=0; i<input.extent(0); ++i) {
-    // Get example
-    blitz::Array<double,1> x(input(i,a));
-    // Accumulate statistics
-    accStatistics(x,stats);
-  }
+  // check dimensions
+  bob::core::array::assertSameDimensionLength(input.extent(1), m_n_inputs);
+  bob::core::array::assertSameDimensionLength(stats.sumPx.extent(0), m_n_gaussians);
+  bob::core::array::assertSameDimensionLength(stats.sumPx.extent(1), m_n_inputs);
+
+  accStatistics_(input, stats);
 }
 
 void bob::machine::GMMMachine::accStatistics_(const blitz::Array<double,2>& input, bob::machine::GMMStats& stats) const {
-  // iterate over data
+  // The working arrays are allocated once per call (rather than in the
+  // machine), such that this method may be called concurrently
+  const int n_max = std::min(s_block_size, input.extent(0));
+  blitz::Array<double,2> xx_all(n_max, m_n_inputs);
+  blitz::Array<double,2> L_all(n_max, m_n_gaussians);
+  blitz::Array<double,1> ll_all(n_max);
+
+  // iterate over blocks of data
   blitz::Range a = blitz::Range::all();
-  for(int i=0; i<input.extent(0); ++i) {
-    // Get example
-    blitz::Array<double,1> x(input(i, a));
+  blitz::secondIndex j;
+  for(int t=0; t<input.extent(0); t+=s_block_size) {
+    const int n = std::min(s_block_size, input.extent(0)-t);
+    blitz::Range b(0, n-1);
+    blitz::Array<double,2> X(input(blitz::Range(t, t+n-1), a));
+    blitz::Array<double,2> xx(xx_all(b,a));
+    blitz::Array<double,2> L(L_all(b,a));
+    blitz::Array<double,1> ll(ll_all(b));
+
+    // Calculate Gaussian and GMM likelihoods
+    // - L(t,i) = log(weight_i*p(x_t|gaussian_i))
+    // - ll(t) = log(sum_i(weight_i*p(x_t|gaussian_i)))
+    // (xx is set to the squared samples)
+    logLikelihoodBlock(X, xx, L, ll);
+
+    // Calculate responsibilities (in place)
+    L = blitz::exp(L - ll(blitz::tensor::i));
+
     // Accumulate statistics
-    accStatistics_(x,stats);
+    // - total likelihood
+    stats.log_likelihood += blitz::sum(ll);
+
+    // - number of samples
+    stats.T += n;
+
+    // - responsibilities
+    stats.n += blitz::sum(L(j, blitz::tensor::i), j);
+
+    // - first and second order stats
+    bob::math::gemm_(L, X, stats.sumPx, true, false, 1., 1.);
+    bob::math::gemm_(L, xx, stats.sumPxx, true, false, 1., 1.);
   }
 }
 
@@ -369,6 +490,8 @@ boost::shared_ptr<bob::machine::Gaussian> bob::machine::GMMMachine::updateGaussi
   if (i>=m_n_gaussians) {
     throw std::runtime_error("updateGaussian(): index out of bounds");
   }
+  // The Gaussian might be modified through the returned pointer
+  m_cache_supervector = false;
   return m_gaussians[i];
 }
 
@@ -425,6 +548,21 @@ void bob::machine::GMMMachine::updateCacheSupervectors() const
     m_cache_mean_supervector(range) = m_gaussians[i]->getMean();
     m_cache_variance_supervector(range) = m_gaussians[i]->getVariance();
   }
+
+  // Parameters of the expanded Gaussian log-likelihoods
+  m_cache_inv_variances.resize(m_n_gaussians, m_n_inputs);
+  m_cache_weighted_means.resize(m_n_gaussians, m_n_inputs);
+  m_cache_gaussian_constants.resize(m_n_gaussians);
+  for(size_t i=0; i<m_n_gaussians; ++i) {
+    blitz::Array<double,1> inv_variance = m_cache_inv_variances(i, blitz::Range::all());
+    blitz::Array<double,1> weighted_mean = m_cache_weighted_means(i, blitz::Range::all());
+    const blitz::Array<double,1>& mean = m_gaussians[i]->getMean();
+    const blitz::Array<double,1>& variance = m_gaussians[i]->getVariance();
+    inv_variance = 1. / variance;
+    weighted_mean = mean * inv_variance;
+    m_cache_gaussian_constants(i) = -0.5 * (m_n_inputs * bob::math::Log::Log2Pi +
+      blitz::sum(blitz::log(variance)) + blitz::sum(mean * weighted_mean));
+  }
   m_cache_supervector = true;
 }
 
@@ -180,6 +180,45 @@ void bob::machine::GaborGraphMachine::extract(
   }
 }
 
+/**
+ * Extracts the Gabor jets (including phase information) at the node positions directly from the image.
+ * The Gabor wavelet transform is computed at the node positions only, which avoids computing the full Gabor jet image.
+ * @param gwt        The Gabor wavelet transform to use
+ * @param image      The image (in spatial domain) to extract the Gabor jets from
+ * @param graph_jets The graph that will be filled
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::machine::GaborGraphMachine::extract(
+  bob::ip::GaborWaveletTransform& gwt,
+  const blitz::Array<std::complex<double>,2>& image,
+  blitz::Array<double,3>& graph_jets,
+  bool do_normalize
+) const {
+  // check the positions
+  checkPositions(image.shape()[0], image.shape()[1]);
+  // compute the Gabor jets at the node positions
+  gwt.computeJets(image, m_node_positions, graph_jets, do_normalize);
+}
+
+/**
+ * Extracts the Gabor jets (without phase information) at the node positions directly from the image.
+ * The Gabor wavelet transform is computed at the node positions only, which avoids computing the full Gabor jet image.
+ * @param gwt        The Gabor wavelet transform to use
+ * @param image      The image (in spatial domain) to extract the Gabor jets from
+ * @param graph_jets The graph that will be filled
+ * @param do_normalize Shall the Gabor jets be normalized?
+ */
+void bob::machine::GaborGraphMachine::extract(
+  bob::ip::GaborWaveletTransform& gwt,
+  const blitz::Array<std::complex<double>,2>& image,
+  blitz::Array<double,2>& graph_jets,
+  bool do_normalize
+) const {
+  // check the positions
+  checkPositions(image.shape()[0], image.shape()[1]);
+  // compute the Gabor jets at the node positions
+  gwt.computeJets(image, m_node_positions, graph_jets, do_normalize);
+}
 
 /**
  * Averages the given set of Gabor graphs into a single one by interpolating the Gabor jets
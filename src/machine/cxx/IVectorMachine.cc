@@ -21,8 +21,11 @@
 #include <bob/machine/IVectorMachine.h>
 #include <bob/core/array_copy.h>
 #include <bob/core/check.h>
+#include <bob/core/parallel.h>
+#include <bob/math/gemm.h>
 #include <bob/math/linear.h>
 #include <bob/math/linsolve.h>
+#include <boost/bind.hpp>
 
 bob::machine::IVectorMachine::IVectorMachine()
 {
@@ -184,13 +187,15 @@ void bob::machine::IVectorMachine::precompute()
       blitz::Array<double,2> Tct_sigmacInv_Tc = m_cache_Tct_sigmacInv_Tc(c, rall, rall);
       bob::math::prod(Tct_sigmacInv, Tc, Tct_sigmacInv_Tc);
     }
+
+    // sigma^{-1}.T, used to project blocks of statistics at once
+    m_cache_sigmaInvT = m_T(i,j) / m_sigma(i);
   }
 }
 
 void bob::machine::IVectorMachine::resizePrecompute()
 {
   resizeCache();
-  resizeTmp();
   precompute();
 }
 
@@ -202,18 +207,10 @@ void bob::machine::IVectorMachine::resizeCache()
     const int D = (int)m_ubm->getNInputs();
     m_cache_Tct_sigmacInv.resize(C, (int)m_rt, D); 
     m_cache_Tct_sigmacInv_Tc.resize(C, (int)m_rt, (int)m_rt);
+    m_cache_sigmaInvT.resize(C*D, (int)m_rt);
   }
 }
 
-void bob::machine::IVectorMachine::resizeTmp()
-{
-  if (m_ubm)
-    m_tmp_d.resize(m_ubm->getNInputs());
-  m_tmp_t1.resize(m_rt);
-  m_tmp_t2.resize(m_rt);
-  m_tmp_tt.resize(m_rt, m_rt);
-}
-
 void bob::machine::IVectorMachine::forward(const bob::machine::GMMStats& gs,
   blitz::Array<double,1>& ivector) const
 {
@@ -235,27 +232,226 @@ void bob::machine::IVectorMachine::computeTtSigmaInvFnorm(
   const bob::machine::GMMStats& gs, blitz::Array<double,1>& output) const
 {
   // Computes \f$T^{T} \Sigma^{-1} \sum_{c=1}^{C} (F_c - N_c ubmmean_{c})\f$
+  // The working arrays are local, as this method may be called concurrently
+  blitz::Array<double,1> tmp_d(getDimD());
+  blitz::Array<double,1> tmp_t2(m_rt);
   blitz::Range rall = blitz::Range::all();
   output = 0;
   for (int c=0; c<(int)getDimC(); ++c)
   {
-    m_tmp_d = gs.sumPx(c,rall) - gs.n(c) * m_ubm->getGaussian(c)->getMean();
+    tmp_d = gs.sumPx(c,rall) - gs.n(c) * m_ubm->getGaussian(c)->getMean();
     blitz::Array<double,2> Tct_sigmacInv = m_cache_Tct_sigmacInv(c, rall, rall);
-    bob::math::prod(Tct_sigmacInv, m_tmp_d, m_tmp_t2);
-    output += m_tmp_t2;
+    bob::math::prod(Tct_sigmacInv, tmp_d, tmp_t2);
+    output += tmp_t2;
   }
 }
 
 void bob::machine::IVectorMachine::forward_(const bob::machine::GMMStats& gs, 
   blitz::Array<double,1>& ivector) const
 {
+  // The working arrays are local, as this method may be called concurrently
+  blitz::Array<double,2> tmp_tt(m_rt, m_rt);
+  blitz::Array<double,1> tmp_t1(m_rt);
+
   // Computes \f$(Id + \sum_{c=1}^{C} N_{i,j,c} T^{T} \Sigma_{c}^{-1} T)\f$
-  computeIdTtSigmaInvT(gs, m_tmp_tt);
+  computeIdTtSigmaInvT(gs, tmp_tt);
 
   // Computes \f$T^{T} \Sigma^{-1} \sum_{c=1}^{C} (F_c - N_c ubmmean_{c})\f$
-  computeTtSigmaInvFnorm(gs, m_tmp_t1);
+  computeTtSigmaInvFnorm(gs, tmp_t1);
 
-  // Solves m_tmp_tt.ivector = m_tmp_t1
-  bob::math::linsolve(m_tmp_tt, ivector, m_tmp_t1);
+  // Solves tmp_tt.ivector = tmp_t1
+  bob::math::linsolve(tmp_tt, ivector, tmp_t1);
 }
 
+namespace bob { namespace machine { namespace detail {
+
+  /**
+   * The statistics are processed by tiles of this number of utterances,
+   * whose statistics are packed in contiguous matrices
+   */
+  static const int s_ivector_tile_size = 256;
+
+  /**
+   * Views the cached \f$T_{c}^{T} \Sigma_{c}^{-1} T_{c}\f$ blocks as a
+   * C x rt*rt matrix (one flattened block per row)
+   */
+  static blitz::Array<double,2> flatBlocks(const blitz::Array<double,3>& blocks)
+  {
+    return blitz::Array<double,2>(const_cast<double*>(blocks.data()),
+      blitz::shape(blocks.extent(0), blocks.extent(1)*blocks.extent(2)),
+      blitz::neverDeleteData);
+  }
+
+  /**
+   * Computes \f$(Id + \sum_{c=1}^{C} N_{i,j,c} T^{T} \Sigma_{c}^{-1} T)\f$
+   * for a block of utterances, given the flattened blocks P (C x rt*rt)
+   */
+  static void idTtSigmaInvT(const blitz::Array<double,2>& P, const int rt,
+    const blitz::Array<double,2>& N, blitz::Array<double,2>& output)
+  {
+    bob::math::gemm_(N, P, output);
+    for (int k=0; k<output.extent(0); ++k)
+      for (int r=0; r<rt; ++r)
+        output(k, r*rt+r) += 1.;
+  }
+
+  /**
+   * The utterances processed by a thread, together with (unshared) views of
+   * the cache of the machine, of the statistics it reads and of the
+   * ivectors it writes. The statistics are either given as a list of
+   * GMMStats (stats), or stacked in arrays (n and sumPx).
+   */
+  struct ivector_shard {
+    blitz::Array<double,2> P; ///< flattened \f$T_{c}^{T} \Sigma_{c}^{-1} T_{c}\f$ blocks
+    blitz::Array<double,2> sigmaInvT;
+    blitz::Array<double,1> ubm_mean;
+    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >* stats;
+    blitz::Array<double,2> n;
+    blitz::Array<double,3> sumPx;
+    int start; ///< index of the first utterance of the shard
+    blitz::Array<double,2> ivectors; ///< ivectors of the utterances of the shard
+  };
+
+  static void forwardShard(ivector_shard& s)
+  {
+    const int n_utts = s.ivectors.extent(0);
+    const int C = s.P.extent(0);
+    const int CD = s.sigmaInvT.extent(0);
+    const int rt = s.sigmaInvT.extent(1);
+    const int D = CD / C;
+    if (n_utts == 0) return;
+
+    const int tile = std::min(s_ivector_tile_size, n_utts);
+    blitz::Array<double,2> N(tile, C);
+    blitz::Array<double,2> Fnorm(tile, CD);
+    blitz::Array<double,2> A(tile, rt*rt);
+    blitz::Array<double,2> B(tile, rt);
+    for (int t0=0; t0<n_utts; t0+=s_ivector_tile_size) {
+      const int n = std::min(s_ivector_tile_size, n_utts-t0);
+      if (n != N.extent(0)) {
+        N.resize(n, C);
+        Fnorm.resize(n, CD);
+        A.resize(n, rt*rt);
+        B.resize(n, rt);
+      }
+
+      // Packs the zeroth order and centered first order statistics
+      for (int k=0; k<n; ++k) {
+        const int t = s.start + t0 + k;
+        for (int c=0; c<C; ++c) {
+          const double n_c = s.stats ? (*s.stats)[t]->n(c) : s.n(t,c);
+          N(k,c) = n_c;
+          for (int d=0; d<D; ++d) {
+            const double f = s.stats ? (*s.stats)[t]->sumPx(c,d) : s.sumPx(t,c,d);
+            Fnorm(k,c*D+d) = f - n_c * s.ubm_mean(c*D+d);
+          }
+        }
+      }
+
+      // Computes the systems of all the utterances of the tile at once
+      idTtSigmaInvT(s.P, rt, N, A);
+      bob::math::gemm_(Fnorm, s.sigmaInvT, B);
+
+      // Solves each system
+      for (int k=0; k<n; ++k) {
+        blitz::Array<double,2> A_k(A.data() + k*rt*rt, blitz::shape(rt,rt),
+          blitz::neverDeleteData);
+        blitz::Array<double,1> ivector = s.ivectors(t0+k, blitz::Range::all());
+        bob::math::linsolve_(A_k, ivector, B(k, blitz::Range::all()));
+      }
+    }
+  }
+
+  static void forwardShards(std::vector<ivector_shard>& shards, const size_t i)
+  {
+    forwardShard(shards[i]);
+  }
+
+  /**
+   * Extracts the ivectors of all the utterances of s, whose utterances are
+   * split into contiguous shards, one per thread
+   */
+  static void forward(ivector_shard& s, const size_t n_threads_max)
+  {
+    const int n_utts = s.ivectors.extent(0);
+    const size_t n_threads = std::min(n_threads_max, static_cast<size_t>(n_utts));
+    if (n_threads <= 1) {
+      forwardShard(s);
+      return;
+    }
+
+    std::vector<ivector_shard> shards(n_threads, s);
+    for (size_t i=0; i<n_threads; ++i) {
+      const blitz::Range r = bob::core::shard(n_utts, n_threads, i);
+      shards[i].P.reference(bob::core::array::unsharedView(s.P));
+      shards[i].sigmaInvT.reference(bob::core::array::unsharedView(s.sigmaInvT));
+      shards[i].ubm_mean.reference(bob::core::array::unsharedView(s.ubm_mean));
+      if (!s.stats) {
+        shards[i].n.reference(bob::core::array::unsharedView(s.n));
+        shards[i].sumPx.reference(bob::core::array::unsharedView(s.sumPx));
+      }
+      shards[i].start = r.first();
+      shards[i].ivectors.reference(bob::core::array::unsharedView(
+        s.ivectors(r, blitz::Range::all())));
+    }
+    bob::core::parallel(n_threads, boost::bind(&forwardShards, boost::ref(shards), _1));
+  }
+
+}}}
+
+void bob::machine::IVectorMachine::computeIdTtSigmaInvT(
+  const blitz::Array<double,2>& N, blitz::Array<double,2>& output) const
+{
+  detail::idTtSigmaInvT(detail::flatBlocks(m_cache_Tct_sigmacInv_Tc), (int)m_rt,
+    N, output);
+}
+
+void bob::machine::IVectorMachine::computeTtSigmaInvFnorm(
+  const blitz::Array<double,2>& Fnorm, blitz::Array<double,2>& output) const
+{
+  bob::math::gemm_(Fnorm, m_cache_sigmaInvT, output);
+}
+
+void bob::machine::IVectorMachine::forward(
+  const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& input,
+  blitz::Array<double,2>& output, const size_t n_threads) const
+{
+  bob::core::array::assertSameDimensionLength(output.extent(0), (int)input.size());
+  bob::core::array::assertSameDimensionLength(output.extent(1), (int)m_rt);
+  for (size_t t=0; t<input.size(); ++t) {
+    bob::core::array::assertSameDimensionLength(input[t]->sumPx.extent(0), (int)getDimC());
+    bob::core::array::assertSameDimensionLength(input[t]->sumPx.extent(1), (int)getDimD());
+  }
+
+  detail::ivector_shard s;
+  s.P.reference(detail::flatBlocks(m_cache_Tct_sigmacInv_Tc));
+  s.sigmaInvT.reference(m_cache_sigmaInvT);
+  s.ubm_mean.reference(m_ubm->getMeanSupervector());
+  s.stats = &input;
+  s.start = 0;
+  s.ivectors.reference(output);
+  detail::forward(s, n_threads);
+}
+
+void bob::machine::IVectorMachine::forward(const blitz::Array<double,2>& n,
+  const blitz::Array<double,3>& sumPx, blitz::Array<double,2>& output,
+  const size_t n_threads) const
+{
+  bob::core::array::assertSameDimensionLength(n.extent(0), sumPx.extent(0));
+  bob::core::array::assertSameDimensionLength(n.extent(1), (int)getDimC());
+  bob::core::array::assertSameDimensionLength(sumPx.extent(1), (int)getDimC());
+  bob::core::array::assertSameDimensionLength(sumPx.extent(2), (int)getDimD());
+  bob::core::array::assertSameDimensionLength(output.extent(0), n.extent(0));
+  bob::core::array::assertSameDimensionLength(output.extent(1), (int)m_rt);
+
+  detail::ivector_shard s;
+  s.P.reference(detail::flatBlocks(m_cache_Tct_sigmacInv_Tc));
+  s.sigmaInvT.reference(m_cache_sigmaInvT);
+  s.ubm_mean.reference(m_ubm->getMeanSupervector());
+  s.stats = 0;
+  s.n.reference(n);
+  s.sumPx.reference(sumPx);
+  s.start = 0;
+  s.ivectors.reference(output);
+  detail::forward(s, n_threads);
+}
@@ -24,7 +24,11 @@
 #include <bob/core/assert.h>
 #include <bob/core/check.h>
 #include <bob/core/array_copy.h>
+#include <bob/math/gemm.h>
 #include <limits>
+#include <algorithm>
+
+const int bob::machine::KMeansMachine::s_block_size = 256;
 
 bob::machine::KMeansMachine::KMeansMachine():
   m_n_means(0), m_n_inputs(0), m_means(0,0),
@@ -145,8 +149,15 @@ void bob::machine::KMeansMachine::getClosestMean(const blitz::Array<double,1> &x
 {
   min_distance = std::numeric_limits<double>::max();
 
+  // The sum over the dimensions is stopped as soon as it exceeds the 
+  // smallest distance found so far
+  const int n_inputs = static_cast<int>(m_n_inputs);
   for(size_t i=0; i<m_n_means; ++i) {
-    double this_distance = getDistanceFromMean(x,i);
+    double this_distance = 0.;
+    for(int d=0; d<n_inputs && this_distance<min_distance; ++d) {
+      const double diff = m_means(i,d) - x(d);
+      this_distance += diff * diff;
+    }
     if(this_distance < min_distance) {
       min_distance = this_distance;
       closest_mean = i;
@@ -154,6 +165,65 @@ void bob::machine::KMeansMachine::getClosestMean(const blitz::Array<double,1> &x
   }
 }
 
+void bob::machine::KMeansMachine::getClosestMeans(const blitz::Array<double,2>& x,
+  blitz::Array<int,1>& closest_means, blitz::Array<double,1>& min_distances) const
+{
+  // check arguments
+  bob::core::array::assertSameDimensionLength(x.extent(1), m_n_inputs);
+  bob::core::array::assertSameDimensionLength(closest_means.extent(0), x.extent(0));
+  bob::core::array::assertSameDimensionLength(min_distances.extent(0), x.extent(0));
+  if(m_n_means == 0 || x.extent(0) == 0) return;
+
+  blitz::firstIndex i;
+  blitz::secondIndex j;
+  blitz::Array<double,1> means_norms(m_n_means);
+  means_norms = blitz::sum(blitz::pow2(m_means(i,j)), j);
+  const double max_means_norm = blitz::max(means_norms);
+
+  // For each block of samples, the products x.mean are computed at once,
+  // and the closest mean minimizes ||mean||^2 - 2 x.mean. This expansion
+  // cancels catastrophically when the samples and the means are far from
+  // the origin compared with their distances, its error being bounded by
+  // (about) (n_inputs+2) eps (||x||^2 + ||mean||^2). The means within
+  // twice this bound of the smallest value are hence compared using the
+  // exact distances, as getClosestMean() does.
+  blitz::Range a = blitz::Range::all();
+  const int n_means = static_cast<int>(m_n_means);
+  const int n_inputs = static_cast<int>(m_n_inputs);
+  const double eps = std::numeric_limits<double>::epsilon();
+  blitz::Array<double,2> distances(std::min(s_block_size, x.extent(0)), n_means);
+  for(int t=0; t<x.extent(0); t+=s_block_size) {
+    const int n = std::min(s_block_size, x.extent(0)-t);
+    const blitz::Array<double,2> block = x(blitz::Range(t, t+n-1), a);
+    blitz::Array<double,2> d = distances(blitz::Range(0, n-1), a);
+    bob::math::gemm_(block, m_means, d, false, true, -2.);
+    for(int s=0; s<n; ++s) {
+      double min_expanded = d(s,0) + means_norms(0);
+      for(int k=1; k<n_means; ++k)
+        min_expanded = std::min(min_expanded, d(s,k) + means_norms(k));
+      const double tolerance = 4. * (n_inputs + 2) * eps *
+        (blitz::sum(blitz::pow2(block(s,a))) + max_means_norm);
+
+      int closest = 0;
+      double min_distance = std::numeric_limits<double>::max();
+      for(int k=0; k<n_means; ++k) {
+        if(d(s,k) + means_norms(k) > min_expanded + tolerance) continue;
+        double distance = 0.;
+        for(int l=0; l<n_inputs && distance<min_distance; ++l) {
+          const double diff = m_means(k,l) - block(s,l);
+          distance += diff * diff;
+        }
+        if(distance < min_distance) {
+          min_distance = distance;
+          closest = k;
+        }
+      }
+      closest_means(t+s) = closest;
+      min_distances(t+s) = min_distance;
+    }
+  }
+}
+
 double bob::machine::KMeansMachine::getMinDistance(const blitz::Array<double,1>& input) const
 {
   size_t closest_mean = 0;
@@ -184,16 +254,17 @@ void bob::machine::KMeansMachine::getVariancesAndWeightsForEachClusterAcc(const
   bob::core::array::assertSameShape(variances, m_means);
   bob::core::array::assertSameDimensionLength(weights.extent(0), m_n_means);
 
+  // find the closest means
+  blitz::Array<int,1> closest_means(data.extent(0));
+  blitz::Array<double,1> min_distances(data.extent(0));
+  getClosestMeans(data, closest_means, min_distances);
+
   // iterate over data
   blitz::Range a = blitz::Range::all();
   for(int i=0; i<data.extent(0); ++i) {
     // - get example
     blitz::Array<double,1> x(data(i,a));
-
-    // - find closest mean
-    size_t closest_mean = 0;
-    double min_distance = 0;
-    getClosestMean(x,closest_mean,min_distance);
+    const int closest_mean = closest_means(i);
 
     // - accumulate stats
     m_cache_means(closest_mean, blitz::Range::all()) += x;
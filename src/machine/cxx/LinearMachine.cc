@@ -32,8 +32,7 @@ bob::machine::LinearMachine::LinearMachine(const blitz::Array<double,2>& weight)
   : m_input_sub(weight.extent(0)),
     m_input_div(weight.extent(0)),
     m_bias(weight.extent(1)),
-    m_activation(boost::make_shared<bob::machine::IdentityActivation>()),
-    m_buffer(weight.extent(0))
+    m_activation(boost::make_shared<bob::machine::IdentityActivation>())
 {
   m_input_sub = 0.0;
   m_input_div = 1.0;
@@ -46,8 +45,7 @@ bob::machine::LinearMachine::LinearMachine():
   m_input_div(0),
   m_weight(0, 0),
   m_bias(0),
-  m_activation(boost::make_shared<bob::machine::IdentityActivation>()),
-  m_buffer(0)
+  m_activation(boost::make_shared<bob::machine::IdentityActivation>())
 {
 }
 
@@ -56,8 +54,7 @@ bob::machine::LinearMachine::LinearMachine(size_t n_input, size_t n_output):
   m_input_div(n_input),
   m_weight(n_input, n_output),
   m_bias(n_output),
-  m_activation(boost::make_shared<bob::machine::IdentityActivation>()),
-  m_buffer(n_input)
+  m_activation(boost::make_shared<bob::machine::IdentityActivation>())
 {
   m_input_sub = 0.0;
   m_input_div = 1.0;
@@ -70,8 +67,7 @@ bob::machine::LinearMachine::LinearMachine(const bob::machine::LinearMachine& ot
   m_input_div(bob::core::array::ccopy(other.m_input_div)),
   m_weight(bob::core::array::ccopy(other.m_weight)),
   m_bias(bob::core::array::ccopy(other.m_bias)),
-  m_activation(other.m_activation),
-  m_buffer(m_input_sub.shape())
+  m_activation(other.m_activation)
 {
 }
 
@@ -90,7 +86,6 @@ bob::machine::LinearMachine& bob::machine::LinearMachine::operator=
     m_weight.reference(bob::core::array::ccopy(other.m_weight));
     m_bias.reference(bob::core::array::ccopy(other.m_bias));
     m_activation = other.m_activation;
-    m_buffer.resize(m_input_sub.shape());
   }
   return *this;
 }
@@ -128,7 +123,6 @@ void bob::machine::LinearMachine::load (bob::io::HDF5File& config) {
   m_input_div.reference(config.readArray<double,1>("input_div"));
   m_weight.reference(config.readArray<double,2>("weights"));
   m_bias.reference(config.readArray<double,1>("biases"));
-  m_buffer.resize(m_input_sub.extent(0));
 
   //switch between different versions - support for version 1
   if (config.hasAttribute(".", "version")) { //new version
@@ -145,7 +139,6 @@ void bob::machine::LinearMachine::load (bob::io::HDF5File& config) {
 void bob::machine::LinearMachine::resize (size_t input, size_t output) {
   m_input_sub.resizeAndPreserve(input);
   m_input_div.resizeAndPreserve(input);
-  m_buffer.resizeAndPreserve(input);
   m_weight.resizeAndPreserve(input, output);
   m_bias.resizeAndPreserve(output);
 }
@@ -164,8 +157,10 @@ void bob::machine::LinearMachine::save (bob::io::HDF5File& config) const {
 
 void bob::machine::LinearMachine::forward_
 (const blitz::Array<double,1>& input, blitz::Array<double,1>& output) const {
-  m_buffer = (input - m_input_sub) / m_input_div;
-  bob::math::prod_(m_buffer, m_weight, output);
+  // The normalized input is a local array, such that this const method may
+  // be called concurrently
+  blitz::Array<double,1> buffer((input - m_input_sub) / m_input_div);
+  bob::math::prod_(buffer, m_weight, output);
   for (int i=0; i<m_weight.extent(1); ++i)
     output(i) = m_activation->f(output(i) + m_bias(i));
 }
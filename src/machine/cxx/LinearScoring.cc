@@ -18,71 +18,165 @@
  * along with this program.  If not, see <http://www.gnu.org/licenses/>.
  */
 #include <bob/machine/LinearScoring.h>
-#include <bob/math/linear.h>
+#include <bob/math/gemm.h>
+#include <bob/core/assert.h>
+#include <bob/core/parallel.h>
+#include <boost/bind.hpp>
+#include <limits>
 
 namespace bob { namespace machine {
 
 namespace detail {
 
-  void linearScoring(const std::vector<blitz::Array<double,1> >& models,
+  /**
+   * The test statistics are scored by tiles of this number of trials, whose
+   * centered statistics are packed in a contiguous matrix
+   */
+  static const int s_tile_size = 256;
+
+  /**
+   * The test trials scored by a thread, together with (unshared) views of
+   * the data it reads and of the scores it writes
+   */
+  struct scoring_shard {
+    blitz::Array<double,2> models; ///< packed models (one per row)
+    blitz::Array<double,1> ubm_mean;
+    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >* test_stats;
+    const std::vector<blitz::Array<double,1> >* test_channelOffset;
+    bool frame_length_normalisation;
+    int start; ///< index of the first test trial of the shard
+    blitz::Array<double,2> scores; ///< scores of the trials of the shard
+  };
+
+  static void scoreShard(scoring_shard& s)
+  {
+    const int Tm = s.scores.extent(0);
+    const int Tt = s.scores.extent(1);
+    const int CD = s.models.extent(1);
+    if (Tt == 0) return;
+
+    blitz::Array<double,2> B(std::min(s_tile_size, Tt), CD);
+    blitz::Array<double,2> S(Tm, B.extent(0));
+    for (int t0=0; t0<Tt; t0+=s_tile_size) {
+      const int n = std::min(s_tile_size, Tt-t0);
+      if (n != B.extent(0)) {
+        B.resize(n, CD);
+        S.resize(Tm, n);
+      }
+
+      // Packs the centered (and normalised) statistics of the tile
+      for (int k=0; k<n; ++k) {
+        const int t = s.start + t0 + k;
+        const bob::machine::GMMStats& stats = *(*s.test_stats)[t];
+        const int D = stats.sumPx.extent(1);
+        const double sum_N = stats.T;
+        const bool zero = s.frame_length_normalisation &&
+          sum_N <= std::numeric_limits<double>::epsilon() &&
+          sum_N >= -std::numeric_limits<double>::epsilon();
+        for (int d=0; d<CD; ++d) {
+          double mean = s.ubm_mean(d);
+          if (s.test_channelOffset) mean += (*s.test_channelOffset)[t](d);
+          B(k,d) = stats.sumPx(d/D, d%D) - stats.n(d/D) * mean;
+          if (zero) B(k,d) = 0;
+          else if (s.frame_length_normalisation) B(k,d) /= sum_N;
+        }
+      }
+
+      // Scores all the models against the tile at once
+      bob::math::gemm_(s.models, B, S, false, true);
+      s.scores(blitz::Range::all(), blitz::Range(t0, t0+n-1)) = S;
+    }
+  }
+
+  static void scoreShards(std::vector<scoring_shard>& shards, const size_t i)
+  {
+    scoreShard(shards[i]);
+  }
+
+  /**
+   * Scores the packed models (one model per row, already centered and
+   * divided by the variance) against all the test statistics. The test
+   * trials are split into contiguous shards, one per thread.
+   */
+  static void linearScoring(const blitz::Array<double,2>& A,
                      const blitz::Array<double,1>& ubm_mean,
-                     const blitz::Array<double,1>& ubm_variance,
                      const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                      const std::vector<blitz::Array<double,1> >* test_channelOffset,
                      const bool frame_length_normalisation,
-                     blitz::Array<double,2>& scores) 
+                     blitz::Array<double,2>& scores,
+                     const size_t n_threads_max)
   {
-    int C = test_stats[0]->sumPx.extent(0);
-    int D = test_stats[0]->sumPx.extent(1);
-    int CD = C*D;
-    int Tt = test_stats.size();
-    int Tm = models.size();
+    const int CD = A.extent(1);
+    const int Tt = test_stats.size();
 
     // Check output size
-    bob::core::array::assertSameDimensionLength(scores.extent(0), models.size());
-    bob::core::array::assertSameDimensionLength(scores.extent(1), test_stats.size());
+    bob::core::array::assertSameDimensionLength(scores.extent(0), A.extent(0));
+    bob::core::array::assertSameDimensionLength(scores.extent(1), Tt);
+    bob::core::array::assertSameDimensionLength(ubm_mean.extent(0), CD);
+    for (int t=0; t<Tt; ++t)
+      bob::core::array::assertSameDimensionLength(test_stats[t]->sumPx.size(), CD);
+    if (test_channelOffset) {
+      bob::core::array::assertSameDimensionLength((*test_channelOffset).size(), Tt);
+      for (int t=0; t<Tt; ++t)
+        bob::core::array::assertSameDimensionLength((*test_channelOffset)[t].extent(0), CD);
+    }
 
-    blitz::Array<double,2> A(Tm, CD);
-    blitz::Array<double,2> B(CD, Tt);
+    scoring_shard s;
+    s.ubm_mean.reference(ubm_mean);
+    s.test_stats = &test_stats;
+    s.test_channelOffset = test_channelOffset;
+    s.frame_length_normalisation = frame_length_normalisation;
+    s.start = 0;
 
-    // 1) Compute A
-    for(int t=0; t<Tm; ++t) {
-      blitz::Array<double, 1> tmp = A(t, blitz::Range::all());
-      tmp = (models[t] - ubm_mean) / ubm_variance;
+    const size_t n_threads = std::min(n_threads_max, static_cast<size_t>(Tt));
+    if (n_threads <= 1) {
+      s.models.reference(A);
+      s.scores.reference(scores);
+      scoreShard(s);
+      return;
     }
 
-    // 2) Compute B
-    if(test_channelOffset == 0) {
-      for(int t=0; t<Tt; ++t) 
-        for(int s=0; s<CD; ++s)
-          B(s, t) = test_stats[t]->sumPx(s/D, s%D) - (ubm_mean(s) * test_stats[t]->n(s/D));
+    std::vector<scoring_shard> shards(n_threads, s);
+    for (size_t i=0; i<n_threads; ++i) {
+      const blitz::Range r = bob::core::shard(Tt, n_threads, i);
+      shards[i].models.reference(bob::core::array::unsharedView(A));
+      shards[i].ubm_mean.reference(bob::core::array::unsharedView(ubm_mean));
+      shards[i].start = r.first();
+      shards[i].scores.reference(bob::core::array::unsharedView(
+        scores(blitz::Range::all(), r)));
     }
-    else {
-      bob::core::array::assertSameDimensionLength((*test_channelOffset).size(), Tt);
-      
-      for(int t=0; t<Tt; ++t) {
-        bob::core::array::assertSameDimensionLength((*test_channelOffset)[t].extent(0), CD);
-        for(int s=0; s<CD; ++s) 
-          B(s, t) = test_stats[t]->sumPx(s/D, s%D) - (test_stats[t]->n(s/D) * (ubm_mean(s) + (*test_channelOffset)[t](s)));
-      }
-    }
-
-    // Apply the normalisation if needed
-    if(frame_length_normalisation) {
-      for(int t=0; t<Tt; ++t) {
-        double sum_N = test_stats[t]->T;
-        blitz::Array<double, 1> v_t = B(blitz::Range::all(),t);
+    bob::core::parallel(n_threads, boost::bind(&scoreShards, boost::ref(shards), _1));
+  }
 
-        if (sum_N <= std::numeric_limits<double>::epsilon() && sum_N >= -std::numeric_limits<double>::epsilon())
-          v_t = 0;
-        else 
-          v_t /= sum_N;
-      }
+  /**
+   * Packs the models, centered and divided by the variance, one per row
+   */
+  static void packModels(const std::vector<blitz::Array<double,1> >& models,
+                         const blitz::Array<double,1>& ubm_mean,
+                         const blitz::Array<double,1>& ubm_variance,
+                         blitz::Array<double,2>& A)
+  {
+    A.resize(models.size(), ubm_mean.extent(0));
+    for (int t=0; t<A.extent(0); ++t) {
+      bob::core::array::assertSameDimensionLength(models[t].extent(0), A.extent(1));
+      blitz::Array<double,1> tmp = A(t, blitz::Range::all());
+      tmp = (models[t] - ubm_mean) / ubm_variance;
     }
+  }
 
-    // 3) Compute LLR
-    bob::math::prod(A, B, scores);
-  } 
+  static void packModels(const std::vector<boost::shared_ptr<const bob::machine::GMMMachine> >& models,
+                         const bob::machine::GMMMachine& ubm,
+                         blitz::Array<double,2>& A)
+  {
+    const blitz::Array<double,1>& ubm_mean = ubm.getMeanSupervector();
+    const blitz::Array<double,1>& ubm_variance = ubm.getVarianceSupervector();
+    A.resize(models.size(), ubm_mean.extent(0));
+    for (int t=0; t<A.extent(0); ++t) {
+      blitz::Array<double,1> tmp = A(t, blitz::Range::all());
+      models[t]->getMeanSupervector(tmp);
+      tmp = (tmp - ubm_mean) / ubm_variance;
+    }
+  }
 }
 
 
@@ -91,39 +185,36 @@ void linearScoring(const std::vector<blitz::Array<double,1> >& models,
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const std::vector<blitz::Array<double,1> >& test_channelOffset,
                    const bool frame_length_normalisation,
-                   blitz::Array<double, 2>& scores)
+                   blitz::Array<double, 2>& scores,
+                   const size_t n_threads)
 {
-  detail::linearScoring(models, ubm_mean, ubm_variance, test_stats, &test_channelOffset, frame_length_normalisation, scores);
+  blitz::Array<double,2> A;
+  detail::packModels(models, ubm_mean, ubm_variance, A);
+  detail::linearScoring(A, ubm_mean, test_stats, &test_channelOffset, frame_length_normalisation, scores, n_threads);
 }
 
 void linearScoring(const std::vector<blitz::Array<double,1> >& models,
                    const blitz::Array<double,1>& ubm_mean, const blitz::Array<double,1>& ubm_variance,
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const bool frame_length_normalisation,
-                   blitz::Array<double, 2>& scores)
+                   blitz::Array<double, 2>& scores,
+                   const size_t n_threads)
 {
-  detail::linearScoring(models, ubm_mean, ubm_variance, test_stats, 0, frame_length_normalisation, scores);
+  blitz::Array<double,2> A;
+  detail::packModels(models, ubm_mean, ubm_variance, A);
+  detail::linearScoring(A, ubm_mean, test_stats, 0, frame_length_normalisation, scores, n_threads);
 }
 
 void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMachine> >& models,
                    const bob::machine::GMMMachine& ubm,
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const bool frame_length_normalisation,
-                   blitz::Array<double, 2>& scores) 
+                   blitz::Array<double, 2>& scores,
+                   const size_t n_threads)
 {
-  int C = test_stats[0]->sumPx.extent(0);
-  int D = test_stats[0]->sumPx.extent(1);
-  int CD = C*D;
-  std::vector<blitz::Array<double,1> > models_b;
-  // Allocate and get the mean supervector
-  for(size_t i=0; i<models.size(); ++i) {
-    blitz::Array<double,1> mod(CD);
-    models[i]->getMeanSupervector(mod);
-    models_b.push_back(mod);
-  }
-  const blitz::Array<double,1>& ubm_mean = ubm.getMeanSupervector();
-  const blitz::Array<double,1>& ubm_variance = ubm.getVarianceSupervector();
-  detail::linearScoring(models_b, ubm_mean, ubm_variance, test_stats, 0, frame_length_normalisation, scores);
+  blitz::Array<double,2> A;
+  detail::packModels(models, ubm, A);
+  detail::linearScoring(A, ubm.getMeanSupervector(), test_stats, 0, frame_length_normalisation, scores, n_threads);
 }
 
 void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMachine> >& models,
@@ -131,25 +222,14 @@ void linearScoring(const std::vector<boost::shared_ptr<const bob::machine::GMMMa
                    const std::vector<boost::shared_ptr<const bob::machine::GMMStats> >& test_stats,
                    const std::vector<blitz::Array<double,1> >& test_channelOffset,
                    const bool frame_length_normalisation,
-                   blitz::Array<double, 2>& scores) 
+                   blitz::Array<double, 2>& scores,
+                   const size_t n_threads)
 {
-  int C = test_stats[0]->sumPx.extent(0);
-  int D = test_stats[0]->sumPx.extent(1);
-  int CD = C*D;
-  std::vector<blitz::Array<double,1> > models_b;
-  // Allocate and get the mean supervector
-  for(size_t i=0; i<models.size(); ++i) {
-    blitz::Array<double,1> mod(CD);
-    models[i]->getMeanSupervector(mod);
-    models_b.push_back(mod);
-  }
-  const blitz::Array<double,1>& ubm_mean = ubm.getMeanSupervector();
-  const blitz::Array<double,1>& ubm_variance = ubm.getVarianceSupervector();
-  detail::linearScoring(models_b, ubm_mean, ubm_variance, test_stats, &test_channelOffset, frame_length_normalisation, scores);
+  blitz::Array<double,2> A;
+  detail::packModels(models, ubm, A);
+  detail::linearScoring(A, ubm.getMeanSupervector(), test_stats, &test_channelOffset, frame_length_normalisation, scores, n_threads);
 }
 
-
-
 double linearScoring(const blitz::Array<double,1>& models,
                      const blitz::Array<double,1>& ubm_mean, const blitz::Array<double,1>& ubm_variance,
                      const bob::machine::GMMStats& test_stats,
@@ -37,8 +37,7 @@ bob::machine::MLP::MLP (size_t input, size_t output):
   m_weight(1),
   m_bias(1),
   m_hidden_activation(boost::make_shared<bob::machine::HyperbolicTangentActivation>()),
-  m_output_activation(m_hidden_activation),
-  m_buffer(1)
+  m_output_activation(m_hidden_activation)
 {
   resize(input, output);
   m_input_sub = 0;
@@ -53,8 +52,7 @@ bob::machine::MLP::MLP (size_t input, size_t hidden, size_t output):
   m_weight(2),
   m_bias(2),
   m_hidden_activation(boost::make_shared<bob::machine::HyperbolicTangentActivation>()),
-  m_output_activation(m_hidden_activation),
-  m_buffer(2)
+  m_output_activation(m_hidden_activation)
 {
   resize(input, hidden, output);
   m_input_sub = 0;
@@ -69,8 +67,7 @@ bob::machine::MLP::MLP (size_t input, const std::vector<size_t>& hidden, size_t
   m_weight(hidden.size()+1),
   m_bias(hidden.size()+1),
   m_hidden_activation(boost::make_shared<bob::machine::HyperbolicTangentActivation>()),
-  m_output_activation(m_hidden_activation),
-  m_buffer(hidden.size()+1)
+  m_output_activation(m_hidden_activation)
 {
   resize(input, hidden, output);
   m_input_sub = 0;
@@ -96,13 +93,11 @@ bob::machine::MLP::MLP (const bob::machine::MLP& other):
   m_weight(other.m_weight.size()),
   m_bias(other.m_bias.size()),
   m_hidden_activation(other.m_hidden_activation),
-  m_output_activation(other.m_output_activation),
-  m_buffer(other.m_buffer.size())
+  m_output_activation(other.m_output_activation)
 {
   for (size_t i=0; i<other.m_weight.size(); ++i) {
     m_weight[i].reference(bob::core::array::ccopy(other.m_weight[i]));
     m_bias[i].reference(bob::core::array::ccopy(other.m_bias[i]));
-    m_buffer[i].reference(bob::core::array::ccopy(other.m_buffer[i]));
   }
 }
 
@@ -121,11 +116,9 @@ bob::machine::MLP& bob::machine::MLP::operator= (const MLP& other) {
     m_bias.resize(other.m_bias.size());
     m_hidden_activation = other.m_hidden_activation;
     m_output_activation = other.m_output_activation;
-    m_buffer.resize(other.m_buffer.size());
     for (size_t i=0; i<other.m_weight.size(); ++i) {
       m_weight[i].reference(bob::core::array::ccopy(other.m_weight[i]));
       m_bias[i].reference(bob::core::array::ccopy(other.m_bias[i]));
-      m_buffer[i].reference(bob::core::array::ccopy(other.m_buffer[i]));
     }
   }
   return *this;
@@ -160,7 +153,6 @@ void bob::machine::MLP::load (bob::io::HDF5File& config) {
   uint8_t nhidden = config.read<uint8_t>("nhidden");
   m_weight.resize(nhidden+1);
   m_bias.resize(nhidden+1);
-  m_buffer.resize(nhidden+1);
 
   //configures the input
   m_input_sub.reference(config.readArray<double,1>("input_sub"));
@@ -189,13 +181,6 @@ void bob::machine::MLP::load (bob::io::HDF5File& config) {
     m_hidden_activation = bob::machine::make_deprecated_activation(act);
     m_output_activation = m_hidden_activation;
   }
-
-  //setup buffers: first, input
-  m_buffer[0].reference(blitz::Array<double,1>(m_input_sub.shape()));
-  for (size_t i=1; i<m_weight.size(); ++i) {
-    //buffers have to be sized the same as the input for the next layer
-    m_buffer[i].reference(blitz::Array<double,1>(m_weight[i].extent(0)));
-  }
 }
 
 void bob::machine::MLP::save (bob::io::HDF5File& config) const {
@@ -221,29 +206,48 @@ void bob::machine::MLP::save (bob::io::HDF5File& config) const {
   config.cd("..");
 }
 
+void bob::machine::MLP::allocateBuffer
+(std::vector<blitz::Array<double,1> >& buffer) const {
+  //buffers have to be sized the same as the input for the next layer
+  buffer.resize(m_weight.size());
+  for (size_t i=0; i<m_weight.size(); ++i) {
+    buffer[i].resize(m_weight[i].extent(0));
+  }
+}
+
 void bob::machine::MLP::forward_ (const blitz::Array<double,1>& input,
-    blitz::Array<double,1>& output) {
+    blitz::Array<double,1>& output,
+    std::vector<blitz::Array<double,1> >& buffer) const {
 
   //doesn't check input, just computes
-  m_buffer[0] = (input - m_input_sub) / m_input_div;
+  buffer[0] = (input - m_input_sub) / m_input_div;
 
   //input -> hidden[0]; hidden[0] -> hidden[1], ..., hidden[N-2] -> hidden[N-1]
   for (size_t j=1; j<m_weight.size(); ++j) {
-    bob::math::prod_(m_buffer[j-1], m_weight[j-1], m_buffer[j]);
-    m_buffer[j] += m_bias[j-1];
-    for (int i=0; i<m_buffer[j].extent(0); ++i) {
-      m_buffer[j](i) = m_hidden_activation->f(m_buffer[j](i));
+    bob::math::prod_(buffer[j-1], m_weight[j-1], buffer[j]);
+    buffer[j] += m_bias[j-1];
+    for (int i=0; i<buffer[j].extent(0); ++i) {
+      buffer[j](i) = m_hidden_activation->f(buffer[j](i));
     }
   }
 
   //hidden[N-1] -> output
-  bob::math::prod_(m_buffer.back(), m_weight.back(), output);
+  bob::math::prod_(buffer.back(), m_weight.back(), output);
   output += m_bias.back();
   for (int i=0; i<output.extent(0); ++i) {
     output(i) = m_output_activation->f(output(i));
   }
 }
 
+void bob::machine::MLP::forward_ (const blitz::Array<double,1>& input,
+    blitz::Array<double,1>& output) {
+  //the outputs of the layers are buffered by each call (rather than by the
+  //machine), so that this method may be called concurrently
+  std::vector<blitz::Array<double,1> > buffer;
+  allocateBuffer(buffer);
+  forward_(input, output, buffer);
+}
+
 void bob::machine::MLP::forward (const blitz::Array<double,1>& input,
     blitz::Array<double,1>& output) {
 
@@ -264,11 +268,14 @@ void bob::machine::MLP::forward (const blitz::Array<double,1>& input,
 void bob::machine::MLP::forward_ (const blitz::Array<double,2>& input,
     blitz::Array<double,2>& output) {
 
+  //the buffers are allocated once for all the rows
+  std::vector<blitz::Array<double,1> > buffer;
+  allocateBuffer(buffer);
   blitz::Range all = blitz::Range::all();
   for (int i=0; i<input.extent(0); ++i) {
     blitz::Array<double,1> inref(input(i,all));
     blitz::Array<double,1> outref(output(i,all));
-    forward_(inref, outref);
+    forward_(inref, outref, buffer);
   }
 }
 
@@ -300,8 +307,6 @@ void bob::machine::MLP::resize (size_t input, size_t output) {
   m_weight[0].reference(blitz::Array<double,2>(input, output));
   m_bias.resize(1);
   m_bias[0].reference(blitz::Array<double,1>(output));
-  m_buffer.resize(1);
-  m_buffer[0].reference(blitz::Array<double,1>(input));
   setWeights(0);
   setBiases(0);
 }
@@ -325,25 +330,21 @@ void bob::machine::MLP::resize (size_t input, const std::vector<size_t>& hidden,
   m_input_div = 1;
   m_weight.resize(hidden.size()+1);
   m_bias.resize(hidden.size()+1);
-  m_buffer.resize(hidden.size()+1);
   
   //initializes first layer
   m_weight[0].reference(blitz::Array<double,2>(input, hidden[0]));
   m_bias[0].reference(blitz::Array<double,1>(hidden[0]));
-  m_buffer[0].reference(blitz::Array<double,1>(input));
 
   //initializes hidden layers
   const size_t NH1 = hidden.size()-1;
   for (size_t i=0; i<NH1; ++i) {
     m_weight[i+1].reference(blitz::Array<double,2>(hidden[i], hidden[i+1]));
     m_bias[i+1].reference(blitz::Array<double,1>(hidden[i+1]));
-    m_buffer[i+1].reference(blitz::Array<double,1>(hidden[i]));
   }
 
   //initializes the last layer
   m_weight.back().reference(blitz::Array<double,2>(hidden.back(), output));
   m_bias.back().reference(blitz::Array<double,1>(output));
-  m_buffer.back().reference(blitz::Array<double,1>(hidden.back()));
   
   setWeights(0);
   setBiases(0);
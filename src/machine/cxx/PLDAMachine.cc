@@ -27,9 +27,13 @@
 #include <bob/math/linear.h>
 #include <bob/math/det.h>
 #include <bob/math/inv.h>
+#include <bob/math/gemm.h>
+#include <bob/core/parallel.h>
 
 #include <cmath>
+#include <algorithm>
 #include <boost/lexical_cast.hpp>
+#include <boost/bind.hpp>
 #include <string>
 
 bob::machine::PLDABase::PLDABase():
@@ -325,10 +329,7 @@ void bob::machine::PLDABase::resizeNoInit(const size_t dim_d, const size_t dim_f
 
 void bob::machine::PLDABase::resizeTmp()
 {
-  m_tmp_d_1.resize(m_dim_d);
-  m_tmp_d_2.resize(m_dim_d);
   m_tmp_d_ng_1.resize(m_dim_d, m_dim_g);
-  m_tmp_nf_nf_1.resize(m_dim_f, m_dim_f);
   m_tmp_ng_ng_1.resize(m_dim_g, m_dim_g);
 }
 
@@ -496,16 +497,20 @@ void bob::machine::PLDABase::computeGamma(const size_t a,
   // gamma = (Id + a.F^T.beta.F)^-1
 
   // Checks destination size
-  bob::core::array::assertSameShape(res, m_tmp_nf_nf_1);
-  // m_tmp_nf_nf_1 = F^T.beta.F
-  bob::math::prod(m_cache_Ft_beta, m_F, m_tmp_nf_nf_1);
-   // m_tmp_nf_nf_1 = a.F^T.beta.F
-  m_tmp_nf_nf_1 *= static_cast<double>(a);
-  // m_tmp_nf_nf_1 = Id + a.F^T.beta.F
-  for(int i=0; i<m_tmp_nf_nf_1.extent(0); ++i) m_tmp_nf_nf_1(i,i) += 1;
+  bob::core::array::assertSameDimensionLength(res.extent(0), m_dim_f);
+  bob::core::array::assertSameDimensionLength(res.extent(1), m_dim_f);
+  // The working array is local, as this method may be called concurrently
+  // (e.g. by pldaScoring())
+  // tmp = F^T.beta.F
+  blitz::Array<double,2> tmp(m_dim_f, m_dim_f);
+  bob::math::prod(m_cache_Ft_beta, m_F, tmp);
+   // tmp = a.F^T.beta.F
+  tmp *= static_cast<double>(a);
+  // tmp = Id + a.F^T.beta.F
+  for(int i=0; i<tmp.extent(0); ++i) tmp(i,i) += 1;
 
   // res = (Id + a.F^T.beta.F)^-1
-  bob::math::inv(m_tmp_nf_nf_1, res);
+  bob::math::inv(tmp, res);
 }
 
 void bob::machine::PLDABase::precomputeLogDetAlpha()
@@ -572,14 +577,16 @@ double bob::machine::PLDABase::computeLogLikelihoodPointEstimate(
   // Computes: -D/2 log(2pi) -1/2 log(det(\Sigma)) 
   //   -1/2 {(x_{ij}-(\mu+Fh_{i}+Gw_{ij}))^{T}\Sigma^{-1}(x_{ij}-(\mu+Fh_{i}+Gw_{ij}))}
   double res = -0.5*((double)m_dim_d)*log(2*M_PI) - 0.5*m_cache_logdet_sigma;
-  // m_tmp_d_1 = (x_{ij} - (\mu+Fh_{i}+Gw_{ij}))
-  m_tmp_d_1 = xij - m_mu;
-  bob::math::prod(m_F, hi, m_tmp_d_2);
-  m_tmp_d_1 -= m_tmp_d_2;
-  bob::math::prod(m_G, wij, m_tmp_d_2);
-  m_tmp_d_1 -= m_tmp_d_2;
+  // The working arrays are local, as this method may be called concurrently
+  blitz::Array<double,1> tmp_d_1(m_dim_d), tmp_d_2(m_dim_d);
+  // tmp_d_1 = (x_{ij} - (\mu+Fh_{i}+Gw_{ij}))
+  tmp_d_1 = xij - m_mu;
+  bob::math::prod(m_F, hi, tmp_d_2);
+  tmp_d_1 -= tmp_d_2;
+  bob::math::prod(m_G, wij, tmp_d_2);
+  tmp_d_1 -= tmp_d_2;
   // add third term to res
-  res += -0.5*blitz::sum(blitz::pow2(m_tmp_d_1) * m_cache_isigma);
+  res += -0.5*blitz::sum(blitz::pow2(tmp_d_1) * m_cache_isigma);
   return res;
 }
 
@@ -604,8 +611,7 @@ namespace bob{
 bob::machine::PLDAMachine::PLDAMachine():
   m_plda_base(),
   m_n_samples(0), m_nh_sum_xit_beta_xi(0), m_weighted_sum(0), 
-  m_loglikelihood(0), m_cache_gamma(), m_cache_loglike_constterm(),
-  m_tmp_d_1(0), m_tmp_d_2(0), m_tmp_nf_1(0), m_tmp_nf_2(0), m_tmp_nf_nf_1(0,0)
+  m_loglikelihood(0), m_cache_gamma(), m_cache_loglike_constterm()
 {
 }
 
@@ -614,7 +620,6 @@ bob::machine::PLDAMachine::PLDAMachine(const boost::shared_ptr<bob::machine::PLD
   m_n_samples(0), m_nh_sum_xit_beta_xi(0), m_weighted_sum(plda_base->getDimF()),
   m_loglikelihood(0), m_cache_gamma(), m_cache_loglike_constterm()
 {
-  resizeTmp();
 }
 
 
@@ -627,7 +632,6 @@ bob::machine::PLDAMachine::PLDAMachine(const bob::machine::PLDAMachine& other):
   m_cache_loglike_constterm(other.m_cache_loglike_constterm)
 {
   bob::core::array::ccopy(other.m_cache_gamma, m_cache_gamma);
-  resizeTmp();
 }
 
 bob::machine::PLDAMachine::PLDAMachine(bob::io::HDF5File& config,
@@ -652,7 +656,6 @@ bob::machine::PLDAMachine& bob::machine::PLDAMachine::operator=
     m_loglikelihood = other.m_loglikelihood;
     bob::core::array::ccopy(other.m_cache_gamma, m_cache_gamma);
     m_cache_loglike_constterm = other.m_cache_loglike_constterm;
-    resizeTmp();
   }
   return *this;
 }
@@ -722,7 +725,6 @@ void bob::machine::PLDAMachine::load(bob::io::HDF5File& config)
       m_cache_loglike_constterm[a_indices(i)] = config.read<double>(str2);
     }
   }
-  resizeTmp();
 }
 
 void bob::machine::PLDAMachine::save(bob::io::HDF5File& config) const 
@@ -756,7 +758,6 @@ void bob::machine::PLDAMachine::setPLDABase(const boost::shared_ptr<bob::machine
   m_plda_base = plda_base; 
   m_weighted_sum.resizeAndPreserve(getDimF());
   clearMaps();
-  resizeTmp();
 }
 
 
@@ -850,28 +851,31 @@ double bob::machine::PLDAMachine::computeLogLikelihood(const blitz::Array<double
   const blitz::Array<double,2>& Ft_beta = getPLDABase()->getFtBeta();
   const blitz::Array<double,1>& mu = getPLDABase()->getMu();
   double terma = (enrol?m_nh_sum_xit_beta_xi:0.);
+  // The working arrays are local, as this method may be called concurrently
+  blitz::Array<double,1> tmp_d_1(getDimD()), tmp_d_2(getDimD());
+  blitz::Array<double,1> tmp_nf_1(getDimF()), tmp_nf_2(getDimF());
   // sumWeighted
-  if (enrol && m_n_samples > 0) m_tmp_nf_1 = m_weighted_sum;
-  else m_tmp_nf_1 = 0;
+  if (enrol && m_n_samples > 0) tmp_nf_1 = m_weighted_sum;
+  else tmp_nf_1 = 0;
   
   // terma += -1 / 2. * (xi^t*beta*xi)
-  m_tmp_d_1 = sample - mu;
-  bob::math::prod(beta, m_tmp_d_1, m_tmp_d_2);
-  terma += -1 / 2. * (blitz::sum(m_tmp_d_1*m_tmp_d_2));
+  tmp_d_1 = sample - mu;
+  bob::math::prod(beta, tmp_d_1, tmp_d_2);
+  terma += -1 / 2. * (blitz::sum(tmp_d_1*tmp_d_2));
     
   // sumWeighted
-  bob::math::prod(Ft_beta, m_tmp_d_1, m_tmp_nf_2);
-  m_tmp_nf_1 += m_tmp_nf_2;
+  bob::math::prod(Ft_beta, tmp_d_1, tmp_nf_2);
+  tmp_nf_1 += tmp_nf_2;
   blitz::Array<double,2> gamma_a;
   if (hasGamma(n_samples) || m_plda_base->hasGamma(n_samples))
     gamma_a.reference(getGamma(n_samples));
   else
   {
-    gamma_a.reference(m_tmp_nf_nf_1);
+    gamma_a.resize(getDimF(), getDimF());
     m_plda_base->computeGamma(n_samples, gamma_a);
   }
-  bob::math::prod(gamma_a, m_tmp_nf_1, m_tmp_nf_2);
-  double termb = 1 / 2. * (blitz::sum(m_tmp_nf_1*m_tmp_nf_2));
+  bob::math::prod(gamma_a, tmp_nf_1, tmp_nf_2);
+  double termb = 1 / 2. * (blitz::sum(tmp_nf_1*tmp_nf_2));
 
   // 1/2/ Constant term of the log likelihood:
   //      1/ First term of the likelihood: -Nsamples*D/2*log(2*PI)
@@ -903,20 +907,23 @@ double bob::machine::PLDAMachine::computeLogLikelihood(const blitz::Array<double
   const blitz::Array<double,2>& Ft_beta = getPLDABase()->getFtBeta();
   const blitz::Array<double,1>& mu = getPLDABase()->getMu();
   double terma = (enrol?m_nh_sum_xit_beta_xi:0.);
+  // The working arrays are local, as this method may be called concurrently
+  blitz::Array<double,1> tmp_d_1(getDimD()), tmp_d_2(getDimD());
+  blitz::Array<double,1> tmp_nf_1(getDimF()), tmp_nf_2(getDimF());
   // sumWeighted
-  if (enrol && m_n_samples > 0) m_tmp_nf_1 = m_weighted_sum;
-  else m_tmp_nf_1 = 0;
+  if (enrol && m_n_samples > 0) tmp_nf_1 = m_weighted_sum;
+  else tmp_nf_1 = 0;
   for (int k=0; k<samples.extent(0); ++k) 
   {
     blitz::Array<double,1> samp = samples(k,blitz::Range::all());
-    m_tmp_d_1 = samp - mu;
+    tmp_d_1 = samp - mu;
     // terma += -1 / 2. * (xi^t*beta*xi)
-    bob::math::prod(beta, m_tmp_d_1, m_tmp_d_2);
-    terma += -1 / 2. * (blitz::sum(m_tmp_d_1*m_tmp_d_2));
+    bob::math::prod(beta, tmp_d_1, tmp_d_2);
+    terma += -1 / 2. * (blitz::sum(tmp_d_1*tmp_d_2));
     
     // sumWeighted
-    bob::math::prod(Ft_beta, m_tmp_d_1, m_tmp_nf_2);
-    m_tmp_nf_1 += m_tmp_nf_2;
+    bob::math::prod(Ft_beta, tmp_d_1, tmp_nf_2);
+    tmp_nf_1 += tmp_nf_2;
   }
 
   blitz::Array<double,2> gamma_a;
@@ -924,11 +931,11 @@ double bob::machine::PLDAMachine::computeLogLikelihood(const blitz::Array<double
     gamma_a.reference(getGamma(n_samples));
   else
   {
-    gamma_a.reference(m_tmp_nf_nf_1);
+    gamma_a.resize(getDimF(), getDimF());
     m_plda_base->computeGamma(n_samples, gamma_a);
   }
-  bob::math::prod(gamma_a, m_tmp_nf_1, m_tmp_nf_2);
-  double termb = 1 / 2. * (blitz::sum(m_tmp_nf_1*m_tmp_nf_2));
+  bob::math::prod(gamma_a, tmp_nf_1, tmp_nf_2);
+  double termb = 1 / 2. * (blitz::sum(tmp_nf_1*tmp_nf_2));
 
   // 1/2/ Constant term of the log likelihood:
   //      1/ First term of the likelihood: -Nsamples*D/2*log(2*PI)
@@ -950,17 +957,160 @@ void bob::machine::PLDAMachine::resize(const size_t dim_d, const size_t dim_f,
 {
   m_weighted_sum.resizeAndPreserve(dim_f);
   clearMaps();
-  resizeTmp();
 }
 
-void bob::machine::PLDAMachine::resizeTmp()
+/**
+ * The probes are scored by tiles of this number of probes
+ */
+static const int s_plda_tile_size = 256;
+
+/**
+ * The probes scored by a thread, together with (unshared) views of the
+ * terms which were precomputed for the models and of the scores it writes
+ */
+struct plda_shard {
+  blitz::Array<double,2> probes;
+  blitz::Array<double,1> mu;
+  blitz::Array<double,2> Ft_beta;
+  blitz::Array<double,2> V; ///< gamma_{n+1}.sumWeighted of each model (one per row)
+  blitz::Array<double,1> c; ///< constant term of the score of each model
+  blitz::Array<int,1> group; ///< number of enrolled samples (index) of each model
+  blitz::Array<double,3> delta; ///< (gamma_{n+1} - gamma_1) / 2 for each group
+  blitz::Array<double,2> scores;
+};
+
+static void plda_score(plda_shard& s)
 {
-  if (m_plda_base)
-  {
-    m_tmp_d_1.resize(getDimD());
-    m_tmp_d_2.resize(getDimD());
-    m_tmp_nf_1.resize(getDimF());
-    m_tmp_nf_2.resize(getDimF());
-    m_tmp_nf_nf_1.resize(getDimF(), getDimF());
+  const int n_models = s.V.extent(0);
+  const int n_probes = s.probes.extent(0);
+  const int n_groups = s.delta.extent(0);
+  blitz::Range a = blitz::Range::all();
+  blitz::Array<double,2> X, U, T, S, P;
+  for (int t0=0; t0<n_probes; t0+=s_plda_tile_size) {
+    const int n = std::min(s_plda_tile_size, n_probes-t0);
+    X.resize(n, s.probes.extent(1));
+    U.resize(n, s.V.extent(1));
+    T.resize(U.shape());
+    S.resize(n_models, n);
+    P.resize(n_groups, n);
+
+    // U = (x - mu)^T.beta.F for each probe x of the tile
+    for (int k=0; k<n; ++k)
+      for (int d=0; d<X.extent(1); ++d)
+        X(k,d) = s.probes(t0+k,d) - s.mu(d);
+    bob::math::gemm_(X, s.Ft_beta, U, false, true);
+
+    // Quadratic terms of the probes, which only depend on the number of
+    // enrolled samples of the models
+    for (int g=0; g<n_groups; ++g) {
+      bob::math::gemm_(U, s.delta(g,a,a), T);
+      for (int k=0; k<n; ++k)
+        P(g,k) = blitz::sum(U(k,a) * T(k,a));
+    }
+
+    // Cross terms, for all the models at once
+    bob::math::gemm_(s.V, U, S, false, true);
+    for (int m=0; m<n_models; ++m)
+      for (int k=0; k<n; ++k)
+        s.scores(m,t0+k) = S(m,k) + s.c(m) + P(s.group(m),k);
+  }
+}
+
+static void plda_score_shard(std::vector<plda_shard>& shards, const size_t i)
+{
+  plda_score(shards[i]);
+}
+
+void bob::machine::pldaScoring(
+  const std::vector<boost::shared_ptr<const bob::machine::PLDAMachine> >& models,
+  const blitz::Array<double,2>& probes, blitz::Array<double,2>& scores,
+  const size_t n_threads_max)
+{
+  const int n_models = models.size();
+  const int n_probes = probes.extent(0);
+  bob::core::array::assertSameDimensionLength(scores.extent(0), n_models);
+  bob::core::array::assertSameDimensionLength(scores.extent(1), n_probes);
+  if (n_models == 0 || n_probes == 0) return;
+
+  const boost::shared_ptr<bob::machine::PLDABase> base = models[0]->getPLDABase();
+  for (int m=1; m<n_models; ++m)
+    if (models[m]->getPLDABase() != base)
+      throw std::runtime_error("the PLDA machines scored at once should share the same PLDABase");
+  bob::core::array::assertSameDimensionLength(probes.extent(1), base->getDimD());
+  const int dim_f = base->getDimF();
+  blitz::Range a = blitz::Range::all();
+
+  // The log-likelihood ratio of a model with n enrolled samples against a
+  // probe x is, with u = F^T.beta.(x - mu):
+  //   LLR = constterm[n+1] - constterm[1] + A - loglikelihood
+  //         + 1/2*(sumWeighted + u)^T.gamma_{n+1}.(sumWeighted + u)
+  //         - 1/2*u^T.gamma_1.u
+  // The terms which do not depend on the probe are precomputed for each
+  // model, and gamma and the constant terms for each number of enrolled
+  // samples.
+  std::map<uint64_t, int> groups;
+  for (int m=0; m<n_models; ++m)
+    groups.insert(std::make_pair(models[m]->getNSamples(), static_cast<int>(groups.size())));
+  blitz::Array<double,2> gamma_1(dim_f, dim_f);
+  base->computeGamma(1, gamma_1);
+  const double constterm_1 = base->computeLogLikeConstTerm(1, gamma_1);
+  std::vector<blitz::Array<double,2> > gamma(groups.size());
+  std::vector<double> constterm(groups.size());
+  blitz::Array<double,3> delta(groups.size(), dim_f, dim_f);
+  for (std::map<uint64_t, int>::const_iterator it=groups.begin(); it!=groups.end(); ++it) {
+    const int g = it->second;
+    gamma[g].resize(dim_f, dim_f);
+    base->computeGamma(it->first + 1, gamma[g]);
+    constterm[g] = base->computeLogLikeConstTerm(it->first + 1, gamma[g]) - constterm_1;
+    delta(g,a,a) = (gamma[g] - gamma_1) / 2.;
+  }
+
+  blitz::Array<double,2> V(n_models, dim_f);
+  blitz::Array<double,1> c(n_models);
+  blitz::Array<int,1> group(n_models);
+  for (int m=0; m<n_models; ++m) {
+    const bob::machine::PLDAMachine& model = *models[m];
+    const int g = groups[model.getNSamples()];
+    group(m) = g;
+    c(m) = constterm[g] + model.getWSumXitBetaXi() - model.getLogLikelihood();
+    blitz::Array<double,1> v = V(m,a);
+    if (model.getNSamples() > 0) {
+      const blitz::Array<double,1>& weighted_sum = model.getWeightedSum();
+      bob::math::prod(gamma[g], weighted_sum, v);
+      c(m) += blitz::sum(weighted_sum * v) / 2.;
+    }
+    else
+      v = 0.;
+  }
+
+  // The probes are split into contiguous shards, one per thread
+  plda_shard s;
+  s.probes.reference(probes);
+  s.mu.reference(base->getMu());
+  s.Ft_beta.reference(base->getFtBeta());
+  s.V.reference(V);
+  s.c.reference(c);
+  s.group.reference(group);
+  s.delta.reference(delta);
+  s.scores.reference(scores);
+  const size_t n_threads = std::min(n_threads_max, static_cast<size_t>(n_probes));
+  if (n_threads <= 1) {
+    plda_score(s);
+    return;
+  }
+
+  std::vector<plda_shard> shards(n_threads);
+  for (size_t i=0; i<n_threads; ++i) {
+    const blitz::Range r = bob::core::shard(n_probes, n_threads, i);
+    shards[i].probes.reference(bob::core::array::unsharedView(probes(r,a)));
+    shards[i].mu.reference(bob::core::array::unsharedView(s.mu));
+    shards[i].Ft_beta.reference(bob::core::array::unsharedView(s.Ft_beta));
+    shards[i].V.reference(bob::core::array::unsharedView(V));
+    shards[i].c.reference(bob::core::array::unsharedView(c));
+    shards[i].group.reference(bob::core::array::unsharedView(group));
+    shards[i].delta.reference(bob::core::array::unsharedView(delta));
+    shards[i].scores.reference(bob::core::array::unsharedView(scores(a,r)));
   }
+  bob::core::parallel(n_threads, boost::bind(&plda_score_shard,
+    boost::ref(shards), _1));
 }
@@ -23,6 +23,7 @@
 #include <string>
 #include <cmath>
 #include <boost/format.hpp>
+#include <boost/shared_array.hpp>
 #include <boost/algorithm/string.hpp>
 #include <boost/filesystem.hpp>
 #include <bob/machine/SVM.h>
@@ -224,9 +225,6 @@ void bob::machine::SupportVector::reset() {
     }
   }
 
-  //create and reset cache
-  m_input_cache.reset(new svm_node[1 + m_input_size]);
-
   m_input_sub.resize(inputSize());
   m_input_sub = 0.0;
   m_input_div.resize(inputSize());
@@ -339,12 +337,15 @@ void bob::machine::SupportVector::setInputDivision(const blitz::Array<double,1>&
 }
 
 /**
- * Copies the user input to a locally pre-allocated cache. Apply normalization
- * at the same occasion.
+ * Copies the user input to a locally allocated cache. Apply normalization
+ * at the same occasion. The cache is allocated by each call (rather than
+ * kept in the machine), so that a machine may be used concurrently.
  */
-static inline void copy(const blitz::Array<double,1>& input,
-    boost::shared_array<svm_node>& cache, const blitz::Array<double,1>& sub,
-    const blitz::Array<double,1>& div) {
+static inline boost::shared_array<svm_node> copy(
+    const blitz::Array<double,1>& input, const size_t input_size,
+    const blitz::Array<double,1>& sub, const blitz::Array<double,1>& div) {
+
+  boost::shared_array<svm_node> cache(new svm_node[1 + input_size]);
 
   size_t cur = 0; ///< currently used index
 
@@ -357,12 +358,14 @@ static inline void copy(const blitz::Array<double,1>& input,
   }
 
   cache[cur].index = -1; //libsvm detects end of input if index==-1
+  return cache;
 }
 
 int bob::machine::SupportVector::predictClass_
 (const blitz::Array<double,1>& input) const {
-  copy(input, m_input_cache, m_input_sub, m_input_div);
-  int retval = round(svm_predict(m_model.get(), m_input_cache.get()));
+  boost::shared_array<svm_node> cache =
+    copy(input, m_input_size, m_input_sub, m_input_div);
+  int retval = round(svm_predict(m_model.get(), cache.get()));
   return retval;
 }
 
@@ -381,12 +384,13 @@ int bob::machine::SupportVector::predictClass
 int bob::machine::SupportVector::predictClassAndScores_
 (const blitz::Array<double,1>& input,
  blitz::Array<double,1>& scores) const {
-  copy(input, m_input_cache, m_input_sub, m_input_div);
+  boost::shared_array<svm_node> cache =
+    copy(input, m_input_size, m_input_sub, m_input_div);
 #if LIBSVM_VERSION > 290
-  int retval = round(svm_predict_values(m_model.get(), m_input_cache.get(), scores.data()));
+  int retval = round(svm_predict_values(m_model.get(), cache.get(), scores.data()));
 #else
-  svm_predict_values(m_model.get(), m_input_cache.get(), scores.data());
-  int retval = round(svm_predict(m_model.get(), m_input_cache.get()));
+  svm_predict_values(m_model.get(), cache.get(), scores.data());
+  int retval = round(svm_predict(m_model.get(), cache.get()));
 #endif
   return retval;
 }
@@ -417,8 +421,9 @@ int bob::machine::SupportVector::predictClassAndScores
 int bob::machine::SupportVector::predictClassAndProbabilities_
 (const blitz::Array<double,1>& input,
  blitz::Array<double,1>& probabilities) const {
-  copy(input, m_input_cache, m_input_sub, m_input_div);
-  int retval = round(svm_predict_probability(m_model.get(), m_input_cache.get(), probabilities.data()));
+  boost::shared_array<svm_node> cache =
+    copy(input, m_input_size, m_input_sub, m_input_div);
+  int retval = round(svm_predict_probability(m_model.get(), cache.get(), probabilities.data()));
   return retval;
 }
 
@@ -32,8 +32,7 @@ bob::machine::WienerMachine::WienerMachine():
   m_Pn(0),
   m_W(0,0),
   m_fft(0,0),
-  m_ifft(0,0),
-  m_buffer1(0,0), m_buffer2(0,0)
+  m_ifft(0,0)
 {
 }
 
@@ -44,9 +43,7 @@ bob::machine::WienerMachine::WienerMachine(const blitz::Array<double,2>& Ps,
   m_Pn(Pn),
   m_W(m_Ps.extent(0),m_Ps.extent(1)),
   m_fft(m_Ps.extent(0),m_Ps.extent(1)),
-  m_ifft(m_Ps.extent(0),m_Ps.extent(1)),
-  m_buffer1(m_Ps.extent(0),m_Ps.extent(1)),
-  m_buffer2(m_Ps.extent(0),m_Ps.extent(1))
+  m_ifft(m_Ps.extent(0),m_Ps.extent(1))
 {
   computeW();
 }
@@ -58,8 +55,7 @@ bob::machine::WienerMachine::WienerMachine(const size_t height,
   m_Pn(Pn),
   m_W(height,width),
   m_fft(height,width),
-  m_ifft(height,width),
-  m_buffer1(0,0), m_buffer2(0,0)
+  m_ifft(height,width)
 {
   m_Ps = 1.;
   computeW();
@@ -71,9 +67,7 @@ bob::machine::WienerMachine::WienerMachine(const bob::machine::WienerMachine& ot
   m_Pn(other.m_Pn),
   m_W(bob::core::array::ccopy(other.m_W)),
   m_fft(other.m_fft),
-  m_ifft(other.m_ifft),
-  m_buffer1(m_Ps.extent(0),m_Ps.extent(1)), 
-  m_buffer2(m_Ps.extent(0),m_Ps.extent(1))
+  m_ifft(other.m_ifft)
 {
 }
 
@@ -95,8 +89,6 @@ bob::machine::WienerMachine& bob::machine::WienerMachine::operator=
     m_W.reference(bob::core::array::ccopy(other.m_W));
     m_fft.reset(m_Ps.extent(0),m_Ps.extent(1));
     m_ifft.reset(m_Ps.extent(0),m_Ps.extent(1));
-    m_buffer1.resize(m_Ps.extent(0),m_Ps.extent(1));
-    m_buffer2.resize(m_Ps.extent(0),m_Ps.extent(1));
   }
   return *this;
 }
@@ -132,8 +124,6 @@ void bob::machine::WienerMachine::load(bob::io::HDF5File& config)
   m_W.reference(config.readArray<double,2>("W"));
   m_fft.reset(m_Ps.extent(0),m_Ps.extent(1));
   m_ifft.reset(m_Ps.extent(0),m_Ps.extent(1));
-  m_buffer1.resize(m_Ps.extent(0),m_Ps.extent(1));
-  m_buffer2.resize(m_Ps.extent(0),m_Ps.extent(1));
 }
 
 void bob::machine::WienerMachine::resize(const size_t height, 
@@ -143,8 +133,6 @@ void bob::machine::WienerMachine::resize(const size_t height,
   m_W.resizeAndPreserve(height,width);
   m_fft.reset(height,width);
   m_ifft.reset(height,width);
-  m_buffer1.resizeAndPreserve(height,width);
-  m_buffer2.resizeAndPreserve(height,width);
 }
 
 void bob::machine::WienerMachine::save(bob::io::HDF5File& config) const
@@ -165,10 +153,14 @@ void bob::machine::WienerMachine::computeW()
 void bob::machine::WienerMachine::forward_(const blitz::Array<double,2>& input,
   blitz::Array<double,2>& output) const
 {
-  m_fft(bob::core::array::cast<std::complex<double> >(input), m_buffer1);
-  m_buffer1 *= m_W;
-  m_ifft(m_buffer1, m_buffer2);
-  output = blitz::abs(m_buffer2);
+  // The working arrays are local, such that this const method may be called
+  // concurrently (the FFTs run their plans on buffers of the calling thread)
+  blitz::Array<std::complex<double>,2> buffer1(m_W.extent(0), m_W.extent(1));
+  blitz::Array<std::complex<double>,2> buffer2(m_W.extent(0), m_W.extent(1));
+  m_fft(bob::core::array::cast<std::complex<double> >(input), buffer1);
+  buffer1 *= m_W;
+  m_ifft(buffer1, buffer2);
+  output = blitz::abs(buffer2);
 }
 
 void bob::machine::WienerMachine::forward(const blitz::Array<double,2>& input,
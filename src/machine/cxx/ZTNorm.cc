@@ -21,24 +21,191 @@
 
 #include <bob/machine/ZTNorm.h>
 #include <bob/core/assert.h>
+#include <bob/core/parallel.h>
+#include <boost/bind.hpp>
+#include <boost/format.hpp>
+#include <stdexcept>
+#include <algorithm>
 #include <limits>
+#include <cmath>
 
 namespace bob { 
 namespace machine {
 
 namespace detail {
+
+  // Constant to check if the std is close to 0. 
+  static const double eps = std::numeric_limits<double>::min();
+
+  /**
+   * Computes the mean and the standard deviation of the values of x which
+   * are not masked (a standard deviation close to 0 is replaced by 1)
+   */
+  static void statistics(const blitz::Array<double,1>& x,
+    const blitz::Array<bool,1>* mask, double& mean, double& std)
+  {
+    double sum = 0.;
+    double count = 0.;
+    for (int j=0; j<x.extent(0); ++j)
+      if (!mask || !(*mask)(j)) {
+        sum += x(j);
+        count += 1.;
+      }
+    mean = sum / count;
+
+    double sumsq = 0.;
+    for (int j=0; j<x.extent(0); ++j)
+      if (!mask || !(*mask)(j))
+        sumsq += (x(j) - mean) * (x(j) - mean);
+    if (count > 1.)
+      std = sqrt(sumsq / (count - 1.));
+    else // 1 single value -> std = 0
+      std = 0.;
+    if (std <= eps) std = 1.;
+  }
+
+  /**
+   * Accumulates the T-Norm statistics, i.e. the mean and the standard
+   * deviation of each column of the (Z-normalised) tnorm scores, one tnorm
+   * model at a time (Welford's algorithm)
+   */
+  struct tnorm_statistics {
+    double count;
+    blitz::Array<double,1> mean;
+    blitz::Array<double,1> m2; ///< sums of the squared deviations
+
+    tnorm_statistics(const int size_enrol):
+      count(0.), mean(size_enrol), m2(size_enrol)
+    {
+      mean = 0.;
+      m2 = 0.;
+    }
+
+    /**
+     * Adds the scores C of a tnorm model, Z-normalised with the scores D of
+     * this model against the znorm probes (if any)
+     */
+    void accumulate(const blitz::Array<double,1>& C,
+      const blitz::Array<double,1>* D, const blitz::Array<bool,1>* mask)
+    {
+      double mean_D = 0.;
+      double std_D = 1.;
+      if (D) statistics(*D, mask, mean_D, std_D);
+      count += 1.;
+      for (int j=0; j<C.extent(0); ++j) {
+        const double zC = (C(j) - mean_D) / std_D;
+        const double delta = zC - mean(j);
+        mean(j) += delta / count;
+        m2(j) += delta * (zC - mean(j));
+      }
+    }
+
+    /**
+     * Gets the standard deviations (those close to 0 are replaced by 1)
+     */
+    void getStd(blitz::Array<double,1>& std) const
+    {
+      std.resize(m2.extent(0));
+      for (int j=0; j<m2.extent(0); ++j) {
+        if (count > 1.)
+          std(j) = sqrt(m2(j) / (count - 1.));
+        else // 1 single value -> std = 0
+          std(j) = 0.;
+        if (std(j) <= eps) std(j) = 1.;
+      }
+    }
+  };
+
+  /**
+   * The rows of the raw scores normalised by a thread, together with
+   * (unshared) views of the data it reads and of the scores it writes
+   */
+  struct ztnorm_shard {
+    blitz::Array<double,2> A;
+    blitz::Array<double,2> B; ///< empty without Z-Norm
+    blitz::Array<double,1> mean_T; ///< empty without T-Norm
+    blitz::Array<double,1> std_T;
+    blitz::Array<double,2> scores;
+  };
+
+  static void normalize(ztnorm_shard& s)
+  {
+    const bool znorm = s.B.extent(1) > 0;
+    const bool tnorm = s.mean_T.extent(0) > 0;
+    for (int i=0; i<s.A.extent(0); ++i) {
+      // zA = (A - mean(B)) / std(B)     [znorm on original scores]
+      double mean_B = 0.;
+      double std_B = 1.;
+      if (znorm) {
+        blitz::Array<double,1> B_i = s.B(i, blitz::Range::all());
+        statistics(B_i, 0, mean_B, std_B);
+      }
+      // ztA = (zA - mean(zC)) / std(zC)  [ztnorm on eval scores]
+      for (int j=0; j<s.A.extent(1); ++j) {
+        double score = (s.A(i,j) - mean_B) / std_B;
+        if (tnorm) score = (score - s.mean_T(j)) / s.std_T(j);
+        s.scores(i,j) = score;
+      }
+    }
+  }
+
+  static void normalizeShards(std::vector<ztnorm_shard>& shards,
+    const size_t i)
+  {
+    normalize(shards[i]);
+  }
+
+  /**
+   * Normalises the raw scores A, with the rows of B for Z-Norm (unless B is
+   * empty) and with the given T-Norm statistics (unless they are empty).
+   * The rows are split into contiguous shards, one per thread.
+   */
+  static void normalize(const blitz::Array<double,2>& A,
+    const blitz::Array<double,2>& B, const blitz::Array<double,1>& mean_T,
+    const blitz::Array<double,1>& std_T, blitz::Array<double,2>& scores,
+    const size_t n_threads_max)
+  {
+    const size_t n_threads = std::min(n_threads_max, static_cast<size_t>(A.extent(0)));
+    if (n_threads <= 1) {
+      ztnorm_shard s;
+      s.A.reference(A);
+      s.B.reference(B);
+      s.mean_T.reference(mean_T);
+      s.std_T.reference(std_T);
+      s.scores.reference(scores);
+      normalize(s);
+      return;
+    }
+
+    blitz::Range a = blitz::Range::all();
+    std::vector<ztnorm_shard> shards(n_threads);
+    for (size_t i=0; i<n_threads; ++i) {
+      const blitz::Range r = bob::core::shard(A.extent(0), n_threads, i);
+      shards[i].A.reference(bob::core::array::unsharedView(A(r,a)));
+      if (B.extent(1) > 0)
+        shards[i].B.reference(bob::core::array::unsharedView(B(r,a)));
+      shards[i].mean_T.reference(bob::core::array::unsharedView(mean_T));
+      shards[i].std_T.reference(bob::core::array::unsharedView(std_T));
+      shards[i].scores.reference(bob::core::array::unsharedView(scores(r,a)));
+    }
+    bob::core::parallel(n_threads, boost::bind(&normalizeShards,
+      boost::ref(shards), _1));
+  }
+
   void ztNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
               const blitz::Array<double,2>* rawscores_zprobes_vs_models,
               const blitz::Array<double,2>* rawscores_probes_vs_tmodels,
               const blitz::Array<double,2>* rawscores_zprobes_vs_tmodels,
               const blitz::Array<bool,2>* mask_zprobes_vs_tmodels_istruetrial,
-              blitz::Array<double,2>& scores)
+              blitz::Array<double,2>& scores,
+              const size_t n_threads)
   {
     // Rename variables
     const blitz::Array<double,2>& A = rawscores_probes_vs_models;
     const blitz::Array<double,2>* B = rawscores_zprobes_vs_models;
     const blitz::Array<double,2>* C = rawscores_probes_vs_tmodels;
     const blitz::Array<double,2>* D = rawscores_zprobes_vs_tmodels;
+    const blitz::Array<bool,2>* mask = mask_zprobes_vs_tmodels_istruetrial;
 
     // Compute the sizes
     int size_eval  = A.extent(0);
@@ -67,96 +234,143 @@ namespace detail {
       bob::core::array::assertSameDimensionLength(D->extent(1), size_znorm);
     }
 
-    if (mask_zprobes_vs_tmodels_istruetrial) {
-      bob::core::array::assertSameDimensionLength(mask_zprobes_vs_tmodels_istruetrial->extent(0), size_tnorm);
-      bob::core::array::assertSameDimensionLength(mask_zprobes_vs_tmodels_istruetrial->extent(1), size_znorm);
+    if (mask) {
+      bob::core::array::assertSameDimensionLength(mask->extent(0), size_tnorm);
+      bob::core::array::assertSameDimensionLength(mask->extent(1), size_znorm);
     }
 
     bob::core::array::assertSameDimensionLength(scores.extent(0), size_eval);
     bob::core::array::assertSameDimensionLength(scores.extent(1), size_enrol);
 
-    // Declare needed IndexPlaceholder
-    blitz::firstIndex ii;
-    blitz::secondIndex jj;
-
-    // Constant to check if the std is close to 0. 
-    const double eps = std::numeric_limits<double>::min();
-    
-    // zA
-    blitz::Array<double,2> zA(A.shape());
-    if (B && size_znorm > 0) {
-      // Znorm  -->      zA  = (A - mean(B) ) / std(B)    [znorm on oringinal scores]
-      // mean(B)
-      blitz::Array<double,1> mean_B(blitz::mean(*B, jj));
-      // std(B)
-      blitz::Array<double,2> B2n(B->shape());
-      B2n = blitz::pow2((*B)(ii, jj) - mean_B(ii));
-      blitz::Array<double,1> std_B(B->extent(0));
-      if(size_znorm>1)
-        std_B = blitz::sqrt(blitz::sum(B2n, jj) / (size_znorm - 1));
-      else // 1 single value -> std = 0
-        std_B = 0; 
-      std_B = blitz::where( std_B <= eps, 1., std_B);
-
-      zA = (A(ii, jj) - mean_B(ii)) / std_B(ii);
-    }
-    else
-      zA = A;
-
-    blitz::Array<double,2> zC(size_tnorm, size_enrol);
-    if (D && size_tnorm > 0 && size_znorm > 0) {
-      blitz::Array<double,1> mean_Dimp(size_tnorm);
-      blitz::Array<double,1> std_Dimp(size_tnorm);
-
-      // Compute mean_Dimp and std_Dimp = D only with impostors
-      for (int i = 0; i < size_tnorm; ++i) {
-        double sum = 0;
-        double sumsq = 0;
-        double count = 0;
-        for (int j = 0; j < size_znorm; ++j) {
-          bool keep;
-          // The second part is never executed if mask_zprobes_vs_tmodels_istruetrial==NULL
-          keep = (mask_zprobes_vs_tmodels_istruetrial == NULL) || !(*mask_zprobes_vs_tmodels_istruetrial)(i, j); //tnorm_models_spk_ids(i) != znorm_tests_spk_ids(j);
-          
-          double value = keep * (*D)(i, j);
-          sum += value;
-          sumsq += value*value;
-          count += keep;
-        }
-
-        double mean = sum / count;
-        mean_Dimp(i) = mean;
-        if (count > 1)
-          std_Dimp(i) = sqrt((sumsq - count * mean * mean) / (count -1));
-        else // 1 single value -> std = 0
-          std_Dimp(i) = 0;
+    // T-Norm statistics, in a single pass over the tnorm scores. The tnorm
+    // scores are Z-normalised with the scores of the tnorm models against
+    // the znorm probes, restricted to the impostor trials:
+    //   zC = (C - mean(D)) / std(D)     [znorm the tnorm scores]
+    blitz::Array<double,1> mean_T, std_T;
+    if (C && size_tnorm > 0) {
+      const bool use_D = D && size_znorm > 0;
+      blitz::Range a = blitz::Range::all();
+      tnorm_statistics t(size_enrol);
+      for (int k=0; k<size_tnorm; ++k) {
+        blitz::Array<double,1> D_k;
+        if (use_D) D_k.reference((*D)(k,a));
+        blitz::Array<bool,1> mask_k;
+        if (use_D && mask) mask_k.reference((*mask)(k,a));
+        t.accumulate((*C)(k,a), use_D ? &D_k : 0, use_D && mask ? &mask_k : 0);
       }
+      mean_T.reference(t.mean);
+      t.getStd(std_T);
+    }
+
+    // Normalises the raw scores, by shards of rows
+    blitz::Array<double,2> no_B;
+    normalize(A, size_znorm > 0 ? *B : no_B, mean_T, std_T, scores, n_threads);
+  }
 
-      // zC  = (C - mean(D)) / std(D)     [znorm the tnorm scores]
-      std_Dimp = blitz::where( std_Dimp <= eps, 1., std_Dimp);
-      zC = ((*C)(ii, jj) - mean_Dimp(ii)) / std_Dimp(ii);
+  /**
+   * Returns the length of the arrays of a file read as a sequence of 1D
+   * arrays (0 if the file is empty)
+   */
+  static int rowLength(bob::io::File& f)
+  {
+    if (f.size() == 0) return 0;
+    const bob::core::array::typeinfo& info = f.type();
+    if (info.nd != 1) {
+      boost::format m("file '%s' cannot be read as a sequence of 1D arrays (%s)");
+      m % f.filename() % info.str();
+      throw std::runtime_error(m.str());
     }
-    else if (C && size_tnorm > 0)
-      zC = *C;
+    return info.shape[0];
+  }
 
-    if (C && size_tnorm > 0)
-    {
-      blitz::Array<double,1> mean_zC(size_enrol);
-      blitz::Array<double,1> std_zC(size_enrol);
-      
-      // ztA = (zA - mean(zC)) / std(zC)  [ztnorm on eval scores]
-      mean_zC = blitz::mean(zC(jj, ii), jj);
-      if (size_tnorm > 1)
-        std_zC = sqrt(blitz::sum(pow(zC(jj, ii) - mean_zC(ii), 2) , jj) / (size_tnorm - 1));
-      else // 1 single value -> std = 0
-        std_zC = 0;
-      std_zC = blitz::where( std_zC <= eps, 1., std_zC);
-
-      // Normalised scores
-      scores = (zA(ii, jj) - mean_zC(jj)) /  std_zC(jj);
-    }
-    else
-      scores = zA;
+  /**
+   * Reads the rows of a matrix stored as a sequence of 1D arrays, starting
+   * at the given row
+   */
+  static void readRows(bob::io::File& f, const int start,
+    blitz::Array<double,2>& rows)
+  {
+    for (int k=0; k<rows.extent(0); ++k) {
+      blitz::Array<double,1> row = rows(k, blitz::Range::all());
+      row = f.cast<double,1>(start + k);
+    }
+  }
+
+  void ztNorm(bob::io::File& rawscores_probes_vs_models,
+              bob::io::File* rawscores_zprobes_vs_models,
+              bob::io::File* rawscores_probes_vs_tmodels,
+              bob::io::File* rawscores_zprobes_vs_tmodels,
+              bob::io::File* mask_zprobes_vs_tmodels_istruetrial,
+              bob::io::File& scores,
+              const size_t block_size,
+              const size_t n_threads)
+  {
+    // Rename variables
+    bob::io::File& A = rawscores_probes_vs_models;
+    bob::io::File* B = rawscores_zprobes_vs_models;
+    bob::io::File* C = rawscores_probes_vs_tmodels;
+    bob::io::File* D = rawscores_zprobes_vs_tmodels;
+    bob::io::File* mask = mask_zprobes_vs_tmodels_istruetrial;
+
+    if (block_size == 0)
+      throw std::runtime_error("the number of rows normalised at once should be strictly positive");
+
+    // Compute the sizes
+    const int size_eval  = A.size();
+    const int size_enrol = rowLength(A);
+    const int size_tnorm = (C ? C->size() : 0);
+    const int size_znorm = (B ? rowLength(*B) : 0);
+    const bool use_D = D && size_znorm > 0 && size_tnorm > 0;
+
+    // Check the inputs
+    if (size_znorm > 0)
+      bob::core::array::assertSameDimensionLength(B->size(), size_eval);
+    if (size_tnorm > 0)
+      bob::core::array::assertSameDimensionLength(rowLength(*C), size_enrol);
+    if (use_D) {
+      bob::core::array::assertSameDimensionLength(D->size(), size_tnorm);
+      bob::core::array::assertSameDimensionLength(rowLength(*D), size_znorm);
+      if (mask) {
+        bob::core::array::assertSameDimensionLength(mask->size(), size_tnorm);
+        bob::core::array::assertSameDimensionLength(rowLength(*mask), size_znorm);
+      }
+    }
+
+    // T-Norm statistics, in a single pass over the tnorm scores
+    blitz::Array<double,1> mean_T, std_T;
+    if (size_tnorm > 0) {
+      tnorm_statistics t(size_enrol);
+      blitz::Array<double,1> C_k(size_enrol);
+      blitz::Array<double,1> D_k(size_znorm);
+      blitz::Array<bool,1> mask_k(size_znorm);
+      for (int k=0; k<size_tnorm; ++k) {
+        C_k = C->cast<double,1>(k);
+        if (use_D) D_k = D->cast<double,1>(k);
+        if (use_D && mask) mask_k = mask->cast<bool,1>(k);
+        t.accumulate(C_k, use_D ? &D_k : 0, use_D && mask ? &mask_k : 0);
+      }
+      mean_T.reference(t.mean);
+      t.getStd(std_T);
+    }
+
+    // Normalises the raw scores by blocks of rows, which are appended to
+    // the output file
+    blitz::Array<double,2> A_block, B_block, scores_block;
+    for (int i=0; i<size_eval; i+=block_size) {
+      const int n = std::min(static_cast<int>(block_size), size_eval - i);
+      A_block.resize(n, size_enrol);
+      readRows(A, i, A_block);
+      if (size_znorm > 0) {
+        B_block.resize(n, size_znorm);
+        readRows(*B, i, B_block);
+      }
+      scores_block.resize(n, size_enrol);
+      normalize(A_block, B_block, mean_T, std_T, scores_block, n_threads);
+      for (int k=0; k<n; ++k) {
+        blitz::Array<double,1> row = scores_block(k, blitz::Range::all());
+        scores.append(bob::core::array::blitz_array(row));
+      }
+    }
   }
 }
 
@@ -165,36 +379,85 @@ void ztNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
             const blitz::Array<double,2>& rawscores_probes_vs_tmodels,
             const blitz::Array<double,2>& rawscores_zprobes_vs_tmodels,
             const blitz::Array<bool,2>& mask_zprobes_vs_tmodels_istruetrial,
-            blitz::Array<double,2>& scores)
+            blitz::Array<double,2>& scores,
+            const size_t n_threads)
 {
   detail::ztNorm(rawscores_probes_vs_models, &rawscores_zprobes_vs_models, &rawscores_probes_vs_tmodels,
-                 &rawscores_zprobes_vs_tmodels, &mask_zprobes_vs_tmodels_istruetrial, scores);
+                 &rawscores_zprobes_vs_tmodels, &mask_zprobes_vs_tmodels_istruetrial, scores, n_threads);
 }
 
 void ztNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
             const blitz::Array<double,2>& rawscores_zprobes_vs_models,
             const blitz::Array<double,2>& rawscores_probes_vs_tmodels,
             const blitz::Array<double,2>& rawscores_zprobes_vs_tmodels,
-            blitz::Array<double,2>& scores)
+            blitz::Array<double,2>& scores,
+            const size_t n_threads)
 {
   detail::ztNorm(rawscores_probes_vs_models, &rawscores_zprobes_vs_models, &rawscores_probes_vs_tmodels,
-                 &rawscores_zprobes_vs_tmodels, NULL, scores);
+                 &rawscores_zprobes_vs_tmodels, NULL, scores, n_threads);
 }
 
 void tNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
            const blitz::Array<double,2>& rawscores_probes_vs_tmodels,
-           blitz::Array<double,2>& scores)
+           blitz::Array<double,2>& scores,
+           const size_t n_threads)
 {
   detail::ztNorm(rawscores_probes_vs_models, NULL, &rawscores_probes_vs_tmodels,
-                 NULL, NULL, scores);
+                 NULL, NULL, scores, n_threads);
 }
 
 void zNorm(const blitz::Array<double,2>& rawscores_probes_vs_models,
            const blitz::Array<double,2>& rawscores_zprobes_vs_models,
-           blitz::Array<double,2>& scores)
+           blitz::Array<double,2>& scores,
+           const size_t n_threads)
+{
+  detail::ztNorm(rawscores_probes_vs_models, &rawscores_zprobes_vs_models, NULL,
+                 NULL, NULL, scores, n_threads);
+}
+
+void ztNorm(bob::io::File& rawscores_probes_vs_models,
+            bob::io::File& rawscores_zprobes_vs_models,
+            bob::io::File& rawscores_probes_vs_tmodels,
+            bob::io::File& rawscores_zprobes_vs_tmodels,
+            bob::io::File& mask_zprobes_vs_tmodels_istruetrial,
+            bob::io::File& scores,
+            const size_t block_size,
+            const size_t n_threads)
+{
+  detail::ztNorm(rawscores_probes_vs_models, &rawscores_zprobes_vs_models, &rawscores_probes_vs_tmodels,
+                 &rawscores_zprobes_vs_tmodels, &mask_zprobes_vs_tmodels_istruetrial, scores, block_size, n_threads);
+}
+
+void ztNorm(bob::io::File& rawscores_probes_vs_models,
+            bob::io::File& rawscores_zprobes_vs_models,
+            bob::io::File& rawscores_probes_vs_tmodels,
+            bob::io::File& rawscores_zprobes_vs_tmodels,
+            bob::io::File& scores,
+            const size_t block_size,
+            const size_t n_threads)
+{
+  detail::ztNorm(rawscores_probes_vs_models, &rawscores_zprobes_vs_models, &rawscores_probes_vs_tmodels,
+                 &rawscores_zprobes_vs_tmodels, NULL, scores, block_size, n_threads);
+}
+
+void tNorm(bob::io::File& rawscores_probes_vs_models,
+           bob::io::File& rawscores_probes_vs_tmodels,
+           bob::io::File& scores,
+           const size_t block_size,
+           const size_t n_threads)
+{
+  detail::ztNorm(rawscores_probes_vs_models, NULL, &rawscores_probes_vs_tmodels,
+                 NULL, NULL, scores, block_size, n_threads);
+}
+
+void zNorm(bob::io::File& rawscores_probes_vs_models,
+           bob::io::File& rawscores_zprobes_vs_models,
+           bob::io::File& scores,
+           const size_t block_size,
+           const size_t n_threads)
 {
   detail::ztNorm(rawscores_probes_vs_models, &rawscores_zprobes_vs_models, NULL,
-                 NULL, NULL, scores);
+                 NULL, NULL, scores, block_size, n_threads);
 }
 
 }}
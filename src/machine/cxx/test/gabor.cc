@@ -110,6 +110,13 @@ BOOST_AUTO_TEST_CASE( test_gabor_graph_machine )
 #endif // GENERATE_NEW_REFERENCE_FILES
 
 
+  // extract the graph directly from the image
+  blitz::Array<double,3> sparse_graph(machine.numberOfNodes(), 2, gwt.numberOfKernels());
+  machine.extract(gwt, image, sparse_graph, true);
+  for (int i = 0; i < machine.numberOfNodes(); ++i)
+    for (int j = 0; j < (int)gwt.numberOfKernels(); ++j)
+      BOOST_CHECK_SMALL(sparse_graph(i,0,j) - graph(i,0,j), 1e-6);
+
   // compute similarities of the graph to itself and check that they are unity
   std::vector<boost::shared_ptr<bob::machine::GaborJetSimilarity> > sim_fcts;
   sim_fcts.push_back(boost::shared_ptr<bob::machine::GaborJetSimilarity>(new bob::machine::GaborJetSimilarity(bob::machine::GaborJetSimilarity::SCALAR_PRODUCT)));
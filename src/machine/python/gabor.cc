@@ -23,6 +23,8 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
+#include <bob/python/gabor.h>
 
 #include <bob/ip/GaborWaveletTransform.h>
 #include <bob/machine/GaborGraphMachine.h>
@@ -58,6 +60,27 @@ static bob::python::ndarray bob_extract2(bob::machine::GaborGraphMachine& self,
   }
 }
 
+static bob::python::ndarray bob_extract3(bob::machine::GaborGraphMachine& self, bob::ip::GaborWaveletTransform& gwt, bob::python::const_ndarray input_image, bool include_phases, bool normalized){
+  const blitz::Array<std::complex<double>,2> image = bob::python::convert_gabor_image(input_image);
+  if (include_phases){
+    bob::python::ndarray output_graph(bob::core::array::t_float64, self.numberOfNodes(), 2, (int)gwt.numberOfKernels());
+    blitz::Array<double,3> graph = output_graph.bz<double,3>();
+    {
+      bob::python::no_gil unlock;
+      self.extract(gwt, image, graph, normalized);
+    }
+    return output_graph;
+  } else {
+    bob::python::ndarray output_graph(bob::core::array::t_float64, self.numberOfNodes(), (int)gwt.numberOfKernels());
+    blitz::Array<double,2> graph = output_graph.bz<double,2>();
+    {
+      bob::python::no_gil unlock;
+      self.extract(gwt, image, graph, normalized);
+    }
+    return output_graph;
+  }
+}
+
 static void bob_average(bob::machine::GaborGraphMachine& self, bob::python::const_ndarray many_graph_jets, bob::python::ndarray averaged_graph_jets){
   blitz::Array<double,3> graph = averaged_graph_jets.bz<double,3>();
   self.average(many_graph_jets.bz<double,4>(), graph);
@@ -247,6 +270,13 @@ void bind_machine_gabor(){
       "Extracts and returns the Gabor jets at the desired locations from the given Gabor jet image"
     )
 
+    .def(
+      "__call__",
+      &bob_extract3,
+      (boost::python::arg("self"), boost::python::arg("gwt"), boost::python::arg("input_image"), boost::python::arg("include_phases")=true, boost::python::arg("normalized")=true),
+      "Extracts and returns the Gabor jets at the desired locations directly from the given gray or color image. The Gabor wavelet transform gwt is performed at the node positions only, which is much faster than computing the whole Gabor jet image first."
+    )
+
     .def(
       "average",
       &bob_average,
@@ -19,6 +19,7 @@
  */
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/concept_check.hpp>
 #include <bob/machine/GMMStats.h>
 #include <bob/machine/GMMMachine.h>
@@ -167,30 +168,113 @@ static void py_gmmmachine_set_shape(bob::machine::GMMMachine& m,
   m.resize(s(0), s(1));
 }
 
-static double py_gmmmachine_loglikelihoodA(const bob::machine::GMMMachine& machine,
+/**
+ * The computations over 2D arrays release the GIL. The (lazily updated)
+ * supervector caches of the machine are hence reloaded beforehand, so that
+ * several threads may share the same machine.
+ */
+static object py_gmmmachine_loglikelihoodA(const bob::machine::GMMMachine& machine,
   bob::python::const_ndarray x, bob::python::ndarray ll)
 {
-  blitz::Array<double,1> ll_ = ll.bz<double,1>();
-  return machine.logLikelihood(x.bz<double,1>(), ll_);
+  const bob::core::array::typeinfo& info = x.type();
+  switch(info.nd) {
+    case 1:
+      {
+        blitz::Array<double,1> ll_ = ll.bz<double,1>();
+        return object(machine.logLikelihood(x.bz<double,1>(), ll_));
+      }
+    case 2:
+      {
+        blitz::Array<double,2> ll_ = ll.bz<double,2>();
+        bob::python::ndarray res(bob::core::array::t_float64, info.shape[0]);
+        blitz::Array<double,1> res_ = res.bz<double,1>();
+        blitz::Array<double,2> x_ = x.bz<double,2>();
+        machine.reloadCacheSupervectors();
+        {
+          bob::python::no_gil unlock;
+          machine.logLikelihood(x_, ll_, res_);
+        }
+        return res.self();
+      }
+    default:
+      PYTHON_ERROR(TypeError, "cannot compute the log likelihood of arrays with "  SIZE_T_FMT " dimensions (only with 1 or 2 dimensions).", info.nd);
+  }
 }
 
-static double py_gmmmachine_loglikelihoodA_(const bob::machine::GMMMachine& machine, 
+static object py_gmmmachine_loglikelihoodA_(const bob::machine::GMMMachine& machine, 
   bob::python::const_ndarray x, bob::python::ndarray ll)
 {
-  blitz::Array<double,1> ll_ = ll.bz<double,1>();
-  return machine.logLikelihood_(x.bz<double,1>(), ll_);
+  const bob::core::array::typeinfo& info = x.type();
+  switch(info.nd) {
+    case 1:
+      {
+        blitz::Array<double,1> ll_ = ll.bz<double,1>();
+        return object(machine.logLikelihood_(x.bz<double,1>(), ll_));
+      }
+    case 2:
+      {
+        blitz::Array<double,2> ll_ = ll.bz<double,2>();
+        bob::python::ndarray res(bob::core::array::t_float64, info.shape[0]);
+        blitz::Array<double,1> res_ = res.bz<double,1>();
+        blitz::Array<double,2> x_ = x.bz<double,2>();
+        machine.reloadCacheSupervectors();
+        {
+          bob::python::no_gil unlock;
+          machine.logLikelihood_(x_, ll_, res_);
+        }
+        return res.self();
+      }
+    default:
+      PYTHON_ERROR(TypeError, "cannot compute the log likelihood of arrays with "  SIZE_T_FMT " dimensions (only with 1 or 2 dimensions).", info.nd);
+  }
 }
 
-static double py_gmmmachine_loglikelihoodB(const bob::machine::GMMMachine& machine,
+static object py_gmmmachine_loglikelihoodB(const bob::machine::GMMMachine& machine,
   bob::python::const_ndarray x)
 {
-  return machine.logLikelihood(x.bz<double,1>());
+  const bob::core::array::typeinfo& info = x.type();
+  switch(info.nd) {
+    case 1:
+      return object(machine.logLikelihood(x.bz<double,1>()));
+    case 2:
+      {
+        bob::python::ndarray res(bob::core::array::t_float64, info.shape[0]);
+        blitz::Array<double,1> res_ = res.bz<double,1>();
+        blitz::Array<double,2> x_ = x.bz<double,2>();
+        machine.reloadCacheSupervectors();
+        {
+          bob::python::no_gil unlock;
+          machine.logLikelihood(x_, res_);
+        }
+        return res.self();
+      }
+    default:
+      PYTHON_ERROR(TypeError, "cannot compute the log likelihood of arrays with "  SIZE_T_FMT " dimensions (only with 1 or 2 dimensions).", info.nd);
+  }
 }
 
-static double py_gmmmachine_loglikelihoodB_(const bob::machine::GMMMachine& machine,
+static object py_gmmmachine_loglikelihoodB_(const bob::machine::GMMMachine& machine,
   bob::python::const_ndarray x)
 {
-  return machine.logLikelihood_(x.bz<double,1>());
+  const bob::core::array::typeinfo& info = x.type();
+  switch(info.nd) {
+    case 1:
+      return object(machine.logLikelihood_(x.bz<double,1>()));
+    case 2:
+      {
+        bob::python::ndarray res(bob::core::array::t_float64, info.shape[0]);
+        blitz::Array<double,1> res_ = res.bz<double,1>();
+        blitz::Array<double,2> x_ = x.bz<double,2>();
+        machine.reloadCacheSupervectors();
+        {
+          bob::python::no_gil unlock;
+          machine.logLikelihood_(x_, res_);
+        }
+        return res.self();
+      }
+    default:
+      PYTHON_ERROR(TypeError, "cannot compute the log likelihood of arrays with "  SIZE_T_FMT " dimensions (only with 1 or 2 dimensions).", info.nd);
+  }
 }
 
 static void py_gmmmachine_accStatistics(const bob::machine::GMMMachine& machine,
@@ -202,7 +286,12 @@ static void py_gmmmachine_accStatistics(const bob::machine::GMMMachine& machine,
       machine.accStatistics(x.bz<double,1>(), gs);
       break;
     case 2:
-      machine.accStatistics(x.bz<double,2>(), gs);
+      {
+        blitz::Array<double,2> x_ = x.bz<double,2>();
+        machine.reloadCacheSupervectors();
+        bob::python::no_gil unlock;
+        machine.accStatistics(x_, gs);
+      }
       break;
     default:
       PYTHON_ERROR(TypeError, "cannot accStatistics of arrays with "  SIZE_T_FMT " dimensions (only with 1 or 2 dimensions).", info.nd);
@@ -218,7 +307,12 @@ static void py_gmmmachine_accStatistics_(const bob::machine::GMMMachine& machine
       machine.accStatistics_(x.bz<double,1>(), gs);
       break;
     case 2:
-      machine.accStatistics_(x.bz<double,2>(), gs);
+      {
+        blitz::Array<double,2> x_ = x.bz<double,2>();
+        machine.reloadCacheSupervectors();
+        bob::python::no_gil unlock;
+        machine.accStatistics_(x_, gs);
+      }
       break;
     default:
       PYTHON_ERROR(TypeError, "cannot accStatistics of arrays with "  SIZE_T_FMT " dimensions (only with 1 or 2 dimensions).", info.nd);
@@ -288,13 +382,13 @@ void bind_machine_gmm()
          "Get the specified Gaussian component. An exception is thrown if i is out of range.")
 
     .def("log_likelihood", &py_gmmmachine_loglikelihoodA, args("self", "x", "log_weighted_gaussian_likelihoods"),
-         "Output the log likelihood of the sample, x, i.e. log(p(x|bob::machine::GMMMachine)). Inputs are checked.")
+         "Output the log likelihood of the sample, x, i.e. log(p(x|bob::machine::GMMMachine)). If x is a 2D array, the log likelihoods of all its rows are computed at once and returned as a 1D array, and log_weighted_gaussian_likelihoods should be a 2D array (samples x Gaussians). Inputs are checked.")
     .def("log_likelihood_", &py_gmmmachine_loglikelihoodA_, args("self", "x", "log_weighted_gaussian_likelihoods"),
-         "Output the log likelihood of the sample, x, i.e. log(p(x|bob::machine::GMMMachine)). Inputs are NOT checked.")
+         "Output the log likelihood of the sample, x, i.e. log(p(x|bob::machine::GMMMachine)). If x is a 2D array, the log likelihoods of all its rows are computed at once and returned as a 1D array, and log_weighted_gaussian_likelihoods should be a 2D array (samples x Gaussians). Inputs are NOT checked.")
     .def("log_likelihood", &py_gmmmachine_loglikelihoodB, args("self", "x"),
-         " Output the log likelihood of the sample, x, i.e. log(p(x|GMM)). Inputs are checked.")
+         " Output the log likelihood of the sample, x, i.e. log(p(x|GMM)). If x is a 2D array, the log likelihoods of all its rows are computed at once and returned as a 1D array. Inputs are checked.")
     .def("log_likelihood_", &py_gmmmachine_loglikelihoodB_, args("self", "x"),
-         " Output the log likelihood of the sample, x, i.e. log(p(x|GMM)). Inputs are checked.")
+         " Output the log likelihood of the sample, x, i.e. log(p(x|GMM)). If x is a 2D array, the log likelihoods of all its rows are computed at once and returned as a 1D array. Inputs are NOT checked.")
     .def("acc_statistics", &py_gmmmachine_accStatistics, args("self", "x", "stats"),
          "Accumulate the GMM statistics for this sample(s). Inputs are checked.")
     .def("acc_statistics_", &py_gmmmachine_accStatistics_, args("self", "x", "stats"),
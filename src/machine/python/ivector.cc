@@ -19,7 +19,9 @@
 */
 
 #include <boost/python.hpp>
+#include <boost/python/stl_iterator.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <bob/python/exception.h>
 #include <bob/machine/IVectorMachine.h>
@@ -74,6 +76,7 @@ static void py_iv_forward1(const bob::machine::IVectorMachine& machine,
   const bob::machine::GMMStats& gs, bob::python::ndarray ivector)
 {
   blitz::Array<double,1> ivector_ = ivector.bz<double,1>();
+  bob::python::no_gil unlock;
   machine.forward(gs, ivector_);
 }
 
@@ -81,6 +84,7 @@ static void py_iv_forward1_(const bob::machine::IVectorMachine& machine,
   const bob::machine::GMMStats& gs, bob::python::ndarray ivector)
 {
   blitz::Array<double,1> ivector_ = ivector.bz<double,1>();
+  bob::python::no_gil unlock;
   machine.forward_(gs, ivector_);
 }
 
@@ -89,10 +93,46 @@ static object py_iv_forward2(const bob::machine::IVectorMachine& machine,
 {
   bob::python::ndarray ivector(bob::core::array::t_float64, machine.getDimRt());
   blitz::Array<double,1> ivector_ = ivector.bz<double,1>();
-  machine.forward(gs, ivector_);
+  {
+    bob::python::no_gil unlock;
+    machine.forward(gs, ivector_);
+  }
   return ivector.self();
 }
+static object py_iv_forward_list(const bob::machine::IVectorMachine& machine,
+  object gmmstats, const size_t n_threads)
+{
+  stl_input_iterator<boost::shared_ptr<bob::machine::GMMStats> > dbegin(gmmstats), dend;
+  std::vector<boost::shared_ptr<const bob::machine::GMMStats> > gmmstats_c(dbegin, dend);
+  bob::python::ndarray ivectors(bob::core::array::t_float64, gmmstats_c.size(), machine.getDimRt());
+  blitz::Array<double,2> ivectors_ = ivectors.bz<double,2>();
+  // the (lazily updated) supervectors of the UBM are reloaded while holding
+  // the GIL, as the UBM may be shared by several threads
+  machine.getUbm()->reloadCacheSupervectors();
+  {
+    bob::python::no_gil unlock;
+    machine.forward(gmmstats_c, ivectors_, n_threads);
+  }
+  return ivectors.self();
+}
 
+static object py_iv_forward_stacked(const bob::machine::IVectorMachine& machine,
+  bob::python::const_ndarray n, bob::python::const_ndarray sum_px,
+  const size_t n_threads)
+{
+  const blitz::Array<double,2> n_ = n.bz<double,2>();
+  const blitz::Array<double,3> sum_px_ = sum_px.bz<double,3>();
+  bob::python::ndarray ivectors(bob::core::array::t_float64, n_.extent(0), machine.getDimRt());
+  blitz::Array<double,2> ivectors_ = ivectors.bz<double,2>();
+  // the (lazily updated) supervectors of the UBM are reloaded while holding
+  // the GIL, as the UBM may be shared by several threads
+  machine.getUbm()->reloadCacheSupervectors();
+  {
+    bob::python::no_gil unlock;
+    machine.forward(n_, sum_px_, ivectors_, n_threads);
+  }
+  return ivectors.self();
+}
 
 void bind_machine_ivector()
 {
@@ -119,6 +159,10 @@ void bind_machine_ivector()
     .def("__compute_Id_TtSigmaInvT__", &py_computeIdTtSigmaInvT2, (arg("self"), arg("gmmstats")), "Computes (Id + sum_{c=1}^{C} N_{i,j,c} T^{T} Sigma_{c}^{-1} T)")
     .def("__compute_TtSigmaInvFnorm__", &py_computeTtSigmaInvFnorm1, (arg("self"), arg("gmmstats"), arg("output")), "Computes T^{T} Sigma^{-1} sum_{c=1}^{C} (F_c - N_c mean(c))")
     .def("__compute_TtSigmaInvFnorm__", &py_computeTtSigmaInvFnorm2, (arg("self"), arg("gmmstats")), "Computes T^{T} Sigma^{-1} sum_{c=1}^{C} (F_c - N_c mean(c))")
+    .def("__call__", &py_iv_forward_stacked, (arg("self"), arg("n"), arg("sum_px"), arg("n_threads")=1), "Executes the machine on the statistics of several utterances, stacked in a 2D array of zeroth order statistics (one utterance per row) and a 3D array of first order statistics. The ivectors are returned as the rows of a 2D array. The utterances are split over n_threads threads.")
+    .def("__call__", &py_iv_forward_list, (arg("self"), arg("gmmstats"), arg("n_threads")=1), "Executes the machine on a list of GMMStats. The ivectors are returned as the rows of a 2D array. The utterances are processed by tiles, and are split over n_threads threads.")
+    .def("forward", &py_iv_forward_stacked, (arg("self"), arg("n"), arg("sum_px"), arg("n_threads")=1), "Executes the machine on the statistics of several utterances, stacked in a 2D array of zeroth order statistics (one utterance per row) and a 3D array of first order statistics. The ivectors are returned as the rows of a 2D array. The utterances are split over n_threads threads.")
+    .def("forward", &py_iv_forward_list, (arg("self"), arg("gmmstats"), arg("n_threads")=1), "Executes the machine on a list of GMMStats. The ivectors are returned as the rows of a 2D array. The utterances are processed by tiles, and are split over n_threads threads.")
     .def("__call__", &py_iv_forward1_, (arg("self"), arg("gmmstats"), arg("ivector")), "Executes the machine on the GMMStats, and updates the ivector array. NO CHECK is performed.")
     .def("__call__", &py_iv_forward2, (arg("self"), arg("gmmstats")), "Executes the machine on the GMMStats. The ivector is allocated an returned.")
     .def("forward", &py_iv_forward1, (arg("self"), arg("gmmstats"), arg("ivector")), "Executes the machine on the GMMStats, and updates the ivector array.")
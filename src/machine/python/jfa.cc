@@ -22,6 +22,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <bob/machine/JFAMachine.h>
 #include <bob/machine/GMMMachine.h>
@@ -56,6 +57,8 @@ static void py_jfa_setZ(bob::machine::JFAMachine& machine, bob::python::const_nd
   machine.setZ(Z_);
 }
 
+// The JFA and ISV machines keep the latent variable x of their last
+// computation: the GIL is hence kept while they run.
 static void py_jfa_estimateX(bob::machine::JFAMachine& machine, 
   const bob::machine::GMMStats& gmm_stats, bob::python::ndarray x)
 {
@@ -138,6 +141,7 @@ static void py_gen2b_forward(const bob::machine::Machine<bob::machine::GMMStats,
   const bob::machine::GMMStats& stats, bob::python::const_ndarray output)
 {
   blitz::Array<double,1> output_ = output.bz<double,1>();
+  bob::python::no_gil unlock;
   m.forward(stats, output_);
 }
 
@@ -145,6 +149,7 @@ static void py_gen2b_forward_(const bob::machine::Machine<bob::machine::GMMStats
   const bob::machine::GMMStats& stats, bob::python::const_ndarray output)
 {
   blitz::Array<double,1> output_ = output.bz<double,1>();
+  bob::python::no_gil unlock;
   m.forward_(stats, output_);
 }
 
@@ -22,6 +22,7 @@
 #include <bob/machine/KMeansMachine.h>
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 
 using namespace boost::python;
 
@@ -32,6 +33,8 @@ static tuple py_getVariancesAndWeightsForEachCluster(const bob::machine::KMeansM
   bob::python::ndarray weights(bob::core::array::t_float64, n_means);
   blitz::Array<double,2> variances_ = variances.bz<double,2>();
   blitz::Array<double,1> weights_ = weights.bz<double,1>();
+  // the GIL is kept, as the means of the clusters are accumulated in the
+  // (cache of the) machine
   machine.getVariancesAndWeightsForEachCluster(ar.bz<double,2>(), variances_, weights_);
   return boost::python::make_tuple(variances.self(), weights.self());
 }
@@ -45,6 +48,8 @@ static void py_getVariancesAndWeightsForEachClusterInit(const bob::machine::KMea
 static void py_getVariancesAndWeightsForEachClusterAcc(const bob::machine::KMeansMachine& machine, bob::python::const_ndarray ar, bob::python::ndarray variances, bob::python::ndarray weights) {
   blitz::Array<double,2> variances_ = variances.bz<double,2>();
   blitz::Array<double,1> weights_ = weights.bz<double,1>();
+  // the GIL is kept, as the means of the clusters are accumulated in the
+  // (cache of the) machine
   machine.getVariancesAndWeightsForEachClusterAcc(ar.bz<double,2>(), variances_, weights_);
 }
 
@@ -82,6 +87,18 @@ static tuple py_getClosestMean(const bob::machine::KMeansMachine& machine, bob::
   return boost::python::make_tuple(closest_mean, min_distance);
 }
 
+static tuple py_getClosestMeans(const bob::machine::KMeansMachine& machine, bob::python::const_ndarray x) 
+{
+  const blitz::Array<double,2> x_ = x.bz<double,2>();
+  blitz::Array<int,1> closest_means(x_.extent(0));
+  blitz::Array<double,1> min_distances(x_.extent(0));
+  {
+    bob::python::no_gil unlock;
+    machine.getClosestMeans(x_, closest_means, min_distances);
+  }
+  return boost::python::make_tuple(closest_means, min_distances);
+}
+
 static double py_getMinDistance(const bob::machine::KMeansMachine& machine, bob::python::const_ndarray input) 
 {
   return machine.getMinDistance(input.bz<double,1>());
@@ -115,6 +132,8 @@ void bind_machine_kmeans()
         "Return the power of two of the square Euclidean distance of the sample, x, to the i'th mean")
     .def("get_closest_mean", &py_getClosestMean, (arg("self"), arg("x")),
         "Calculate the index of the mean that is closest (in terms of square Euclidean distance) to the data sample, x")
+    .def("get_closest_means", &py_getClosestMeans, (arg("self"), arg("x")),
+        "Calculate the indices of the means that are closest (in terms of square Euclidean distance) to the data samples (rows) of x, as well as the distances of the samples from these means. The distances are computed by blocks of samples, using the expansion ||x-mean||^2 = ||x||^2 - 2 x.mean + ||mean||^2.")
     .def("get_min_distance", &py_getMinDistance, (arg("self"), arg("input")),
         "Output the minimum square Euclidean distance between the input and one of the means")
     .def("get_variances_and_weights_for_each_cluster", &py_getVariancesAndWeightsForEachCluster, (arg("self"), arg("data")),
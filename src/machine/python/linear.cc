@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/machine/LinearMachine.h>
 
 using namespace boost::python;
@@ -34,8 +35,12 @@ static object forward(const bob::machine::LinearMachine& m,
     case 1:
       {
         bob::python::ndarray output(bob::core::array::t_float64, m.outputSize());
+        blitz::Array<double,1> input_ = input.bz<double,1>();
         blitz::Array<double,1> output_ = output.bz<double,1>();
-        m.forward(input.bz<double,1>(), output_);
+        {
+          bob::python::no_gil unlock;
+          m.forward(input_, output_);
+        }
         return output.self();
       }
     case 2:
@@ -44,10 +49,13 @@ static object forward(const bob::machine::LinearMachine& m,
         blitz::Array<double,2> input_ = input.bz<double,2>();
         blitz::Array<double,2> output_ = output.bz<double,2>();
         blitz::Range all = blitz::Range::all();
-        for (size_t k=0; k<info.shape[0]; ++k) {
-          blitz::Array<double,1> i_ = input_(k,all);
-          blitz::Array<double,1> o_ = output_(k,all);
-          m.forward(i_, o_);
+        {
+          bob::python::no_gil unlock;
+          for (size_t k=0; k<info.shape[0]; ++k) {
+            blitz::Array<double,1> i_ = input_(k,all);
+            blitz::Array<double,1> o_ = output_(k,all);
+            m.forward(i_, o_);
+          }
         }
         return output.self();
       }
@@ -64,8 +72,10 @@ static void forward2(const bob::machine::LinearMachine& m,
   switch(info.nd) {
     case 1:
       {
+        blitz::Array<double,1> input_ = input.bz<double,1>();
         blitz::Array<double,1> output_ = output.bz<double,1>();
-        m.forward(input.bz<double,1>(), output_);
+        bob::python::no_gil unlock;
+        m.forward(input_, output_);
       }
       break;
     case 2:
@@ -73,6 +83,7 @@ static void forward2(const bob::machine::LinearMachine& m,
         blitz::Array<double,2> input_ = input.bz<double,2>();
         blitz::Array<double,2> output_ = output.bz<double,2>();
         blitz::Range all = blitz::Range::all();
+        bob::python::no_gil unlock;
         for (size_t k=0; k<info.shape[0]; ++k) {
           blitz::Array<double,1> i_ = input_(k,all);
           blitz::Array<double,1> o_ = output_(k,all);
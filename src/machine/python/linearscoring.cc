@@ -19,6 +19,7 @@
  */
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <bob/machine/LinearScoring.h>
 #include <boost/python/stl_iterator.hpp>
@@ -58,7 +59,8 @@ static void convertGMMMachineList(object models, std::vector<boost::shared_ptr<c
 static object linearScoring1(object models,
     bob::python::const_ndarray ubm_mean, bob::python::const_ndarray ubm_variance,
     object test_stats, object test_channelOffset = list(), // Empty list
-    bool frame_length_normalisation = false) 
+    bool frame_length_normalisation = false,
+    size_t n_threads = 1) 
 {
   blitz::Array<double,1> ubm_mean_ = ubm_mean.bz<double,1>();
   blitz::Array<double,1> ubm_variance_ = ubm_variance.bz<double,1>();
@@ -72,12 +74,14 @@ static object linearScoring1(object models,
   bob::python::ndarray ret(bob::core::array::t_float64, models_c.size(), test_stats_c.size());
   blitz::Array<double,2> ret_ = ret.bz<double,2>();
   if (test_channelOffset.ptr() == Py_None || len(test_channelOffset) == 0) { //list is empty
-    bob::machine::linearScoring(models_c, ubm_mean_, ubm_variance_, test_stats_c, frame_length_normalisation, ret_);
+    bob::python::no_gil unlock;
+    bob::machine::linearScoring(models_c, ubm_mean_, ubm_variance_, test_stats_c, frame_length_normalisation, ret_, n_threads);
   }
   else { 
     std::vector<blitz::Array<double,1> > test_channelOffset_c;
     convertChannelOffsetList(test_channelOffset, test_channelOffset_c);
-    bob::machine::linearScoring(models_c, ubm_mean_, ubm_variance_, test_stats_c, test_channelOffset_c, frame_length_normalisation, ret_);
+    bob::python::no_gil unlock;
+    bob::machine::linearScoring(models_c, ubm_mean_, ubm_variance_, test_stats_c, test_channelOffset_c, frame_length_normalisation, ret_, n_threads);
   }
  
   return ret.self();
@@ -86,7 +90,8 @@ static object linearScoring1(object models,
 static object linearScoring2(object models,
     bob::machine::GMMMachine& ubm,
     object test_stats, object test_channelOffset = list(), // Empty list
-    bool frame_length_normalisation = false) 
+    bool frame_length_normalisation = false,
+    size_t n_threads = 1) 
 {
   std::vector<boost::shared_ptr<const bob::machine::GMMMachine> > models_c;
   convertGMMMachineList(models, models_c);
@@ -96,13 +101,18 @@ static object linearScoring2(object models,
 
   bob::python::ndarray ret(bob::core::array::t_float64, models_c.size(), test_stats_c.size());
   blitz::Array<double,2> ret_ = ret.bz<double,2>();
+  // the (lazily updated) supervectors of the UBM are reloaded while holding
+  // the GIL, as the UBM may be shared by several threads
+  ubm.reloadCacheSupervectors();
   if (test_channelOffset.ptr() == Py_None || len(test_channelOffset) == 0) { //list is empty
-    bob::machine::linearScoring(models_c, ubm, test_stats_c, frame_length_normalisation, ret_);
+    bob::python::no_gil unlock;
+    bob::machine::linearScoring(models_c, ubm, test_stats_c, frame_length_normalisation, ret_, n_threads);
   }
   else { 
     std::vector<blitz::Array<double,1> > test_channelOffset_c;
     convertChannelOffsetList(test_channelOffset, test_channelOffset_c);
-    bob::machine::linearScoring(models_c, ubm, test_stats_c, test_channelOffset_c, frame_length_normalisation, ret_);
+    bob::python::no_gil unlock;
+    bob::machine::linearScoring(models_c, ubm, test_stats_c, test_channelOffset_c, frame_length_normalisation, ret_, n_threads);
   }
   
   return ret.self();
@@ -117,12 +127,12 @@ static double linearScoring3(bob::python::const_ndarray model,
           ubm_var.bz<double,1>(), test_stats, test_channelOffset.bz<double,1>(), frame_length_normalisation);
 }
 
-BOOST_PYTHON_FUNCTION_OVERLOADS(linearScoring1_overloads, linearScoring1, 4, 6)
-BOOST_PYTHON_FUNCTION_OVERLOADS(linearScoring2_overloads, linearScoring2, 3, 5)
+BOOST_PYTHON_FUNCTION_OVERLOADS(linearScoring1_overloads, linearScoring1, 4, 7)
+BOOST_PYTHON_FUNCTION_OVERLOADS(linearScoring2_overloads, linearScoring2, 3, 6)
 BOOST_PYTHON_FUNCTION_OVERLOADS(linearScoring3_overloads, linearScoring3, 5, 6)
 
 void bind_machine_linear_scoring() {
-  def("linear_scoring", linearScoring1, linearScoring1_overloads(args("models", "ubm_mean", "ubm_variance", "test_stats", "test_channelOffset", "frame_length_normalisation"),
+  def("linear_scoring", linearScoring1, linearScoring1_overloads(args("models", "ubm_mean", "ubm_variance", "test_stats", "test_channelOffset", "frame_length_normalisation", "n_threads"),
     "Compute a matrix of scores using linear scoring.\n"
     "Return a 2D matrix of scores, scores[m, s] is the score for model m against statistics s\n"
     "\n"
@@ -134,8 +144,9 @@ void bind_machine_linear_scoring() {
     "test_stats   -- list of accumulate statistics for each test trial\n"
     "test_channelOffset -- \n"
     "frame_length_normlisation -- perform a normalisation by the number of feature vectors\n"
+    "n_threads    -- number of threads the test trials are split over\n"
     ));
-  def("linear_scoring", linearScoring2, linearScoring2_overloads(args("models", "ubm", "test_stats", "test_channel_offset", "frame_length_normalisation"),
+  def("linear_scoring", linearScoring2, linearScoring2_overloads(args("models", "ubm", "test_stats", "test_channel_offset", "frame_length_normalisation", "n_threads"),
     "Compute a matrix of scores using linear scoring.\n"
     "Return a 2D matrix of scores, scores[m, s] is the score for model m against statistics s\n"
     "\n"
@@ -146,6 +157,7 @@ void bind_machine_linear_scoring() {
     "test_stats  -- list of accumulate statistics for each test trial\n"
     "test_channel_offset -- \n"
     "frame_length_normlisation -- perform a normalisation by the number of feature vectors\n"
+    "n_threads   -- number of threads the test trials are split over\n"
     ));
   def("linear_scoring", linearScoring3, linearScoring3_overloads(args("model", "ubm_mean", "ubm_variance", "test_stats", "test_channelOffset", "frame_length_normalisation"),
     "Compute a score using linear scoring.\n"
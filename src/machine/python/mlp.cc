@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/make_shared.hpp>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/machine/MLP.h>
@@ -50,7 +51,11 @@ static object forward1(bob::machine::MLP& m, bob::python::const_ndarray input) {
       {
         bob::python::ndarray output(bob::core::array::t_float64, m.outputSize());
         blitz::Array<double,1> output_ = output.bz<double,1>();
-        m.forward(input.bz<double,1>(), output_);
+        blitz::Array<double,1> input_ = input.bz<double,1>();
+        {
+          bob::python::no_gil unlock;
+          m.forward(input_, output_);
+        }
         return output.self();
       }
       break;
@@ -58,7 +63,11 @@ static object forward1(bob::machine::MLP& m, bob::python::const_ndarray input) {
       {
         bob::python::ndarray output(bob::core::array::t_float64, input.type().shape[0],m.outputSize());
         blitz::Array<double,2> output_ = output.bz<double,2>();
-        m.forward(input.bz<double,2>(), output_);
+        blitz::Array<double,2> input_ = input.bz<double,2>();
+        {
+          bob::python::no_gil unlock;
+          m.forward(input_, output_);
+        }
         return output.self();
       }
       break;
@@ -75,13 +84,17 @@ static void forward2(bob::machine::MLP& m, bob::python::const_ndarray input,
     case 1:
       {
         blitz::Array<double,1> output_ = output.bz<double,1>();
-        m.forward(input.bz<double,1>(), output_);
+        blitz::Array<double,1> input_ = input.bz<double,1>();
+        bob::python::no_gil unlock;
+        m.forward(input_, output_);
       }
       break;
     case 2:
       {
         blitz::Array<double,2> output_ = output.bz<double,2>();
-        m.forward(input.bz<double,2>(), output_);
+        blitz::Array<double,2> input_ = input.bz<double,2>();
+        bob::python::no_gil unlock;
+        m.forward(input_, output_);
       }
       break;
     default:
@@ -97,13 +110,17 @@ static void forward2_(bob::machine::MLP& m, bob::python::const_ndarray input,
     case 1:
       {
         blitz::Array<double,1> output_ = output.bz<double,1>();
-        m.forward_(input.bz<double,1>(), output_);
+        blitz::Array<double,1> input_ = input.bz<double,1>();
+        bob::python::no_gil unlock;
+        m.forward_(input_, output_);
       }
       break;
     case 2:
       {
         blitz::Array<double,2> output_ = output.bz<double,2>();
-        m.forward_(input.bz<double,2>(), output_);
+        blitz::Array<double,2> input_ = input.bz<double,2>();
+        bob::python::no_gil unlock;
+        m.forward_(input_, output_);
       }
       break;
     default:
@@ -21,9 +21,12 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <bob/python/exception.h>
 #include <bob/machine/PLDAMachine.h>
+#include <boost/python/stl_iterator.hpp>
+#include <vector>
 
 using namespace boost::python;
 
@@ -72,9 +75,17 @@ static double computeLogLikelihood(bob::machine::PLDAMachine& plda,
   const bob::core::array::typeinfo& info = samples.type();
   switch (info.nd) {
     case 1:
-      return plda.computeLogLikelihood(samples.bz<double,1>(), with_enrolled_samples);
+      {
+        blitz::Array<double,1> samples_ = samples.bz<double,1>();
+        bob::python::no_gil unlock;
+        return plda.computeLogLikelihood(samples_, with_enrolled_samples);
+      }
     case 2:
-      return plda.computeLogLikelihood(samples.bz<double,2>(), with_enrolled_samples);
+      {
+        blitz::Array<double,2> samples_ = samples.bz<double,2>();
+        bob::python::no_gil unlock;
+        return plda.computeLogLikelihood(samples_, with_enrolled_samples);
+      }
     default:
       PYTHON_ERROR(TypeError, "PLDA log-likelihood computation does not accept input array with '" SIZE_T_FMT "' dimensions (only 1D or 2D arrays)", info.nd);
   }
@@ -89,14 +100,22 @@ static double plda_forward_sample(bob::machine::PLDAMachine& m,
       {
         double score;
         // Calls the forward function
-        m.forward(samples.bz<double,1>(), score);
+        blitz::Array<double,1> samples_ = samples.bz<double,1>();
+        {
+          bob::python::no_gil unlock;
+          m.forward(samples_, score);
+        }
         return score;
       }
     case 2:
       {
         double score;
         // Calls the forward function
-        m.forward(samples.bz<double,2>(), score);
+        blitz::Array<double,2> samples_ = samples.bz<double,2>();
+        {
+          bob::python::no_gil unlock;
+          m.forward(samples_, score);
+        }
         return score;
       }
     default:
@@ -112,6 +131,22 @@ static double py_log_likelihood_point_estimate(bob::machine::PLDABase& plda,
            hi.bz<double,1>(), wij.bz<double,1>());
 }
 
+static object plda_scoring(object models, bob::python::const_ndarray probes,
+  const size_t n_threads)
+{
+  stl_input_iterator<boost::shared_ptr<bob::machine::PLDAMachine> > dbegin(models), dend;
+  std::vector<boost::shared_ptr<const bob::machine::PLDAMachine> > models_c(dbegin, dend);
+  const blitz::Array<double,2> probes_ = probes.bz<double,2>();
+
+  bob::python::ndarray scores(bob::core::array::t_float64, models_c.size(), probes_.extent(0));
+  blitz::Array<double,2> scores_ = scores.bz<double,2>();
+  {
+    bob::python::no_gil unlock;
+    bob::machine::pldaScoring(models_c, probes_, scores_, n_threads);
+  }
+  return scores.self();
+}
+
 BOOST_PYTHON_FUNCTION_OVERLOADS(computeLogLikelihood_overloads, computeLogLikelihood, 2, 3)
 
 void bind_machine_plda()
@@ -185,4 +220,6 @@ void bind_machine_plda()
     .def("__call__", &plda_forward_sample, (arg("self"), arg("sample")), "Processes a sample and returns a log-likelihood ratio score.")
     .def("forward", &plda_forward_sample, (arg("self"), arg("sample")), "Processes a sample and returns a log-likelihood ratio score.")
   ;
+
+  def("plda_scoring", &plda_scoring, (arg("models"), arg("probes"), arg("n_threads")=1), "Computes the log-likelihood ratio scores of a list of enrolled PLDA machines, which should share the same PLDABase, against the probe samples given as the rows of a 2D array. Returns a 2D array of scores, where scores[m,p] is the score of models[m] against probes[p,:]. The terms which only depend on the models are computed once, and the probes are scored with matrix products, split over n_threads threads.");
 }
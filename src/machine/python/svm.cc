@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/machine/SVM.h>
 
 using namespace boost::python;
@@ -46,11 +47,16 @@ static object predict_class_n(const bob::machine::SupportVector& m,
     PYTHON_ERROR(RuntimeError, "Input array should have " SIZE_T_FMT " columns, but you have given me one with %d instead", m.inputSize(), i_.extent(1));
   }
   blitz::Range all = blitz::Range::all();
-  list retval;
-  for (int k=0; k<i_.extent(0); ++k) {
-    blitz::Array<double,1> tmp = i_(k,all);
-    retval.append(m.predictClass_(tmp));
+  std::vector<int> classes(i_.extent(0));
+  {
+    bob::python::no_gil unlock;
+    for (int k=0; k<i_.extent(0); ++k) {
+      blitz::Array<double,1> tmp = i_(k,all);
+      classes[k] = m.predictClass_(tmp);
+    }
   }
+  list retval;
+  for (size_t k=0; k<classes.size(); ++k) retval.append(classes[k]);
   return tuple(retval);
 }
 
@@ -93,12 +99,22 @@ static object predict_class_and_scores_n(const bob::machine::SupportVector& m,
     PYTHON_ERROR(RuntimeError, "Input array should have " SIZE_T_FMT " columns, but you have given me one with %d instead", m.inputSize(), i_.extent(1));
   }
   blitz::Range all = blitz::Range::all();
+  std::vector<int> classes_(i_.extent(0));
+  blitz::Array<double,2> scores_(i_.extent(0), m.outputSize());
+  {
+    bob::python::no_gil unlock;
+    for (int k=0; k<i_.extent(0); ++k) {
+      blitz::Array<double,1> tmp = i_(k,all);
+      blitz::Array<double,1> s_ = scores_(k,all);
+      classes_[k] = m.predictClassAndScores_(tmp, s_);
+    }
+  }
   list classes, scores;
   for (int k=0; k<i_.extent(0); ++k) {
-    blitz::Array<double,1> tmp = i_(k,all);
     bob::python::ndarray s(bob::core::array::t_float64, m.outputSize());
     blitz::Array<double,1> s_ = s.bz<double,1>();
-    classes.append(m.predictClassAndScores_(tmp, s_));
+    s_ = scores_(k,all);
+    classes.append(classes_[k]);
     scores.append(s.self());
   }
   return make_tuple(tuple(classes), tuple(scores));
@@ -134,12 +150,22 @@ static object predict_class_and_probs_n(const bob::machine::SupportVector& m,
     PYTHON_ERROR(RuntimeError, "this SVM does not support probabilities");
   }
   blitz::Range all = blitz::Range::all();
+  std::vector<int> classes_(i_.extent(0));
+  blitz::Array<double,2> probs_(i_.extent(0), m.numberOfClasses());
+  {
+    bob::python::no_gil unlock;
+    for (int k=0; k<i_.extent(0); ++k) {
+      blitz::Array<double,1> tmp = i_(k,all);
+      blitz::Array<double,1> s_ = probs_(k,all);
+      classes_[k] = m.predictClassAndProbabilities_(tmp, s_);
+    }
+  }
   list classes, probs;
   for (int k=0; k<i_.extent(0); ++k) {
-    blitz::Array<double,1> tmp = i_(k,all);
     bob::python::ndarray s(bob::core::array::t_float64, m.numberOfClasses());
     blitz::Array<double,1> s_ = s.bz<double,1>();
-    classes.append(m.predictClassAndProbabilities_(tmp, s_));
+    s_ = probs_(k,all);
+    classes.append(classes_[k]);
     probs.append(s.self());
   }
   return make_tuple(tuple(classes), tuple(probs));
@@ -22,6 +22,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/machine/WienerMachine.h>
 #include <boost/shared_ptr.hpp>
 #include <boost/make_shared.hpp>
@@ -32,14 +33,18 @@ static void py_forward1_(const bob::machine::WienerMachine& m,
   bob::python::const_ndarray input, bob::python::ndarray output)
 {
   blitz::Array<double,2> output_ = output.bz<double,2>();
-  m.forward_(input.bz<double,2>(), output_);
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  bob::python::no_gil unlock;
+  m.forward_(input_, output_);
 }
 
 static void py_forward1(const bob::machine::WienerMachine& m,
   bob::python::const_ndarray input, bob::python::ndarray output)
 {
   blitz::Array<double,2> output_ = output.bz<double,2>();
-  m.forward(input.bz<double,2>(), output_);
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  bob::python::no_gil unlock;
+  m.forward(input_, output_);
 }
 
 static object py_forward2(const bob::machine::WienerMachine& m,
@@ -48,7 +53,11 @@ static object py_forward2(const bob::machine::WienerMachine& m,
   const bob::core::array::typeinfo& info = input.type();
   bob::python::ndarray output(bob::core::array::t_float64, info.shape[0], info.shape[1]);
   blitz::Array<double,2> output_ = output.bz<double,2>();
-  m.forward(input.bz<double,2>(), output_);
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  {
+    bob::python::no_gil unlock;
+    m.forward(input_, output_);
+  }
   return output.self();
 }
 
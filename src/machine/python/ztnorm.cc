@@ -22,6 +22,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 
 #include <boost/python.hpp>
 #include <bob/machine/ZTNorm.h>
@@ -33,7 +34,8 @@ static object ztnorm1(
   bob::python::const_ndarray rawscores_zprobes_vs_models,
   bob::python::const_ndarray rawscores_probes_vs_tmodels,
   bob::python::const_ndarray rawscores_zprobes_vs_tmodels,
-  bob::python::const_ndarray mask_zprobes_vs_tmodels_istruetrial) 
+  bob::python::const_ndarray mask_zprobes_vs_tmodels_istruetrial,
+  const size_t n_threads) 
 {
   const blitz::Array<double,2> rawscores_probes_vs_models_ = 
     rawscores_probes_vs_models.bz<double,2>();
@@ -50,12 +52,15 @@ static object ztnorm1(
   bob::python::ndarray ret(bob::core::array::t_float64, rawscores_probes_vs_models_.extent(0), rawscores_probes_vs_models_.extent(1));
   blitz::Array<double, 2> ret_ = ret.bz<double,2>();
 
-  bob::machine::ztNorm(rawscores_probes_vs_models_,
-                       rawscores_zprobes_vs_models_,
-                       rawscores_probes_vs_tmodels_,
-                       rawscores_zprobes_vs_tmodels_,
-                       mask_zprobes_vs_tmodels_istruetrial_,
-                       ret_);
+  {
+    bob::python::no_gil unlock;
+    bob::machine::ztNorm(rawscores_probes_vs_models_,
+                         rawscores_zprobes_vs_models_,
+                         rawscores_probes_vs_tmodels_,
+                         rawscores_zprobes_vs_tmodels_,
+                         mask_zprobes_vs_tmodels_istruetrial_,
+                         ret_, n_threads);
+  }
 
   return ret.self();
 }
@@ -64,7 +69,8 @@ static object ztnorm2(
   bob::python::const_ndarray rawscores_probes_vs_models,
   bob::python::const_ndarray rawscores_zprobes_vs_models,
   bob::python::const_ndarray rawscores_probes_vs_tmodels,
-  bob::python::const_ndarray rawscores_zprobes_vs_tmodels) 
+  bob::python::const_ndarray rawscores_zprobes_vs_tmodels,
+  const size_t n_threads) 
 {
   const blitz::Array<double,2> rawscores_probes_vs_models_ = 
     rawscores_probes_vs_models.bz<double,2>();
@@ -79,18 +85,22 @@ static object ztnorm2(
   bob::python::ndarray ret(bob::core::array::t_float64, rawscores_probes_vs_models_.extent(0), rawscores_probes_vs_models_.extent(1));
   blitz::Array<double, 2> ret_ = ret.bz<double,2>();
 
-  bob::machine::ztNorm(rawscores_probes_vs_models_,
-                       rawscores_zprobes_vs_models_,
-                       rawscores_probes_vs_tmodels_,
-                       rawscores_zprobes_vs_tmodels_,
-                       ret_);
+  {
+    bob::python::no_gil unlock;
+    bob::machine::ztNorm(rawscores_probes_vs_models_,
+                         rawscores_zprobes_vs_models_,
+                         rawscores_probes_vs_tmodels_,
+                         rawscores_zprobes_vs_tmodels_,
+                         ret_, n_threads);
+  }
 
   return ret.self();
 }
 
 static object tnorm(
   bob::python::const_ndarray rawscores_probes_vs_models,
-  bob::python::const_ndarray rawscores_probes_vs_tmodels)
+  bob::python::const_ndarray rawscores_probes_vs_tmodels,
+  const size_t n_threads)
 {
   const blitz::Array<double,2> rawscores_probes_vs_models_ = 
     rawscores_probes_vs_models.bz<double,2>();
@@ -101,16 +111,20 @@ static object tnorm(
   bob::python::ndarray ret(bob::core::array::t_float64, rawscores_probes_vs_models_.extent(0), rawscores_probes_vs_models_.extent(1));
   blitz::Array<double, 2> ret_ = ret.bz<double,2>();
 
-  bob::machine::tNorm(rawscores_probes_vs_models_,
-                       rawscores_probes_vs_tmodels_,
-                       ret_);
+  {
+    bob::python::no_gil unlock;
+    bob::machine::tNorm(rawscores_probes_vs_models_,
+                         rawscores_probes_vs_tmodels_,
+                         ret_, n_threads);
+  }
 
   return ret.self();
 }
 
 static object znorm(
   bob::python::const_ndarray rawscores_probes_vs_models,
-  bob::python::const_ndarray rawscores_zprobes_vs_models)
+  bob::python::const_ndarray rawscores_zprobes_vs_models,
+  const size_t n_threads)
 {
   const blitz::Array<double,2> rawscores_probes_vs_models_ = 
     rawscores_probes_vs_models.bz<double,2>();
@@ -121,46 +135,149 @@ static object znorm(
   bob::python::ndarray ret(bob::core::array::t_float64, rawscores_probes_vs_models_.extent(0), rawscores_probes_vs_models_.extent(1));
   blitz::Array<double, 2> ret_ = ret.bz<double,2>();
 
-  bob::machine::zNorm(rawscores_probes_vs_models_,
-                       rawscores_zprobes_vs_models_,
-                       ret_);
+  {
+    bob::python::no_gil unlock;
+    bob::machine::zNorm(rawscores_probes_vs_models_,
+                         rawscores_zprobes_vs_models_,
+                         ret_, n_threads);
+  }
 
   return ret.self();
 }
 
+static void ztnorm1_files(bob::io::File& rawscores_probes_vs_models,
+  bob::io::File& rawscores_zprobes_vs_models,
+  bob::io::File& rawscores_probes_vs_tmodels,
+  bob::io::File& rawscores_zprobes_vs_tmodels,
+  bob::io::File& mask_zprobes_vs_tmodels_istruetrial,
+  bob::io::File& normalizedscores, const size_t block_size,
+  const size_t n_threads)
+{
+  // The files are read with the GIL, as HDF5 is not thread-safe
+  bob::machine::ztNorm(rawscores_probes_vs_models,
+                       rawscores_zprobes_vs_models,
+                       rawscores_probes_vs_tmodels,
+                       rawscores_zprobes_vs_tmodels,
+                       mask_zprobes_vs_tmodels_istruetrial,
+                       normalizedscores, block_size, n_threads);
+}
+
+static void ztnorm2_files(bob::io::File& rawscores_probes_vs_models,
+  bob::io::File& rawscores_zprobes_vs_models,
+  bob::io::File& rawscores_probes_vs_tmodels,
+  bob::io::File& rawscores_zprobes_vs_tmodels,
+  bob::io::File& normalizedscores, const size_t block_size,
+  const size_t n_threads)
+{
+  bob::machine::ztNorm(rawscores_probes_vs_models,
+                       rawscores_zprobes_vs_models,
+                       rawscores_probes_vs_tmodels,
+                       rawscores_zprobes_vs_tmodels,
+                       normalizedscores, block_size, n_threads);
+}
+
+static void tnorm_files(bob::io::File& rawscores_probes_vs_models,
+  bob::io::File& rawscores_probes_vs_tmodels,
+  bob::io::File& normalizedscores, const size_t block_size,
+  const size_t n_threads)
+{
+  bob::machine::tNorm(rawscores_probes_vs_models,
+                      rawscores_probes_vs_tmodels,
+                      normalizedscores, block_size, n_threads);
+}
+
+static void znorm_files(bob::io::File& rawscores_probes_vs_models,
+  bob::io::File& rawscores_zprobes_vs_models,
+  bob::io::File& normalizedscores, const size_t block_size,
+  const size_t n_threads)
+{
+  bob::machine::zNorm(rawscores_probes_vs_models,
+                      rawscores_zprobes_vs_models,
+                      normalizedscores, block_size, n_threads);
+}
+
 void bind_machine_ztnorm() 
 {
   def("ztnorm",
       ztnorm1,
-      args("rawscores_probes_vs_models",
-           "rawscores_zprobes_vs_models",
-           "rawscores_probes_vs_tmodels",
-           "rawscores_zprobes_vs_tmodels",
-           "mask_zprobes_vs_tmodels_istruetrial"),
-      "Normalise raw scores with ZT-Norm"
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_zprobes_vs_models"),
+       arg("rawscores_probes_vs_tmodels"),
+       arg("rawscores_zprobes_vs_tmodels"),
+       arg("mask_zprobes_vs_tmodels_istruetrial"),
+       arg("n_threads")=1),
+      "Normalise raw scores with ZT-Norm. The rows of the scores may be split over n_threads threads."
      );
   
   def("ztnorm",
       ztnorm2,
-      args("rawscores_probes_vs_models",
-           "rawscores_zprobes_vs_models",
-           "rawscores_probes_vs_tmodels",
-           "rawscores_zprobes_vs_tmodels"),
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_zprobes_vs_models"),
+       arg("rawscores_probes_vs_tmodels"),
+       arg("rawscores_zprobes_vs_tmodels"),
+       arg("n_threads")=1),
       "Normalise raw scores with ZT-Norm. Assume that znorm and tnorm have no common subject id."
      );
 
   def("tnorm",
       tnorm,
-      args("rawscores_probes_vs_models",
-           "rawscores_probes_vs_tmodels"),
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_probes_vs_tmodels"),
+       arg("n_threads")=1),
       "Normalise raw scores with T-Norm."
      );
 
   def("znorm",
       znorm,
-      args("rawscores_probes_vs_models",
-           "rawscores_zprobes_vs_models"),
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_zprobes_vs_models"),
+       arg("n_threads")=1),
       "Normalise raw scores with Z-Norm."
      );
 
+  def("ztnorm",
+      ztnorm1_files,
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_zprobes_vs_models"),
+       arg("rawscores_probes_vs_tmodels"),
+       arg("rawscores_zprobes_vs_tmodels"),
+       arg("mask_zprobes_vs_tmodels_istruetrial"),
+       arg("normalizedscores"),
+       arg("block_size")=1024,
+       arg("n_threads")=1),
+      "Normalise raw scores with ZT-Norm, reading the score matrices from bob.io.File objects (e.g. HDF5 files) which store them as sequences of rows. The tnorm scores are read once, and the raw scores are then normalised by blocks of block_size rows, which are appended to the normalizedscores file. The rows of a block may be split over n_threads threads."
+     );
+
+  def("ztnorm",
+      ztnorm2_files,
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_zprobes_vs_models"),
+       arg("rawscores_probes_vs_tmodels"),
+       arg("rawscores_zprobes_vs_tmodels"),
+       arg("normalizedscores"),
+       arg("block_size")=1024,
+       arg("n_threads")=1),
+      "Normalise raw scores with ZT-Norm, reading the score matrices from bob.io.File objects, by blocks of block_size rows. Assume that znorm and tnorm have no common subject id."
+     );
+
+  def("tnorm",
+      tnorm_files,
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_probes_vs_tmodels"),
+       arg("normalizedscores"),
+       arg("block_size")=1024,
+       arg("n_threads")=1),
+      "Normalise raw scores with T-Norm, reading the score matrices from bob.io.File objects, by blocks of block_size rows."
+     );
+
+  def("znorm",
+      znorm_files,
+      (arg("rawscores_probes_vs_models"),
+       arg("rawscores_zprobes_vs_models"),
+       arg("normalizedscores"),
+       arg("block_size")=1024,
+       arg("n_threads")=1),
+      "Normalise raw scores with Z-Norm, reading the score matrices from bob.io.File objects, by blocks of block_size rows."
+     );
+
 }
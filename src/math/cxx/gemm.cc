@@ -0,0 +1,93 @@
+/**
+ * @file math/cxx/gemm.cc
+ * @date Sun Oct 18 11:02:47 2026 +0200
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ * 
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ * 
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <algorithm>
+#include <bob/math/gemm.h>
+#include <bob/core/assert.h>
+#include <bob/core/check.h>
+#include <bob/core/array_copy.h>
+
+// Declaration of the external BLAS function
+// General matrix-matrix product (dgemm)
+extern "C" void dgemm_( const char *transa, const char *transb,
+  const int *M, const int *N, const int *K, const double *alpha,
+  const double *A, const int *lda, const double *B, const int *ldb,
+  const double *beta, double *C, const int *ldc);
+
+void bob::math::gemm(const blitz::Array<double,2>& A,
+  const blitz::Array<double,2>& B, blitz::Array<double,2>& C,
+  const bool transA, const bool transB, const double alpha, const double beta)
+{
+  // Check inputs
+  bob::core::array::assertZeroBase(A);
+  bob::core::array::assertZeroBase(B);
+  bob::core::array::assertSameDimensionLength(A.extent(transA ? 0 : 1),
+    B.extent(transB ? 1 : 0));
+
+  // Check output
+  bob::core::array::assertZeroBase(C);
+  bob::core::array::assertSameDimensionLength(A.extent(transA ? 1 : 0),
+    C.extent(0));
+  bob::core::array::assertSameDimensionLength(B.extent(transB ? 0 : 1),
+    C.extent(1));
+
+  bob::math::gemm_(A, B, C, transA, transB, alpha, beta);
+}
+
+void bob::math::gemm_(const blitz::Array<double,2>& A,
+  const blitz::Array<double,2>& B, blitz::Array<double,2>& C,
+  const bool transA, const bool transB, const double alpha, const double beta)
+{
+  // Size variables
+  const int M = C.extent(0);
+  const int N = C.extent(1);
+  const int K = A.extent(transA ? 0 : 1);
+  if (M == 0 || N == 0) return;
+
+  // BLAS expects column-major matrices, whereas blitz arrays are row-major.
+  // The row-major C = op(A)*op(B) is hence computed as the column-major
+  // C^T = op(B)^T*op(A)^T, where A^T, B^T and C^T are the column-major
+  // views of A, B and C.
+  blitz::Array<double,2> A_blas, B_blas, C_blas;
+  if (bob::core::array::isCZeroBaseContiguous(A)) A_blas.reference(A);
+  else A_blas.reference(bob::core::array::ccopy(A));
+  if (bob::core::array::isCZeroBaseContiguous(B)) B_blas.reference(B);
+  else B_blas.reference(bob::core::array::ccopy(B));
+  const bool C_direct_use = bob::core::array::isCZeroBaseContiguous(C);
+  if (C_direct_use) C_blas.reference(C);
+  else C_blas.reference(bob::core::array::ccopy(C));
+
+  const char transa = transB ? 'T' : 'N';
+  const char transb = transA ? 'T' : 'N';
+  const int lda = std::max(1, B_blas.extent(1));
+  const int ldb = std::max(1, A_blas.extent(1));
+  const int ldc = N;
+  if (K == 0) {
+    // dgemm does not scale C when the inner dimension is empty
+    if (beta == 0.) C_blas = 0.;
+    else C_blas *= beta;
+  }
+  else
+    dgemm_( &transa, &transb, &N, &M, &K, &alpha, B_blas.data(), &lda,
+      A_blas.data(), &ldb, &beta, C_blas.data(), &ldc);
+
+  // Copy back content to C if required
+  if (!C_direct_use)
+    C = C_blas;
+}
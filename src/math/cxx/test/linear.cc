@@ -25,6 +25,7 @@
 #define BOOST_TEST_MAIN
 #include <boost/test/unit_test.hpp>
 #include <bob/math/linear.h>
+#include <bob/math/gemm.h>
 
 
 struct T {
@@ -111,6 +112,22 @@ BOOST_AUTO_TEST_CASE( test_matrix_matrix_prod )
   checkBlitzClose( A_23, sol, eps);
 }
 
+BOOST_AUTO_TEST_CASE( test_matrix_matrix_gemm )
+{
+  blitz::Array<double,2> sol(2,3);
+  bob::math::gemm( A_24, A_43, sol);
+  checkBlitzClose( A_23, sol, eps);
+
+  // Transposed operands: (A_43^T * A_24^T)^T = A_24 * A_43
+  blitz::Array<double,2> A_42(A_24.transpose(1,0));
+  blitz::Array<double,2> A_34(A_43.transpose(1,0));
+  sol = 1.;
+  bob::math::gemm( A_42, A_34, sol, true, true, 2., 1.);
+  blitz::Array<double,2> A_23b(2,3);
+  A_23b = 2.*A_23 + 1.;
+  checkBlitzClose( A_23b, sol, eps);
+}
+
 BOOST_AUTO_TEST_CASE( test_matrix_vector_prod )
 {
   blitz::Array<double,1> sol(2);
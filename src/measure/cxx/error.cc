@@ -24,6 +24,7 @@
 #include <algorithm>
 #include <limits>
 #include <boost/format.hpp>
+#include <boost/math/special_functions/next.hpp>
 #include <bob/measure/error.h>
 #include <bob/core/blitz_compat.h>
 #include <bob/core/assert.h>
@@ -189,15 +190,102 @@ double bob::measure::minWeightedErrorRateThreshold
   return bob::measure::minimizingThreshold(negatives, positives, predicate);
 }
 
+void bob::measure::detail::sortScores(const blitz::Array<double,1>& scores,
+    std::vector<double>& sorted) {
+  sorted.resize(scores.extent(0));
+  std::copy(scores.begin(), scores.end(), sorted.begin());
+  std::sort(sorted.begin(), sorted.end());
+}
+
+double bob::measure::detail::thresholdAbove(const std::vector<double>& scores) {
+  // half an average score interval above the highest score, or the next
+  // representable value if all scores are equal
+  const double threshold = scores.back() +
+    0.5 * (scores.back() - scores.front()) / scores.size();
+  return threshold > scores.back() ? threshold :
+    boost::math::float_next(scores.back());
+}
+
+/**
+ * Returns the number of sorted scores that are strictly smaller than the
+ * given threshold. All curve functions below sort their inputs once, using
+ * sortScores(), and then count the scores that fall on either side of each
+ * threshold with this binary search, instead of re-scanning the full arrays
+ * for every point.
+ */
+static inline size_t countBelow(const std::vector<double>& sorted,
+    double threshold) {
+  return std::lower_bound(sorted.begin(), sorted.end(), threshold) -
+    sorted.begin();
+}
+
+/**
+ * Same as bob::measure::farfrr(), but working on ascendingly sorted scores,
+ * in O(log N) instead of O(N).
+ */
+static std::pair<double, double> sortedFarfrr(
+    const std::vector<double>& negatives,
+    const std::vector<double>& positives, double threshold) {
+  size_t total_negatives = negatives.size();
+  size_t total_positives = positives.size();
+  size_t false_accepts = total_negatives - countBelow(negatives, threshold);
+  size_t false_rejects = countBelow(positives, threshold);
+  if (!total_negatives) total_negatives = 1; //avoids division by zero
+  if (!total_positives) total_positives = 1; //avoids division by zero
+  return std::make_pair(false_accepts/(double)total_negatives,
+      false_rejects/(double)total_positives);
+}
+
+/**
+ * Same as bob::measure::precision_recall(), but working on ascendingly
+ * sorted scores, in O(log N) instead of O(N).
+ */
+static std::pair<double, double> sortedPrecisionRecall(
+    const std::vector<double>& negatives,
+    const std::vector<double>& positives, double threshold) {
+  size_t total_positives = positives.size();
+  size_t false_positives = negatives.size() - countBelow(negatives, threshold);
+  size_t true_positives = positives.size() - countBelow(positives, threshold);
+  size_t total_classified_positives = true_positives + false_positives;
+  if (!total_classified_positives) total_classified_positives = 1; //avoids division by zero
+  if (!total_positives) total_positives = 1; //avoids division by zero
+  return std::make_pair(true_positives/(double)(total_classified_positives),
+      true_positives/(double)(total_positives));
+}
+
+/**
+ * Returns the minimum and the maximum of two sets of ascendingly sorted
+ * scores, taken together.
+ */
+static std::pair<double, double> sortedRange(
+    const std::vector<double>& negatives,
+    const std::vector<double>& positives) {
+  double min = std::numeric_limits<double>::max();
+  double max = -std::numeric_limits<double>::max();
+  if (!negatives.empty()) {
+    min = std::min(min, negatives.front());
+    max = std::max(max, negatives.back());
+  }
+  if (!positives.empty()) {
+    min = std::min(min, positives.front());
+    max = std::max(max, positives.back());
+  }
+  return std::make_pair(min, max);
+}
+
 blitz::Array<double,2> bob::measure::roc(const blitz::Array<double,1>& negatives,
  const blitz::Array<double,1>& positives, size_t points) {
-  double min = std::min(blitz::min(negatives), blitz::min(positives));
-  double max = std::max(blitz::max(negatives), blitz::max(positives));
+  std::vector<double> negatives_, positives_;
+  bob::measure::detail::sortScores(negatives, negatives_);
+  bob::measure::detail::sortScores(positives, positives_);
+  std::pair<double, double> range = sortedRange(negatives_, positives_);
+  double min = range.first;
+  double max = range.second;
   double step = (max-min)/((double)points-1.0);
   blitz::Array<double,2> retval(2, points);
   for (int i=0; i<(int)points; ++i) {
     std::pair<double, double> ratios =
-      bob::measure::farfrr(negatives, positives, min + i*step);
+      sortedFarfrr(negatives_, positives_, min + i*step);
     //note: inversion to preserve X x Y ordering (FRR x FAR)
     retval(0,i) = ratios.second;
     retval(1,i) = ratios.first;
@@ -207,13 +295,17 @@ blitz::Array<double,2> bob::measure::roc(const blitz::Array<double,1>& negatives
 
 blitz::Array<double,2> bob::measure::precision_recall_curve(const blitz::Array<double,1>& negatives,
  const blitz::Array<double,1>& positives, size_t points) {
-  double min = std::min(blitz::min(negatives), blitz::min(positives));
-  double max = std::max(blitz::max(negatives), blitz::max(positives));
+  std::vector<double> negatives_, positives_;
+  bob::measure::detail::sortScores(negatives, negatives_);
+  bob::measure::detail::sortScores(positives, positives_);
+  std::pair<double, double> range = sortedRange(negatives_, positives_);
+  double min = range.first;
+  double max = range.second;
   double step = (max-min)/((double)points-1.0);
   blitz::Array<double,2> retval(2, points);
   for (int i=0; i<(int)points; ++i) {
     std::pair<double, double> ratios =
-      bob::measure::precision_recall(negatives, positives, min + i*step);
+      sortedPrecisionRecall(negatives_, positives_, min + i*step);
     retval(0,i) = ratios.first;
     retval(1,i) = ratios.second;
   }
@@ -520,15 +612,22 @@ blitz::Array<double,2> bob::measure::epc
  const blitz::Array<double,1>& dev_positives,
  const blitz::Array<double,1>& test_negatives,
  const blitz::Array<double,1>& test_positives, size_t points) {
+  std::vector<double> dev_negatives_, dev_positives_;
+  bob::measure::detail::sortScores(dev_negatives, dev_negatives_);
+  bob::measure::detail::sortScores(dev_positives, dev_positives_);
+  std::vector<double> test_negatives_, test_positives_;
+  bob::measure::detail::sortScores(test_negatives, test_negatives_);
+  bob::measure::detail::sortScores(test_positives, test_positives_);
   double step = 1.0/((double)points-1.0);
   blitz::Array<double,2> retval(2, points);
   for (int i=0; i<(int)points; ++i) {
     double alpha = (double)i*step;
     retval(0,i) = alpha;
-    double threshold = bob::measure::minWeightedErrorRateThreshold(dev_negatives,
-        dev_positives, alpha);
+    weighted_error predicate(alpha);
+    double threshold = bob::measure::detail::sortedMinimizingThreshold(
+        dev_negatives_, dev_positives_, predicate);
     std::pair<double, double> ratios =
-      bob::measure::farfrr(test_negatives, test_positives, threshold);
+      sortedFarfrr(test_negatives_, test_positives_, threshold);
     retval(1,i) = (ratios.first + ratios.second) / 2;
   }
   return retval;
@@ -24,6 +24,7 @@
 #include <bob/sp/DCT1D.h>
 #include <bob/core/assert.h>
 #include <fftw3.h>
+#include <algorithm>
 
 bob::sp::DCT1DAbstract::DCT1DAbstract(const size_t length):
   m_length(length)
@@ -80,6 +81,9 @@ void bob::sp::DCT1DAbstract::reset()
 {
   // Precompute some normalization factors
   initNormFactors();
+  // The plans are fetched again at the next call
+  m_plan.reset();
+  m_plan_many.reset();
 }
 
 void bob::sp::DCT1DAbstract::initNormFactors()
@@ -116,21 +120,15 @@ void bob::sp::DCT1D::operator()(const blitz::Array<double,1>& src,
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_length);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape( dst, src);
 
-  // Reinterpret cast to fftw format
-  double* src_ = const_cast<double*>(src.data());
-  double* dst_ = dst.data();
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_r2r_1d(src.extent(0), src_, dst_, FFTW_REDFT10, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // The plan is fetched once per length
+  m_plan.executeR2R(std::vector<int>(1, (int)m_length), FFTW_REDFT10,
+    src.data(), dst.data());
 
   // Normalize
   dst(0) *= m_sqrt_1byl/2.;
@@ -140,6 +138,30 @@ void bob::sp::DCT1D::operator()(const blitz::Array<double,1>& src,
   }
 }
 
+void bob::sp::DCT1D::operator()(const blitz::Array<double,2>& src, 
+  blitz::Array<double,2>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_length);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape( dst, src);
+
+  // Transform all the rows, by batches sharing a single FFTW plan
+  m_plan_many.executeManyR2R(std::vector<int>(1, (int)m_length), FFTW_REDFT10,
+    src.data(), dst.data(), src.extent(0));
+
+  // Normalize
+  blitz::Range rall = blitz::Range::all();
+  dst(rall, 0) *= m_sqrt_1byl/2.;
+  if (dst.extent(1)>1) {
+    blitz::Range r_dst(1, dst.ubound(1));
+    dst(rall, r_dst) *= m_sqrt_2byl/2.;
+  }
+}
+
 
 bob::sp::IDCT1D::IDCT1D():
   bob::sp::DCT1DAbstract(0)
@@ -165,6 +187,7 @@ void bob::sp::IDCT1D::operator()(const blitz::Array<double,1>& src,
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_length);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
@@ -180,14 +203,35 @@ void bob::sp::IDCT1D::operator()(const blitz::Array<double,1>& src,
     dst(r_dst) /= m_sqrt_2l;
   }
 
-  // Reinterpret cast to fftw format
-  double* dst_ = dst.data();
- 
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_r2r_1d(src.extent(0), dst_, dst_, FFTW_REDFT01, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // Transform in place, the plan being fetched once per length
+  m_plan.executeR2R(std::vector<int>(1, (int)m_length), FFTW_REDFT01,
+    dst.data(), dst.data());
+}
+
+void bob::sp::IDCT1D::operator()(const blitz::Array<double,2>& src, 
+  blitz::Array<double,2>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_length);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape( dst, src);
+
+  // Copy content from src to dst
+  dst = src;
+
+  // Normalize
+  blitz::Range rall = blitz::Range::all();
+  dst(rall, 0) /= m_sqrt_1l;
+  if (dst.extent(1)>1) {
+    blitz::Range r_dst(1, dst.ubound(1));
+    dst(rall, r_dst) /= m_sqrt_2l;
+  }
+
+  // Transform all the rows in place, by batches sharing a single FFTW plan
+  m_plan_many.executeManyR2R(std::vector<int>(1, (int)m_length), FFTW_REDFT01,
+    dst.data(), dst.data(), dst.extent(0));
 }
 
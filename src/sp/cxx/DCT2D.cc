@@ -24,6 +24,7 @@
 #include <bob/sp/DCT2D.h>
 #include <bob/core/assert.h>
 #include <fftw3.h>
+#include <algorithm>
 
 
 bob::sp::DCT2DAbstract::DCT2DAbstract(const size_t height, const size_t width):
@@ -64,7 +65,7 @@ bool bob::sp::DCT2DAbstract::operator!=(const bob::sp::DCT2DAbstract& b) const
 
 void bob::sp::DCT2DAbstract::reset(const size_t height, const size_t width)
 {
-  if (m_height != height && m_width != width) {
+  if (m_height != height || m_width != width) {
     // Update the height and width
     m_height = height;
     m_width = width;
@@ -89,6 +90,17 @@ void bob::sp::DCT2DAbstract::reset()
 {
   // Precompute some normalization factors
   initNormFactors();
+  // The plans are fetched again at the next call
+  m_plan.reset();
+  m_plan_many.reset();
+}
+
+std::vector<int> bob::sp::DCT2DAbstract::planShape() const
+{
+  std::vector<int> shape(2);
+  shape[0] = (int)m_height;
+  shape[1] = (int)m_width;
+  return shape;
 }
 
 void bob::sp::DCT2DAbstract::initNormFactors() 
@@ -125,21 +137,15 @@ void bob::sp::DCT2D::operator()(const blitz::Array<double,2>& src,
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_width);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape( dst, src);
 
-  // Reinterpret cast to fftw format
-  double* src_ = const_cast<double*>(src.data());
-  double* dst_ = dst.data();
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_r2r_2d(src.extent(0), src.extent(1), src_, dst_, FFTW_REDFT10, FFTW_REDFT10, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // The plan is fetched once per shape
+  m_plan.executeR2R(planShape(), FFTW_REDFT10, src.data(), dst.data());
 
   // Rescale the result
   for (int i=0; i<(int)m_height; ++i)
@@ -147,6 +153,29 @@ void bob::sp::DCT2D::operator()(const blitz::Array<double,2>& src,
       dst(i,j) = dst(i,j)/4.*(i==0?m_sqrt_1h:m_sqrt_2h)*(j==0?m_sqrt_1w:m_sqrt_2w);
 }
 
+void bob::sp::DCT2D::operator()(const blitz::Array<double,3>& src, 
+  blitz::Array<double,3>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(2), m_width);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape( dst, src);
+
+  // Transform all the 2D arrays, by batches sharing a single FFTW plan
+  m_plan_many.executeManyR2R(planShape(), FFTW_REDFT10, src.data(),
+    dst.data(), src.extent(0));
+
+  // Rescale the result
+  for (int k=0; k<dst.extent(0); ++k)
+    for (int i=0; i<(int)m_height; ++i)
+      for (int j=0; j<(int)m_width; ++j)
+        dst(k,i,j) = dst(k,i,j)/4.*(i==0?m_sqrt_1h:m_sqrt_2h)*(j==0?m_sqrt_1w:m_sqrt_2w);
+}
+
 
 bob::sp::IDCT2D::IDCT2D():
   bob::sp::DCT2DAbstract::DCT2DAbstract(0,0)
@@ -172,28 +201,20 @@ void bob::sp::IDCT2D::operator()(const blitz::Array<double,2>& src,
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_width);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape( dst, src);
 
   // Normalize
-  for (int j=0; j<(int)m_width; ++j)
-  {
-    // Copy the column into the C array and normalize it
-    for (int i=0; i<(int)m_height; ++i)
+  for (int i=0; i<(int)m_height; ++i)
+    for (int j=0; j<(int)m_width; ++j)
       dst(i,j) = src(i,j)*4/(i==0?m_sqrt_1h:m_sqrt_2h)/(j==0?m_sqrt_1w:m_sqrt_2w);
-  }
 
-  // Reinterpret cast to fftw format
-  double* dst_ = dst.data();
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_r2r_2d(src.extent(0), src.extent(1), dst_, dst_, FFTW_REDFT01, FFTW_REDFT01, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // Transform in place, the plan being fetched once per shape
+  m_plan.executeR2R(planShape(), FFTW_REDFT01, dst.data(), dst.data());
   
   // Rescale the result by the size of the input 
   // (as this is not performed by FFW)
@@ -201,3 +222,32 @@ void bob::sp::IDCT2D::operator()(const blitz::Array<double,2>& src,
   dst /= norm_factor;
 }
 
+void bob::sp::IDCT2D::operator()(const blitz::Array<double,3>& src, 
+  blitz::Array<double,3>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(2), m_width);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape( dst, src);
+
+  // Normalize
+  for (int k=0; k<dst.extent(0); ++k)
+    for (int i=0; i<(int)m_height; ++i)
+      for (int j=0; j<(int)m_width; ++j)
+        dst(k,i,j) = src(k,i,j)*4/(i==0?m_sqrt_1h:m_sqrt_2h)/(j==0?m_sqrt_1w:m_sqrt_2w);
+
+  // Transform all the 2D arrays in place, by batches sharing a single FFTW
+  // plan
+  m_plan_many.executeManyR2R(planShape(), FFTW_REDFT01, dst.data(),
+    dst.data(), dst.extent(0));
+
+  // Rescale the result by the size of the input 
+  // (as this is not performed by FFW)
+  double norm_factor = 4.*(int)m_width*(int)m_height;
+  dst /= norm_factor;
+}
+
@@ -24,6 +24,7 @@
 #include <bob/sp/FFT1D.h>
 #include <bob/core/assert.h>
 #include <fftw3.h>
+#include <algorithm>
 
 
 bob::sp::FFT1DAbstract::FFT1DAbstract(const size_t length):
@@ -61,8 +62,10 @@ bool bob::sp::FFT1DAbstract::operator!=(const bob::sp::FFT1DAbstract& b) const
 
 void bob::sp::FFT1DAbstract::reset(const size_t length)
 {
-  // Update the length
+  // Update the length, the plan being fetched again at the next call
   m_length = length;
+  m_plan.reset();
+  m_plan_many.reset();
 }
 
 void bob::sp::FFT1DAbstract::setLength(const size_t length)
@@ -95,21 +98,31 @@ void bob::sp::FFT1D::operator()(const blitz::Array<std::complex<double>,1>& src,
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_length);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape(dst, src);
 
-  // Reinterpret cast to fftw format
-  fftw_complex* src_ = reinterpret_cast<fftw_complex*>(const_cast<std::complex<double>* >(src.data()));
-  fftw_complex* dst_ = reinterpret_cast<fftw_complex*>(dst.data());
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_dft_1d(src.extent(0), src_, dst_, FFTW_FORWARD, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // The plan is fetched once per length
+  m_plan.executeDFT(std::vector<int>(1, (int)m_length), FFTW_FORWARD, src.data(),
+    dst.data());
+}
+
+void bob::sp::FFT1D::operator()(const blitz::Array<std::complex<double>,2>& src, 
+  blitz::Array<std::complex<double>,2>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_length);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape(dst, src);
+
+  // Transform all the rows, by batches sharing a single FFTW plan
+  m_plan_many.executeManyDFT(std::vector<int>(1, (int)m_length), FFTW_FORWARD,
+    src.data(), dst.data(), src.extent(0));
 }
 
 
@@ -137,21 +150,34 @@ void bob::sp::IFFT1D::operator()(const blitz::Array<std::complex<double>,1>& src
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_length);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape(dst, src);
+
+  // The plan is fetched once per length
+  m_plan.executeDFT(std::vector<int>(1, (int)m_length), FFTW_BACKWARD, src.data(),
+    dst.data());
+
+  // Rescale as FFTW is not doing it
+  dst /= static_cast<double>(m_length);
+}
+
+void bob::sp::IFFT1D::operator()(const blitz::Array<std::complex<double>,2>& src, 
+  blitz::Array<std::complex<double>,2>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_length);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape(dst, src);
 
-  // Reinterpret cast to fftw format
-  fftw_complex* src_ = reinterpret_cast<fftw_complex*>(const_cast<std::complex<double>* >(src.data()));
-  fftw_complex* dst_ = reinterpret_cast<fftw_complex*>(dst.data());
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_dft_1d(src.extent(0), src_, dst_, FFTW_BACKWARD, FFTW_ESTIMATE);
-  fftw_execute(p); /* repeat as needed */
-  fftw_destroy_plan(p);
+  // Transform all the rows, by batches sharing a single FFTW plan
+  m_plan_many.executeManyDFT(std::vector<int>(1, (int)m_length), FFTW_BACKWARD,
+    src.data(), dst.data(), src.extent(0));
 
   // Rescale as FFTW is not doing it
   dst /= static_cast<double>(m_length);
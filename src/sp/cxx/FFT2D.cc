@@ -24,6 +24,7 @@
 #include <bob/sp/FFT2D.h>
 #include <bob/core/assert.h>
 #include <fftw3.h>
+#include <algorithm>
 
 bob::sp::FFT2DAbstract::FFT2DAbstract(const size_t height, const size_t width):
   m_height(height), m_width(width)
@@ -60,9 +61,30 @@ bool bob::sp::FFT2DAbstract::operator!=(const bob::sp::FFT2DAbstract& b) const
 
 void bob::sp::FFT2DAbstract::reset(const size_t height, const size_t width)
 {
-  // Update the height and width
+  // Update the height and width, the plan being fetched again at the next
+  // call
   m_height = height;
   m_width = width;
+  m_plan.reset();
+  m_plan_many.reset();
+}
+
+void bob::sp::FFT2DAbstract::setHeight(const size_t height)
+{
+  reset(height, m_width);
+}
+
+void bob::sp::FFT2DAbstract::setWidth(const size_t width)
+{
+  reset(m_height, width);
+}
+
+std::vector<int> bob::sp::FFT2DAbstract::planShape() const
+{
+  std::vector<int> shape(2);
+  shape[0] = (int)m_height;
+  shape[1] = (int)m_width;
+  return shape;
 }
 
 bob::sp::FFT2D::FFT2D():
@@ -89,21 +111,15 @@ void bob::sp::FFT2D::operator()(const blitz::Array<std::complex<double>,2>& src,
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_width);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape( dst, src);
 
-  // Reinterpret cast to fftw format
-  fftw_complex* src_ = reinterpret_cast<fftw_complex*>(const_cast<std::complex<double>* >(src.data()));
-  fftw_complex* dst_ = reinterpret_cast<fftw_complex*>(dst.data());
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_dft_2d(src.extent(0), src.extent(1), src_, dst_, FFTW_FORWARD, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // The plan is fetched once per shape
+  m_plan.executeDFT(planShape(), FFTW_FORWARD, src.data(), dst.data());
 }
 
 
@@ -111,16 +127,28 @@ void bob::sp::FFT2D::operator()(blitz::Array<std::complex<double>,2>& src_dst) c
 {
   // check data
   bob::core::array::assertCZeroBaseContiguous(src_dst);
+  bob::core::array::assertSameDimensionLength(src_dst.extent(0), m_height);
+  bob::core::array::assertSameDimensionLength(src_dst.extent(1), m_width);
+
+  // The plan is fetched once per shape
+  m_plan.executeDFT(planShape(), FFTW_FORWARD, src_dst.data(), src_dst.data());
+}
 
-  // Reinterpret cast to fftw format
-  fftw_complex* src_dst_ = reinterpret_cast<fftw_complex*>(src_dst.data());
+void bob::sp::FFT2D::operator()(const blitz::Array<std::complex<double>,3>& src, 
+  blitz::Array<std::complex<double>,3>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(2), m_width);
 
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized
-  // for large arrays
-  p = fftw_plan_dft_2d(src_dst.extent(0), src_dst.extent(1), src_dst_, src_dst_, FFTW_FORWARD, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape(dst, src);
+
+  // Transform all the 2D arrays, by batches sharing a single FFTW plan
+  m_plan_many.executeManyDFT(planShape(), FFTW_FORWARD, src.data(), dst.data(),
+    src.extent(0));
 }
 
 
@@ -148,21 +176,15 @@ void bob::sp::IFFT2D::operator()(const blitz::Array<std::complex<double>,2>& src
 {
   // check input
   bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(0), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_width);
 
   // Check output
   bob::core::array::assertCZeroBaseContiguous(dst);
   bob::core::array::assertSameShape( dst, src);
 
-  // Reinterpret cast to fftw format
-  fftw_complex* src_ = reinterpret_cast<fftw_complex*>(const_cast<std::complex<double>* >(src.data()));
-  fftw_complex* dst_ = reinterpret_cast<fftw_complex*>(dst.data());
-  
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized 
-  // for large arrays
-  p = fftw_plan_dft_2d(src.extent(0), src.extent(1), src_, dst_, FFTW_BACKWARD, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // The plan is fetched once per shape
+  m_plan.executeDFT(planShape(), FFTW_BACKWARD, src.data(), dst.data());
 
   // Rescale the result by the size of the input 
   // (as this is not performed by FFTW)
@@ -173,18 +195,34 @@ void bob::sp::IFFT2D::operator()(blitz::Array<std::complex<double>,2>& src_dst)
 {
   // check data
   bob::core::array::assertCZeroBaseContiguous(src_dst);
+  bob::core::array::assertSameDimensionLength(src_dst.extent(0), m_height);
+  bob::core::array::assertSameDimensionLength(src_dst.extent(1), m_width);
 
-  // Reinterpret cast to fftw format
-  fftw_complex* src_dst_ = reinterpret_cast<fftw_complex*>(src_dst.data());
-
-  fftw_plan p;
-  // FFTW_ESTIMATE -> The planner is computed quickly but may not be optimized
-  // for large arrays
-  p = fftw_plan_dft_2d(src_dst.extent(0), src_dst.extent(1), src_dst_, src_dst_, FFTW_BACKWARD, FFTW_ESTIMATE);
-  fftw_execute(p);
-  fftw_destroy_plan(p);
+  // The plan is fetched once per shape
+  m_plan.executeDFT(planShape(), FFTW_BACKWARD, src_dst.data(), src_dst.data());
 
   // Rescale the result by the size of the input
   // (as this is not performed by FFTW)
   src_dst /= static_cast<double>(m_width*m_height);
 }
+
+void bob::sp::IFFT2D::operator()(const blitz::Array<std::complex<double>,3>& src, 
+  blitz::Array<std::complex<double>,3>& dst) const
+{
+  // check input
+  bob::core::array::assertCZeroBaseContiguous(src);
+  bob::core::array::assertSameDimensionLength(src.extent(1), m_height);
+  bob::core::array::assertSameDimensionLength(src.extent(2), m_width);
+
+  // Check output
+  bob::core::array::assertCZeroBaseContiguous(dst);
+  bob::core::array::assertSameShape(dst, src);
+
+  // Transform all the 2D arrays, by batches sharing a single FFTW plan
+  m_plan_many.executeManyDFT(planShape(), FFTW_BACKWARD, src.data(), dst.data(),
+    src.extent(0));
+
+  // Rescale the result by the size of the input
+  // (as this is not performed by FFTW)
+  dst /= static_cast<double>(m_width*m_height);
+}
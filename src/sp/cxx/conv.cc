@@ -0,0 +1,209 @@
+/**
+ * @file sp/cxx/conv.cc
+ * @date Sun Oct 18 09:41:02 2026 +0200
+ *
+ * @brief Fast convolution paths (separable kernels and FFT-based
+ * overlap-add) for large kernels
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <bob/sp/conv.h>
+#include <bob/sp/FFT1D.h>
+#include <bob/sp/FFT2D.h>
+#include <cmath>
+
+/**
+ * Index in the full convolution product of the first element of the output
+ * (the same along each dimension)
+ */
+static int conv_start(const int N, const bob::sp::Conv::SizeOption size_opt)
+{
+  if (size_opt == bob::sp::Conv::Full) return 0;
+  else if (size_opt == bob::sp::Conv::Same) return (N-1)/2;
+  else return N-1;
+}
+
+/**
+ * Size of the FFTs used to convolve a signal of length M with a kernel of
+ * length N: a power of two, at least twice as large as the kernel, unless
+ * the whole (padded) signal fits in a smaller transform.
+ */
+static int fft_size(const int M, const int N, const int min_size)
+{
+  int F = 1;
+  while (F < std::max(2*N, min_size)) F *= 2;
+  return std::min(M+N-1, F);
+}
+
+bool bob::sp::detail::convFast(const blitz::Array<double,1>& a,
+  const blitz::Array<double,1>& b, blitz::Array<double,1>& c,
+  const bob::sp::Conv::SizeOption size_opt)
+{
+  const int M = a.extent(0);
+  const int N = b.extent(0);
+  const int P = c.extent(0);
+  if (N < convFastMinKernelSize || P == 0) return false;
+
+  // Overlap-add: the signal is cut into tiles of length L, which are
+  // transformed all at once with the zero-padded kernel
+  const int F = fft_size(M, N, 1024);
+  const int L = F - N + 1;
+  const int n_tiles = (M + L - 1) / L;
+
+  blitz::Array<std::complex<double>,1> kernel(F);
+  kernel = 0.;
+  for (int k=0; k<N; ++k) kernel(k) = b(k);
+  bob::sp::FFT1D fft(F);
+  blitz::Array<std::complex<double>,1> kernel_f(F);
+  fft(kernel, kernel_f);
+
+  blitz::Array<std::complex<double>,2> tiles(n_tiles, F);
+  tiles = 0.;
+  for (int k=0; k<M; ++k) tiles(k/L, k%L) = a(k);
+  blitz::Array<std::complex<double>,2> tiles_f(n_tiles, F);
+  fft(tiles, tiles_f);
+  blitz::secondIndex j;
+  tiles_f *= kernel_f(j);
+  bob::sp::IFFT1D ifft(F);
+  ifft(tiles_f, tiles);
+
+  // Adds the overlapping parts of the tiles, and keeps the requested part
+  // of the full convolution product
+  blitz::Array<double,1> full(M+N-1);
+  full = 0.;
+  for (int t=0; t<n_tiles; ++t)
+    for (int k=0; k<F && t*L+k<M+N-1; ++k)
+      full(t*L+k) += tiles(t,k).real();
+
+  const int start = conv_start(N, size_opt);
+  for (int k=0; k<P; ++k) c(k) = full(start+k);
+  return true;
+}
+
+/**
+ * Checks if the kernel B is the outer product of a column u and a row v, up
+ * to rounding errors.
+ */
+static bool separate(const blitz::Array<double,2>& B,
+  blitz::Array<double,1>& u, blitz::Array<double,1>& v)
+{
+  // The largest element is used as a pivot
+  int p = 0, q = 0;
+  double max_abs = 0.;
+  for (int i=0; i<B.extent(0); ++i)
+    for (int j=0; j<B.extent(1); ++j)
+      if (std::fabs(B(i,j)) > max_abs) {
+        max_abs = std::fabs(B(i,j));
+        p = i;
+        q = j;
+      }
+  if (max_abs == 0.) return false;
+
+  u.resize(B.extent(0));
+  v.resize(B.extent(1));
+  for (int i=0; i<B.extent(0); ++i) u(i) = B(i,q);
+  for (int j=0; j<B.extent(1); ++j) v(j) = B(p,j) / B(p,q);
+
+  const double eps = 1e-12 * max_abs;
+  for (int i=0; i<B.extent(0); ++i)
+    for (int j=0; j<B.extent(1); ++j)
+      if (std::fabs(B(i,j) - u(i)*v(j)) > eps) return false;
+  return true;
+}
+
+bool bob::sp::detail::convFast(const blitz::Array<double,2>& A,
+  const blitz::Array<double,2>& B, blitz::Array<double,2>& C,
+  const bob::sp::Conv::SizeOption size_opt)
+{
+  const int M0 = A.extent(0);
+  const int M1 = A.extent(1);
+  const int N0 = B.extent(0);
+  const int N1 = B.extent(1);
+  const int P0 = C.extent(0);
+  const int P1 = C.extent(1);
+  if (N0*N1 < convFastMinKernelSize || P0 == 0 || P1 == 0) return false;
+
+  blitz::Range rall = blitz::Range::all();
+
+  // Separable kernel: convolves the columns and then the rows
+  blitz::Array<double,1> u, v;
+  if (separate(B, u, v)) {
+    blitz::Array<double,2> tmp(P0, M1);
+    for (int j=0; j<M1; ++j) {
+      blitz::Array<double,1> tmp_col(tmp(rall,j));
+      bob::sp::conv(A(rall,j), u, tmp_col, size_opt);
+    }
+    for (int i=0; i<P0; ++i) {
+      blitz::Array<double,1> C_row(C(i,rall));
+      bob::sp::conv(tmp(i,rall), v, C_row, size_opt);
+    }
+    return true;
+  }
+
+  // Overlap-add: the image is cut into tiles of size L0xL1. Each row of
+  // tiles is transformed at once with the zero-padded kernel.
+  const int F0 = fft_size(M0, N0, 64);
+  const int F1 = fft_size(M1, N1, 64);
+  const int L0 = F0 - N0 + 1;
+  const int L1 = F1 - N1 + 1;
+  const int n_tiles0 = (M0 + L0 - 1) / L0;
+  const int n_tiles1 = (M1 + L1 - 1) / L1;
+
+  blitz::Array<std::complex<double>,2> kernel(F0, F1);
+  kernel = 0.;
+  for (int k0=0; k0<N0; ++k0)
+    for (int k1=0; k1<N1; ++k1)
+      kernel(k0,k1) = B(k0,k1);
+  bob::sp::FFT2D fft(F0, F1);
+  bob::sp::IFFT2D ifft(F0, F1);
+  blitz::Array<std::complex<double>,2> kernel_f(F0, F1);
+  fft(kernel, kernel_f);
+
+  blitz::Array<std::complex<double>,3> tiles(n_tiles1, F0, F1);
+  blitz::Array<std::complex<double>,3> tiles_f(n_tiles1, F0, F1);
+  blitz::Array<double,2> full(M0+N0-1, M1+N1-1);
+  full = 0.;
+  blitz::secondIndex j;
+  blitz::thirdIndex k;
+  for (int t0=0; t0<n_tiles0; ++t0)
+  {
+    const int o0 = t0 * L0;
+    tiles = 0.;
+    for (int k0=0; k0<L0 && o0+k0<M0; ++k0)
+      for (int k1=0; k1<M1; ++k1)
+        tiles(k1/L1, k0, k1%L1) = A(o0+k0, k1);
+    fft(tiles, tiles_f);
+    tiles_f *= kernel_f(j,k);
+    ifft(tiles_f, tiles);
+
+    // Adds the overlapping parts of the tiles
+    for (int t1=0; t1<n_tiles1; ++t1)
+    {
+      const int o1 = t1 * L1;
+      for (int k0=0; k0<F0 && o0+k0<M0+N0-1; ++k0)
+        for (int k1=0; k1<F1 && o1+k1<M1+N1-1; ++k1)
+          full(o0+k0, o1+k1) += tiles(t1,k0,k1).real();
+    }
+  }
+
+  // Keeps the requested part of the full convolution product
+  const int start0 = conv_start(N0, size_opt);
+  const int start1 = conv_start(N1, size_opt);
+  for (int k0=0; k0<P0; ++k0)
+    for (int k1=0; k1<P1; ++k1)
+      C(k0,k1) = full(start0+k0, start1+k1);
+  return true;
+}
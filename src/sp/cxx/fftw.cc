@@ -0,0 +1,377 @@
+/**
+ * @file sp/cxx/fftw.cc
+ * @date Sat Oct 17 10:12:31 2026 +0200
+ *
+ * @brief Thread-safe cache of FFTW plans shared by the FFTW-based
+ * transforms of bob::sp, executed on per-thread aligned working buffers
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <bob/sp/fftw.h>
+#include <map>
+#include <algorithm>
+#include <new>
+#include <cstdio>
+#include <stdexcept>
+#include <boost/format.hpp>
+#include <boost/thread/mutex.hpp>
+#include <boost/thread/locks.hpp>
+#include <boost/thread/tss.hpp>
+#include <fftw3.h>
+
+/**
+ * The FFTW planner (plan creation and destruction, wisdom) is not
+ * thread-safe, whereas the execution of a plan is. All the calls to the
+ * planner are therefore serialized with a single mutex. The mutex and the
+ * cache are allocated once and never released, as transforms may still be
+ * destroyed by static destructors of other compilation units.
+ */
+static boost::mutex& planner_mutex() {
+  static boost::mutex* mutex = new boost::mutex;
+  return *mutex;
+}
+
+typedef std::map<std::vector<int>, boost::shared_ptr<bob::sp::detail::FFTWPlanHandle> > plan_cache_t;
+
+static plan_cache_t& plan_cache() {
+  static plan_cache_t* cache = new plan_cache_t;
+  return *cache;
+}
+
+static bob::sp::FFTW::PlanningRigor s_rigor = bob::sp::FFTW::Estimate;
+
+static unsigned planner_flags(const bob::sp::FFTW::PlanningRigor rigor) {
+  switch (rigor) {
+    case bob::sp::FFTW::Measure: return FFTW_MEASURE;
+    case bob::sp::FFTW::Patient: return FFTW_PATIENT;
+    case bob::sp::FFTW::Exhaustive: return FFTW_EXHAUSTIVE;
+    default: return FFTW_ESTIMATE;
+  }
+}
+
+/**
+ * The kind of transform, which is the first entry of a plan key
+ */
+static const int DFT = 0;
+static const int R2R = 1;
+
+struct bob::sp::detail::FFTWPlanHandle {
+  FFTWPlanHandle(fftw_plan p): plan(p) {}
+
+  ~FFTWPlanHandle() {
+    boost::lock_guard<boost::mutex> lock(planner_mutex());
+    fftw_destroy_plan(plan);
+  }
+
+  fftw_plan plan;
+};
+
+void bob::sp::setFFTWPlanningRigor(const bob::sp::FFTW::PlanningRigor rigor)
+{
+  boost::lock_guard<boost::mutex> lock(planner_mutex());
+  s_rigor = rigor;
+}
+
+bob::sp::FFTW::PlanningRigor bob::sp::getFFTWPlanningRigor()
+{
+  boost::lock_guard<boost::mutex> lock(planner_mutex());
+  return s_rigor;
+}
+
+void bob::sp::importFFTWWisdom(const std::string& filename)
+{
+  boost::lock_guard<boost::mutex> lock(planner_mutex());
+  FILE* f = fopen(filename.c_str(), "r");
+  if (!f) {
+    boost::format m("cannot open FFTW wisdom file '%s' for reading");
+    m % filename;
+    throw std::runtime_error(m.str());
+  }
+  const int ok = fftw_import_wisdom_from_file(f);
+  fclose(f);
+  if (!ok) {
+    boost::format m("cannot import FFTW wisdom from file '%s'");
+    m % filename;
+    throw std::runtime_error(m.str());
+  }
+}
+
+void bob::sp::exportFFTWWisdom(const std::string& filename)
+{
+  boost::lock_guard<boost::mutex> lock(planner_mutex());
+  FILE* f = fopen(filename.c_str(), "w");
+  if (!f) {
+    boost::format m("cannot open FFTW wisdom file '%s' for writing");
+    m % filename;
+    throw std::runtime_error(m.str());
+  }
+  fftw_export_wisdom_to_file(f);
+  fclose(f);
+}
+
+void bob::sp::clearFFTWPlanCache()
+{
+  // The plans are destroyed outside of the lock, as their destruction
+  // acquires it
+  plan_cache_t released;
+  {
+    boost::lock_guard<boost::mutex> lock(planner_mutex());
+    released.swap(plan_cache());
+  }
+}
+
+size_t bob::sp::getFFTWPlanCacheSize()
+{
+  boost::lock_guard<boost::mutex> lock(planner_mutex());
+  return plan_cache().size();
+}
+
+/**
+ * Fetches the plan of the given key from the cache, or creates it on the
+ * given (aligned) buffers. The plan may then be executed on any other pair
+ * of distinct buffers allocated with fftw_malloc().
+ */
+static boost::shared_ptr<bob::sp::detail::FFTWPlanHandle>
+  get_plan(const std::vector<int>& key, void* input, void* output)
+{
+  boost::lock_guard<boost::mutex> lock(planner_mutex());
+  // The planning flags are part of the key, so that changing the rigor
+  // leads to new plans; the input buffer is always overwritten before an
+  // execution, which lets FFTW use algorithms destroying it
+  const unsigned flags = planner_flags(s_rigor) | FFTW_DESTROY_INPUT;
+  std::vector<int> cache_key(key);
+  cache_key.push_back(static_cast<int>(flags));
+
+  plan_cache_t::iterator it = plan_cache().find(cache_key);
+  if (it != plan_cache().end()) return it->second;
+
+  // The frames of a batch are stored contiguously, one after the other
+  const int howmany = key[2];
+  const int rank = static_cast<int>(key.size()) - 3;
+  const int* n = &key[3];
+  int dist = 1;
+  for (int i=0; i<rank; ++i) dist *= n[i];
+  fftw_plan p = 0;
+  if (key[0] == DFT) {
+    p = fftw_plan_many_dft(rank, n, howmany,
+      static_cast<fftw_complex*>(input), 0, 1, dist,
+      static_cast<fftw_complex*>(output), 0, 1, dist, key[1], flags);
+  }
+  else {
+    std::vector<fftw_r2r_kind> kinds(rank,
+      static_cast<fftw_r2r_kind>(key[1]));
+    p = fftw_plan_many_r2r(rank, n, howmany,
+      static_cast<double*>(input), 0, 1, dist,
+      static_cast<double*>(output), 0, 1, dist, &kinds[0], flags);
+  }
+  if (!p) throw std::runtime_error("FFTW could not create a plan for the requested transform");
+
+  boost::shared_ptr<bob::sp::detail::FFTWPlanHandle> handle(
+    new bob::sp::detail::FFTWPlanHandle(p));
+  plan_cache()[cache_key] = handle;
+  return handle;
+}
+
+
+/**
+ * The aligned working buffers of the calling thread, on which all the plans
+ * are executed. They grow to the largest transform run by the thread, and
+ * are released when the thread exits.
+ */
+namespace {
+  struct ScratchBuffers {
+    ScratchBuffers(): input(0), output(0), bytes(0) {}
+    ~ScratchBuffers() { release(); }
+
+    void release() {
+      if (input) fftw_free(input);
+      if (output) fftw_free(output);
+      input = output = 0;
+      bytes = 0;
+    }
+
+    void reserve(const size_t size) {
+      if (input && size <= bytes) return;
+      release();
+      // At least one element is allocated, as FFTW does not accept null
+      // arrays
+      const size_t n = std::max(size, sizeof(fftw_complex));
+      input = fftw_malloc(n);
+      output = fftw_malloc(n);
+      if (!input || !output) {
+        release();
+        throw std::bad_alloc();
+      }
+      bytes = n;
+    }
+
+    void* input;
+    void* output;
+    size_t bytes;
+  };
+}
+
+static ScratchBuffers& scratch_buffers(const size_t bytes)
+{
+  static boost::thread_specific_ptr<ScratchBuffers>* buffers =
+    new boost::thread_specific_ptr<ScratchBuffers>;
+  if (!buffers->get()) buffers->reset(new ScratchBuffers);
+  ScratchBuffers& b = **buffers;
+  b.reserve(bytes);
+  return b;
+}
+
+/**
+ * A prepared plan, which is never modified once shared
+ */
+struct bob::sp::detail::FFTWPlanState {
+  boost::shared_ptr<FFTWPlanHandle> handle;
+  std::vector<int> key;
+  size_t frame_size;
+  size_t howmany;
+  size_t bytes;
+};
+
+bob::sp::detail::FFTWPlan::FFTWPlan()
+{
+}
+
+bob::sp::detail::FFTWPlan::FFTWPlan(const bob::sp::detail::FFTWPlan&)
+{
+}
+
+bob::sp::detail::FFTWPlan::~FFTWPlan()
+{
+}
+
+bob::sp::detail::FFTWPlan&
+bob::sp::detail::FFTWPlan::operator=(const bob::sp::detail::FFTWPlan& other)
+{
+  if (this != &other) reset();
+  return *this;
+}
+
+void bob::sp::detail::FFTWPlan::reset()
+{
+  // The previous state is released outside of the lock, as releasing the
+  // last reference to a plan acquires the planner lock
+  boost::shared_ptr<const FFTWPlanState> released;
+  boost::lock_guard<boost::mutex> lock(m_mutex);
+  released.swap(m_state);
+}
+
+boost::shared_ptr<const bob::sp::detail::FFTWPlanState>
+bob::sp::detail::FFTWPlan::acquire(const std::vector<int>& key,
+  const size_t frame_size, const size_t howmany, const size_t element_size)
+{
+  boost::shared_ptr<const FFTWPlanState> released;
+  boost::lock_guard<boost::mutex> lock(m_mutex);
+  if (m_state && m_state->key == key) return m_state;
+
+  boost::shared_ptr<FFTWPlanState> state(new FFTWPlanState);
+  state->key = key;
+  state->frame_size = frame_size;
+  state->howmany = howmany;
+  state->bytes = howmany * frame_size * element_size;
+  ScratchBuffers& b = scratch_buffers(state->bytes);
+  state->handle = get_plan(key, b.input, b.output);
+  released = m_state;
+  m_state = state;
+  return m_state;
+}
+
+/**
+ * Chooses the number of frames transformed at once: the smallest power of
+ * two holding all the frames, within a bounded memory footprint. Rounding to
+ * powers of two keeps the number of distinct cached plans low.
+ */
+static size_t batch_size(const size_t count, const size_t frame_size)
+{
+  static const size_t max_elements = 1 << 16;
+  const size_t max_batch = frame_size ? std::max<size_t>(1, max_elements / frame_size) : 1;
+  size_t batch = 1;
+  while (batch < count && 2 * batch <= max_batch) batch *= 2;
+  return batch;
+}
+
+static void execute(const fftw_plan plan, std::complex<double>* input,
+  std::complex<double>* output)
+{
+  fftw_execute_dft(plan, reinterpret_cast<fftw_complex*>(input),
+    reinterpret_cast<fftw_complex*>(output));
+}
+
+static void execute(const fftw_plan plan, double* input, double* output)
+{
+  fftw_execute_r2r(plan, input, output);
+}
+
+template <typename T>
+void bob::sp::detail::FFTWPlan::run(const int type, const int param,
+  const std::vector<int>& shape, const T* src, T* dst, const size_t count,
+  const bool many)
+{
+  std::vector<int> key;
+  key.reserve(shape.size() + 3);
+  key.push_back(type);
+  key.push_back(param);
+  key.push_back(1);
+  size_t frame_size = 1;
+  for (size_t i=0; i<shape.size(); ++i) {
+    key.push_back(shape[i]);
+    frame_size *= shape[i];
+  }
+  const size_t howmany = many ? batch_size(count, frame_size) : 1;
+  key[2] = static_cast<int>(howmany);
+
+  boost::shared_ptr<const FFTWPlanState> state =
+    acquire(key, frame_size, howmany, sizeof(T));
+  ScratchBuffers& b = scratch_buffers(state->bytes);
+  T* input = static_cast<T*>(b.input);
+  T* output = static_cast<T*>(b.output);
+  for (size_t i=0; i<count; i+=howmany) {
+    const size_t n = std::min(howmany, count-i) * frame_size;
+    const size_t offset = i * frame_size;
+    std::copy(src + offset, src + offset + n, input);
+    execute(state->handle->plan, input, output);
+    std::copy(output, output + n, dst + offset);
+  }
+}
+
+void bob::sp::detail::FFTWPlan::executeDFT(const std::vector<int>& shape,
+  const int sign, const std::complex<double>* src, std::complex<double>* dst)
+{
+  run(DFT, sign, shape, src, dst, 1, false);
+}
+
+void bob::sp::detail::FFTWPlan::executeR2R(const std::vector<int>& shape,
+  const int kind, const double* src, double* dst)
+{
+  run(R2R, kind, shape, src, dst, 1, false);
+}
+
+void bob::sp::detail::FFTWPlan::executeManyDFT(const std::vector<int>& shape,
+  const int sign, const std::complex<double>* src, std::complex<double>* dst,
+  const size_t count)
+{
+  run(DFT, sign, shape, src, dst, count, true);
+}
+
+void bob::sp::detail::FFTWPlan::executeManyR2R(const std::vector<int>& shape,
+  const int kind, const double* src, double* dst, const size_t count)
+{
+  run(R2R, kind, shape, src, dst, count, true);
+}
@@ -423,4 +423,60 @@ BOOST_AUTO_TEST_CASE( test_convolve_2D_3x4_2x2 )
     bob::sp::Conv::Valid);
 }
 
+// Large kernels are convolved with FFTs (or as two 1D convolutions when
+// separable), which should give the same results as the direct convolution
+BOOST_AUTO_TEST_CASE( test_convolve_fast )
+{
+  const bob::sp::Conv::SizeOption opts[] = {bob::sp::Conv::Full, 
+    bob::sp::Conv::Same, bob::sp::Conv::Valid};
+  blitz::firstIndex i;
+  blitz::secondIndex j;
+
+  // 1D signal with a kernel of 100 elements
+  blitz::Array<double,1> a(3000), b(100);
+  a = blitz::sin(0.37*i) + 0.01*i;
+  b = blitz::cos(0.11*i);
+  // 2D image with a non-separable kernel of 9x12 elements, and with a
+  // separable one of 11x11 elements
+  blitz::Array<double,2> A(150,130), B(9,12), S(11,11);
+  A = blitz::sin(0.3*i+0.7*j) + 0.001*i*j;
+  B = blitz::cos(0.5*i*j+0.2*i);
+  S = blitz::exp(-0.1*(i-5)*(i-5)) * blitz::exp(-0.2*(j-5)*(j-5));
+
+  for (int o=0; o<3; ++o) {
+    const bob::sp::Conv::SizeOption opt = opts[o];
+    const int N = b.extent(0);
+    blitz::Array<double,1> c(bob::sp::getConvOutputSize(a, b, opt));
+    blitz::Array<double,1> c_ref(c.shape());
+    bob::sp::conv(a, b, c, opt);
+    if (opt == bob::sp::Conv::Full)
+      bob::sp::detail::convInternal(a, b, c_ref, N-1, 1);
+    else if (opt == bob::sp::Conv::Same)
+      bob::sp::detail::convInternal(a, b, c_ref, N/2, (N+1)/2);
+    else
+      bob::sp::detail::convInternal(a, b, c_ref, 0, N);
+    for (int k=0; k<c.extent(0); ++k)
+      BOOST_CHECK_SMALL(c(k) - c_ref(k), 1e-8);
+
+    for (int s=0; s<2; ++s) {
+      const blitz::Array<double,2> K = (s == 0 ? B : S);
+      const int N0 = K.extent(0);
+      const int N1 = K.extent(1);
+      blitz::Array<double,2> C(bob::sp::getConvOutputSize(A, K, opt));
+      blitz::Array<double,2> C_ref(C.shape());
+      bob::sp::conv(A, K, C, opt);
+      if (opt == bob::sp::Conv::Full)
+        bob::sp::detail::convInternal(A, K, C_ref, N0-1, 1, N1-1, 1);
+      else if (opt == bob::sp::Conv::Same)
+        bob::sp::detail::convInternal(A, K, C_ref, N0/2, (N0+1)/2, N1/2,
+          (N1+1)/2);
+      else
+        bob::sp::detail::convInternal(A, K, C_ref, 0, N0, 0, N1);
+      for (int k0=0; k0<C.extent(0); ++k0)
+        for (int k1=0; k1<C.extent(1); ++k1)
+          BOOST_CHECK_SMALL(C(k0,k1) - C_ref(k0,k1), 1e-8);
+    }
+  }
+}
+
 BOOST_AUTO_TEST_SUITE_END()
@@ -23,6 +23,7 @@
 #include <bob/sp/Quantization.h>
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/make_shared.hpp>
 
 using namespace boost::python;
@@ -40,7 +41,9 @@ template <typename T, int N>
 static void inner_call_quantization(const bob::sp::Quantization<T>& op, bob::python::const_ndarray input, bob::python::ndarray output) 
 {
   blitz::Array<uint32_t,N> output_ = output.bz<uint32_t,N>();
-  op(input.bz<T,N>(), output_);
+  blitz::Array<T,N> input_ = input.bz<T,N>();
+  bob::python::no_gil unlock;
+  op(input_, output_);
 }
 
 template <typename T>
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 
 #include <bob/sp/DCT1D.h>
 #include <bob/sp/DCT2D.h>
@@ -41,66 +42,86 @@ static const char* DCT_DOC = "Compute the direct DCT of a 1 or 2D array/signal o
 static const char* IDCT_DOC = "Compute the inverse DCT of a 1 or 2D array/signal of type float64.";
 
 
-static void py_dct1d_c(bob::sp::DCT1D& op, bob::python::const_ndarray src,
+template <typename Op>
+static void py_dct1d_c(Op& op, bob::python::const_ndarray src,
   bob::python::ndarray dst) 
 {
-  blitz::Array<double,1> dst_ = dst.bz<double,1>();
-  op(src.bz<double,1>(), dst_);
-}
-
-static object py_dct1d_p(bob::sp::DCT1D& op, bob::python::const_ndarray src)
-{
-  bob::python::ndarray dst(bob::core::array::t_float64, op.getLength());
-  blitz::Array<double,1> dst_ = dst.bz<double,1>();
-  op(src.bz<double,1>(), dst_);
-  return dst.self();
-}
-
-static void py_idct1d_c(bob::sp::IDCT1D& op, bob::python::const_ndarray src,
-  bob::python::ndarray dst) 
-{
-  blitz::Array<double,1> dst_ = dst.bz<double,1>();
-  op(src.bz<double,1>(), dst_);
+  switch (src.type().nd) {
+    case 1:
+      {
+        blitz::Array<double,1> dst_ = dst.bz<double,1>();
+        blitz::Array<double,1> src_ = src.bz<double,1>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    case 2:
+      {
+        blitz::Array<double,2> dst_ = dst.bz<double,2>();
+        blitz::Array<double,2> src_ = src.bz<double,2>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    default:
+      PYTHON_ERROR(TypeError, "DCT1D only supports 1D arrays, or 2D arrays of 1D signals - you provided an array of dimensionality '" SIZE_T_FMT "'.", src.type().nd);
+  }
 }
 
-static object py_idct1d_p(bob::sp::IDCT1D& op, bob::python::const_ndarray src)
+template <typename Op>
+static object py_dct1d_p(Op& op, bob::python::const_ndarray src)
 {
+  const bob::core::array::typeinfo& info = src.type();
+  if (info.nd == 2) {
+    bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0],
+      op.getLength());
+    py_dct1d_c(op, src, dst);
+    return dst.self();
+  }
   bob::python::ndarray dst(bob::core::array::t_float64, op.getLength());
-  blitz::Array<double,1> dst_ = dst.bz<double,1>();
-  op(src.bz<double,1>(), dst_);
+  py_dct1d_c(op, src, dst);
   return dst.self();
 }
 
-
-static void py_dct2d_c(bob::sp::DCT2D& op, bob::python::const_ndarray src,
+template <typename Op>
+static void py_dct2d_c(Op& op, bob::python::const_ndarray src,
   bob::python::ndarray dst) 
 {
-  blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<double,2>(), dst_);
-}
-
-static object py_dct2d_p(bob::sp::DCT2D& op, bob::python::const_ndarray src)
-{
-  bob::python::ndarray dst(bob::core::array::t_float64, op.getHeight(), 
-    op.getWidth());
-  blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<double,2>(), dst_);
-  return dst.self();
-}
-
-static void py_idct2d_c(bob::sp::IDCT2D& op, bob::python::const_ndarray src,
-  bob::python::ndarray dst) 
-{
-  blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<double,2>(), dst_);
+  switch (src.type().nd) {
+    case 2:
+      {
+        blitz::Array<double,2> dst_ = dst.bz<double,2>();
+        blitz::Array<double,2> src_ = src.bz<double,2>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    case 3:
+      {
+        blitz::Array<double,3> dst_ = dst.bz<double,3>();
+        blitz::Array<double,3> src_ = src.bz<double,3>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    default:
+      PYTHON_ERROR(TypeError, "DCT2D only supports 2D arrays, or 3D arrays of 2D signals - you provided an array of dimensionality '" SIZE_T_FMT "'.", src.type().nd);
+  }
 }
 
-static object py_idct2d_p(bob::sp::IDCT2D& op, bob::python::const_ndarray src)
+template <typename Op>
+static object py_dct2d_p(Op& op, bob::python::const_ndarray src)
 {
+  const bob::core::array::typeinfo& info = src.type();
+  if (info.nd == 3) {
+    bob::python::ndarray dst(bob::core::array::t_float64, info.shape[0],
+      op.getHeight(), op.getWidth());
+    py_dct2d_c(op, src, dst);
+    return dst.self();
+  }
   bob::python::ndarray dst(bob::core::array::t_float64, op.getHeight(), 
     op.getWidth());
-  blitz::Array<double,2> dst_ = dst.bz<double,2>();
-  op(src.bz<double,2>(), dst_);
+  py_dct2d_c(op, src, dst);
   return dst.self();
 }
 
@@ -114,14 +135,18 @@ static object script_dct(bob::python::const_ndarray ar)
       {
         bob::sp::DCT1D op(info.shape[0]);
         blitz::Array<double,1> res_ = res.bz<double,1>();
-        op(ar.bz<double,1>(), res_);
+        blitz::Array<double,1> ar_ = ar.bz<double,1>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     case 2:
       {
         bob::sp::DCT2D op(info.shape[0], info.shape[1]);
         blitz::Array<double,2> res_ = res.bz<double,2>();
-        op(ar.bz<double,2>(), res_);
+        blitz::Array<double,2> ar_ = ar.bz<double,2>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     default:
@@ -138,14 +163,18 @@ static object script_idct(bob::python::const_ndarray ar) {
       {
         bob::sp::IDCT1D op(info.shape[0]);
         blitz::Array<double,1> res_ = res.bz<double,1>();
-        op(ar.bz<double,1>(), res_);
+        blitz::Array<double,1> ar_ = ar.bz<double,1>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     case 2:
       {
         bob::sp::IDCT2D op(info.shape[0], info.shape[1]);
         blitz::Array<double,2> res_ = res.bz<double,2>();
-        op(ar.bz<double,2>(), res_);
+        blitz::Array<double,2> ar_ = ar.bz<double,2>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     default:
@@ -167,16 +196,16 @@ void bind_sp_dct()
       .def(init<bob::sp::DCT1D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_dct1d_c, (arg("self"), arg("input"), arg("output")), "Compute the DCT of the input 1D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_dct1d_p, (arg("self"), arg("input")), "Compute the DCT of the input 1D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_dct1d_c<bob::sp::DCT1D>, (arg("self"), arg("input"), arg("output")), "Compute the DCT of the input 1D array/signal, or of each row of a 2D array. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_dct1d_p<bob::sp::DCT1D>, (arg("self"), arg("input")), "Compute the DCT of the input 1D array/signal, or of each row of a 2D array. The output is allocated and returned.")
     ;
 
   class_<bob::sp::IDCT1D, boost::shared_ptr<bob::sp::IDCT1D>, bases<bob::sp::DCT1DAbstract> >("IDCT1D", IDCT1D_DOC, init<const size_t>((arg("self"), arg("length"))))
       .def(init<bob::sp::IDCT1D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_idct1d_c, (arg("self"), arg("input"), arg("output")), "Compute the inverse DCT of the input 1D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_idct1d_p, (arg("self"), arg("input")), "Compute the inverse DCT of the input 1D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_dct1d_c<bob::sp::IDCT1D>, (arg("self"), arg("input"), arg("output")), "Compute the inverse DCT of the input 1D array/signal, or of each row of a 2D array. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_dct1d_p<bob::sp::IDCT1D>, (arg("self"), arg("input")), "Compute the inverse DCT of the input 1D array/signal, or of each row of a 2D array. The output is allocated and returned.")
     ;
 
   class_<bob::sp::DCT2DAbstract, boost::noncopyable>("DCT2DAbstract", "Abstract class for DCT2D", no_init)
@@ -189,16 +218,16 @@ void bind_sp_dct()
       .def(init<bob::sp::DCT2D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_dct2d_c, (arg("self"), arg("input"), arg("output")), "Compute the DCT of the input 2D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_dct2d_p, (arg("self"), arg("input")), "Compute the DCT of the input 2D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_dct2d_c<bob::sp::DCT2D>, (arg("self"), arg("input"), arg("output")), "Compute the DCT of the input 2D array/signal, or of each 2D array of a 3D stack. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_dct2d_p<bob::sp::DCT2D>, (arg("self"), arg("input")), "Compute the DCT of the input 2D array/signal, or of each 2D array of a 3D stack. The output is allocated and returned.")
     ;
 
   class_<bob::sp::IDCT2D, boost::shared_ptr<bob::sp::IDCT2D>, bases<bob::sp::DCT2DAbstract> >("IDCT2D", IDCT2D_DOC, init<const size_t, const size_t>((arg("self"), arg("height"), arg("width"))))
       .def(init<bob::sp::IDCT2D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_idct2d_c, (arg("self"), arg("input"), arg("output")), "Compute the inverse DCT of the input 2D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_idct2d_p, (arg("self"), arg("input")), "Compute the inverse DCT of the input 2D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_dct2d_c<bob::sp::IDCT2D>, (arg("self"), arg("input"), arg("output")), "Compute the inverse DCT of the input 2D array/signal, or of each 2D array of a 3D stack. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_dct2d_p<bob::sp::IDCT2D>, (arg("self"), arg("input")), "Compute the inverse DCT of the input 2D array/signal, or of each 2D array of a 3D stack. The output is allocated and returned.")
     ;
 
   // dct function-like
@@ -22,6 +22,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 
 #include <bob/sp/FFT1D.h>
 #include <bob/sp/FFT2D.h>
@@ -46,66 +47,86 @@ static const char* FFTSHIFT_DOC = "If a 1D complex128 array is passed, inverses
 static const char* IFFTSHIFT_DOC = "This method undo what fftshift() does. Accepts 1 or 2D array of type complex128.";
 
 
-static void py_fft1d_c(bob::sp::FFT1D& op, bob::python::const_ndarray src,
+template <typename Op>
+static void py_fft1d_c(Op& op, bob::python::const_ndarray src,
   bob::python::ndarray dst) 
 {
-  blitz::Array<std::complex<double>,1> dst_ = dst.bz<std::complex<double>,1>();
-  op(src.bz<std::complex<double>,1>(), dst_);
-}
-
-static object py_fft1d_p(bob::sp::FFT1D& op, bob::python::const_ndarray src)
-{
-  bob::python::ndarray dst(bob::core::array::t_complex128, op.getLength());
-  blitz::Array<std::complex<double>,1> dst_ = dst.bz<std::complex<double>,1>();
-  op(src.bz<std::complex<double>,1>(), dst_);
-  return dst.self();
-}
-
-static void py_ifft1d_c(bob::sp::IFFT1D& op, bob::python::const_ndarray src,
-  bob::python::ndarray dst) 
-{
-  blitz::Array<std::complex<double>,1> dst_ = dst.bz<std::complex<double>,1>();
-  op(src.bz<std::complex<double>,1>(), dst_);
+  switch (src.type().nd) {
+    case 1:
+      {
+        blitz::Array<std::complex<double>,1> dst_ = dst.bz<std::complex<double>,1>();
+        blitz::Array<std::complex<double>,1> src_ = src.bz<std::complex<double>,1>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    case 2:
+      {
+        blitz::Array<std::complex<double>,2> dst_ = dst.bz<std::complex<double>,2>();
+        blitz::Array<std::complex<double>,2> src_ = src.bz<std::complex<double>,2>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    default:
+      PYTHON_ERROR(TypeError, "FFT1D only supports 1D arrays, or 2D arrays of 1D signals - you provided an array of dimensionality '" SIZE_T_FMT "'.", src.type().nd);
+  }
 }
 
-static object py_ifft1d_p(bob::sp::IFFT1D& op, bob::python::const_ndarray src)
+template <typename Op>
+static object py_fft1d_p(Op& op, bob::python::const_ndarray src)
 {
+  const bob::core::array::typeinfo& info = src.type();
+  if (info.nd == 2) {
+    bob::python::ndarray dst(bob::core::array::t_complex128, info.shape[0],
+      op.getLength());
+    py_fft1d_c(op, src, dst);
+    return dst.self();
+  }
   bob::python::ndarray dst(bob::core::array::t_complex128, op.getLength());
-  blitz::Array<std::complex<double>,1> dst_ = dst.bz<std::complex<double>,1>();
-  op(src.bz<std::complex<double>,1>(), dst_);
+  py_fft1d_c(op, src, dst);
   return dst.self();
 }
 
-
-static void py_fft2d_c(bob::sp::FFT2D& op, bob::python::const_ndarray src,
+template <typename Op>
+static void py_fft2d_c(Op& op, bob::python::const_ndarray src,
   bob::python::ndarray dst) 
 {
-  blitz::Array<std::complex<double>,2> dst_ = dst.bz<std::complex<double>,2>();
-  op(src.bz<std::complex<double>,2>(), dst_);
-}
-
-static object py_fft2d_p(bob::sp::FFT2D& op, bob::python::const_ndarray src)
-{
-  bob::python::ndarray dst(bob::core::array::t_complex128, op.getHeight(), 
-    op.getWidth());
-  blitz::Array<std::complex<double>,2> dst_ = dst.bz<std::complex<double>,2>();
-  op(src.bz<std::complex<double>,2>(), dst_);
-  return dst.self();
-}
-
-static void py_ifft2d_c(bob::sp::IFFT2D& op, bob::python::const_ndarray src,
-  bob::python::ndarray dst) 
-{
-  blitz::Array<std::complex<double>,2> dst_ = dst.bz<std::complex<double>,2>();
-  op(src.bz<std::complex<double>,2>(), dst_);
+  switch (src.type().nd) {
+    case 2:
+      {
+        blitz::Array<std::complex<double>,2> dst_ = dst.bz<std::complex<double>,2>();
+        blitz::Array<std::complex<double>,2> src_ = src.bz<std::complex<double>,2>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    case 3:
+      {
+        blitz::Array<std::complex<double>,3> dst_ = dst.bz<std::complex<double>,3>();
+        blitz::Array<std::complex<double>,3> src_ = src.bz<std::complex<double>,3>();
+        bob::python::no_gil unlock;
+        op(src_, dst_);
+      }
+      break;
+    default:
+      PYTHON_ERROR(TypeError, "FFT2D only supports 2D arrays, or 3D arrays of 2D signals - you provided an array of dimensionality '" SIZE_T_FMT "'.", src.type().nd);
+  }
 }
 
-static object py_ifft2d_p(bob::sp::IFFT2D& op, bob::python::const_ndarray src)
+template <typename Op>
+static object py_fft2d_p(Op& op, bob::python::const_ndarray src)
 {
+  const bob::core::array::typeinfo& info = src.type();
+  if (info.nd == 3) {
+    bob::python::ndarray dst(bob::core::array::t_complex128, info.shape[0],
+      op.getHeight(), op.getWidth());
+    py_fft2d_c(op, src, dst);
+    return dst.self();
+  }
   bob::python::ndarray dst(bob::core::array::t_complex128, op.getHeight(), 
     op.getWidth());
-  blitz::Array<std::complex<double>,2> dst_ = dst.bz<std::complex<double>,2>();
-  op(src.bz<std::complex<double>,2>(), dst_);
+  py_fft2d_c(op, src, dst);
   return dst.self();
 }
 
@@ -120,14 +141,18 @@ static object script_fft(bob::python::const_ndarray ar)
       {
         bob::sp::FFT1D op(info.shape[0]);
         blitz::Array<dcplx,1> res_ = res.bz<dcplx,1>();
-        op(ar.bz<dcplx,1>(), res_);
+        blitz::Array<dcplx,1> ar_ = ar.bz<dcplx,1>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     case 2:
       {
         bob::sp::FFT2D op(info.shape[0], info.shape[1]);
         blitz::Array<dcplx,2> res_ = res.bz<dcplx,2>();
-        op(ar.bz<dcplx,2>(), res_);
+        blitz::Array<dcplx,2> ar_ = ar.bz<dcplx,2>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     default:
@@ -146,14 +171,18 @@ static object script_ifft(bob::python::const_ndarray ar)
       {
         bob::sp::IFFT1D op(info.shape[0]);
         blitz::Array<dcplx,1> res_ = res.bz<dcplx,1>();
-        op(ar.bz<dcplx,1>(), res_);
+        blitz::Array<dcplx,1> ar_ = ar.bz<dcplx,1>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     case 2:
       {
         bob::sp::IFFT2D op(info.shape[0], info.shape[1]);
         blitz::Array<dcplx,2> res_ = res.bz<dcplx,2>();
-        op(ar.bz<dcplx,2>(), res_);
+        blitz::Array<dcplx,2> ar_ = ar.bz<dcplx,2>();
+        bob::python::no_gil unlock;
+        op(ar_, res_);
       }
       break;
     default:
@@ -268,16 +297,16 @@ void bind_sp_fft()
       .def(init<bob::sp::FFT1D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_fft1d_c, (arg("self"), arg("input"), arg("output")), "Compute the FFT of the input 1D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_fft1d_p, (arg("self"), arg("input")), "Compute the FFT of the input 1D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_fft1d_c<bob::sp::FFT1D>, (arg("self"), arg("input"), arg("output")), "Compute the FFT of the input 1D array/signal, or of each row of a 2D array. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_fft1d_p<bob::sp::FFT1D>, (arg("self"), arg("input")), "Compute the FFT of the input 1D array/signal, or of each row of a 2D array. The output is allocated and returned.")
     ;
 
   class_<bob::sp::IFFT1D, boost::shared_ptr<bob::sp::IFFT1D>, bases<bob::sp::FFT1DAbstract> >("IFFT1D", IFFT1D_DOC, init<const size_t>((arg("self"), arg("length"))))
       .def(init<bob::sp::IFFT1D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_ifft1d_c, (arg("self"), arg("input"), arg("output")), "Compute the inverse FFT of the input 1D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_ifft1d_p, (arg("self"), arg("input")), "Compute the inverse FFT of the input 1D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_fft1d_c<bob::sp::IFFT1D>, (arg("self"), arg("input"), arg("output")), "Compute the inverse FFT of the input 1D array/signal, or of each row of a 2D array. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_fft1d_p<bob::sp::IFFT1D>, (arg("self"), arg("input")), "Compute the inverse FFT of the input 1D array/signal, or of each row of a 2D array. The output is allocated and returned.")
     ;
 
   class_<bob::sp::FFT2DAbstract, boost::noncopyable>("FFT2DAbstract", "Abstract class for FFT2D", no_init)
@@ -290,16 +319,16 @@ void bind_sp_fft()
       .def(init<bob::sp::FFT2D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_fft2d_c, (arg("self"), arg("input"), arg("output")), "Compute the FFT of the input 2D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_fft2d_p, (arg("self"), arg("input")), "Compute the FFT of the input 2D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_fft2d_c<bob::sp::FFT2D>, (arg("self"), arg("input"), arg("output")), "Compute the FFT of the input 2D array/signal, or of each 2D array of a 3D stack. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_fft2d_p<bob::sp::FFT2D>, (arg("self"), arg("input")), "Compute the FFT of the input 2D array/signal, or of each 2D array of a 3D stack. The output is allocated and returned.")
     ;
 
   class_<bob::sp::IFFT2D, boost::shared_ptr<bob::sp::IFFT2D>, bases<bob::sp::FFT2DAbstract> >("IFFT2D", IFFT2D_DOC, init<const size_t,const size_t>((arg("self"), arg("height"), arg("width"))))
       .def(init<bob::sp::IFFT2D&>((arg("self"), arg("other"))))
       .def(self == self)
       .def(self != self)
-      .def("__call__", &py_ifft2d_c, (arg("self"), arg("input"), arg("output")), "Compute the inverse FFT of the input 2D array/signal. The output should have the expected size and type (numpy.float64).")
-      .def("__call__", &py_ifft2d_p, (arg("self"), arg("input")), "Compute the inverse FFT of the input 2D array/signal. The output is allocated and returned.")
+      .def("__call__", &py_fft2d_c<bob::sp::IFFT2D>, (arg("self"), arg("input"), arg("output")), "Compute the inverse FFT of the input 2D array/signal, or of each 2D array of a 3D stack. The output should have the expected size and type (numpy.float64).")
+      .def("__call__", &py_fft2d_p<bob::sp::IFFT2D>, (arg("self"), arg("input")), "Compute the inverse FFT of the input 2D array/signal, or of each 2D array of a 3D stack. The output is allocated and returned.")
     ;
 
   // fft function-like 
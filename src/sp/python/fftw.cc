@@ -0,0 +1,42 @@
+/**
+ * @file sp/python/fftw.cc
+ * @date Sat Oct 17 10:12:31 2026 +0200
+ *
+ * @brief Binds the configuration of the FFTW plan cache
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <boost/python.hpp>
+#include <bob/sp/fftw.h>
+
+using namespace boost::python;
+
+void bind_sp_fftw()
+{
+  enum_<bob::sp::FFTW::PlanningRigor>("FFTWPlanningRigor")
+    .value("Estimate", bob::sp::FFTW::Estimate)
+    .value("Measure", bob::sp::FFTW::Measure)
+    .value("Patient", bob::sp::FFTW::Patient)
+    .value("Exhaustive", bob::sp::FFTW::Exhaustive)
+    ;
+
+  def("set_fftw_planning_rigor", &bob::sp::setFFTWPlanningRigor, (arg("rigor")), "Sets the rigor used by FFTW to create the plans of the FFT and DCT transforms (Estimate by default). A higher rigor (e.g. Measure) takes longer to plan, but may lead to faster transforms. Plans already in use are kept.");
+  def("get_fftw_planning_rigor", &bob::sp::getFFTWPlanningRigor, "Gets the rigor used by FFTW to create the plans of the FFT and DCT transforms.");
+  def("import_fftw_wisdom", &bob::sp::importFFTWWisdom, (arg("filename")), "Imports FFTW wisdom from the given file, so that the plans it describes are created without measuring them again.");
+  def("export_fftw_wisdom", &bob::sp::exportFFTWWisdom, (arg("filename")), "Exports the FFTW wisdom accumulated so far to the given file.");
+  def("clear_fftw_plan_cache", &bob::sp::clearFFTWPlanCache, "Releases the FFTW plans shared by the FFT and DCT transforms.");
+  def("fftw_plan_cache_size", &bob::sp::getFFTWPlanCacheSize, "Returns the number of FFTW plans currently cached.");
+}
@@ -26,6 +26,7 @@ void bind_sp_version();
 void bind_sp_extrapolate();
 void bind_sp_dct();
 void bind_sp_fft();
+void bind_sp_fftw();
 void bind_sp_convolution();
 void bind_sp_convolution();
 void bind_sp_quantization();
@@ -38,6 +39,7 @@ BOOST_PYTHON_MODULE(_sp) {
   bind_sp_extrapolate();
   bind_sp_dct();
   bind_sp_fft();
+  bind_sp_fftw();
   bind_sp_convolution();
   bind_sp_quantization();
 }
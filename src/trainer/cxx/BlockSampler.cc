@@ -0,0 +1,177 @@
+/**
+ * @file trainer/cxx/BlockSampler.cc
+ * @date Sun Oct 18 11:05:47 2026 +0200
+ *
+ * @brief Implementation of the BlockSampler.
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <bob/trainer/BlockSampler.h>
+#include <bob/io/utils.h>
+#include <bob/core/blitz_array.h>
+#include <stdexcept>
+#include <algorithm>
+#include <set>
+#include <boost/format.hpp>
+
+bob::trainer::BlockSampler::BlockSampler(
+    const std::vector<boost::shared_ptr<bob::io::File> >& files,
+    const size_t block_size):
+  m_files(files),
+  m_n_inputs(0),
+  m_block_size(block_size)
+{
+  initialize();
+}
+
+bob::trainer::BlockSampler::BlockSampler(
+    const std::vector<std::string>& filenames, const size_t block_size):
+  m_n_inputs(0),
+  m_block_size(block_size)
+{
+  for (size_t i=0; i<filenames.size(); ++i)
+    m_files.push_back(bob::io::open(filenames[i], 'r'));
+  initialize();
+}
+
+bob::trainer::BlockSampler::BlockSampler(
+    const bob::trainer::BlockSampler& other):
+  m_files(other.m_files),
+  m_offsets(other.m_offsets),
+  m_n_inputs(other.m_n_inputs),
+  m_block_size(other.m_block_size)
+{
+}
+
+bob::trainer::BlockSampler::~BlockSampler() {}
+
+bob::trainer::BlockSampler& bob::trainer::BlockSampler::operator=(
+    const bob::trainer::BlockSampler& other)
+{
+  if (this != &other) {
+    m_files = other.m_files;
+    m_offsets = other.m_offsets;
+    m_n_inputs = other.m_n_inputs;
+    m_block_size = other.m_block_size;
+  }
+  return *this;
+}
+
+void bob::trainer::BlockSampler::initialize()
+{
+  if (m_files.empty())
+    throw std::runtime_error("a block sampler requires at least one file");
+  setBlockSize(m_block_size);
+
+  m_offsets.resize(1, 0);
+  for (size_t i=0; i<m_files.size(); ++i) {
+    const bob::core::array::typeinfo& info = m_files[i]->type();
+    if (info.nd != 1) {
+      boost::format m("file '%s' cannot be read as a sequence of 1D arrays (%s)");
+      m % m_files[i]->filename() % info.str();
+      throw std::runtime_error(m.str());
+    }
+    if (i == 0) m_n_inputs = info.shape[0];
+    else if (info.shape[0] != m_n_inputs) {
+      boost::format m("the samples of file '%s' are of length %u, whereas the previous ones are of length %u");
+      m % m_files[i]->filename() % info.shape[0] % m_n_inputs;
+      throw std::runtime_error(m.str());
+    }
+    m_offsets.push_back(m_offsets.back() + m_files[i]->size());
+  }
+}
+
+void bob::trainer::BlockSampler::setBlockSize(const size_t block_size)
+{
+  if (block_size == 0)
+    throw std::runtime_error("the block size of a block sampler should be strictly positive");
+  m_block_size = block_size;
+}
+
+void bob::trainer::BlockSampler::readSample(const size_t index,
+  blitz::Array<double,1>& sample) const
+{
+  // Finds the file holding this sample
+  const size_t f = std::upper_bound(m_offsets.begin(), m_offsets.end(), index)
+    - m_offsets.begin() - 1;
+  bob::io::File& file = *m_files[f];
+  const size_t local = index - m_offsets[f];
+
+  // Samples stored as double are directly read into the destination (which
+  // is contiguous), others are converted
+  const bob::core::array::typeinfo& info = file.type();
+  if (info.dtype == bob::core::array::t_float64 && sample.isStorageContiguous()) {
+    bob::core::array::blitz_array buffer(sample.data(), info);
+    file.read(buffer, local);
+  }
+  else
+    sample = file.cast<double,1>(local);
+}
+
+void bob::trainer::BlockSampler::getBlock(const size_t i,
+  blitz::Array<double,2>& block) const
+{
+  if (i >= getNBlocks()) {
+    boost::format m("block index %u is out of range (the sampler has %u blocks)");
+    m % i % getNBlocks();
+    throw std::runtime_error(m.str());
+  }
+  const size_t start = i * m_block_size;
+  const size_t n = std::min(m_block_size, getNSamples() - start);
+  block.resize(n, m_n_inputs);
+  for (size_t k=0; k<n; ++k) {
+    blitz::Array<double,1> sample(block(k, blitz::Range::all()));
+    readSample(start + k, sample);
+  }
+}
+
+void bob::trainer::BlockSampler::getSamples(const std::vector<size_t>& indices,
+  blitz::Array<double,2>& samples) const
+{
+  samples.resize(indices.size(), m_n_inputs);
+  for (size_t k=0; k<indices.size(); ++k) {
+    if (indices[k] >= getNSamples()) {
+      boost::format m("sample index %u is out of range (the sampler has %u samples)");
+      m % indices[k] % getNSamples();
+      throw std::runtime_error(m.str());
+    }
+    blitz::Array<double,1> sample(samples(k, blitz::Range::all()));
+    readSample(indices[k], sample);
+  }
+}
+
+void bob::trainer::BlockSampler::getRandomSamples(boost::mt19937& rng,
+  const size_t n, blitz::Array<double,2>& samples) const
+{
+  const size_t n_samples = getNSamples();
+  std::vector<size_t> indices;
+  if (n >= n_samples) {
+    indices.resize(n_samples);
+    for (size_t i=0; i<n_samples; ++i) indices[i] = i;
+  }
+  else {
+    // Floyd's algorithm, which draws n distinct indices without enumerating
+    // all of them
+    std::set<size_t> selected;
+    for (size_t j=n_samples-n; j<n_samples; ++j) {
+      boost::uniform_int<size_t> range(0, j);
+      const size_t t = range(rng);
+      if (!selected.insert(t).second) selected.insert(j);
+    }
+    indices.assign(selected.begin(), selected.end());
+  }
+  getSamples(indices, samples);
+}
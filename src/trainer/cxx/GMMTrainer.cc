@@ -21,6 +21,11 @@
 #include <bob/trainer/GMMTrainer.h>
 #include <bob/core/assert.h>
 #include <bob/core/check.h>
+#include <bob/core/parallel.h>
+#include <boost/bind.hpp>
+#include <boost/shared_ptr.hpp>
+#include <algorithm>
+#include <vector>
 
 bob::trainer::GMMTrainer::GMMTrainer(const bool update_means, 
     const bool update_variances, const bool update_weights,
@@ -50,12 +55,78 @@ void bob::trainer::GMMTrainer::initialize(bob::machine::GMMMachine& gmm,
   m_ss.resize(gmm.getNGaussians(),gmm.getNInputs());
 }
 
+static void acc_statistics_shard(
+  const std::vector<boost::shared_ptr<bob::machine::GMMMachine> >& machines,
+  const std::vector<blitz::Array<double,2> >& shards,
+  std::vector<boost::shared_ptr<bob::machine::GMMStats> >& stats,
+  const size_t i)
+{
+  machines[i]->accStatistics(shards[i], *stats[i]);
+}
+
 void bob::trainer::GMMTrainer::eStep(bob::machine::GMMMachine& gmm,
   const blitz::Array<double,2>& data) 
 {
   m_ss.init();
-  // Calculate the sufficient statistics and save in m_ss
-  gmm.accStatistics(data, m_ss);
+  accumulateStatistics(gmm, data);
+}
+
+void bob::trainer::GMMTrainer::accumulateStatistics(
+  const bob::machine::GMMMachine& gmm, const blitz::Array<double,2>& data)
+{
+  const size_t n_threads = std::min(m_n_threads, static_cast<size_t>(data.extent(0)));
+  if (n_threads <= 1) {
+    // Calculate the sufficient statistics and save in m_ss
+    gmm.accStatistics(data, m_ss);
+    return;
+  }
+
+  // Each thread processes a shard of the data with its own copy of the
+  // machine (which holds working arrays) and its own statistics, which are
+  // then summed in m_ss
+  std::vector<boost::shared_ptr<bob::machine::GMMMachine> > machines;
+  std::vector<blitz::Array<double,2> > shards;
+  std::vector<boost::shared_ptr<bob::machine::GMMStats> > stats;
+  for (size_t t=0; t<n_threads; ++t) {
+    machines.push_back(boost::shared_ptr<bob::machine::GMMMachine>(
+      new bob::machine::GMMMachine(gmm)));
+    shards.push_back(bob::core::array::unsharedView(
+      data(bob::core::shard(data.extent(0), n_threads, t), blitz::Range::all())));
+    stats.push_back(boost::shared_ptr<bob::machine::GMMStats>(
+      new bob::machine::GMMStats(gmm.getNGaussians(), gmm.getNInputs())));
+  }
+  bob::core::parallel(n_threads, boost::bind(&acc_statistics_shard,
+    boost::cref(machines), boost::cref(shards), boost::ref(stats), _1));
+
+  for (size_t t=0; t<n_threads; ++t) m_ss += *stats[t];
+}
+
+void bob::trainer::GMMTrainer::eStep(bob::machine::GMMMachine& gmm,
+  const bob::trainer::BlockSampler& sampler)
+{
+  m_ss.init();
+  blitz::Array<double,2> block;
+  for (size_t b=0; b<sampler.getNBlocks(); ++b) {
+    sampler.getBlock(b, block);
+    accumulateStatistics(gmm, block);
+  }
+}
+
+void bob::trainer::GMMTrainer::train(bob::machine::GMMMachine& gmm,
+  const bob::trainer::BlockSampler& sampler)
+{
+  bob::core::info << "# " << name() << ":" << std::endl;
+  // The initialization, the M-step and the finalization only rely on the
+  // machine and on the accumulated statistics
+  const blitz::Array<double,2> no_data;
+  initialize(gmm, no_data);
+  void (bob::trainer::GMMTrainer::*e_step)(bob::machine::GMMMachine&,
+    const bob::trainer::BlockSampler&) = &bob::trainer::GMMTrainer::eStep;
+  iterate(gmm,
+    boost::bind(e_step, this, boost::ref(gmm), boost::cref(sampler)),
+    boost::bind(&bob::trainer::GMMTrainer::mStep, this, boost::ref(gmm),
+      boost::cref(no_data)));
+  finalize(gmm, no_data);
 }
 
 double bob::trainer::GMMTrainer::computeLikelihood(bob::machine::GMMMachine& gmm)
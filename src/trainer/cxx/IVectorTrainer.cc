@@ -24,11 +24,15 @@
 #include <bob/core/array_copy.h>
 #include <bob/core/array_random.h>
 #include <bob/core/check.h>
+#include <bob/core/parallel.h>
+#include <bob/math/gemm.h>
 #include <bob/math/inv.h>
 #include <bob/math/linear.h>
 #include <bob/math/linsolve.h>
 #include <boost/shared_ptr.hpp>
 #include <boost/random.hpp>
+#include <boost/bind.hpp>
+#include <algorithm>
 
 bob::trainer::IVectorTrainer::IVectorTrainer(const bool update_sigma,
     const double convergence_threshold,
@@ -100,13 +104,150 @@ void bob::trainer::IVectorTrainer::initialize(
   machine.precompute();
 }
 
-void bob::trainer::IVectorTrainer::eStep(
-  bob::machine::IVectorMachine& machine,
-  const std::vector<bob::machine::GMMStats>& data)
+/**
+ * The statistics are accumulated by tiles of this number of utterances,
+ * whose statistics are packed in contiguous matrices
+ */
+static const int s_tile_size = 256;
+
+/**
+ * Views a contiguous 3D array as a 2D array, merging its first two
+ * dimensions if first is true, and its last two otherwise
+ */
+static blitz::Array<double,2> flatten(blitz::Array<double,3>& a, const bool first)
+{
+  const blitz::TinyVector<int,2> shape = first ?
+    blitz::shape(a.extent(0)*a.extent(1), a.extent(2)) :
+    blitz::shape(a.extent(0), a.extent(1)*a.extent(2));
+  return blitz::Array<double,2>(a.data(), shape, blitz::neverDeleteData);
+}
+
+/**
+ * Accumulates the statistics of the E-step over the given data. The
+ * posteriors of the utterances of a tile are computed with matrix products
+ * over the whole tile, and are accumulated over the Gaussians the same way.
+ */
+static void accumulate(const bob::machine::IVectorMachine& machine,
+  const std::vector<bob::machine::GMMStats>& data, const bool update_sigma,
+  blitz::Array<double,3>& acc_Nij_wij2, blitz::Array<double,3>& acc_Fnormij_wij,
+  blitz::Array<double,1>& acc_Nij, blitz::Array<double,2>& acc_Snormij)
 {
   blitz::Range rall = blitz::Range::all();
   const int C = machine.getDimC();
+  const int D = machine.getDimD();
+  const int Rt = machine.getDimRt();
+  const int n_utts = data.size();
+  if (n_utts == 0) return;
+  const blitz::Array<double,1>& ubm_mean = machine.getUbm()->getMeanSupervector();
+
+  // The accumulators, viewed as C x Rt*Rt and CD x Rt matrices
+  blitz::Array<double,2> acc_Nij_wij2_2d = flatten(acc_Nij_wij2, false);
+  blitz::Array<double,2> acc_Fnormij_wij_2d = flatten(acc_Fnormij_wij, true);
+
+  // Working arrays
+  const int tile = std::min(s_tile_size, n_utts);
+  blitz::Array<double,2> N(tile, C);
+  blitz::Array<double,2> Fnorm(tile, C*D);
+  blitz::Array<double,2> IdTtSigmaInvT(tile, Rt*Rt);
+  blitz::Array<double,2> TtSigmaInvFnorm(tile, Rt);
+  blitz::Array<double,2> wij(tile, Rt);
+  blitz::Array<double,2> wij2(tile, Rt*Rt);
+  blitz::Array<double,2> tmp_tt1(Rt,Rt);
+  blitz::Array<double,2> tmp_tt2(Rt,Rt);
+
+  for (int t0=0; t0<n_utts; t0+=s_tile_size)
+  {
+    const int n = std::min(s_tile_size, n_utts-t0);
+    if (n != N.extent(0))
+    {
+      N.resize(n, C);
+      Fnorm.resize(n, C*D);
+      IdTtSigmaInvT.resize(n, Rt*Rt);
+      TtSigmaInvFnorm.resize(n, Rt);
+      wij.resize(n, Rt);
+      wij2.resize(n, Rt*Rt);
+    }
+
+    // Packs Nijc and Fnorm_c = Fijc - Nijc * ubmmean_{c}
+    for (int k=0; k<n; ++k)
+    {
+      const bob::machine::GMMStats& gs = data[t0+k];
+      for (int c=0; c<C; ++c)
+      {
+        N(k,c) = gs.n(c);
+        for (int d=0; d<D; ++d)
+          Fnorm(k,c*D+d) = gs.sumPx(c,d) - gs.n(c) * ubm_mean(c*D+d);
+      }
+    }
+
+    // Computes E{wij} and E{wij.wij^{T}}
+    // a. Computes \f$T^{T} \Sigma^{-1} F_{norm}\f$
+    machine.computeTtSigmaInvFnorm(Fnorm, TtSigmaInvFnorm);
+    // b. Computes \f$Id + T^{T} \Sigma^{-1} T\f$
+    machine.computeIdTtSigmaInvT(N, IdTtSigmaInvT);
+    for (int k=0; k<n; ++k)
+    {
+      for (int r=0; r<Rt; ++r)
+        for (int s=0; s<Rt; ++s)
+          tmp_tt1(r,s) = IdTtSigmaInvT(k,r*Rt+s);
+      // c. Computes \f$(Id + T^{T} \Sigma^{-1} T)^{-1}\f$
+      bob::math::inv(tmp_tt1, tmp_tt2);
+      // d. Computes \f$E{wij} = (Id + T^{T} \Sigma^{-1} T)^{-1} T^{T} \Sigma^{-1} F_{norm}\f$
+      blitz::Array<double,1> wij_k = wij(k,rall);
+      bob::math::prod(tmp_tt2, TtSigmaInvFnorm(k,rall), wij_k);
+      // e. Computes \f$E{wij.wij^{T}} = (Id + T^{T} \Sigma^{-1} T)^{-1} + E{wij}.E{wij^{T}}\f$
+      for (int r=0; r<Rt; ++r)
+        for (int s=0; s<Rt; ++s)
+          wij2(k,r*Rt+s) = tmp_tt2(r,s) + wij_k(r)*wij_k(s);
+    }
+
+    // acc_Nij_wij2_c += Nijc . E{wij.wij^{T}}, for all c at once
+    bob::math::gemm_(N, wij2, acc_Nij_wij2_2d, true, false, 1., 1.);
+    // acc_Fnormij_wij_c += (Fijc - Nijc * ubmmean_{c}).E{wij}^{T}, for all c
+    bob::math::gemm_(Fnorm, wij, acc_Fnormij_wij_2d, true, false, 1., 1.);
 
+    if (update_sigma)
+    {
+      for (int k=0; k<n; ++k)
+      {
+        const bob::machine::GMMStats& gs = data[t0+k];
+        acc_Nij += gs.n;
+        for (int c=0; c<C; ++c)
+          for (int d=0; d<D; ++d)
+          {
+            const double mc = ubm_mean(c*D+d);
+            acc_Snormij(c,d) += gs.sumPxx(c,d) - mc*(gs.sumPx(c,d) + Fnorm(k,c*D+d));
+          }
+      }
+    }
+  }
+}
+
+/**
+ * The machine, the data and the accumulators of a thread
+ */
+struct ivector_shard {
+  boost::shared_ptr<bob::machine::IVectorMachine> machine;
+  std::vector<bob::machine::GMMStats> data;
+  blitz::Array<double,3> acc_Nij_wij2;
+  blitz::Array<double,3> acc_Fnormij_wij;
+  blitz::Array<double,1> acc_Nij;
+  blitz::Array<double,2> acc_Snormij;
+};
+
+static void accumulate_shard(
+  std::vector<boost::shared_ptr<ivector_shard> >& shards,
+  const bool update_sigma, const size_t i)
+{
+  ivector_shard& s = *shards[i];
+  accumulate(*s.machine, s.data, update_sigma, s.acc_Nij_wij2,
+    s.acc_Fnormij_wij, s.acc_Nij, s.acc_Snormij);
+}
+
+void bob::trainer::IVectorTrainer::eStep(
+  bob::machine::IVectorMachine& machine,
+  const std::vector<bob::machine::GMMStats>& data)
+{
   // Reinitializes accumulators to 0
   m_acc_Nij_wij2 = 0.;
   m_acc_Fnormij_wij = 0.;
@@ -115,44 +256,62 @@ void bob::trainer::IVectorTrainer::eStep(
     m_acc_Nij = 0.;
     m_acc_Snormij = 0.;
   }
-  for (std::vector<bob::machine::GMMStats>::const_iterator it = data.begin();
-       it != data.end(); ++it)
+
+  const size_t n_threads = std::min(m_n_threads, data.size());
+  if (n_threads <= 1)
   {
-    // Computes E{wij} and E{wij.wij^{T}}
-    // a. Computes \f$T^{T} \Sigma^{-1} F_{norm}\f$
-    machine.computeTtSigmaInvFnorm(*it, m_tmp_t1);
-    // b. Computes \f$Id + T^{T} \Sigma^{-1} T\f$
-    machine.computeIdTtSigmaInvT(*it, m_tmp_tt1);
-    // c. Computes \f$(Id + T^{T} \Sigma^{-1} T)^{-1}\f$
-    bob::math::inv(m_tmp_tt1, m_tmp_tt2);
-    // d. Computes \f$E{wij} = (Id + T^{T} \Sigma^{-1} T)^{-1} T^{T} \Sigma^{-1} F_{norm}\f$
-    bob::math::prod(m_tmp_tt2, m_tmp_t1, m_tmp_wij); // E{wij}
-    // e.  Computes \f$E{wij}.E{wij^{T}}\f$
-    bob::math::prod(m_tmp_wij, m_tmp_wij, m_tmp_wij2);
-    // f. Computes \f$E{wij.wij^{T}} = (Id + T^{T} \Sigma^{-1} T)^{-1} + E{wij}.E{wij^{T}}\f$
-    m_tmp_wij2 += m_tmp_tt2; // E{wij.wij^{T}}
+    accumulate(machine, data, m_update_sigma, m_acc_Nij_wij2,
+      m_acc_Fnormij_wij, m_acc_Nij, m_acc_Snormij);
+    return;
+  }
 
+  // Each thread processes a shard of the data with its own copy of the
+  // machine (and of its UBM) and its own accumulators, which are then
+  // summed. The statistics of the shards are views of the data, which do
+  // not share its reference counts.
+  std::vector<boost::shared_ptr<ivector_shard> > shards;
+  for (size_t t=0; t<n_threads; ++t)
+  {
+    boost::shared_ptr<ivector_shard> s(new ivector_shard);
+    s->machine.reset(new bob::machine::IVectorMachine(machine));
+    s->machine->setUbm(boost::shared_ptr<bob::machine::GMMMachine>(
+      new bob::machine::GMMMachine(*machine.getUbm())));
+    blitz::Range r = bob::core::shard(static_cast<int>(data.size()), n_threads, t);
+    s->data.resize(r.length());
+    for (int i=0; i<r.length(); ++i)
+    {
+      const bob::machine::GMMStats& gs = data[r.first()+i];
+      bob::machine::GMMStats& gs_view = s->data[i];
+      gs_view.T = gs.T;
+      gs_view.log_likelihood = gs.log_likelihood;
+      gs_view.n.reference(bob::core::array::unsharedView(gs.n));
+      gs_view.sumPx.reference(bob::core::array::unsharedView(gs.sumPx));
+      gs_view.sumPxx.reference(bob::core::array::unsharedView(gs.sumPxx));
+    }
+    s->acc_Nij_wij2.resize(m_acc_Nij_wij2.shape());
+    s->acc_Nij_wij2 = 0.;
+    s->acc_Fnormij_wij.resize(m_acc_Fnormij_wij.shape());
+    s->acc_Fnormij_wij = 0.;
     if (m_update_sigma)
-      m_acc_Nij += (*it).n;
+    {
+      s->acc_Nij.resize(m_acc_Nij.shape());
+      s->acc_Nij = 0.;
+      s->acc_Snormij.resize(m_acc_Snormij.shape());
+      s->acc_Snormij = 0.;
+    }
+    shards.push_back(s);
+  }
+  bob::core::parallel(n_threads, boost::bind(&accumulate_shard,
+    boost::ref(shards), m_update_sigma, _1));
 
-    for (int c=0; c<C; ++c)
+  for (size_t t=0; t<n_threads; ++t)
+  {
+    m_acc_Nij_wij2 += shards[t]->acc_Nij_wij2;
+    m_acc_Fnormij_wij += shards[t]->acc_Fnormij_wij;
+    if (m_update_sigma)
     {
-      blitz::Array<double,2> acc_Nij_wij2_c = m_acc_Nij_wij2(c,rall,rall);
-      blitz::Array<double,2> acc_Fnormij_wij = m_acc_Fnormij_wij(c,rall,rall);
-      // acc_Nij_wij2_c += Nijc . E{wij.wij^{T}}
-      acc_Nij_wij2_c += (*it).n(c) * m_tmp_wij2;
-      blitz::Array<double,1> mc = machine.getUbm()->getGaussian(c)->getMean();
-      // m_tmp_d1 = Fijc - Nijc * ubmmean_{c}
-      m_tmp_d1 = (*it).sumPx(c,rall) - (*it).n(c)*mc; // Fnorm_c
-      // m_tmp_dt1 = (Fijc - Nijc * ubmmean_{c}).E{wij}^{T}
-      bob::math::prod(m_tmp_d1, m_tmp_wij, m_tmp_dt1); 
-      // acc_Fnormij_wij += (Fijc - Nijc * ubmmean_{c}).E{wij}^{T}
-      acc_Fnormij_wij += m_tmp_dt1;
-      if (m_update_sigma)
-      {
-        blitz::Array<double,1> acc_Snormij_c = m_acc_Snormij(c,rall);
-        acc_Snormij_c += (*it).sumPxx(c,rall) - mc*((*it).sumPx(c,rall) + m_tmp_d1);
-      }
+      m_acc_Nij += shards[t]->acc_Nij;
+      m_acc_Snormij += shards[t]->acc_Snormij;
     }
   }
 }
@@ -28,18 +28,21 @@
 #include <bob/math/linear.h>
 #include <bob/core/check.h>
 #include <bob/core/array_repmat.h>
+#include <bob/core/parallel.h>
+#include <boost/bind.hpp>
 #include <algorithm>
 
 #include <random/normal.h>
 
 
 bob::trainer::FABaseTrainer::FABaseTrainer():
-  m_Nid(0), m_dim_C(0), m_dim_D(0), m_dim_ru(0), m_dim_rv(0),
+  m_n_threads(1), m_Nid(0), m_dim_C(0), m_dim_D(0), m_dim_ru(0), m_dim_rv(0),
   m_x(0), m_y(0), m_z(0), m_Nacc(0), m_Facc(0)
 {
 }
 
-bob::trainer::FABaseTrainer::FABaseTrainer(const bob::trainer::FABaseTrainer& other)
+bob::trainer::FABaseTrainer::FABaseTrainer(const bob::trainer::FABaseTrainer& other):
+  m_n_threads(other.m_n_threads)
 {
 }
 
@@ -190,6 +193,142 @@ void bob::trainer::FABaseTrainer::initCache()
 }
 
 
+/**
+ * The machine, the statistics and the trainer of a thread. The trainer
+ * processes a shard of the identities.
+ */
+struct fa_shard {
+  boost::shared_ptr<bob::machine::FABase> machine;
+  std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > stats;
+  bob::trainer::FABaseTrainer trainer;
+};
+
+static void estep_shard(std::vector<boost::shared_ptr<fa_shard> >& shards,
+  const boost::function<void (bob::trainer::FABaseTrainer&,
+    const bob::machine::FABase&,
+    const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >&)>& f,
+  const size_t i)
+{
+  fa_shard& s = *shards[i];
+  f(s.trainer, *s.machine, s.stats);
+}
+
+void bob::trainer::FABaseTrainer::initShard(
+  const bob::trainer::FABaseTrainer& other, const blitz::Range& r)
+{
+  m_n_threads = 1;
+  m_Nid = r.length();
+  m_dim_C = other.m_dim_C;
+  m_dim_D = other.m_dim_D;
+  m_dim_ru = other.m_dim_ru;
+  m_dim_rv = other.m_dim_rv;
+
+  m_x.clear();
+  m_y.clear();
+  m_z.clear();
+  m_Nacc.clear();
+  m_Facc.clear();
+  for (int k=r.first(); k<=r.last(); ++k)
+  {
+    m_x.push_back(bob::core::array::unsharedView(other.m_x[k]));
+    m_y.push_back(bob::core::array::unsharedView(other.m_y[k]));
+    m_z.push_back(bob::core::array::unsharedView(other.m_z[k]));
+    m_Nacc.push_back(bob::core::array::unsharedView(other.m_Nacc[k]));
+    m_Facc.push_back(bob::core::array::unsharedView(other.m_Facc[k]));
+  }
+
+  // Working arrays and accumulators of its own, and read-only views of the
+  // subspace caches
+  initCache();
+  m_cache_VtSigmaInv.reference(bob::core::array::unsharedView(other.m_cache_VtSigmaInv));
+  m_cache_VProd.reference(bob::core::array::unsharedView(other.m_cache_VProd));
+  m_cache_UtSigmaInv.reference(bob::core::array::unsharedView(other.m_cache_UtSigmaInv));
+  m_cache_UProd.reference(bob::core::array::unsharedView(other.m_cache_UProd));
+  m_cache_DtSigmaInv.reference(bob::core::array::unsharedView(other.m_cache_DtSigmaInv));
+  m_cache_DProd.reference(bob::core::array::unsharedView(other.m_cache_DProd));
+}
+
+void bob::trainer::FABaseTrainer::parallelize(const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+  const estep_function& f, const bool acc_v, const bool acc_u,
+  const bool acc_d)
+{
+  const size_t n_threads = std::min(m_n_threads, stats.size());
+  if (n_threads <= 1)
+  {
+    f(*this, m, stats);
+    return;
+  }
+
+  // Each thread processes a shard of the identities with its own copy of
+  // the machine and its own trainer (working arrays and accumulators). The
+  // speaker factors and the statistics of the identities are views, which
+  // do not share their reference counts.
+  std::vector<boost::shared_ptr<fa_shard> > shards;
+  for (size_t t=0; t<n_threads; ++t)
+  {
+    boost::shared_ptr<fa_shard> s(new fa_shard);
+    s->machine.reset(new bob::machine::FABase(m));
+    blitz::Range r = bob::core::shard(static_cast<int>(stats.size()), n_threads, t);
+    s->trainer.initShard(*this, r);
+    s->stats.resize(r.length());
+    for (int i=0; i<r.length(); ++i)
+    {
+      const std::vector<boost::shared_ptr<bob::machine::GMMStats> >& stats_i = stats[r.first()+i];
+      for (size_t h=0; h<stats_i.size(); ++h)
+      {
+        // Only the zeroth and first order statistics are used
+        boost::shared_ptr<bob::machine::GMMStats> gs(new bob::machine::GMMStats);
+        gs->T = stats_i[h]->T;
+        gs->log_likelihood = stats_i[h]->log_likelihood;
+        gs->n.reference(bob::core::array::unsharedView(stats_i[h]->n));
+        gs->sumPx.reference(bob::core::array::unsharedView(stats_i[h]->sumPx));
+        s->stats[i].push_back(gs);
+      }
+    }
+    shards.push_back(s);
+  }
+  bob::core::parallel(n_threads, boost::bind(&estep_shard,
+    boost::ref(shards), boost::cref(f), _1));
+
+  // Sums the accumulators of the threads
+  if (acc_v)
+  {
+    m_acc_V_A1 = 0.;
+    m_acc_V_A2 = 0.;
+  }
+  if (acc_u)
+  {
+    m_acc_U_A1 = 0.;
+    m_acc_U_A2 = 0.;
+  }
+  if (acc_d)
+  {
+    m_acc_D_A1 = 0.;
+    m_acc_D_A2 = 0.;
+  }
+  for (size_t t=0; t<n_threads; ++t)
+  {
+    const bob::trainer::FABaseTrainer& trainer = shards[t]->trainer;
+    if (acc_v)
+    {
+      m_acc_V_A1 += trainer.m_acc_V_A1;
+      m_acc_V_A2 += trainer.m_acc_V_A2;
+    }
+    if (acc_u)
+    {
+      m_acc_U_A1 += trainer.m_acc_U_A1;
+      m_acc_U_A2 += trainer.m_acc_U_A2;
+    }
+    if (acc_d)
+    {
+      m_acc_D_A1 += trainer.m_acc_D_A1;
+      m_acc_D_A2 += trainer.m_acc_D_A2;
+    }
+  }
+}
+
+
 
 //////////////////////////// V ///////////////////////////
 void bob::trainer::FABaseTrainer::computeVtSigmaInv(const bob::machine::FABase& m)
@@ -267,27 +406,16 @@ void bob::trainer::FABaseTrainer::updateY_i(const size_t id)
   bob::math::prod(m_cache_IdPlusVProd_i, m_tmp_rv, y);
 }
 
-void bob::trainer::FABaseTrainer::updateY(const bob::machine::FABase& m,
-  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
-{
-  // Precomputation
-  computeVtSigmaInv(m);
-  computeVProd(m);
-  // Loops over all people
-  for (size_t id=0; id<stats.size(); ++id) {
-    computeIdPlusVProd_i(id);
-    computeFn_y_i(m, stats[id], id);
-    updateY_i(id);
-  }
-}
-
-void bob::trainer::FABaseTrainer::computeAccumulatorsV(
-  const bob::machine::FABase& m,
-  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+void bob::trainer::FABaseTrainer::estepY(const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+  const bool update_y, const bool acc_v)
 {
   // Initializes the cache accumulator
-  m_acc_V_A1 = 0.;
-  m_acc_V_A2 = 0.;
+  if (acc_v)
+  {
+    m_acc_V_A1 = 0.;
+    m_acc_V_A2 = 0.;
+  }
   // Loops over all people
   blitz::firstIndex i;
   blitz::secondIndex j;
@@ -295,20 +423,55 @@ void bob::trainer::FABaseTrainer::computeAccumulatorsV(
   for (size_t id=0; id<stats.size(); ++id) {
     computeIdPlusVProd_i(id);
     computeFn_y_i(m, stats[id], id);
+    if (update_y) updateY_i(id);
 
-    // Needs to return values to be accumulated for estimating V
-    const blitz::Array<double,1>& y = m_y[id];
-    m_tmp_rvrv = m_cache_IdPlusVProd_i;
-    m_tmp_rvrv += y(i) * y(j);
-    for (size_t c=0; c<m_dim_C; ++c)
+    if (acc_v)
     {
-      blitz::Array<double,2> A1_y_c = m_acc_V_A1(c, rall, rall);
-      A1_y_c += m_tmp_rvrv * m_Nacc[id](c);
+      // Needs to return values to be accumulated for estimating V
+      const blitz::Array<double,1>& y = m_y[id];
+      m_tmp_rvrv = m_cache_IdPlusVProd_i;
+      m_tmp_rvrv += y(i) * y(j);
+      for (size_t c=0; c<m_dim_C; ++c)
+      {
+        blitz::Array<double,2> A1_y_c = m_acc_V_A1(c, rall, rall);
+        A1_y_c += m_tmp_rvrv * m_Nacc[id](c);
+      }
+      m_acc_V_A2 += m_cache_Fn_y_i(i) * y(j);
     }
-    m_acc_V_A2 += m_cache_Fn_y_i(i) * y(j);
   }
 }
 
+void bob::trainer::FABaseTrainer::updateY(const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  // Precomputation
+  computeVtSigmaInv(m);
+  computeVProd(m);
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepY,
+    _1, _2, _3, true, false), false, false, false);
+}
+
+void bob::trainer::FABaseTrainer::computeAccumulatorsV(
+  const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepY,
+    _1, _2, _3, false, true), true, false, false);
+}
+
+void bob::trainer::FABaseTrainer::updateYAndComputeAccumulatorsV(
+  const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  // Precomputation
+  computeVtSigmaInv(m);
+  computeVProd(m);
+  // The normalised statistics Fn_y_i do not depend on y_i, and are
+  // therefore the same for the update of y_i and for the accumulators
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepY,
+    _1, _2, _3, true, true), true, false, false);
+}
+
 void bob::trainer::FABaseTrainer::updateV(blitz::Array<double,2>& V)
 {
   blitz::Range rall = blitz::Range::all();
@@ -397,54 +560,114 @@ void bob::trainer::FABaseTrainer::updateX_ih(const size_t id, const size_t h)
   bob::math::prod(m_cache_IdPlusUProd_ih, m_tmp_ru, x);
 }
 
-void bob::trainer::FABaseTrainer::updateX(const bob::machine::FABase& m,
-  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+void bob::trainer::FABaseTrainer::accumulateU_ih(const size_t id,
+  const size_t h, const blitz::Array<double,1>& Nih)
 {
-  // Precomputation
-  computeUtSigmaInv(m);
-  computeUProd(m);
-  // Loops over all people
-  for (size_t id=0; id<stats.size(); ++id) {
-    int n_session_i = stats[id].size();
-    for (int s=0; s<n_session_i; ++s) {
-      computeIdPlusUProd_ih(stats[id][s]);
-      computeFn_x_ih(m, stats[id][s], id);
-      updateX_ih(id, s);
-    }
+  // Needs to return values to be accumulated for estimating U
+  blitz::firstIndex i;
+  blitz::secondIndex j;
+  blitz::Range rall = blitz::Range::all();
+  blitz::Array<double,1> x = m_x[id](rall, h);
+  m_tmp_ruru = m_cache_IdPlusUProd_ih;
+  m_tmp_ruru += x(i) * x(j);
+  for (int c=0; c<(int)m_dim_C; ++c)
+  {
+    blitz::Array<double,2> A1_x_c = m_acc_U_A1(c,rall,rall);
+    A1_x_c += m_tmp_ruru * Nih(c);
   }
+  m_acc_U_A2 += m_cache_Fn_x_ih(i) * x(j);
 }
 
-void bob::trainer::FABaseTrainer::computeAccumulatorsU(
-  const bob::machine::FABase& m,
-  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+void bob::trainer::FABaseTrainer::estepXZ(const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+  const bool update_x, const bool update_z, const bool acc_u)
 {
   // Initializes the cache accumulator
-  m_acc_U_A1 = 0.;
-  m_acc_U_A2 = 0.;
+  if (acc_u)
+  {
+    m_acc_U_A1 = 0.;
+    m_acc_U_A2 = 0.;
+  }
+  // Inverses of the sessions of the current person, kept if z_i is updated
+  // before the accumulation
+  std::vector<blitz::Array<double,2> > IdPlusUProd_i;
   // Loops over all people
-  blitz::firstIndex i;
-  blitz::secondIndex j;
-  blitz::Range rall = blitz::Range::all();
   for (size_t id=0; id<stats.size(); ++id) {
-    int n_session_i = stats[id].size();
-    for (int h=0; h<n_session_i; ++h) {
+    const size_t n_session_i = stats[id].size();
+    for (size_t h=0; h<n_session_i; ++h) {
       computeIdPlusUProd_ih(stats[id][h]);
       computeFn_x_ih(m, stats[id][h], id);
+      if (update_x) updateX_ih(id, h);
+      if (acc_u) {
+        if (!update_z) accumulateU_ih(id, h, stats[id][h]->n);
+        else {
+          if (h >= IdPlusUProd_i.size())
+            IdPlusUProd_i.push_back(blitz::Array<double,2>(m_dim_ru, m_dim_ru));
+          IdPlusUProd_i[h] = m_cache_IdPlusUProd_ih;
+        }
+      }
+    }
 
-      // Needs to return values to be accumulated for estimating U
-      blitz::Array<double,1> x = m_x[id](rall, h);
-      m_tmp_ruru = m_cache_IdPlusUProd_ih;
-      m_tmp_ruru += x(i) * x(j);
-      for (int c=0; c<(int)m_dim_C; ++c)
-      {
-        blitz::Array<double,2> A1_x_c = m_acc_U_A1(c,rall,rall);
-        A1_x_c += m_tmp_ruru * stats[id][h]->n(c);
+    if (update_z) {
+      computeIdPlusDProd_i(id);
+      computeFn_z_i(m, stats[id], id);
+      updateZ_i(id);
+      // Fn_x_ih depends on z_i, but the inverses do not
+      if (acc_u) {
+        for (size_t h=0; h<n_session_i; ++h) {
+          m_cache_IdPlusUProd_ih = IdPlusUProd_i[h];
+          computeFn_x_ih(m, stats[id][h], id);
+          accumulateU_ih(id, h, stats[id][h]->n);
+        }
       }
-      m_acc_U_A2 += m_cache_Fn_x_ih(i) * x(j);
     }
   }
 }
 
+void bob::trainer::FABaseTrainer::updateX(const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  // Precomputation
+  computeUtSigmaInv(m);
+  computeUProd(m);
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepXZ,
+    _1, _2, _3, true, false, false), false, false, false);
+}
+
+void bob::trainer::FABaseTrainer::computeAccumulatorsU(
+  const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepXZ,
+    _1, _2, _3, false, false, true), false, true, false);
+}
+
+void bob::trainer::FABaseTrainer::updateXAndComputeAccumulatorsU(
+  const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  // Precomputation
+  computeUtSigmaInv(m);
+  computeUProd(m);
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepXZ,
+    _1, _2, _3, true, false, true), false, true, false);
+}
+
+void bob::trainer::FABaseTrainer::updateXZAndComputeAccumulatorsU(
+  const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  // Precomputation
+  computeUtSigmaInv(m);
+  computeUProd(m);
+  computeDtSigmaInv(m);
+  computeDProd(m);
+  // z_i only depends on the sessions of person i, which can therefore be
+  // processed at once
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepXZ,
+    _1, _2, _3, true, true, true), false, true, false);
+}
+
 void bob::trainer::FABaseTrainer::updateU(blitz::Array<double,2>& U)
 {
   for (size_t c=0; c<m_dim_C; ++c)
@@ -517,40 +740,60 @@ void bob::trainer::FABaseTrainer::updateZ_i(const size_t id)
   z = m_cache_IdPlusDProd_i * m_cache_DtSigmaInv * m_cache_Fn_z_i;
 }
 
+void bob::trainer::FABaseTrainer::estepZ(const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats,
+  const bool update_z, const bool acc_d)
+{
+  // Initializes the cache accumulator
+  if (acc_d)
+  {
+    m_acc_D_A1 = 0.;
+    m_acc_D_A2 = 0.;
+  }
+  // Loops over all people
+  for (size_t id=0; id<stats.size(); ++id) {
+    computeIdPlusDProd_i(id);
+    computeFn_z_i(m, stats[id], id);
+    if (update_z) updateZ_i(id);
+
+    if (acc_d)
+    {
+      // Needs to return values to be accumulated for estimating D
+      const blitz::Array<double,1>& z = m_z[id];
+      bob::core::array::repelem(m_Nacc[id], m_tmp_CD);
+      m_acc_D_A1 += (m_cache_IdPlusDProd_i + z * z) * m_tmp_CD;
+      m_acc_D_A2 += m_cache_Fn_z_i * z;
+    }
+  }
+}
+
 void bob::trainer::FABaseTrainer::updateZ(const bob::machine::FABase& m,
   const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
 {
   // Precomputation
   computeDtSigmaInv(m);
   computeDProd(m);
-  // Loops over all people
-  for (size_t id=0; id<m_Nid; ++id) {
-    computeIdPlusDProd_i(id);
-    computeFn_z_i(m, stats[id], id);
-    updateZ_i(id);
-  }
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepZ,
+    _1, _2, _3, true, false), false, false, false);
 }
 
 void bob::trainer::FABaseTrainer::computeAccumulatorsD(
   const bob::machine::FABase& m,
   const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
 {
-  // Initializes the cache accumulator
-  m_acc_D_A1 = 0.;
-  m_acc_D_A2 = 0.;
-  // Loops over all people
-  blitz::firstIndex i;
-  blitz::secondIndex j;
-  for (size_t id=0; id<stats.size(); ++id) {
-    computeIdPlusDProd_i(id);
-    computeFn_z_i(m, stats[id], id);
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepZ,
+    _1, _2, _3, false, true), false, false, true);
+}
 
-    // Needs to return values to be accumulated for estimating D
-    blitz::Array<double,1> z = m_z[id];
-    bob::core::array::repelem(m_Nacc[id], m_tmp_CD);
-    m_acc_D_A1 += (m_cache_IdPlusDProd_i + z * z) * m_tmp_CD;
-    m_acc_D_A2 += m_cache_Fn_z_i * z;
-  }
+void bob::trainer::FABaseTrainer::updateZAndComputeAccumulatorsD(
+  const bob::machine::FABase& m,
+  const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& stats)
+{
+  // Precomputation
+  computeDtSigmaInv(m);
+  computeDProd(m);
+  parallelize(m, stats, boost::bind(&bob::trainer::FABaseTrainer::estepZ,
+    _1, _2, _3, true, true), false, false, true);
 }
 
 void bob::trainer::FABaseTrainer::updateD(blitz::Array<double,1>& d)
@@ -591,6 +834,7 @@ bob::trainer::ISVTrainer::ISVTrainer(const bob::trainer::ISVTrainer& other):
      other.m_compute_likelihood),
   m_relevance_factor(other.m_relevance_factor)
 {
+  m_n_threads = other.m_n_threads;
 }
 
 bob::trainer::ISVTrainer::~ISVTrainer()
@@ -656,11 +900,10 @@ void bob::trainer::ISVTrainer::eStep(bob::machine::ISVBase& machine,
   const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& ar)
 {
   m_base_trainer.resetXYZ();
+  m_base_trainer.setNThreads(m_n_threads);
 
   const bob::machine::FABase& base = machine.getBase();
-  m_base_trainer.updateX(base, ar);
-  m_base_trainer.updateZ(base, ar);
-  m_base_trainer.computeAccumulatorsU(base, ar);
+  m_base_trainer.updateXZAndComputeAccumulatorsU(base, ar);
 }
 
 void bob::trainer::ISVTrainer::mStep(bob::machine::ISVBase& machine,
@@ -709,6 +952,7 @@ bob::trainer::JFATrainer::JFATrainer(const size_t max_iterations):
 bob::trainer::JFATrainer::JFATrainer(const bob::trainer::JFATrainer& other):
   m_max_iterations(other.m_max_iterations), m_rng(other.m_rng)
 {
+  m_base_trainer.setNThreads(other.getNThreads());
 }
 
 bob::trainer::JFATrainer::~JFATrainer()
@@ -722,6 +966,7 @@ bob::trainer::JFATrainer& bob::trainer::JFATrainer::operator=
   {
     m_max_iterations = other.m_max_iterations;
     m_rng = other.m_rng;
+    m_base_trainer.setNThreads(other.getNThreads());
   }
   return *this;
 }
@@ -758,8 +1003,7 @@ void bob::trainer::JFATrainer::eStep1(bob::machine::JFABase& machine,
   const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& ar)
 {
   const bob::machine::FABase& base = machine.getBase();
-  m_base_trainer.updateY(base, ar);
-  m_base_trainer.computeAccumulatorsV(base, ar);
+  m_base_trainer.updateYAndComputeAccumulatorsV(base, ar);
 }
 
 void bob::trainer::JFATrainer::mStep1(bob::machine::JFABase& machine,
@@ -781,8 +1025,7 @@ void bob::trainer::JFATrainer::eStep2(bob::machine::JFABase& machine,
   const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& ar)
 {
   const bob::machine::FABase& base = machine.getBase();
-  m_base_trainer.updateX(base, ar);
-  m_base_trainer.computeAccumulatorsU(base, ar);
+  m_base_trainer.updateXAndComputeAccumulatorsU(base, ar);
 }
 
 void bob::trainer::JFATrainer::mStep2(bob::machine::JFABase& machine,
@@ -805,8 +1048,7 @@ void bob::trainer::JFATrainer::eStep3(bob::machine::JFABase& machine,
   const std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > >& ar)
 {
   const bob::machine::FABase& base = machine.getBase();
-  m_base_trainer.updateZ(base, ar);
-  m_base_trainer.computeAccumulatorsD(base, ar);
+  m_base_trainer.updateZAndComputeAccumulatorsD(base, ar);
 }
 
 void bob::trainer::JFATrainer::mStep3(bob::machine::JFABase& machine,
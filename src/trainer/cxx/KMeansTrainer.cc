@@ -21,7 +21,14 @@
 
 #include <bob/trainer/KMeansTrainer.h>
 #include <bob/core/array_copy.h>
+#include <bob/core/parallel.h>
 #include <boost/random.hpp>
+#include <boost/bind.hpp>
+#include <boost/shared_ptr.hpp>
+#include <vector>
+#include <algorithm>
+#include <limits>
+#include <cmath>
 
 #if BOOST_VERSION >= 104700
 #include <boost/random/discrete_distribution.hpp>
@@ -33,7 +40,8 @@ bob::trainer::KMeansTrainer::KMeansTrainer(double convergence_threshold,
     convergence_threshold, max_iterations, compute_likelihood), 
   m_initialization_method(i_m),
   m_rng(new boost::mt19937()), m_average_min_distance(0),
-  m_zeroethOrderStats(0), m_firstOrderStats(0,0)
+  m_zeroethOrderStats(0), m_firstOrderStats(0,0), m_bounds_valid(false),
+  m_use_bounds(false)
 {
 }
 
@@ -43,8 +51,10 @@ bob::trainer::KMeansTrainer::KMeansTrainer(const bob::trainer::KMeansTrainer& ot
   m_initialization_method(other.m_initialization_method),
   m_rng(other.m_rng), m_average_min_distance(other.m_average_min_distance),
   m_zeroethOrderStats(bob::core::array::ccopy(other.m_zeroethOrderStats)), 
-  m_firstOrderStats(bob::core::array::ccopy(other.m_firstOrderStats))
+  m_firstOrderStats(bob::core::array::ccopy(other.m_firstOrderStats)),
+  m_bounds_valid(false), m_use_bounds(false)
 {
+  m_n_threads = other.m_n_threads;
 }
  
 bob::trainer::KMeansTrainer& bob::trainer::KMeansTrainer::operator=
@@ -58,6 +68,7 @@ bob::trainer::KMeansTrainer& bob::trainer::KMeansTrainer::operator=
     m_average_min_distance = other.m_average_min_distance;
     m_zeroethOrderStats.reference(bob::core::array::ccopy(other.m_zeroethOrderStats));
     m_firstOrderStats.reference(bob::core::array::ccopy(other.m_firstOrderStats));
+    m_bounds_valid = false;
   }
   return *this;
 }
@@ -182,6 +193,224 @@ void bob::trainer::KMeansTrainer::initialize(bob::machine::KMeansMachine& kmeans
    // Resize the accumulator
   m_zeroethOrderStats.resize(kmeans.getNMeans());
   m_firstOrderStats.resize(kmeans.getNMeans(), kmeans.getNInputs());
+  // Forget the bounds of a previous training
+  m_bounds_valid = false;
+}
+
+/**
+ * Squared Euclidean distance of the i-th sample from the k-th mean. The sum 
+ * is stopped as soon as it exceeds the given bound.
+ */
+static inline double distance(const blitz::Array<double,2>& ar, const int i,
+  const blitz::Array<double,2>& means, const int k,
+  const double bound=std::numeric_limits<double>::max())
+{
+  double d = 0.;
+  for (int j=0; j<ar.extent(1) && d<bound; ++j) {
+    const double diff = ar(i,j) - means(k,j);
+    d += diff * diff;
+  }
+  return d;
+}
+
+/**
+ * The information required to update the bounds of Hamerly ("Making k-means
+ * even faster", SDM 2010) when the means have moved
+ */
+struct hamerly_bounds {
+  blitz::Array<double,1> half_distances; ///< half the distance of each mean from the closest other one
+  blitz::Array<double,1> drifts; ///< distance each mean moved since the bounds were updated
+  int max_drift_mean; ///< mean which moved the most
+  double max_drift;
+  double second_max_drift;
+};
+
+static void compute_bounds(const blitz::Array<double,2>& means,
+  const blitz::Array<double,2>& previous_means, hamerly_bounds& b)
+{
+  const int n_means = means.extent(0);
+  b.drifts.resize(n_means);
+  b.half_distances.resize(n_means);
+  b.max_drift_mean = 0;
+  b.max_drift = b.second_max_drift = 0.;
+  for (int k=0; k<n_means; ++k) {
+    b.drifts(k) = std::sqrt(distance(previous_means, k, means, k));
+    if (b.drifts(k) > b.max_drift) {
+      b.second_max_drift = b.max_drift;
+      b.max_drift = b.drifts(k);
+      b.max_drift_mean = k;
+    }
+    else if (b.drifts(k) > b.second_max_drift)
+      b.second_max_drift = b.drifts(k);
+  }
+
+  // The distance between two means is only required if it may decrease one
+  // of their half distances
+  b.half_distances = std::numeric_limits<double>::max();
+  for (int k=0; k<n_means; ++k)
+    for (int l=k+1; l<n_means; ++l) {
+      const double bound = 2. * std::max(b.half_distances(k), b.half_distances(l));
+      const double d = 0.5 * std::sqrt(distance(means, k, means, l, bound * bound));
+      b.half_distances(k) = std::min(b.half_distances(k), d);
+      b.half_distances(l) = std::min(b.half_distances(l), d);
+    }
+}
+
+/**
+ * The samples processed by a thread, as well as their assignments and 
+ * bounds, and the statistics accumulated over them
+ */
+struct kmeans_shard {
+  const bob::machine::KMeansMachine* machine;
+  blitz::Array<double,2> data;
+  blitz::Array<int,1> closest_means;
+  blitz::Array<double,1> upper_bounds;
+  blitz::Array<double,1> lower_bounds;
+  blitz::Array<double,1> zeroeth;
+  blitz::Array<double,2> first;
+  double distance;
+};
+
+/**
+ * Assigns the samples to their closest means. If bounds are given, the 
+ * upper bounds of the distances of the samples from their assigned means and
+ * the lower bounds of their distances from the other means are first updated
+ * with the drift of the means. The distance of a sample from the other means
+ * is then only computed when the bounds cannot tell that the assigned mean
+ * is still the closest one.
+ * Otherwise, the distances of the samples from all the means are computed, 
+ * and the bounds are initialized (if they are allocated).
+ */
+static void assign(kmeans_shard& s, const hamerly_bounds* bounds,
+  blitz::Array<double,1>& min_distances)
+{
+  if (!bounds) {
+    s.machine->getClosestMeans(s.data, s.closest_means, min_distances);
+    if (s.upper_bounds.extent(0)) {
+      s.upper_bounds = blitz::sqrt(min_distances);
+      s.lower_bounds = 0.;
+    }
+    return;
+  }
+
+  const blitz::Array<double,2>& means = s.machine->getMeans();
+  const int n_means = means.extent(0);
+  for (int i=0; i<s.data.extent(0); ++i) {
+    int closest = s.closest_means(i);
+    s.lower_bounds(i) -= (closest == bounds->max_drift_mean) ? 
+      bounds->second_max_drift : bounds->max_drift;
+    // The distance from the assigned mean is always computed (instead of
+    // adding its drift to the upper bound), as it is accumulated
+    double min_distance = distance(s.data, i, means, closest);
+    s.upper_bounds(i) = std::sqrt(min_distance);
+    if (s.upper_bounds(i) > std::max(bounds->half_distances(closest), s.lower_bounds(i))) {
+      // Full search, which also updates the lower bound
+      double second_distance = std::numeric_limits<double>::max();
+      for (int k=0; k<n_means; ++k) {
+        if (k == s.closest_means(i)) continue;
+        const double d = distance(s.data, i, means, k, second_distance);
+        if (d < min_distance) {
+          second_distance = min_distance;
+          min_distance = d;
+          closest = k;
+        }
+        else if (d < second_distance)
+          second_distance = d;
+      }
+      s.closest_means(i) = closest;
+      s.upper_bounds(i) = std::sqrt(min_distance);
+      s.lower_bounds(i) = std::sqrt(second_distance);
+    }
+    min_distances(i) = min_distance;
+  }
+}
+
+/**
+ * Assigns the samples of a shard to their closest means, and accumulates the
+ * zeroeth and first order statistics, as well as the sum of the distances to 
+ * the closest means
+ */
+static void accumulate(kmeans_shard& s, const hamerly_bounds* bounds)
+{
+  blitz::Array<double,1> min_distances(s.data.extent(0));
+  assign(s, bounds, min_distances);
+
+  // iterate over data samples
+  blitz::Range a = blitz::Range::all();
+  for(int i=0; i<s.data.extent(0); ++i) {
+    const int closest_mean = s.closest_means(i);
+    s.distance += min_distances(i);
+    ++s.zeroeth(closest_mean);
+    s.first(closest_mean,a) += s.data(i,a);
+  }
+}
+
+static void accumulate_shard(
+  std::vector<boost::shared_ptr<kmeans_shard> >& shards,
+  const hamerly_bounds* bounds, const size_t i)
+{
+  accumulate(*shards[i], bounds);
+}
+
+/**
+ * Accumulates the statistics over the given samples. The assignments (and
+ * the bounds, if allocated) are updated.
+ */
+static void accumulate(const bob::machine::KMeansMachine& kmeans,
+  const blitz::Array<double,2>& ar, const hamerly_bounds* bounds,
+  blitz::Array<int,1>& closest_means, blitz::Array<double,1>& upper_bounds,
+  blitz::Array<double,1>& lower_bounds, const size_t n_threads_max,
+  blitz::Array<double,1>& zeroeth, blitz::Array<double,2>& first,
+  double& distance)
+{
+  const size_t n_threads = std::min(n_threads_max, static_cast<size_t>(ar.extent(0)));
+  if (n_threads <= 1) {
+    kmeans_shard s;
+    s.machine = &kmeans;
+    s.data.reference(ar);
+    s.closest_means.reference(closest_means);
+    s.upper_bounds.reference(upper_bounds);
+    s.lower_bounds.reference(lower_bounds);
+    s.zeroeth.reference(zeroeth);
+    s.first.reference(first);
+    s.distance = 0.;
+    accumulate(s, bounds);
+    distance += s.distance;
+    return;
+  }
+
+  // Each thread processes a shard of the data with its own copy of the
+  // machine and its own accumulators, which are then summed
+  std::vector<boost::shared_ptr<bob::machine::KMeansMachine> > machines;
+  std::vector<boost::shared_ptr<kmeans_shard> > shards;
+  const bool with_bounds = upper_bounds.extent(0) > 0;
+  for (size_t t=0; t<n_threads; ++t) {
+    machines.push_back(boost::shared_ptr<bob::machine::KMeansMachine>(
+      new bob::machine::KMeansMachine(kmeans)));
+    boost::shared_ptr<kmeans_shard> s(new kmeans_shard);
+    s->machine = machines.back().get();
+    const blitz::Range r = bob::core::shard(ar.extent(0), n_threads, t);
+    s->data.reference(bob::core::array::unsharedView(ar(r, blitz::Range::all())));
+    s->closest_means.reference(bob::core::array::unsharedView(closest_means(r)));
+    if (with_bounds) {
+      s->upper_bounds.reference(bob::core::array::unsharedView(upper_bounds(r)));
+      s->lower_bounds.reference(bob::core::array::unsharedView(lower_bounds(r)));
+    }
+    s->zeroeth.resize(zeroeth.shape());
+    s->zeroeth = 0;
+    s->first.resize(first.shape());
+    s->first = 0;
+    s->distance = 0.;
+    shards.push_back(s);
+  }
+  bob::core::parallel(n_threads, boost::bind(&accumulate_shard,
+    boost::ref(shards), bounds, _1));
+
+  for (size_t t=0; t<n_threads; ++t) {
+    distance += shards[t]->distance;
+    zeroeth += shards[t]->zeroeth;
+    first += shards[t]->first;
+  }
 }
 
 void bob::trainer::KMeansTrainer::eStep(bob::machine::KMeansMachine& kmeans, 
@@ -190,23 +419,132 @@ void bob::trainer::KMeansTrainer::eStep(bob::machine::KMeansMachine& kmeans,
   // initialise the accumulators
   resetAccumulators(kmeans);
 
-  // iterate over data samples
+  // The bounds of the previous E-step are only used within train(), where
+  // they refer to the same (unmodified) samples
+  const blitz::Array<double,2>& means = kmeans.getMeans();
+  const bool use_bounds = m_use_bounds && m_bounds_valid &&
+    m_closest_means.extent(0) == ar.extent(0) &&
+    bob::core::array::hasSameShape(m_bounds_means, means);
+  hamerly_bounds bounds;
+  if (use_bounds)
+    compute_bounds(means, m_bounds_means, bounds);
+  else {
+    m_closest_means.resize(ar.extent(0));
+    m_upper_bounds.resize(ar.extent(0));
+    m_lower_bounds.resize(ar.extent(0));
+  }
+  accumulate(kmeans, ar, use_bounds ? &bounds : 0, m_closest_means,
+    m_upper_bounds, m_lower_bounds, m_n_threads, m_zeroethOrderStats,
+    m_firstOrderStats, m_average_min_distance);
+  m_bounds_means.resize(means.shape());
+  m_bounds_means = means;
+  m_bounds_valid = m_use_bounds;
+
+  m_average_min_distance /= static_cast<double>(ar.extent(0));
+}
+
+void bob::trainer::KMeansTrainer::train(bob::machine::KMeansMachine& kmeans,
+  const blitz::Array<double,2>& ar)
+{
+  // The data cannot be modified between the E-steps of the training, which
+  // may hence reuse the bounds of the previous iteration
+  m_use_bounds = true;
+  try {
+    bob::trainer::EMTrainer<bob::machine::KMeansMachine,
+      blitz::Array<double,2> >::train(kmeans, ar);
+  }
+  catch (...) {
+    m_use_bounds = false;
+    m_bounds_valid = false;
+    throw;
+  }
+  m_use_bounds = false;
+  m_bounds_valid = false;
+}
+
+void bob::trainer::KMeansTrainer::accumulateStatistics(
+  const bob::machine::KMeansMachine& kmeans, const blitz::Array<double,2>& ar)
+{
+  blitz::Array<int,1> closest_means(ar.extent(0));
+  blitz::Array<double,1> no_bounds;
+  accumulate(kmeans, ar, 0, closest_means, no_bounds, no_bounds, m_n_threads,
+    m_zeroethOrderStats, m_firstOrderStats, m_average_min_distance);
+}
+
+void bob::trainer::KMeansTrainer::initialize(bob::machine::KMeansMachine& kmeans,
+  const bob::trainer::BlockSampler& sampler)
+{
+  // The means are initialized from a random subset of the samples, of the
+  // size of a block
+  blitz::Array<double,2> subset;
+  sampler.getRandomSamples(*m_rng,
+    std::max(sampler.getBlockSize(), kmeans.getNMeans()), subset);
+  initialize(kmeans, subset);
+}
+
+void bob::trainer::KMeansTrainer::eStep(bob::machine::KMeansMachine& kmeans,
+  const bob::trainer::BlockSampler& sampler)
+{
+  resetAccumulators(kmeans);
+  blitz::Array<double,2> block;
+  for (size_t b=0; b<sampler.getNBlocks(); ++b) {
+    sampler.getBlock(b, block);
+    accumulateStatistics(kmeans, block);
+  }
+  m_average_min_distance /= static_cast<double>(sampler.getNSamples());
+}
+
+void bob::trainer::KMeansTrainer::train(bob::machine::KMeansMachine& kmeans,
+  const bob::trainer::BlockSampler& sampler)
+{
+  bob::core::info << "# " << name() << ":" << std::endl;
+  initialize(kmeans, sampler);
+  void (bob::trainer::KMeansTrainer::*e_step)(bob::machine::KMeansMachine&,
+    const bob::trainer::BlockSampler&) = &bob::trainer::KMeansTrainer::eStep;
+  // The M-step only relies on the accumulated statistics
+  const blitz::Array<double,2> no_data;
+  iterate(kmeans,
+    boost::bind(e_step, this, boost::ref(kmeans), boost::cref(sampler)),
+    boost::bind(&bob::trainer::KMeansTrainer::mStep, this, boost::ref(kmeans),
+      boost::cref(no_data)));
+  finalize(kmeans, no_data);
+}
+
+void bob::trainer::KMeansTrainer::trainMiniBatch(
+  bob::machine::KMeansMachine& kmeans, const bob::trainer::BlockSampler& sampler,
+  const size_t batch_size)
+{
+  bob::core::info << "# " << name() << " (mini-batch):" << std::endl;
+  initialize(kmeans, sampler);
+
+  // Mini-batch k-means (Sculley, "Web-scale k-means clustering", 2010): each
+  // mean is the running average of all the samples assigned to it so far,
+  // counts(i) being their number.
+  blitz::Array<double,1> counts(kmeans.getNMeans());
+  counts = 0.;
+  blitz::Array<double,2> batch;
   blitz::Range a = blitz::Range::all();
-  for(int i=0; i<ar.extent(0); ++i) {
-    // get example
-    blitz::Array<double, 1> x(ar(i,a));
+  for (size_t iter=0; m_max_iterations == 0 || iter<m_max_iterations; ++iter) {
+    sampler.getRandomSamples(*m_rng, batch_size, batch);
+    eStep(kmeans, batch);
 
-    // find closest mean, and distance from that mean
-    size_t closest_mean = 0;
-    double min_distance = 0;
-    kmeans.getClosestMean(x,closest_mean,min_distance);
+    blitz::Array<double,2>& means = kmeans.updateMeans();
+    for (size_t i=0; i<kmeans.getNMeans(); ++i) {
+      if (m_zeroethOrderStats(i) == 0.) continue;
+      means(i,a) = (counts(i) * means(i,a) + m_firstOrderStats(i,a)) /
+        (counts(i) + m_zeroethOrderStats(i));
+      counts(i) += m_zeroethOrderStats(i);
+    }
 
-    // accumulate the stats
-    m_average_min_distance += min_distance;
-    ++m_zeroethOrderStats(closest_mean);
-    m_firstOrderStats(closest_mean,blitz::Range::all()) += x;
+    if (m_compute_likelihood)
+      bob::core::info << "# Mini-batch " << iter+1 << ": " 
+        << m_average_min_distance << std::endl;
+    else
+      bob::core::info << "# Mini-batch " << iter+1 << std::endl;
+    // Without iteration limit, stops after a pass over the whole data
+    if (m_max_iterations == 0 && (iter+1) * batch_size >= sampler.getNSamples())
+      break;
   }
-  m_average_min_distance /= static_cast<double>(ar.extent(0));
 }
 
 void bob::trainer::KMeansTrainer::mStep(bob::machine::KMeansMachine& kmeans, 
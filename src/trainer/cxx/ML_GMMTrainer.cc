@@ -20,6 +20,9 @@
 
 #include <bob/trainer/ML_GMMTrainer.h>
 #include <algorithm>
+#include <cmath>
+#include <stdexcept>
+#include <boost/format.hpp>
 
 bob::trainer::ML_GMMTrainer::ML_GMMTrainer(const bool update_means,
     const bool update_variances, const bool update_weights,
@@ -92,6 +95,49 @@ void bob::trainer::ML_GMMTrainer::mStep(bob::machine::GMMMachine& gmm,
   }
 }
 
+void bob::trainer::ML_GMMTrainer::trainOnline(bob::machine::GMMMachine& gmm,
+  const bob::trainer::BlockSampler& sampler, const size_t batch_size,
+  const double alpha)
+{
+  if (alpha <= 0.5 || alpha > 1.) {
+    boost::format m("the step size exponent of the online EM (%f) should lie in ]0.5,1]");
+    m % alpha;
+    throw std::runtime_error(m.str());
+  }
+  bob::core::info << "# " << name() << " (online):" << std::endl;
+  initialize(gmm, blitz::Array<double,2>());
+
+  bob::machine::GMMStats running(gmm.getNGaussians(), gmm.getNInputs());
+  blitz::Array<double,2> batch;
+  for (size_t iter=0; m_max_iterations == 0 || iter<m_max_iterations; ++iter) {
+    sampler.getRandomSamples(*m_rng, batch_size, batch);
+    eStep(gmm, batch);
+    if (m_compute_likelihood)
+      bob::core::info << "# Mini-batch " << iter+1 << ": "
+        << computeLikelihood(gmm) << std::endl;
+    else
+      bob::core::info << "# Mini-batch " << iter+1 << std::endl;
+
+    // The running statistics are those of a batch, and are interpolated 
+    // with the ones of the current batch
+    if (iter == 0) running = m_ss;
+    else {
+      const double step = std::pow(static_cast<double>(iter+2), -alpha);
+      running.log_likelihood = (1.-step) * running.log_likelihood + step * m_ss.log_likelihood;
+      running.n = (1.-step) * running.n + step * m_ss.n;
+      running.sumPx = (1.-step) * running.sumPx + step * m_ss.sumPx;
+      running.sumPxx = (1.-step) * running.sumPxx + step * m_ss.sumPxx;
+    }
+    m_ss = running;
+    mStep(gmm, batch);
+
+    // Without iteration limit, stops after a pass over the whole data
+    if (m_max_iterations == 0 && (iter+1) * batch_size >= sampler.getNSamples())
+      break;
+  }
+  finalize(gmm, batch);
+}
+
 bob::trainer::ML_GMMTrainer& bob::trainer::ML_GMMTrainer::operator=
   (const bob::trainer::ML_GMMTrainer &other)
 {
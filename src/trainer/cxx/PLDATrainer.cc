@@ -23,11 +23,13 @@
 #include <bob/trainer/PLDATrainer.h>
 #include <bob/core/array_copy.h>
 #include <bob/core/array_random.h>
+#include <bob/core/parallel.h>
 #include <bob/math/linear.h>
 #include <bob/math/inv.h>
 #include <bob/math/svd.h>
 #include <algorithm>
 #include <boost/random.hpp>
+#include <boost/bind.hpp>
 #include <vector>
 #include <limits>
 
@@ -74,6 +76,7 @@ bob::trainer::PLDATrainer::PLDATrainer(const bob::trainer::PLDATrainer& other):
   bob::core::array::ccopy(other.m_cache_z_second_order, m_cache_z_second_order);
   bob::core::array::ccopy(other.m_cache_zeta, m_cache_zeta);
   bob::core::array::ccopy(other.m_cache_iota, m_cache_iota);
+  m_n_threads = other.m_n_threads;
   // Resize working arrays
   resizeTmp();
 }
@@ -512,76 +515,90 @@ void bob::trainer::PLDATrainer::initSigma(bob::machine::PLDABase& machine,
   machine.applyVarianceThreshold();
 }
 
-void bob::trainer::PLDATrainer::eStep(bob::machine::PLDABase& machine, 
-  const std::vector<blitz::Array<double,2> >& v_ar)
-{  
-  // Precomputes useful variables using current estimates of F,G, and sigma
-  precomputeFromFGSigma(machine);
+/**
+ * Computes the first and second order statistics of the latent variables
+ * z_ij = [h_i w_ij] of the given identities, and accumulates the sum of
+ * the second order statistics. The terms which only depend on the number
+ * of samples of an identity (gamma_a, zeta_a and iota_a) should have been
+ * precomputed for all the numbers of samples of the data.
+ */
+static void estep(const bob::machine::PLDABase& machine,
+  const std::vector<blitz::Array<double,2> >& v_ar,
+  std::map<size_t,blitz::Array<double,2> >& zeta,
+  std::map<size_t,blitz::Array<double,2> >& iota,
+  const bool use_sum_second_order,
+  std::vector<blitz::Array<double,2> >& z_first_order,
+  std::vector<blitz::Array<double,3> >& z_second_order,
+  blitz::Array<double,2>& sum_z_second_order)
+{
   // Gets the mean mu from the machine
   const blitz::Array<double,1>& mu = machine.getMu();
   const blitz::Array<double,2>& alpha = machine.getAlpha();
   const blitz::Array<double,2>& F = machine.getF();
   const blitz::Array<double,2>& FtBeta = machine.getFtBeta();
   const blitz::Array<double,2>& GtISigma = machine.getGtISigma();
+  const size_t dim_d = machine.getDimD();
+  const size_t dim_f = machine.getDimF();
+  const size_t dim_g = machine.getDimG();
   blitz::Range a = blitz::Range::all();
 
+  // Working arrays
+  blitz::Array<double,1> tmp_nf_1(dim_f);
+  blitz::Array<double,1> tmp_nf_2(dim_f);
+  blitz::Array<double,1> tmp_ng_1(dim_g);
+  blitz::Array<double,1> tmp_D_1(dim_d);
+  blitz::Array<double,1> tmp_D_2(dim_d);
+
   // blitz indices
   blitz::firstIndex bi;
   blitz::secondIndex bj;
-  // Initializes sum of z second order statistics to 0
-  m_cache_sum_z_second_order = 0.;
+  blitz::Range r1(0, dim_f-1);
+  blitz::Range r2(dim_f, dim_f+dim_g-1);
+  blitz::Array<double,2> z_sum_so_11 = sum_z_second_order(r1,r1);
+  blitz::Array<double,2> z_sum_so_12 = sum_z_second_order(r1,r2);
+  blitz::Array<double,2> z_sum_so_21 = sum_z_second_order(r2,r1);
+  blitz::Array<double,2> z_sum_so_22 = sum_z_second_order(r2,r2);
   for (size_t i=0; i<v_ar.size(); ++i)
   {
+    const size_t n_i = v_ar[i].extent(0);
     // Computes expectation of z_ij = [h_i w_ij]
     // 1/a/ Computes expectation of h_i
-    // Loop over the samples
-    m_tmp_nf_1 = 0.;
+    // tmp_D_1 = sum_j (x_sj-mu)
+    tmp_D_1 = 0.;
     for (int j=0; j<v_ar[i].extent(0); ++j)
-    {
-      // m_tmp_D_1 = x_sj-mu
-      m_tmp_D_1 = v_ar[i](j,a) - mu;
+      tmp_D_1 += v_ar[i](j,a);
+    tmp_D_1 -= static_cast<double>(n_i) * mu;
+    // tmp_nf_1 = sum_j F^T.beta.(x_sj-mu)
+    bob::math::prod(FtBeta, tmp_D_1, tmp_nf_1);
+    const blitz::Array<double,2>& gamma_a = machine.getGamma(n_i);
+    // tmp_nf_2 = E(h_i) = gamma_A  sum_j F^T.beta.(x_sj-mu)
+    bob::math::prod(gamma_a, tmp_nf_1, tmp_nf_2);
 
-      // m_tmp_nf_2 = F^T.beta.(x_sj-mu)
-      bob::math::prod(FtBeta, m_tmp_D_1, m_tmp_nf_2);
-      // m_tmp_nf_1 = sum_j F^T.beta.(x_sj-mu)
-      m_tmp_nf_1 += m_tmp_nf_2;
-    }
-    const blitz::Array<double,2>& gamma_a = machine.getAddGamma(v_ar[i].extent(0));
-    blitz::Range r_hi(0, m_dim_f-1);
-    // m_tmp_nf_2 = E(h_i) = gamma_A  sum_j F^T.beta.(x_sj-mu)
-    bob::math::prod(gamma_a, m_tmp_nf_1, m_tmp_nf_2);
-
-    // 1/b/ Precomputes: m_tmp_D_2 = F.E{h_i}
-    bob::math::prod(F, m_tmp_nf_2, m_tmp_D_2);
+    // 1/b/ Precomputes: tmp_D_2 = F.E{h_i}
+    bob::math::prod(F, tmp_nf_2, tmp_D_2);
 
     // 2/ First and second order statistics of z
     // Precomputed values 
-    blitz::Array<double,2>& zeta_a = m_cache_zeta[v_ar[i].extent(0)];
-    blitz::Array<double,2>& iota_a = m_cache_iota[v_ar[i].extent(0)];
+    blitz::Array<double,2>& zeta_a = zeta[n_i];
+    blitz::Array<double,2>& iota_a = iota[n_i];
     blitz::Array<double,2> iotat_a = iota_a.transpose(1,0);
 
     // Extracts statistics of z_ij = [h_i w_ij] from y_i = [h_i w_i1 ... w_iJ]
-    blitz::Range r1(0, m_dim_f-1);
-    blitz::Range r2(m_dim_f, m_dim_f+m_dim_g-1);
     for (int j=0; j<v_ar[i].extent(0); ++j)
     {
       // 1/ First order statistics of z
-      blitz::Array<double,1> z_first_order_ij_1 = m_cache_z_first_order[i](j,r1);
-      z_first_order_ij_1 = m_tmp_nf_2; // E{h_i}
-      // m_tmp_D_1 = x_sj - mu - F.E{h_i}
-      m_tmp_D_1 = v_ar[i](j,a) - mu - m_tmp_D_2;
-      // m_tmp_ng_1 = G^T.sigma^-1.(x_sj-mu-fhi)
-      bob::math::prod(GtISigma, m_tmp_D_1, m_tmp_ng_1);
+      blitz::Array<double,1> z_first_order_ij_1 = z_first_order[i](j,r1);
+      z_first_order_ij_1 = tmp_nf_2; // E{h_i}
+      // tmp_D_1 = x_sj - mu - F.E{h_i}
+      tmp_D_1 = v_ar[i](j,a) - mu - tmp_D_2;
+      // tmp_ng_1 = G^T.sigma^-1.(x_sj-mu-fhi)
+      bob::math::prod(GtISigma, tmp_D_1, tmp_ng_1);
       // z_first_order_ij_2 = (Id+G^T.sigma^-1.G)^-1.G^T.sigma^-1.(x_sj-mu) = E{w_ij}
-      blitz::Array<double,1> z_first_order_ij_2 = m_cache_z_first_order[i](j,r2);
-      bob::math::prod(alpha, m_tmp_ng_1, z_first_order_ij_2); 
+      blitz::Array<double,1> z_first_order_ij_2 = z_first_order[i](j,r2);
+      bob::math::prod(alpha, tmp_ng_1, z_first_order_ij_2); 
 
       // 2/ Second order statistics of z
-      blitz::Array<double,2> z_sum_so_11 = m_cache_sum_z_second_order(r1,r1);
-      blitz::Array<double,2> z_sum_so_12 = m_cache_sum_z_second_order(r1,r2);
-      blitz::Array<double,2> z_sum_so_21 = m_cache_sum_z_second_order(r2,r1);
-      blitz::Array<double,2> z_sum_so_22 = m_cache_sum_z_second_order(r2,r2);
-      if (m_use_sum_second_order)
+      if (use_sum_second_order)
       {
         z_sum_so_11 += gamma_a + z_first_order_ij_1(bi) * z_first_order_ij_1(bj);
         z_sum_so_12 += iota_a + z_first_order_ij_1(bi) * z_first_order_ij_2(bj);
@@ -590,16 +607,16 @@ void bob::trainer::PLDATrainer::eStep(bob::machine::PLDABase& machine,
       }
       else
       {
-        blitz::Array<double,2> z_so_11 = m_cache_z_second_order[i](j,r1,r1);
+        blitz::Array<double,2> z_so_11 = z_second_order[i](j,r1,r1);
         z_so_11 = gamma_a + z_first_order_ij_1(bi) * z_first_order_ij_1(bj);
         z_sum_so_11 += z_so_11;
-        blitz::Array<double,2> z_so_12 = m_cache_z_second_order[i](j,r1,r2);
+        blitz::Array<double,2> z_so_12 = z_second_order[i](j,r1,r2);
         z_so_12 = iota_a + z_first_order_ij_1(bi) * z_first_order_ij_2(bj);
         z_sum_so_12 += z_so_12;
-        blitz::Array<double,2> z_so_21 = m_cache_z_second_order[i](j,r2,r1);
+        blitz::Array<double,2> z_so_21 = z_second_order[i](j,r2,r1);
         z_so_21 = iotat_a + z_first_order_ij_2(bi) * z_first_order_ij_1(bj);
         z_sum_so_21 += z_so_21;
-        blitz::Array<double,2> z_so_22 = m_cache_z_second_order[i](j,r2,r2);
+        blitz::Array<double,2> z_so_22 = z_second_order[i](j,r2,r2);
         z_so_22 = zeta_a + z_first_order_ij_2(bi) * z_first_order_ij_2(bj);
         z_sum_so_22 += z_so_22;
       }
@@ -607,6 +624,85 @@ void bob::trainer::PLDATrainer::eStep(bob::machine::PLDABase& machine,
   }
 }
 
+/**
+ * The machine, the identities, the latent variable statistics and the
+ * accumulator of a thread
+ */
+struct plda_shard {
+  boost::shared_ptr<bob::machine::PLDABase> machine;
+  std::vector<blitz::Array<double,2> > data;
+  std::map<size_t,blitz::Array<double,2> > zeta;
+  std::map<size_t,blitz::Array<double,2> > iota;
+  std::vector<blitz::Array<double,2> > z_first_order;
+  std::vector<blitz::Array<double,3> > z_second_order;
+  blitz::Array<double,2> sum_z_second_order;
+};
+
+static void estep_shard(std::vector<boost::shared_ptr<plda_shard> >& shards,
+  const bool use_sum_second_order, const size_t i)
+{
+  plda_shard& s = *shards[i];
+  estep(*s.machine, s.data, s.zeta, s.iota, use_sum_second_order,
+    s.z_first_order, s.z_second_order, s.sum_z_second_order);
+}
+
+void bob::trainer::PLDATrainer::eStep(bob::machine::PLDABase& machine, 
+  const std::vector<blitz::Array<double,2> >& v_ar)
+{  
+  // Precomputes useful variables using current estimates of F,G, and sigma
+  // (this includes gamma_a, zeta_a and iota_a for all the numbers of 
+  // samples per identity of the training set)
+  precomputeFromFGSigma(machine);
+
+  // Initializes sum of z second order statistics to 0
+  m_cache_sum_z_second_order = 0.;
+
+  const size_t n_threads = std::min(m_n_threads, v_ar.size());
+  if (n_threads <= 1)
+  {
+    estep(machine, v_ar, m_cache_zeta, m_cache_iota, m_use_sum_second_order,
+      m_cache_z_first_order, m_cache_z_second_order, 
+      m_cache_sum_z_second_order);
+    return;
+  }
+
+  // Each thread processes a shard of the identities with its own copy of
+  // the machine (and of the precomputed terms) and its own sum of the
+  // second order statistics, which are then summed. The data and the
+  // statistics of the identities of a shard are views, which do not share
+  // their reference counts.
+  std::vector<boost::shared_ptr<plda_shard> > shards;
+  for (size_t t=0; t<n_threads; ++t)
+  {
+    boost::shared_ptr<plda_shard> s(new plda_shard);
+    s->machine.reset(new bob::machine::PLDABase(machine));
+    bob::core::array::ccopy(m_cache_zeta, s->zeta);
+    bob::core::array::ccopy(m_cache_iota, s->iota);
+    blitz::Range r = bob::core::shard(static_cast<int>(v_ar.size()), n_threads, t);
+    s->data.resize(r.length());
+    s->z_first_order.resize(r.length());
+    if (!m_use_sum_second_order) s->z_second_order.resize(r.length());
+    for (int i=0; i<r.length(); ++i)
+    {
+      const size_t k = r.first() + i;
+      s->data[i].reference(bob::core::array::unsharedView(v_ar[k]));
+      s->z_first_order[i].reference(
+        bob::core::array::unsharedView(m_cache_z_first_order[k]));
+      if (!m_use_sum_second_order)
+        s->z_second_order[i].reference(
+          bob::core::array::unsharedView(m_cache_z_second_order[k]));
+    }
+    s->sum_z_second_order.resize(m_cache_sum_z_second_order.shape());
+    s->sum_z_second_order = 0.;
+    shards.push_back(s);
+  }
+  bob::core::parallel(n_threads, boost::bind(&estep_shard,
+    boost::ref(shards), m_use_sum_second_order, _1));
+
+  for (size_t t=0; t<n_threads; ++t)
+    m_cache_sum_z_second_order += shards[t]->sum_z_second_order;
+}
+
 void bob::trainer::PLDATrainer::precomputeFromFGSigma(bob::machine::PLDABase& machine)
 {
   // Blitz compatibility: ugly fix (const_cast, as old blitz version does not  
@@ -22,6 +22,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/trainer/MLPBackPropTrainer.h>
 
@@ -77,6 +78,24 @@ static void backprop_set_prev_deriv_bias2(bob::trainer::MLPBackPropTrainer& t,
   t.setPreviousBiasDerivative(v.bz<double,1>(), k);
 }
 
+static void backprop_train(bob::trainer::MLPBackPropTrainer& t, bob::machine::MLP& m,
+  bob::python::const_ndarray input, bob::python::const_ndarray target)
+{
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  blitz::Array<double,2> target_ = target.bz<double,2>();
+  bob::python::no_gil unlock;
+  t.train(m, input_, target_);
+}
+
+static void backprop_train_(bob::trainer::MLPBackPropTrainer& t, bob::machine::MLP& m,
+  bob::python::const_ndarray input, bob::python::const_ndarray target)
+{
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  blitz::Array<double,2> target_ = target.bz<double,2>();
+  bob::python::no_gil unlock;
+  t.train_(m, input_, target_);
+}
+
 void bind_trainer_backprop() {
   class_<bob::trainer::MLPBackPropTrainer, boost::shared_ptr<bob::trainer::MLPBackPropTrainer>, bases<bob::trainer::MLPBaseTrainer> >("MLPBackPropTrainer", "Sets an MLP to perform discrimination based on vanilla error back-propagation as defined in 'Pattern Recognition and Machine Learning' by C.M. Bishop, chapter 5 or else, 'Pattern Classification' by Duda, Hart and Stork, chapter 6.", no_init)
     
@@ -173,7 +192,7 @@ void bind_trainer_backprop() {
     
     .add_property("momentum", &bob::trainer::MLPBackPropTrainer::getMomentum, &bob::trainer::MLPBackPropTrainer::setMomentum, "The momentum (:math:`\\mu`) to be used for the back-propagation. This value allows for some *memory* on previous weight updates to be used for the next update (defaults to 0.0).")
 
-    .def("train", &bob::trainer::MLPBackPropTrainer::train, (arg("self"), arg("machine"), arg("input"), arg("target")), 
+    .def("train", &backprop_train, (arg("self"), arg("machine"), arg("input"), arg("target")), 
         "Trains the MLP to perform discrimination using error back-propagation with (optional) momentum.\n" \
         "\n" \
         "Concretely, this executes the following update rule for the weights (and biases, optionally):\n" \
@@ -213,7 +232,7 @@ void bind_trainer_backprop() {
         "  A 2D :py:class:`numpy.ndarray` with 64-bit floats containing the target data for the MLP to which this training step will be based on. The matrix should be organized so each target lies on a single row of ``target``, matching each input example in ``input``.\n" \
         "\n"
         )
-    .def("train_", &bob::trainer::MLPBackPropTrainer::train_, (arg("self"), arg("machine"), arg("input"), arg("target")), "This is a version of the train() method above, which does no compatibility check on the input machine and can be faster.")
+    .def("train_", &backprop_train_, (arg("self"), arg("machine"), arg("input"), arg("target")), "This is a version of the train() method above, which does no compatibility check on the input machine and can be faster.")
     
     .add_property("previous_derivatives", &backprop_get_prev_deriv, &backprop_set_prev_deriv, "The previous set of weight derivatives calculated by the base trainer. We keep those in case the momentum :math:`\\mu\\neq0.0`")
 
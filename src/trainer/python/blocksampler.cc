@@ -0,0 +1,91 @@
+/**
+ * @file trainer/python/blocksampler.cc
+ * @date Sun Oct 18 11:05:47 2026 +0200
+ *
+ * @brief Python bindings to the BlockSampler
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <boost/python.hpp>
+#include <boost/python/stl_iterator.hpp>
+#include <boost/make_shared.hpp>
+#include <bob/python/ndarray.h>
+#include <bob/io/utils.h>
+#include <bob/trainer/BlockSampler.h>
+
+using namespace boost::python;
+
+static boost::shared_ptr<bob::trainer::BlockSampler> sampler_from_files
+(object files, const size_t block_size) {
+  std::vector<boost::shared_ptr<bob::io::File> > vfiles;
+  stl_input_iterator<object> it(files), end;
+  for (; it != end; ++it) {
+    extract<boost::shared_ptr<bob::io::File> > file(*it);
+    if (file.check()) {
+      vfiles.push_back(file());
+      continue;
+    }
+    extract<std::string> filename(*it);
+    if (!filename.check()) {
+      PYTHON_ERROR(TypeError, "the files of a block sampler should be either bob.io.File objects or filenames");
+    }
+    vfiles.push_back(bob::io::open(filename(), 'r'));
+  }
+  return boost::make_shared<bob::trainer::BlockSampler>(vfiles, block_size);
+}
+
+static list files(const bob::trainer::BlockSampler& s) {
+  list retval;
+  const std::vector<boost::shared_ptr<bob::io::File> >& f = s.getFiles();
+  for (size_t i=0; i<f.size(); ++i) retval.append(f[i]);
+  return retval;
+}
+
+static object block(const bob::trainer::BlockSampler& s, const size_t i) {
+  blitz::Array<double,2> data;
+  s.getBlock(i, data);
+  return object(data);
+}
+
+static object samples(const bob::trainer::BlockSampler& s, object indices) {
+  stl_input_iterator<size_t> it(indices), end;
+  std::vector<size_t> vindices(it, end);
+  blitz::Array<double,2> data;
+  s.getSamples(vindices, data);
+  return object(data);
+}
+
+static object random_samples(const bob::trainer::BlockSampler& s,
+  boost::mt19937& rng, const size_t n) {
+  blitz::Array<double,2> data;
+  s.getRandomSamples(rng, n, data);
+  return object(data);
+}
+
+void bind_trainer_block_sampler() {
+  class_<bob::trainer::BlockSampler, boost::shared_ptr<bob::trainer::BlockSampler> >("BlockSampler", "A block sampler gives access to the samples stored in a list of files, without loading them all in memory. Each file is read as a sequence of 1D arrays (e.g. the rows of a 2D HDF5 dataset), which are the samples. The samples of all the files are concatenated, and may be read by blocks of consecutive samples, or at random.\n\nBlock samplers may be used in place of in-memory arrays to train k-means machines and GMMs on data sets which do not fit in memory.", no_init)
+    .def("__init__", make_constructor(&sampler_from_files, default_call_policies(), (arg("files"), arg("block_size")=4096)), "Initializes the sampler with a list of files, given either as bob.io.File objects or as filenames. The samples are read by blocks of block_size samples.")
+    .add_property("files", &files, "The files the samples are read from")
+    .add_property("n_samples", &bob::trainer::BlockSampler::getNSamples, "The total number of samples")
+    .add_property("n_inputs", &bob::trainer::BlockSampler::getNInputs, "The dimensionality of the samples")
+    .add_property("n_blocks", &bob::trainer::BlockSampler::getNBlocks, "The number of blocks")
+    .add_property("block_size", &bob::trainer::BlockSampler::getBlockSize, &bob::trainer::BlockSampler::setBlockSize, "The number of samples of a block (only the last block may be smaller)")
+    .def("__len__", &bob::trainer::BlockSampler::getNBlocks, (arg("self")), "The number of blocks")
+    .def("block", &block, (arg("self"), arg("index")), "Reads the block of the given index, as a 2D array with one sample per row")
+    .def("samples", &samples, (arg("self"), arg("indices")), "Reads the samples of the given (global) indices, in this order, as a 2D array with one sample per row")
+    .def("random_samples", &random_samples, (arg("self"), arg("rng"), arg("n")), "Reads n distinct samples drawn uniformly at random using the given random generator, or all the samples if there are less than n. The samples are returned in the order they are stored in the files.")
+    ;
+}
@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/CGLogRegTrainer.h>
 
 using namespace boost::python;
@@ -29,14 +30,22 @@ object train1(const bob::trainer::CGLogRegTrainer& t,
   bob::python::const_ndarray data1, bob::python::const_ndarray data2)
 {
   bob::machine::LinearMachine m;
-  t.train(m, data1.bz<double,2>(), data2.bz<double,2>());
+  blitz::Array<double,2> data1_ = data1.bz<double,2>();
+  blitz::Array<double,2> data2_ = data2.bz<double,2>();
+  {
+    bob::python::no_gil unlock;
+    t.train(m, data1_, data2_);
+  }
   return object(m);
 }
 
 void train2(const bob::trainer::CGLogRegTrainer& t, bob::machine::LinearMachine& m, 
   bob::python::const_ndarray data1, bob::python::const_ndarray data2)
 {
-  t.train(m, data1.bz<double,2>(), data2.bz<double,2>());
+  blitz::Array<double,2> data1_ = data1.bz<double,2>();
+  blitz::Array<double,2> data2_ = data2.bz<double,2>();
+  bob::python::no_gil unlock;
+  t.train(m, data1_, data2_);
 }
 
 void bind_trainer_cglogreg() 
@@ -19,6 +19,7 @@
  */
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <bob/trainer/EMPCATrainer.h>
 #include <bob/machine/LinearMachine.h>
@@ -30,31 +31,41 @@ typedef bob::trainer::EMTrainer<bob::machine::LinearMachine, blitz::Array<double
 static void py_train(EMTrainerLinearBase& trainer, 
   bob::machine::LinearMachine& machine, bob::python::const_ndarray data)
 {
-  trainer.train(machine, data.bz<double,2>());
+  blitz::Array<double,2> data_ = data.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.train(machine, data_);
 }
 
 static void py_initialize(EMTrainerLinearBase& trainer, 
   bob::machine::LinearMachine& machine, bob::python::const_ndarray data)
 {
-  trainer.initialize(machine, data.bz<double,2>());
+  blitz::Array<double,2> data_ = data.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.initialize(machine, data_);
 }
 
 static void py_finalize(EMTrainerLinearBase& trainer, 
   bob::machine::LinearMachine& machine, bob::python::const_ndarray data)
 {
-  trainer.finalize(machine, data.bz<double,2>());
+  blitz::Array<double,2> data_ = data.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.finalize(machine, data_);
 }
 
 static void py_eStep(EMTrainerLinearBase& trainer, 
   bob::machine::LinearMachine& machine, bob::python::const_ndarray data)
 {
-  trainer.eStep(machine, data.bz<double,2>());
+  blitz::Array<double,2> data_ = data.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.eStep(machine, data_);
 }
 
 static void py_mStep(EMTrainerLinearBase& trainer, 
   bob::machine::LinearMachine& machine, bob::python::const_ndarray data)
 {
-  trainer.mStep(machine, data.bz<double,2>());
+  blitz::Array<double,2> data_ = data.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.mStep(machine, data_);
 }
 
 void bind_trainer_empca() 
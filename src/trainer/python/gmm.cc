@@ -19,6 +19,7 @@
  */
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/GMMTrainer.h>
 #include <bob/trainer/MAP_GMMTrainer.h>
 #include <bob/trainer/ML_GMMTrainer.h>
@@ -29,27 +30,47 @@ typedef bob::trainer::EMTrainer<bob::machine::GMMMachine, blitz::Array<double,2>
 
 static void py_train(EMTrainerGMMBase& trainer, bob::machine::GMMMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.train(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.train(machine, sample_);
 }
 
 static void py_initialize(EMTrainerGMMBase& trainer, bob::machine::GMMMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.initialize(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.initialize(machine, sample_);
 }
 
 static void py_finalize(EMTrainerGMMBase& trainer, bob::machine::GMMMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.finalize(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.finalize(machine, sample_);
 }
 
 static void py_eStep(EMTrainerGMMBase& trainer, bob::machine::GMMMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.eStep(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.eStep(machine, sample_);
 }
 
 static void py_mStep(EMTrainerGMMBase& trainer, bob::machine::GMMMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.mStep(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.mStep(machine, sample_);
+}
+
+static void py_train_sampler(bob::trainer::GMMTrainer& trainer, bob::machine::GMMMachine& machine, const bob::trainer::BlockSampler& sampler)
+{
+  trainer.train(machine, sampler);
+}
+
+static void py_eStep_sampler(bob::trainer::GMMTrainer& trainer, bob::machine::GMMMachine& machine, const bob::trainer::BlockSampler& sampler)
+{
+  trainer.eStep(machine, sampler);
 }
 
 void bind_trainer_gmm() {
@@ -57,6 +78,7 @@ void bind_trainer_gmm() {
   class_<EMTrainerGMMBase, boost::noncopyable>("EMTrainerGMM", "The base python class for all EM-based trainers.", no_init)
     .add_property("convergence_threshold", &EMTrainerGMMBase::getConvergenceThreshold, &EMTrainerGMMBase::setConvergenceThreshold, "Convergence threshold")
     .add_property("max_iterations", &EMTrainerGMMBase::getMaxIterations, &EMTrainerGMMBase::setMaxIterations, "Max iterations")
+    .add_property("n_threads", &EMTrainerGMMBase::getNThreads, &EMTrainerGMMBase::setNThreads, "The number of threads used by the E-step (1 by default). The data is split into as many shards, which are processed concurrently.")
     .def("train", &py_train, (arg("self"), arg("machine"), arg("data")), "Train a machine using data")
     .def("initialize", &py_initialize, (arg("self"), arg("machine"), arg("data")), "This method is called before the EM algorithm")
     .def("finalize", &py_finalize, (arg("self"), arg("machine"), arg("data")), "This method is called after the EM algorithm")
@@ -74,6 +96,10 @@ void bind_trainer_gmm() {
       "This class implements the E-step of the expectation-maximisation algorithm for a GMM Machine.\n"
       "See Section 9.2.2 of Bishop, \"Pattern recognition and machine learning\", 2006", no_init)
     .add_property("gmm_statistics", make_function(&bob::trainer::GMMTrainer::getGMMStats, return_value_policy<copy_const_reference>()), &bob::trainer::GMMTrainer::setGMMStats, "The internal GMM statistics. Useful to parallelize the E-step.")
+    .def("train", &py_train, (arg("self"), arg("machine"), arg("data")), "Train a machine using data")
+    .def("train", &py_train_sampler, (arg("self"), arg("machine"), arg("sampler")), "Train a machine using the samples of a bob.trainer.BlockSampler, which are read block by block at each iteration. This gives the same result as training on all the samples at once, without loading them in memory.")
+    .def("e_step", &py_eStep, (arg("self"), arg("machine"), arg("data")), "Update the hidden variable distribution (or the sufficient statistics) given the Machine parameters.")
+    .def("e_step", &py_eStep_sampler, (arg("self"), arg("machine"), arg("sampler")), "Calculates the statistics across the samples of a bob.trainer.BlockSampler, block by block.")
   ;
 
   class_<bob::trainer::MAP_GMMTrainer, boost::noncopyable, bases<bob::trainer::GMMTrainer> >("MAP_GMMTrainer",
@@ -97,5 +123,6 @@ void bind_trainer_gmm() {
       "This class implements the maximum likelihood M-step of the expectation-maximisation algorithm for a GMM Machine.\n"
       "See Section 9.2.2 of Bishop, \"Pattern recognition and machine learning\", 2006",
       init<optional<const bool, const bool, const bool, const double> >((arg("self"), arg("update_means"), arg("update_variances"), arg("update_weights"), arg("responsibilities_threshold"))))
+    .def("train_online", &bob::trainer::ML_GMMTrainer::trainOnline, (arg("self"), arg("machine"), arg("sampler"), arg("batch_size")=1024, arg("alpha")=0.7), "Train a machine with the stepwise online EM algorithm (Liang and Klein, \"Online EM for unsupervised models\", 2009), using the samples of a bob.trainer.BlockSampler. At each iteration, the statistics of a random batch of batch_size samples are interpolated with the running statistics, with a weight of (k+2)^(-alpha) for the k-th batch, and the parameters are updated from the running statistics. alpha should lie in ]0.5,1]. There are max_iterations batches, or as many batches as required to go once through the data if max_iterations is 0.")
   ;
 }
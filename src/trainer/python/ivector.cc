@@ -20,6 +20,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <bob/trainer/IVectorTrainer.h>
 #include <bob/machine/IVectorMachine.h>
@@ -35,6 +36,7 @@ static void py_train(EMTrainerIVectorBase& trainer,
 {
   stl_input_iterator<bob::machine::GMMStats> dbegin(data), dend;
   std::vector<bob::machine::GMMStats> vdata(dbegin, dend);
+  bob::python::no_gil unlock;
   trainer.train(machine, vdata);
 }
 
@@ -43,6 +45,7 @@ static void py_initialize(EMTrainerIVectorBase& trainer,
 {
   stl_input_iterator<bob::machine::GMMStats> dbegin(data), dend;
   std::vector<bob::machine::GMMStats> vdata(dbegin, dend);
+  bob::python::no_gil unlock;
   trainer.initialize(machine, vdata);
 }
 
@@ -51,6 +54,7 @@ static void py_eStep(EMTrainerIVectorBase& trainer,
 {
   stl_input_iterator<bob::machine::GMMStats> dbegin(data), dend;
   std::vector<bob::machine::GMMStats> vdata(dbegin, dend);
+  bob::python::no_gil unlock;
   trainer.eStep(machine, vdata);
 }
 
@@ -59,6 +63,7 @@ static void py_mStep(EMTrainerIVectorBase& trainer,
 {
   stl_input_iterator<bob::machine::GMMStats> dbegin(data), dend;
   std::vector<bob::machine::GMMStats> vdata(dbegin, dend);
+  bob::python::no_gil unlock;
   trainer.mStep(machine, vdata);
 }
 
@@ -67,6 +72,7 @@ static void py_finalize(EMTrainerIVectorBase& trainer,
 {
   stl_input_iterator<bob::machine::GMMStats> dbegin(data), dend;
   std::vector<bob::machine::GMMStats> vdata(dbegin, dend);
+  bob::python::no_gil unlock;
   trainer.finalize(machine, vdata);
 }
 
@@ -99,6 +105,7 @@ void bind_trainer_ivector()
   class_<EMTrainerIVectorBase, boost::noncopyable>("EMTrainerIVector", "The base python class for all EM-based trainers.", no_init)
     .add_property("convergence_threshold", &EMTrainerIVectorBase::getConvergenceThreshold, &EMTrainerIVectorBase::setConvergenceThreshold, "Convergence threshold")
     .add_property("max_iterations", &EMTrainerIVectorBase::getMaxIterations, &EMTrainerIVectorBase::setMaxIterations, "Max iterations")
+    .add_property("n_threads", &EMTrainerIVectorBase::getNThreads, &EMTrainerIVectorBase::setNThreads, "The number of threads used by the E-step (1 by default). The data is split into as many shards, which are processed concurrently.")
     .add_property("compute_likelihood_variable", &EMTrainerIVectorBase::getComputeLikelihood, &EMTrainerIVectorBase::setComputeLikelihood, "Indicates whether the log likelihood should be computed during EM or not")
     .add_property("rng", &EMTrainerIVectorBase::getRng, &EMTrainerIVectorBase::setRng, "The Mersenne Twister mt19937 random generator used for the initialization of subspaces/arrays before the EM loop.")
     .def("train", &py_train, (arg("machine"), arg("data")), "Trains a machine using data")
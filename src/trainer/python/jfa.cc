@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/trainer/JFATrainer.h>
 #include <boost/shared_ptr.hpp>
@@ -53,6 +54,7 @@ static void isv_train(bob::trainer::ISVTrainer& t, bob::machine::ISVBase& m, obj
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the train function
+  bob::python::no_gil unlock;
   t.train(m, training_data);
 }
 
@@ -61,6 +63,7 @@ static void isv_initialize(bob::trainer::ISVTrainer& t, bob::machine::ISVBase& m
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the initialize function
+  bob::python::no_gil unlock;
   t.initialize(m, training_data);
 }
 
@@ -69,6 +72,7 @@ static void isv_estep(bob::trainer::ISVTrainer& t, bob::machine::ISVBase& m, obj
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the E-Step function
+  bob::python::no_gil unlock;
   t.eStep(m, training_data);
 }
 
@@ -77,6 +81,7 @@ static void isv_mstep(bob::trainer::ISVTrainer& t, bob::machine::ISVBase& m, obj
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the M-Step function
+  bob::python::no_gil unlock;
   t.mStep(m, training_data);
 }
 
@@ -85,6 +90,7 @@ static void isv_finalize(bob::trainer::ISVTrainer& t, bob::machine::ISVBase& m,
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the finalization function
+  bob::python::no_gil unlock;
   t.finalize(m, training_data);
 }
 
@@ -144,6 +150,7 @@ static void jfa_train(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, obj
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the train function
+  bob::python::no_gil unlock;
   t.train(m, training_data);
 }
 
@@ -152,6 +159,7 @@ static void jfa_initialize(bob::trainer::JFATrainer& t, bob::machine::JFABase& m
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the initialize function
+  bob::python::no_gil unlock;
   t.initialize(m, training_data);
 }
 
@@ -160,6 +168,7 @@ static void jfa_estep1(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, ob
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the E-Step function
+  bob::python::no_gil unlock;
   t.eStep1(m, training_data);
 }
 
@@ -168,6 +177,7 @@ static void jfa_mstep1(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, ob
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the M-Step function
+  bob::python::no_gil unlock;
   t.mStep1(m, training_data);
 }
 
@@ -176,6 +186,7 @@ static void jfa_finalize1(bob::trainer::JFATrainer& t, bob::machine::JFABase& m,
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the finalization function
+  bob::python::no_gil unlock;
   t.finalize1(m, training_data);
 }
 
@@ -184,6 +195,7 @@ static void jfa_estep2(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, ob
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the E-Step function
+  bob::python::no_gil unlock;
   t.eStep2(m, training_data);
 }
 
@@ -192,6 +204,7 @@ static void jfa_mstep2(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, ob
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the M-Step function
+  bob::python::no_gil unlock;
   t.mStep2(m, training_data);
 }
 
@@ -200,6 +213,7 @@ static void jfa_finalize2(bob::trainer::JFATrainer& t, bob::machine::JFABase& m,
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the finalization function
+  bob::python::no_gil unlock;
   t.finalize2(m, training_data);
 }
 
@@ -208,6 +222,7 @@ static void jfa_estep3(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, ob
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the E-Step function
+  bob::python::no_gil unlock;
   t.eStep3(m, training_data);
 }
 
@@ -216,6 +231,7 @@ static void jfa_mstep3(bob::trainer::JFATrainer& t, bob::machine::JFABase& m, ob
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the M-Step function
+  bob::python::no_gil unlock;
   t.mStep3(m, training_data);
 }
 
@@ -224,6 +240,7 @@ static void jfa_finalize3(bob::trainer::JFATrainer& t, bob::machine::JFABase& m,
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the finalization function
+  bob::python::no_gil unlock;
   t.finalize3(m, training_data);
 }
 
@@ -232,6 +249,7 @@ static void jfa_train_loop(bob::trainer::JFATrainer& t, bob::machine::JFABase& m
   std::vector<std::vector<boost::shared_ptr<bob::machine::GMMStats> > > training_data;
   extract_GMMStats(data, training_data);
   // Calls the main loop function
+  bob::python::no_gil unlock;
   t.train_loop(m, training_data);
 }
 
@@ -329,6 +347,7 @@ void bind_trainer_jfa()
     .def(init<const bob::trainer::ISVTrainer&>((arg("self"), arg("other")), "Copy constructs an ISVTrainer"))
     .add_property("max_iterations", &bob::trainer::ISVTrainer::getMaxIterations, &bob::trainer::ISVTrainer::setMaxIterations, "Max iterations")
     .add_property("rng", &bob::trainer::ISVTrainer::getRng, &bob::trainer::ISVTrainer::setRng, "The Mersenne Twister mt19937 random generator used for the initialization of subspaces/arrays before the EM loop.")
+    .add_property("n_threads", &bob::trainer::ISVTrainer::getNThreads, &bob::trainer::ISVTrainer::setNThreads, "The number of threads used by the E-step (1 by default). The identities are split into as many shards, which are processed concurrently.")
     .add_property("__X__", &isv_get_x, &isv_set_x)
     .add_property("__Z__", &isv_get_z, &isv_set_z)
     .def(self == self)
@@ -348,6 +367,7 @@ void bind_trainer_jfa()
     .def(init<const bob::trainer::JFATrainer&>((arg("self"), arg("other")), "Copy constructs an JFATrainer"))
     .add_property("max_iterations", &bob::trainer::JFATrainer::getMaxIterations, &bob::trainer::JFATrainer::setMaxIterations, "Max iterations")
     .add_property("rng", &bob::trainer::JFATrainer::getRng, &bob::trainer::JFATrainer::setRng, "The Mersenne Twister mt19937 random generator used for the initialization of subspaces/arrays before the EM loop.")
+    .add_property("n_threads", &bob::trainer::JFATrainer::getNThreads, &bob::trainer::JFATrainer::setNThreads, "The number of threads used by the E-steps (1 by default). The identities are split into as many shards, which are processed concurrently.")
     .add_property("__X__", &jfa_get_x, &jfa_set_x)
     .add_property("__Y__", &jfa_get_y, &jfa_set_y)
     .add_property("__Z__", &jfa_get_z, &jfa_set_z)
@@ -19,6 +19,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/KMeansTrainer.h>
 
 using namespace boost::python;
@@ -42,31 +43,59 @@ static void py_setFirstOrderStats(bob::trainer::KMeansTrainer& op, bob::python::
 static void py_train(EMTrainerKMeansBase& trainer, 
   bob::machine::KMeansMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.train(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.train(machine, sample_);
 }
 
 static void py_initialize(EMTrainerKMeansBase& trainer, 
   bob::machine::KMeansMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.initialize(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.initialize(machine, sample_);
 }
 
 static void py_finalize(EMTrainerKMeansBase& trainer, 
   bob::machine::KMeansMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.finalize(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.finalize(machine, sample_);
 }
 
 static void py_eStep(EMTrainerKMeansBase& trainer, 
   bob::machine::KMeansMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.eStep(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.eStep(machine, sample_);
 }
 
 static void py_mStep(EMTrainerKMeansBase& trainer, 
   bob::machine::KMeansMachine& machine, bob::python::const_ndarray sample)
 {
-  trainer.mStep(machine, sample.bz<double,2>());
+  blitz::Array<double,2> sample_ = sample.bz<double,2>();
+  bob::python::no_gil unlock;
+  trainer.mStep(machine, sample_);
+}
+
+static void py_train_sampler(bob::trainer::KMeansTrainer& trainer, 
+  bob::machine::KMeansMachine& machine, const bob::trainer::BlockSampler& sampler)
+{
+  trainer.train(machine, sampler);
+}
+
+static void py_initialize_sampler(bob::trainer::KMeansTrainer& trainer, 
+  bob::machine::KMeansMachine& machine, const bob::trainer::BlockSampler& sampler)
+{
+  trainer.initialize(machine, sampler);
+}
+
+static void py_eStep_sampler(bob::trainer::KMeansTrainer& trainer, 
+  bob::machine::KMeansMachine& machine, const bob::trainer::BlockSampler& sampler)
+{
+  trainer.eStep(machine, sampler);
 }
 
 void bind_trainer_kmeans() 
@@ -74,6 +103,7 @@ void bind_trainer_kmeans()
   class_<EMTrainerKMeansBase, boost::noncopyable>("EMTrainerKMeans", "The base python class for all EM-based trainers.", no_init)
     .add_property("convergence_threshold", &EMTrainerKMeansBase::getConvergenceThreshold, &EMTrainerKMeansBase::setConvergenceThreshold, "Convergence threshold")
     .add_property("max_iterations", &EMTrainerKMeansBase::getMaxIterations, &EMTrainerKMeansBase::setMaxIterations, "Max iterations")
+    .add_property("n_threads", &EMTrainerKMeansBase::getNThreads, &EMTrainerKMeansBase::setNThreads, "The number of threads used by the E-step (1 by default). The data is split into as many shards, which are processed concurrently.")
     .add_property("compute_likelihood", &EMTrainerKMeansBase::getComputeLikelihood, &EMTrainerKMeansBase::setComputeLikelihood, "Tells whether we compute the average min (square Euclidean) distance or not.")
     .add_property("rng", &EMTrainerKMeansBase::getRng, &EMTrainerKMeansBase::setRng, "The Mersenne Twister mt19937 random generator used for the initialization of subspaces/arrays before the EM loop.")
     .def(self == self)
@@ -107,6 +137,13 @@ void bind_trainer_kmeans()
      .add_property("average_min_distance", &bob::trainer::KMeansTrainer::getAverageMinDistance, &bob::trainer::KMeansTrainer::setAverageMinDistance, "Average min (square Euclidean) distance. Useful to parallelize the E-step.")
      .add_property("zeroeth_order_statistics", make_function(&bob::trainer::KMeansTrainer::getZeroethOrderStats, return_value_policy<copy_const_reference>()), &py_setZeroethOrderStats, "The zeroeth order statistics. Useful to parallelize the E-step.")
      .add_property("first_order_statistics", make_function(&bob::trainer::KMeansTrainer::getFirstOrderStats, return_value_policy<copy_const_reference>()), &py_setFirstOrderStats, "The first order statistics. Useful to parallelize the E-step.")
+     .def("train", &py_train, (arg("self"), arg("machine"), arg("data")), "Train a machine using data")
+     .def("train", &py_train_sampler, (arg("self"), arg("machine"), arg("sampler")), "Train a machine using the samples of a bob.trainer.BlockSampler, which are read block by block at each iteration. This gives the same result as training on all the samples at once, without loading them in memory.")
+     .def("initialize", &py_initialize, (arg("self"), arg("machine"), arg("data")), "This method is called before the EM algorithm")
+     .def("initialize", &py_initialize_sampler, (arg("self"), arg("machine"), arg("sampler")), "Initializes the means using a random subset of the samples of a bob.trainer.BlockSampler, of the size of a block.")
+     .def("e_step", &py_eStep, (arg("self"), arg("machine"), arg("data")), "Update the hidden variable distribution (or the sufficient statistics) given the Machine parameters.")
+     .def("e_step", &py_eStep_sampler, (arg("self"), arg("machine"), arg("sampler")), "Accumulates the statistics across the samples of a bob.trainer.BlockSampler, block by block.")
+     .def("train_mini_batch", &bob::trainer::KMeansTrainer::trainMiniBatch, (arg("self"), arg("machine"), arg("sampler"), arg("batch_size")=1024), "Train a machine with the mini-batch k-means algorithm (Sculley, \"Web-scale k-means clustering\", 2010), using the samples of a bob.trainer.BlockSampler. At each iteration, a random batch of batch_size samples is drawn, and each mean is moved to the average of all the samples assigned to it so far. There are max_iterations batches, or as many batches as required to go once through the data if max_iterations is 0.")
     ;
 
   // Sets the scope to the one of the KMeansTrainer
@@ -25,6 +25,7 @@
 #include <boost/shared_ptr.hpp>
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/FisherLDATrainer.h>
 
 using namespace boost::python;
@@ -40,7 +41,10 @@ static tuple lda_train1(bob::trainer::FisherLDATrainer& t, object data)
   int osize = t.output_size(vdata);
   blitz::Array<double,1> eig_val(osize);
   bob::machine::LinearMachine m(vdata[0].extent(1), osize);
-  t.train(m, eig_val, vdata);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, eig_val, vdata);
+  }
   return make_tuple(m, eig_val);
 }
 
@@ -54,7 +58,10 @@ static object lda_train2(bob::trainer::FisherLDATrainer& t,
       it!=vdata_ref.end(); ++it)
     vdata.push_back(it->bz<double,2>());
   blitz::Array<double,1> eig_val(t.output_size(vdata));
-  t.train(m, eig_val, vdata);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, eig_val, vdata);
+  }
   return object(eig_val);
 }
 
@@ -31,6 +31,7 @@ void bind_trainer_mlpbase();
 void bind_trainer_backprop();
 void bind_trainer_rprop();
 void bind_trainer_shuffler();
+void bind_trainer_block_sampler();
 void bind_trainer_jfa();
 void bind_trainer_ivector();
 void bind_trainer_plda();
@@ -52,6 +53,7 @@ BOOST_PYTHON_MODULE(_trainer) {
   
   bind_trainer_pca();
   bind_trainer_lda();
+  bind_trainer_block_sampler();
   bind_trainer_gmm();
   bind_trainer_kmeans();
   bind_trainer_mlpbase();
@@ -25,6 +25,7 @@
 #include <boost/shared_ptr.hpp>
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/PCATrainer.h>
 
 using namespace boost::python;
@@ -36,7 +37,10 @@ static tuple pca_train1(bob::trainer::PCATrainer& t,
   const int rank = t.output_size(data_);
   bob::machine::LinearMachine m(data_.extent(1), rank);
   blitz::Array<double,1> eig_val(rank);
-  t.train(m, eig_val, data_);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, eig_val, data_);
+  }
   return make_tuple(m, object(eig_val));
 }
 
@@ -46,7 +50,10 @@ static object pca_train2(bob::trainer::PCATrainer& t,
   const blitz::Array<double,2> data_ = data.bz<double,2>();
   const int rank = t.output_size(data_);
   blitz::Array<double,1> eig_val(rank);
-  t.train(m, eig_val, data_);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, eig_val, data_);
+  }
   return object(eig_val);
 }
 
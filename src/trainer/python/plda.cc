@@ -23,6 +23,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/machine/PLDAMachine.h>
 #include <bob/trainer/PLDATrainer.h>
@@ -40,6 +41,7 @@ static void plda_train(EMTrainerPLDA& t, bob::machine::PLDABase& m, object data)
       it!=vdata.end(); ++it)
     vdata_ref.push_back(it->bz<double,2>());
   // Calls the train function
+  bob::python::no_gil unlock;
   t.train(m, vdata_ref);
 }
 
@@ -52,6 +54,7 @@ static void plda_initialize(EMTrainerPLDA& t, bob::machine::PLDABase& m, object
       it!=vdata.end(); ++it)
     vdata_ref.push_back(it->bz<double,2>());
   // Calls the initialization function
+  bob::python::no_gil unlock;
   t.initialize(m, vdata_ref);
 }
 
@@ -64,6 +67,7 @@ static void plda_eStep(EMTrainerPLDA& t, bob::machine::PLDABase& m, object data)
       it!=vdata.end(); ++it)
     vdata_ref.push_back(it->bz<double,2>());
   // Calls the eStep function
+  bob::python::no_gil unlock;
   t.eStep(m, vdata_ref);
 }
 
@@ -76,6 +80,7 @@ static void plda_mStep(EMTrainerPLDA& t, bob::machine::PLDABase& m, object data)
       it!=vdata.end(); ++it)
     vdata_ref.push_back(it->bz<double,2>());
   // Calls the mStep function
+  bob::python::no_gil unlock;
   t.mStep(m, vdata_ref);
 }
 
@@ -88,6 +93,7 @@ static void plda_finalize(EMTrainerPLDA& t, bob::machine::PLDABase& m, object da
       it!=vdata.end(); ++it)
     vdata_ref.push_back(it->bz<double,2>());
   // Calls the finalization function
+  bob::python::no_gil unlock;
   t.finalize(m, vdata_ref);
 }
 
@@ -111,6 +117,7 @@ void bind_trainer_plda()
   class_<EMTrainerPLDA, boost::noncopyable>("EMTrainerPLDA", "The base python class for all EM/PLDA-based trainers.", no_init)
     .add_property("max_iterations", &EMTrainerPLDA::getMaxIterations, &EMTrainerPLDA::setMaxIterations, "Max iterations")
     .add_property("rng", &EMTrainerPLDA::getRng, &EMTrainerPLDA::setRng, "The Mersenne Twister mt19937 random generator used for the initialization of subspaces/arrays before the EM loop.")
+    .add_property("n_threads", &EMTrainerPLDA::getNThreads, &EMTrainerPLDA::setNThreads, "The number of threads used by the E-step (1 by default). The identities are split into as many shards, which are processed concurrently.")
     .def("train", &plda_train, (arg("self"), arg("machine"), arg("data")), "Trains a PLDABase using data (mu, F, G and sigma are learnt).")
     .def("initialize", &plda_initialize, (arg("self"), arg("machine"), arg("data")), "This method is called before the EM algorithm")
     .def("finalize", &plda_finalize, (arg("self"), arg("machine"), arg("data")), "This method is called at the end of the EM algorithm")
@@ -23,6 +23,7 @@
 #include <boost/python.hpp>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/MLPRPropTrainer.h>
 
 using namespace boost::python;
@@ -127,6 +128,24 @@ static void rprop_set_prev_deriv_bias2(bob::trainer::MLPRPropTrainer& t,
   t.setPreviousBiasDerivative(v.bz<double,1>(), k);
 }
 
+static void rprop_train(bob::trainer::MLPRPropTrainer& t, bob::machine::MLP& m,
+  bob::python::const_ndarray input, bob::python::const_ndarray target)
+{
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  blitz::Array<double,2> target_ = target.bz<double,2>();
+  bob::python::no_gil unlock;
+  t.train(m, input_, target_);
+}
+
+static void rprop_train_(bob::trainer::MLPRPropTrainer& t, bob::machine::MLP& m,
+  bob::python::const_ndarray input, bob::python::const_ndarray target)
+{
+  blitz::Array<double,2> input_ = input.bz<double,2>();
+  blitz::Array<double,2> target_ = target.bz<double,2>();
+  bob::python::no_gil unlock;
+  t.train_(m, input_, target_);
+}
+
 void bind_trainer_rprop() {
   class_<bob::trainer::MLPRPropTrainer, boost::shared_ptr<bob::trainer::MLPRPropTrainer>, bases<bob::trainer::MLPBaseTrainer> >("MLPRPropTrainer", "Sets an MLP to perform discrimination based on RProp: A Direct Adaptive Method for Faster Backpropagation Learning: The RPROP Algorithm, by Martin Riedmiller and Heinrich Braun on IEEE International Conference on Neural Networks, pp. 586--591, 1993.", no_init)
     
@@ -225,7 +244,7 @@ void bind_trainer_rprop() {
     
     .def("reset", &bob::trainer::MLPRPropTrainer::reset, (arg("self")), "Re-initializes the whole training apparatus to start training a new machine. This will effectively reset all Delta matrices to their initial values and set the previous derivatives to zero as described on the section II.C of the RProp paper.")
     
-    .def("train", &bob::trainer::MLPRPropTrainer::train, (arg("self"), arg("machine"), arg("input"), arg("target")), "Trains the MLP to perform discrimination using Resilient Back-propagation (R-Prop).\n" \
+    .def("train", &rprop_train, (arg("self"), arg("machine"), arg("input"), arg("target")), "Trains the MLP to perform discrimination using Resilient Back-propagation (R-Prop).\n" \
         "\n" \
         "Resilient Back-propagation (R-Prop) is an efficient algorithm for gradient descent with local adpatation of the weight updates, which adapts to the behaviour of the chosen error function.\n" \
         "\n" \
@@ -286,7 +305,7 @@ void bind_trainer_rprop() {
         "\n"
         )
     
-    .def("train_", &bob::trainer::MLPRPropTrainer::train_, (arg("self"), arg("machine"), arg("input"), arg("target")), "This is a version of the train() method above, which does no compatibility check on the input machine.")
+    .def("train_", &rprop_train_, (arg("self"), arg("machine"), arg("input"), arg("target")), "This is a version of the train() method above, which does no compatibility check on the input machine.")
     
     .add_property("deltas", &rprop_get_delta, &rprop_set_delta, "Current settings for the weight update (:math:`\\Delta_{ij}(t)`)")
 
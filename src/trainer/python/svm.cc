@@ -21,6 +21,7 @@
  */
 
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/trainer/SVMTrainer.h>
 
@@ -34,6 +35,7 @@ static boost::shared_ptr<bob::machine::SupportVector> train1
   for(std::vector<bob::python::const_ndarray>::iterator it=vdata_ref.begin(); 
       it!=vdata_ref.end(); ++it)
     vdata.push_back(it->bz<double,2>());
+  bob::python::no_gil unlock;
   return trainer.train(vdata);
 }
 
@@ -46,7 +48,10 @@ static boost::shared_ptr<bob::machine::SupportVector> train2
   for(std::vector<bob::python::const_ndarray>::iterator it=vdata_ref.begin(); 
       it!=vdata_ref.end(); ++it)
     vdata.push_back(it->bz<double,2>());
-  return trainer.train(vdata, sub.bz<double,1>(), div.bz<double,1>());
+  blitz::Array<double,1> sub_ = sub.bz<double,1>();
+  blitz::Array<double,1> div_ = div.bz<double,1>();
+  bob::python::no_gil unlock;
+  return trainer.train(vdata, sub_, div_);
 }
 
 void bind_trainer_svm() {
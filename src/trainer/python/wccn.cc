@@ -21,6 +21,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <boost/shared_ptr.hpp>
 #include <boost/python/stl_iterator.hpp>
 #include <bob/trainer/WCCNTrainer.h>
@@ -75,6 +76,7 @@ void py_train1(bob::trainer::WCCNTrainer& t, bob::machine::LinearMachine& m, obj
       it!=vdata_ref.end(); ++it)
     vdata.push_back(it->bz<double,2>());
   blitz::Array<double,1> eig_val(vdata[0].extent(1)-1);
+  bob::python::no_gil unlock;
   t.train(m, vdata);
 }
 
@@ -87,7 +89,10 @@ object py_train2(bob::trainer::WCCNTrainer& t, object data)
       it!=vdata_ref.end(); ++it)
     vdata.push_back(it->bz<double,2>());
   bob::machine::LinearMachine m(vdata[0].extent(1),vdata[0].extent(1));
-  t.train(m, vdata);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, vdata);
+  }
   return object(m);
 }
 
@@ -20,6 +20,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/WhiteningTrainer.h>
 #include <bob/machine/LinearMachine.h>
 #include <boost/shared_ptr.hpp>
@@ -66,6 +67,7 @@ void py_train1(bob::trainer::WhiteningTrainer& t,
   bob::machine::LinearMachine& m, bob::python::const_ndarray data)
 {
   const blitz::Array<double,2> data_ = data.bz<double,2>();
+  bob::python::no_gil unlock;
   t.train(m, data_);
 }
 
@@ -75,7 +77,10 @@ object py_train2(bob::trainer::WhiteningTrainer& t,
   const blitz::Array<double,2> data_ = data.bz<double,2>();
   const int n_features = data_.extent(1);
   bob::machine::LinearMachine m(n_features,n_features);
-  t.train(m, data_);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, data_);
+  }
   return object(m);
 }
 
@@ -22,6 +22,7 @@
 
 #include <boost/python.hpp>
 #include <bob/python/ndarray.h>
+#include <bob/python/gil.h>
 #include <bob/trainer/WienerTrainer.h>
 #include <bob/machine/WienerMachine.h>
 #include <boost/shared_ptr.hpp>
@@ -31,7 +32,9 @@ using namespace boost::python;
 void py_train1(bob::trainer::WienerTrainer& t, 
   bob::machine::WienerMachine& m, bob::python::const_ndarray data)
 {
-  t.train(m, data.bz<double,3>());
+  blitz::Array<double,3> data_ = data.bz<double,3>();
+  bob::python::no_gil unlock;
+  t.train(m, data_);
 }
 
 object py_train2(bob::trainer::WienerTrainer& t, 
@@ -41,7 +44,10 @@ object py_train2(bob::trainer::WienerTrainer& t,
   const int height = data_.extent(1);
   const int width = data_.extent(2);
   bob::machine::WienerMachine m(height, width, 0.);
-  t.train(m, data_);
+  {
+    bob::python::no_gil unlock;
+    t.train(m, data_);
+  }
   return object(m);
 }
 
@@ -31,6 +31,7 @@
 #include "bob/visioner/cv/cv_detector.h"
 #include "bob/visioner/model/mdecoder.h"
 #include "bob/visioner/util/timer.h"
+#include "bob/visioner/util/threads.h"
 
 namespace bob { namespace visioner {
 
@@ -40,7 +41,8 @@ namespace bob { namespace visioner {
     m_cluster(0.05),
     m_threshold(0.0),
     m_type(GroundTruth),
-    m_levels(0)
+    m_levels(0),
+    m_threads(0)
   {
   }
 
@@ -59,6 +61,12 @@ namespace bob { namespace visioner {
       var = po_vm[var_name].as<T>();
     }
 
+  // Number of sub-window positions in [min, max) with the given step
+  static uint64_t scan_steps(int min, int max, int step)
+  {
+    return max > min ? (max - min + step - 1) / step : 0;
+  }
+
   void CVDetector::add_options(boost::program_options::options_description& po_desc) const
   {
     po_desc.add_options()
@@ -77,6 +85,10 @@ namespace bob { namespace visioner {
       ("detect_ds",
        boost::program_options::value<uint64_t>()->default_value(m_ds),
        "detection: scale variation in pixels")
+
+      ("detect_threads",
+       boost::program_options::value<size_t>()->default_value(m_threads),
+       "detection: number of scanning threads (0: current thread)")
       
       ("detect_cluster",
        boost::program_options::value<double>()->default_value(m_cluster),
@@ -104,6 +116,8 @@ namespace bob { namespace visioner {
       return false;
     }
 
+    m_th_models.clear();
+
     param_t _param = param();
     _param.m_ds = m_ds;
     m_ipyramid.reset(_param); 
@@ -113,6 +127,7 @@ namespace bob { namespace visioner {
     decode_var(po_desc, po_vm, "detect_levels", m_levels);
     decode_var(po_desc, po_vm, "detect_ds", m_ds);
     decode_var(po_desc, po_vm, "detect_cluster", m_cluster);     
+    decode_var(po_desc, po_vm, "detect_threads", m_threads);
 
     std::string cmd_method;
     decode_var(po_desc, po_vm, "detect_method", cmd_method);
@@ -139,11 +154,12 @@ namespace bob { namespace visioner {
 
   CVDetector::CVDetector(const std::string& model, double threshold,
       uint64_t levels, uint64_t scale_variation, double clustering,
-      CVDetector::Type detection_method):
+      CVDetector::Type detection_method, size_t threads):
     m_ds(scale_variation),
     m_cluster(clustering),
     m_threshold(threshold),
-    m_type(detection_method) {
+    m_type(detection_method),
+    m_threads(threads) {
 
       // Load the model
       if (Model::load(model, m_model) == false) {
@@ -166,6 +182,41 @@ namespace bob { namespace visioner {
 
     }
 
+  CVDetector::CVDetector(const CVDetector& other):
+    m_ds(other.m_ds),
+    m_cluster(other.m_cluster),
+    m_threshold(other.m_threshold),
+    m_type(other.m_type),
+    m_model(other.m_model),
+    m_lmodel_begins(other.m_lmodel_begins),
+    m_lmodel_ends(other.m_lmodel_ends),
+    m_levels(other.m_levels),
+    m_threads(other.m_threads),
+    m_ipyramid(other.m_ipyramid),
+    m_stats(other.m_stats)
+  {
+  }
+
+  CVDetector& CVDetector::operator=(const CVDetector& other)
+  {
+    if (this != &other)
+    {
+      m_ds = other.m_ds;
+      m_cluster = other.m_cluster;
+      m_threshold = other.m_threshold;
+      m_type = other.m_type;
+      m_model = other.m_model;
+      m_lmodel_begins = other.m_lmodel_begins;
+      m_lmodel_ends = other.m_lmodel_ends;
+      m_levels = other.m_levels;
+      m_threads = other.m_threads;
+      m_th_models.clear();
+      m_ipyramid = other.m_ipyramid;
+      m_stats = other.m_stats;
+    }
+    return *this;
+  }
+
 
 
   void CVDetector::set_scan_levels(uint64_t levels) {
@@ -258,41 +309,69 @@ namespace bob { namespace visioner {
 
     // Scan the image ... 
     Timer timer;
-    for (uint64_t is = 0; is < m_ipyramid.size(); is ++)
+    if (!m_threads)
     {
-      const ipscale_t& ip = m_ipyramid[is];
-      m_model->preprocess(ip);
+      for (uint64_t is = 0; is < m_ipyramid.size(); is ++)
+      {
+        const ipscale_t& ip = m_ipyramid[is];
+        m_model->preprocess(ip);
+
+        const band_t band = { is, ip.m_scan_min_y, ip.m_scan_max_y };
+        scan(*m_model, band, detections, m_stats);
+      }
+    }
 
-      // ... with every model type
-      for (uint64_t o = 0; o < n_outputs(); o ++)
+    // ... or split the rows of every scale in bands of (about) the same
+    //  number of sub-windows, to be distributed to the threads
+    else
+    {
+      uint64_t n_sws = 0;
+      for (uint64_t is = 0; is < m_ipyramid.size(); is ++)
       {
-        for (int x = ip.m_scan_min_x; x < ip.m_scan_max_x; x += ip.m_scan_dx)
-          for (int y = ip.m_scan_min_y; y < ip.m_scan_max_y; y += ip.m_scan_dy)
-          {
-            // Concentrate computation on the most promising detections
-            double score = 0.0;
-            for (uint64_t l = 0; l <= m_levels && score >= 0.0; l ++)
-            {
-              const uint64_t lbegin = m_lmodel_begins[o][l];
-              const uint64_t lend = m_lmodel_ends[o][l];
-              score += m_model->score(o, lbegin, lend, x, y);
+        const ipscale_t& ip = m_ipyramid[is];
+        n_sws += scan_steps(ip.m_scan_min_x, ip.m_scan_max_x, ip.m_scan_dx) *
+          scan_steps(ip.m_scan_min_y, ip.m_scan_max_y, ip.m_scan_dy);
+      }
+      const uint64_t band_sws = n_sws / (4 * m_threads) + 1;
 
-              // Update statistics
-              m_stats.m_evals += lend - lbegin;
-            }
+      std::vector<band_t> bands;
+      for (uint64_t is = 0; is < m_ipyramid.size(); is ++)
+      {
+        const ipscale_t& ip = m_ipyramid[is];
+        const uint64_t n_cols = scan_steps(ip.m_scan_min_x, ip.m_scan_max_x, ip.m_scan_dx);
+        const int n_rows = std::max(band_sws / std::max(n_cols, (uint64_t)1), (uint64_t)1);
+        for (int y = ip.m_scan_min_y; y < ip.m_scan_max_y; y += n_rows * ip.m_scan_dy)
+        {
+          const band_t band = { is, y, std::min(y + n_rows * ip.m_scan_dy, ip.m_scan_max_y) };
+          bands.push_back(band);
+        }
+      }
 
-            // Threshold detection and map it to the original image size
-            if (score >= m_threshold)
-            {
-              detections.push_back(make_detection(
-                    score, 
-                    m_ipyramid.map(subwindow_t(x, y, is)), 
-                    o));
-            }
+      // Each thread uses its own copy of the model (as the preprocessing
+      //  changes it), kept from one image to the next
+      if (m_th_models.size() != m_threads)
+      {
+        m_th_models.resize(m_threads);
+        for (size_t ith = 0; ith < m_threads; ith ++)
+        {
+          m_th_models[ith] = m_model->clone();
+        }
+      }
 
-            // Update statistics
-            m_stats.m_sws ++;
-          }
+      std::vector<band_result_t> results;
+      thread_iloop(
+          boost::bind(&CVDetector::th_scan,
+            this, boost::lambda::_1, boost::lambda::_2, boost::cref(bands), boost::lambda::_3),
+          bands.size(), results, m_threads);
+
+      // Merge the detections and the statistics of the threads
+      for (uint64_t ith = 0; ith < results.size(); ith ++)
+      {
+        const band_result_t& result = results[ith];
+        detections.insert(detections.end(),
+            result.m_detections.begin(), result.m_detections.end());
+        m_stats.m_sws += result.m_stats.m_sws;
+        m_stats.m_evals += result.m_stats.m_evals;
       }
     }
 
@@ -305,6 +384,65 @@ namespace bob { namespace visioner {
     return true;
   }
 
+  // Scan the given band of rows with a model preprocessed for its scale
+  void CVDetector::scan(const Model& model, const band_t& band,
+      std::vector<detection_t>& detections, stats_t& stats) const
+  {
+    const ipscale_t& ip = m_ipyramid[band.m_scale];
+
+    // ... with every model type
+    for (uint64_t o = 0; o < n_outputs(); o ++)
+    {
+      for (int x = ip.m_scan_min_x; x < ip.m_scan_max_x; x += ip.m_scan_dx)
+        for (int y = band.m_y_begin; y < band.m_y_end; y += ip.m_scan_dy)
+        {
+          // Concentrate computation on the most promising detections
+          double score = 0.0;
+          for (uint64_t l = 0; l <= m_levels && score >= 0.0; l ++)
+          {
+            const uint64_t lbegin = m_lmodel_begins[o][l];
+            const uint64_t lend = m_lmodel_ends[o][l];
+            score += model.score(o, lbegin, lend, x, y);
+
+            // Update statistics
+            stats.m_evals += lend - lbegin;
+          }
+
+          // Threshold detection and map it to the original image size
+          if (score >= m_threshold)
+          {
+            detections.push_back(make_detection(
+                  score, 
+                  m_ipyramid.map(subwindow_t(x, y, band.m_scale)), 
+                  o));
+          }
+
+          // Update statistics
+          stats.m_sws ++;
+        }
+    }
+  }
+
+  // Scan a range of bands (thread ith), using its own copy of the model
+  void CVDetector::th_scan(uint64_t ith, std::pair<uint64_t, uint64_t> brange,
+      const std::vector<band_t>& bands, band_result_t& result) const
+  {
+    Model& model = *m_th_models[ith];
+
+    // NB: the bands are sorted by scale, so the model is preprocessed only
+    //  once for each scale of the range.
+    for (uint64_t ib = brange.first; ib < brange.second; ib ++)
+    {
+      const band_t& band = bands[ib];
+      if (ib == brange.first || band.m_scale != bands[ib - 1].m_scale)
+      {
+        model.preprocess(m_ipyramid[band.m_scale]);
+      }
+
+      scan(model, band, result.m_detections, result.m_stats);
+    }
+  }
+
   // Match detections with ground truth locations
   bool CVDetector::match(const detection_t& detection, Object& object) const
   {
@@ -23,6 +23,7 @@
  */
 
 #include <algorithm>
+#include <limits>
 
 #include <boost/bind.hpp>
 #include <boost/lambda/lambda.hpp>
@@ -40,8 +41,9 @@ std::vector<T> stat_cumulate(const std::vector<std::vector<T> >& stats,
     size_t n_types) { 
   std::vector<T> result(n_types, (T)0);
   for (uint64_t i = 0; i < stats.size(); i ++) {
+    // NB: the threads which processed no chunk have empty statistics
     const std::vector<T>& stat = stats[i];
-    for (uint64_t iti = 0; iti < n_types; iti ++) {
+    for (uint64_t iti = 0; iti < std::min(stat.size(), n_types); iti ++) {
       result[iti] += stat[iti];
     }
   }
@@ -51,6 +53,40 @@ std::vector<T> stat_cumulate(const std::vector<std::vector<T> >& stats,
 
 namespace bob { namespace visioner {
 
+  // Copies of a model used by the worker threads, one per thread index: each
+  //  copy is cloned the first time it is needed and keeps the image it was
+  //  last preprocessed with, so that the chunks processed by a thread do not
+  //  clone the model and preprocess the same image again.
+  // NB: The copy of a thread index is only used by that thread.
+  class Sampler::ModelCache {
+
+    public:
+
+      ModelCache(const Model& model, size_t threads)
+        : m_model(model), m_models(std::max(threads, (size_t)1)),
+        m_images(m_models.size(), std::numeric_limits<uint64_t>::max()) {
+      }
+
+      // The copy of thread <ith>, preprocessed with the image <i>
+      Model& get(uint64_t ith, uint64_t i, const ipscale_t& ip) {
+        if (!m_models[ith]) {
+          m_models[ith] = m_model.clone();
+        }
+        if (m_images[ith] != i) {
+          m_models[ith]->preprocess(ip);
+          m_images[ith] = i;
+        }
+        return *m_models[ith];
+      }
+
+    private:
+
+      const Model& m_model;
+      std::vector<boost::shared_ptr<Model> > m_models;
+      std::vector<uint64_t> m_images;
+
+  };
+
   // Constructor
   Sampler::Sampler(const param_t& param, SamplerType type, size_t max_threads) :
     m_param(param),
@@ -168,7 +204,8 @@ namespace bob { namespace visioner {
         inverse(m_tcounts[iti]);
     }
     samples.clear();
-    th_usample(0, std::pair<uint64_t, uint64_t>(0, n_samples()), samples);
+    th_usample(std::pair<uint64_t, uint64_t>(0, n_samples()), m_rgens[0](),
+        samples);
     std::sort(samples.begin(), samples.end());
   }
 
@@ -189,9 +226,9 @@ namespace bob { namespace visioner {
 
     //splits the computation (select the samples)
     std::vector<std::vector<uint64_t> > th_samples;
-    thread_iloop(
+    thread_loop(
         boost::bind(&Sampler::th_usample,
-          this, boost::lambda::_1, boost::lambda::_2, boost::lambda::_3),
+          this, boost::lambda::_1, m_rgens[0](), boost::lambda::_2),
         n_samples(), th_samples, threads);
 
     // Merge results
@@ -216,9 +253,11 @@ namespace bob { namespace visioner {
   void Sampler::sample_based_on_error_single(uint64_t n_sel_samples, const Model& model, std::vector<uint64_t>& samples) const {
 
     //splits the computation (compute the error for each sample)
+    ModelCache models(model, 1);
     std::vector<std::vector<double> > th_terrors;
     th_terrors.resize(1);
-    th_errors(std::pair<uint64_t, uint64_t>(0,n_samples()), model, th_terrors[0]);
+    th_errors(0, std::pair<uint64_t, uint64_t>(0,n_samples()), models,
+        th_terrors[0]);
     const std::vector<double> terrors = stat_cumulate(th_terrors, n_types());
 
     //computes the error-based sampling probabilities
@@ -228,7 +267,8 @@ namespace bob { namespace visioner {
     }
 
     samples.clear();
-    th_esample(0, std::pair<uint64_t, uint64_t>(0,n_samples()), model, samples);
+    th_esample(0, std::pair<uint64_t, uint64_t>(0,n_samples()), m_rgens[0](),
+        models, samples);
     std::sort(samples.begin(), samples.end());
   }
 
@@ -243,10 +283,12 @@ namespace bob { namespace visioner {
     }
 
     //splits the computation (compute the error for each sample)
+    ModelCache models(model, threads);
     std::vector<std::vector<double> > th_terrors;
-    thread_loop(
+    thread_iloop(
         boost::bind(&Sampler::th_errors,
-          this, boost::lambda::_1, boost::cref(model), boost::lambda::_2),
+          this, boost::lambda::_1, boost::lambda::_2, boost::ref(models),
+          boost::lambda::_3),
         n_samples(), th_terrors, threads);
 
     const std::vector<double> terrors = stat_cumulate(th_terrors, n_types());
@@ -262,7 +304,9 @@ namespace bob { namespace visioner {
     std::vector<std::vector<uint64_t> > th_samples;
     thread_iloop(
         boost::bind(&Sampler::th_esample,
-          this, boost::lambda::_1, boost::lambda::_2, boost::cref(model), boost::lambda::_3), n_samples(), th_samples, threads);
+          this, boost::lambda::_1, boost::lambda::_2, m_rgens[0](),
+          boost::ref(models), boost::lambda::_3),
+        n_samples(), th_samples, threads);
 
     //merges results
     samples.clear();
@@ -286,9 +330,10 @@ namespace bob { namespace visioner {
     data.resize(n_outputs(), samples.size(), model.n_features(), model.n_fvalues());
 
     // Split the computation (buffer the feature values and the targets)
+    ModelCache models(model, 1);
     std::vector<uint64_t> types(samples.size(), 0);
-    th_map(std::make_pair<uint64_t,uint64_t>(0, samples.size()), samples,
-        model, types, data);
+    th_map(0, std::make_pair<uint64_t,uint64_t>(0, samples.size()), samples,
+        models, types, data);
 
     // Compute the cost for each class
     std::vector<uint64_t> tcounts(n_types(), 0);
@@ -333,11 +378,12 @@ namespace bob { namespace visioner {
     data.resize(n_outputs(), samples.size(), model.n_features(), model.n_fvalues());
 
     // Split the computation (buffer the feature values and the targets)
+    ModelCache models(model, threads);
     std::vector<uint64_t> types(samples.size(), 0);
-    thread_loop(
+    thread_iloop(
         boost::bind(
-          &Sampler::th_map, this, boost::lambda::_1,
-          boost::cref(samples), boost::cref(model), boost::ref(types), boost::ref(data)), samples.size(), threads);
+          &Sampler::th_map, this, boost::lambda::_1, boost::lambda::_2,
+          boost::cref(samples), boost::ref(models), boost::ref(types), boost::ref(data)), samples.size(), threads);
 
     // Compute the cost for each class
     std::vector<uint64_t> tcounts(n_types(), 0);
@@ -408,7 +454,7 @@ namespace bob { namespace visioner {
   }
 
   // Uniform sampling thread
-  void Sampler::th_usample(uint64_t ith, std::pair<uint64_t, uint64_t> srange, std::vector<uint64_t>& samples) const
+  void Sampler::th_usample(std::pair<uint64_t, uint64_t> srange, boost::mt19937::result_type seed, std::vector<uint64_t>& samples) const
   {
     if (srange.first >= srange.second)
     {
@@ -418,7 +464,9 @@ namespace bob { namespace visioner {
     std::vector<double> targets(n_outputs());
     uint64_t type;
 
-    boost::mt19937& gen = m_rgens[ith];
+    // NB: the random draws depend only on the range, so that the samples do
+    //  not depend on the thread processing it
+    boost::mt19937 gen(static_cast<boost::mt19937::result_type>(seed + srange.first));
     boost::uniform_01<> die;
 
     // Process the valid samples in the range ...
@@ -442,23 +490,24 @@ namespace bob { namespace visioner {
         }
     }
     //bob::core::info << "[" << type2str() << " sampler] " << samples.size() 
-    //  << " samples (uniformily) selected by worker thread " << ith << ": "
+    //  << " samples (uniformily) selected by worker thread: "
     //  << samples[0] << ", " << samples[1] << ", " << samples[2] << std::endl;
   }
 
   // Error-based sampling thread
-  void Sampler::th_esample(uint64_t ith, std::pair<uint64_t, uint64_t> srange, const Model& bmodel, std::vector<uint64_t>& samples) const
+  void Sampler::th_esample(uint64_t ith, std::pair<uint64_t, uint64_t> srange, boost::mt19937::result_type seed, ModelCache& models, std::vector<uint64_t>& samples) const
   {
     if (srange.first >= srange.second)
     {
       return;
     }
 
-    const boost::shared_ptr<Model> model = bmodel.clone();
     std::vector<double> targets(n_outputs()), scores(n_outputs());
     uint64_t type;
 
-    boost::mt19937& gen = m_rgens[ith];
+    // NB: the random draws depend only on the range, so that the samples do
+    //  not depend on the thread processing it
+    boost::mt19937 gen(static_cast<boost::mt19937::result_type>(seed + srange.first));
     boost::uniform_01<> die;
 
     // Process the valid samples in the range ...
@@ -467,7 +516,7 @@ namespace bob { namespace visioner {
 
       const ipscale_t& ip = m_ipscales[i];
 
-      model->preprocess(ip);
+      Model& model = models.get(ith, i, ip);
 
       for (int y = ip.m_scan_min_y; y < ip.m_scan_max_y; y += ip.m_scan_dy)
         for (int x = ip.m_scan_min_x; x < ip.m_scan_max_x; x += ip.m_scan_dx)
@@ -477,7 +526,7 @@ namespace bob { namespace visioner {
             if (s >= srange.first && s < srange.second)
             {
               const double cost =
-                error(x, y, targets, *model, scores) * m_sprobs[type];
+                error(x, y, targets, model, scores) * m_sprobs[type];
               sample(s, cost, gen, die, samples);
             }
             s ++;
@@ -485,13 +534,13 @@ namespace bob { namespace visioner {
         }
     }
     //bob::core::info << "[" << type2str() << " sampler] " << samples.size() 
-    //  << " samples (error-based) selected by worker thread " << ith << ": "
+    //  << " samples (error-based) selected by worker thread: "
     //  << samples[0] << ", " << samples[1] << ", " << samples[2] << std::endl;
   }
 
   // Evaluation thread
-  void Sampler::th_errors(
-      std::pair<uint64_t, uint64_t> srange, const Model& bmodel,
+  void Sampler::th_errors(uint64_t ith,
+      std::pair<uint64_t, uint64_t> srange, ModelCache& models,
       std::vector<double>& terrors) const
   {
     if (srange.first >= srange.second)
@@ -501,7 +550,6 @@ namespace bob { namespace visioner {
 
     terrors.resize(n_types(), 0.0);
 
-    const boost::shared_ptr<Model> model = bmodel.clone();
     std::vector<double> targets(n_outputs()), scores(n_outputs());
     uint64_t type;
 
@@ -511,7 +559,7 @@ namespace bob { namespace visioner {
     {
       const ipscale_t& ip = m_ipscales[i];
 
-      model->preprocess(ip);
+      Model& model = models.get(ith, i, ip);
 
       for (int y = ip.m_scan_min_y; y < ip.m_scan_max_y; y += ip.m_scan_dy)
         for (int x = ip.m_scan_min_x; x < ip.m_scan_max_x; x += ip.m_scan_dx)
@@ -520,7 +568,7 @@ namespace bob { namespace visioner {
           {
             if (s >= srange.first && s < srange.second)
             {
-              terrors[type] += error(x, y, targets, *model, scores);
+              terrors[type] += error(x, y, targets, model, scores);
             }
             s ++;
           }
@@ -529,9 +577,9 @@ namespace bob { namespace visioner {
   }
 
   // Mapping thread (samples to dataset)
-  void Sampler::th_map(
+  void Sampler::th_map(uint64_t ith,
       std::pair<uint64_t, uint64_t> srange,
-      const std::vector<uint64_t>& samples, const Model& bmodel,
+      const std::vector<uint64_t>& samples, ModelCache& models,
       std::vector<uint64_t>& types, DataSet& data) const
   {
     if (srange.first >= srange.second)
@@ -539,7 +587,6 @@ namespace bob { namespace visioner {
       return;
     }
 
-    const boost::shared_ptr<Model> model = bmodel.clone();
     std::vector<double> targets(n_outputs());
     uint64_t type;
 
@@ -549,7 +596,7 @@ namespace bob { namespace visioner {
     {
       const ipscale_t& ip = m_ipscales[i];
 
-      model->preprocess(ip);
+      Model& model = models.get(ith, i, ip);
 
       for (int y = ip.m_scan_min_y; y < ip.m_scan_max_y; y += ip.m_scan_dy)
         for (int x = ip.m_scan_min_x; x < ip.m_scan_max_x; x += ip.m_scan_dx)
@@ -567,9 +614,9 @@ namespace bob { namespace visioner {
               }
 
               // Buffer feature values
-              for (uint64_t f = 0; f < model->n_features(); f ++)
+              for (uint64_t f = 0; f < model.n_features(); f ++)
               {
-                data.value(f, ss) = model->get(f, x, y);
+                data.value(f, ss) = model.get(f, x, y);
               }
 
               ss ++;
@@ -0,0 +1,150 @@
+/**
+ * @file visioner/cxx/test/threads.cc
+ * @date Sun Oct 18 20:12:41 2026 +0200
+ *
+ * @brief Tests the loops run by the thread pool of the visioner
+ *
+ * Copyright (C) 2011-2013 Idiap Research Institute, Martigny, Switzerland
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, version 3 of the License.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#define BOOST_TEST_DYN_LINK
+#define BOOST_TEST_MODULE Visioner Thread Pool Tests
+#define BOOST_TEST_MAIN
+#include <boost/test/unit_test.hpp>
+#include <boost/bind.hpp>
+#include <boost/lambda/lambda.hpp>
+#include <stdexcept>
+#include <stdint.h>
+
+#include "bob/visioner/util/threads.h"
+
+/**
+ * Sums the integers of a range into the result of the thread
+ */
+static void sum(std::pair<uint64_t, uint64_t> range, uint64_t& result) {
+  for (uint64_t i = range.first; i < range.second; ++i) result += i;
+}
+
+/**
+ * Records the thread processing each integer of a range, the integers of the
+ * first quarter being much more costly than the others
+ */
+static void record(uint64_t ith, std::pair<uint64_t, uint64_t> range,
+    uint64_t size, std::vector<uint64_t>& threads) {
+  for (uint64_t i = range.first; i < range.second; ++i) {
+    if (i < size / 4)
+      boost::this_thread::sleep(boost::posix_time::milliseconds(20));
+    threads[i] = ith;
+  }
+}
+
+/**
+ * Throws when processing the integer 3
+ */
+static void fail(std::pair<uint64_t, uint64_t> range) {
+  if (range.first <= 3 && 3 < range.second)
+    throw std::runtime_error("cannot process 3");
+}
+
+/**
+ * Sums the integers of [0, 100) with an inner loop, for each integer of the
+ * range
+ */
+static void nested(std::pair<uint64_t, uint64_t> range, uint64_t& result) {
+  for (uint64_t i = range.first; i < range.second; ++i) {
+    std::vector<uint64_t> results;
+    bob::visioner::thread_loop(boost::bind(sum, boost::lambda::_1,
+          boost::lambda::_2), 100, results, 4);
+    for (size_t k = 0; k < results.size(); ++k) result += results[k];
+  }
+}
+
+/**
+ * Runs summing loops of several sizes, and counts the wrong sums
+ */
+static void sum_loops(size_t n_threads, uint64_t* n_errors) {
+  for (uint64_t size = 1; size < 200; ++size) {
+    std::vector<uint64_t> results;
+    bob::visioner::thread_loop(boost::bind(sum, boost::lambda::_1,
+          boost::lambda::_2), size, results, n_threads);
+    uint64_t total = 0;
+    for (size_t k = 0; k < results.size(); ++k) total += results[k];
+    if (total != size * (size - 1) / 2) ++(*n_errors);
+  }
+}
+
+BOOST_AUTO_TEST_CASE( test_accumulation )
+{
+  // The result of a thread accumulates all the chunks it processes
+  for (size_t n_threads = 1; n_threads <= 8; ++n_threads) {
+    uint64_t n_errors = 0;
+    sum_loops(n_threads, &n_errors);
+    BOOST_CHECK_EQUAL( n_errors, 0 );
+  }
+}
+
+BOOST_AUTO_TEST_CASE( test_stealing )
+{
+  // The second thread steals the costly chunks of the first one
+  const uint64_t size = 64;
+  std::vector<uint64_t> threads(size, 2);
+  bob::visioner::thread_iloop(boost::bind(record, boost::lambda::_1,
+        boost::lambda::_2, size, boost::ref(threads)), size, 2);
+
+  uint64_t n_second = 0;
+  for (uint64_t i = 0; i < size; ++i) {
+    BOOST_REQUIRE( threads[i] < 2 );
+    if (threads[i] == 1) ++n_second;
+  }
+  BOOST_CHECK( n_second > size / 2 );
+}
+
+BOOST_AUTO_TEST_CASE( test_exception )
+{
+  // The exception of a thread is rethrown once the loop is over
+  for (size_t n_threads = 1; n_threads <= 4; ++n_threads) {
+    BOOST_CHECK_THROW( bob::visioner::thread_loop(boost::bind(fail,
+            boost::lambda::_1), 10, n_threads), std::runtime_error );
+  }
+
+  // The pool is still usable afterwards
+  uint64_t n_errors = 0;
+  sum_loops(4, &n_errors);
+  BOOST_CHECK_EQUAL( n_errors, 0 );
+}
+
+BOOST_AUTO_TEST_CASE( test_nested )
+{
+  // The inner loops are processed by the threads of the outer loop
+  std::vector<uint64_t> results;
+  bob::visioner::thread_loop(boost::bind(nested, boost::lambda::_1,
+        boost::lambda::_2), 8, results, 4);
+  uint64_t total = 0;
+  for (size_t k = 0; k < results.size(); ++k) total += results[k];
+  BOOST_CHECK_EQUAL( total, 8 * 4950 );
+}
+
+BOOST_AUTO_TEST_CASE( test_concurrent )
+{
+  // Loops run concurrently by several threads share the pool
+  const size_t n_callers = 4;
+  std::vector<uint64_t> n_errors(n_callers, 0);
+  boost::thread_group callers;
+  for (size_t k = 0; k < n_callers; ++k)
+    callers.create_thread(boost::bind(sum_loops, 4, &n_errors[k]));
+  callers.join_all();
+  for (size_t k = 0; k < n_callers; ++k)
+    BOOST_CHECK_EQUAL( n_errors[k], 0 );
+}
@@ -22,6 +22,14 @@
  * along with this program.  If not, see <http://www.gnu.org/licenses/>.
  */
 
+#include <list>
+#include <string>
+#include <stdexcept>
+
+#include <boost/bind.hpp>
+#include <boost/noncopyable.hpp>
+#include <boost/thread/tss.hpp>
+
 #include "bob/visioner/util/threads.h"
 
 // Split some objects to process using multiple threads
@@ -38,3 +46,223 @@ void bob::visioner::thread_split(uint64_t n_objects,
   }
 
 }
+
+namespace {
+
+  // Number of chunks a loop is split into, for each thread
+  const uint64_t chunks_per_thread = 4;
+
+  // Loop run by the threads of the pool: the chunks of [0, size) are split
+  //  in contiguous sets [begin, end), one per thread
+  class Job : private boost::noncopyable {
+
+    public:
+
+      Job(const boost::function<void (uint64_t, std::pair<uint64_t, uint64_t>)>& op,
+          uint64_t size, size_t num_of_threads)
+        : m_op(op), m_size(size),
+        m_n_chunks(std::min(size, chunks_per_thread * (uint64_t)num_of_threads)),
+        m_begins(num_of_threads), m_ends(num_of_threads),
+        m_raised(false) {
+
+        for (size_t ith = 0; ith < num_of_threads; ith ++) {
+          m_begins[ith] = m_n_chunks * ith / num_of_threads;
+          m_ends[ith] = m_n_chunks * (ith + 1) / num_of_threads;
+        }
+      }
+
+      size_t n_threads() const { return m_begins.size(); }
+
+      // Process chunks as thread <ith> until there are no chunks left
+      void run(uint64_t ith) {
+        uint64_t chunk;
+        while (take(ith, chunk)) {
+          const std::pair<uint64_t, uint64_t> range(
+              m_size * chunk / m_n_chunks, m_size * (chunk + 1) / m_n_chunks);
+          try {
+            m_op(ith, range);
+          }
+          catch (std::exception& e) {
+            error(e.what());
+          }
+          catch (...) {
+            error("unknown exception raised by a thread");
+          }
+        }
+      }
+
+      // Rethrow the first exception raised by the threads, if any
+      void check() const {
+        if (m_raised) throw std::runtime_error(m_message);
+      }
+
+    private:
+
+      // Take the next chunk of thread <ith>, or the last chunk of the
+      //  thread having the most chunks left
+      bool take(uint64_t ith, uint64_t& chunk) {
+        boost::lock_guard<boost::mutex> lock(m_mutex);
+        if (m_begins[ith] < m_ends[ith]) {
+          chunk = m_begins[ith] ++;
+          return true;
+        }
+
+        uint64_t victim = ith, n_left = 0;
+        for (uint64_t i = 0; i < m_begins.size(); i ++) {
+          if (m_ends[i] - m_begins[i] > n_left) {
+            victim = i;
+            n_left = m_ends[i] - m_begins[i];
+          }
+        }
+        if (n_left == 0) return false;
+        chunk = -- m_ends[victim];
+        return true;
+      }
+
+      void error(const std::string& message) {
+        boost::lock_guard<boost::mutex> lock(m_mutex);
+        if (!m_raised) {
+          m_raised = true;
+          m_message = message;
+        }
+      }
+
+      const boost::function<void (uint64_t, std::pair<uint64_t, uint64_t>)>& m_op;
+      uint64_t m_size;
+      uint64_t m_n_chunks;
+      std::vector<uint64_t> m_begins;  ///< Chunks left for each thread:
+      std::vector<uint64_t> m_ends;    ///< [begin, end)
+      boost::mutex m_mutex;
+      bool m_raised;
+      std::string m_message;
+
+  };
+
+  // Persistent pool of worker threads: the workers are created the first
+  //  time they are needed, and wait for the next loops once they are done
+  // NB: The loops run concurrently by several threads are queued: the idle
+  //  workers join the oldest loop still having thread indices left.
+  class ThreadPool : private boost::noncopyable {
+
+    public:
+
+      static ThreadPool& instance() {
+        static ThreadPool pool;
+        return pool;
+      }
+
+      ~ThreadPool() {
+        {
+          boost::lock_guard<boost::mutex> lock(m_mutex);
+          m_stop = true;
+        }
+        m_wake.notify_all();
+        m_workers.join_all();
+      }
+
+      // Tell if the current thread is processing a loop
+      bool busy() const { return m_busy.get() != 0; }
+
+      // Process the loop with the current thread (as thread 0) and up to
+      //  (num_of_threads - 1) workers
+      void run(Job& job) {
+        {
+          boost::lock_guard<boost::mutex> lock(m_mutex);
+          while (m_n_workers + 1 < job.n_threads()) {
+            m_n_workers ++;
+            m_workers.create_thread(boost::bind(&ThreadPool::work, this));
+          }
+          m_jobs.push_back(Entry(&job));
+        }
+        m_wake.notify_all();
+
+        m_busy.reset(new bool(true));
+        job.run(0);
+        m_busy.reset();
+
+        // All the chunks are taken: wait for the workers still running
+        boost::unique_lock<boost::mutex> lock(m_mutex);
+        std::list<Entry>::iterator it = m_jobs.begin();
+        while (it->m_job != &job) ++ it;
+        while (it->m_n_running > 0) m_done.wait(lock);
+        m_jobs.erase(it);
+      }
+
+    private:
+
+      // Loop in the queue, with the next thread index to hand out to a
+      //  worker and the number of workers running it
+      struct Entry {
+        Entry(Job* job) : m_job(job), m_next_thread(1), m_n_running(0) {}
+        Job* m_job;
+        uint64_t m_next_thread;
+        uint64_t m_n_running;
+      };
+
+      ThreadPool() : m_n_workers(0), m_stop(false) {
+      }
+
+      // Oldest loop still having thread indices left, if any
+      // NB: The mutex must be locked.
+      Entry* next() {
+        for (std::list<Entry>::iterator it = m_jobs.begin();
+            it != m_jobs.end(); ++ it) {
+          if (it->m_next_thread < it->m_job->n_threads()) return &(*it);
+        }
+        return 0;
+      }
+
+      // Worker: process the queued loops, one thread index at a time
+      // NB: A worker may join a loop whose chunks are all taken: it then
+      //  returns from Job::run() at once.
+      void work() {
+        m_busy.reset(new bool(true));
+        for (;;) {
+          Entry* entry = 0;
+          uint64_t ith = 0;
+          {
+            boost::unique_lock<boost::mutex> lock(m_mutex);
+            while (!m_stop && (entry = next()) == 0) m_wake.wait(lock);
+            if (m_stop) return;
+            ith = entry->m_next_thread ++;
+            entry->m_n_running ++;
+          }
+
+          entry->m_job->run(ith);
+
+          {
+            boost::lock_guard<boost::mutex> lock(m_mutex);
+            entry->m_n_running --;
+          }
+          m_done.notify_all();
+        }
+      }
+
+      boost::thread_group m_workers;
+      uint64_t m_n_workers;
+      boost::thread_specific_ptr<bool> m_busy;
+      boost::mutex m_mutex;
+      boost::condition_variable m_wake;
+      boost::condition_variable m_done;
+      std::list<Entry> m_jobs;  ///< Loops being processed, oldest first
+      bool m_stop;
+
+  };
+
+}
+
+// Run a loop computation of the given size using multiple threads
+void bob::visioner::thread_run(
+    const boost::function<void (uint64_t, std::pair<uint64_t, uint64_t>)>& op,
+    uint64_t size, size_t num_of_threads) {
+
+  ThreadPool& pool = ThreadPool::instance();
+
+  // Single thread or loop nested in a loop: the current thread processes
+  //  the loop
+  Job job(op, size, pool.busy() ? 1 : std::max(num_of_threads, (size_t)1));
+  if (job.n_threads() > 1) pool.run(job);
+  else job.run(0);
+  job.check();
+
+}
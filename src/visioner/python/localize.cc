@@ -118,12 +118,14 @@ void bind_visioner_localize() {
     .value("GroundTruth", bob::visioner::CVDetector::GroundTruth)
     ;
 
-  boost::python::class_<bob::visioner::CVDetector>("CVDetector", "Object detector that processes a pyramid of images", boost::python::init<const std::string&, double, uint64_t, uint64_t, double, bob::visioner::CVDetector::Type>((boost::python::arg("model"), boost::python::arg("threshold")=0.0, boost::python::arg("scanning_levels")=0, boost::python::arg("scale_variation")=2, boost::python::arg("clustering")=0.05, boost::python::arg("method")=bob::visioner::CVDetector::GroundTruth), "Basic constructor with the following parameters:\n\nmodel\n  file containing the model to be loaded; **note**: Serialization will use a native text format by default. Files that have their names suffixed with '.gz' will be automatically decompressed. If the filename ends in '.vbin' or '.vbgz' the format used will be the native binary format.\n\nthreshold\n  object classification threshold\n\nscanning_levels\n  scanning levels (the more, the faster)\n\nscale_variation\n  scale variation in pixels\n\nclustering\n  overlapping threshold for clustering detections\n\nmethod\n  Scanning or GroundTruth"))
+  boost::python::class_<bob::visioner::CVDetector>("CVDetector", "Object detector that processes a pyramid of images", boost::python::init<const std::string&, double, uint64_t, uint64_t, double, bob::visioner::CVDetector::Type, size_t>((boost::python::arg("model"), boost::python::arg("threshold")=0.0, boost::python::arg("scanning_levels")=0, boost::python::arg("scale_variation")=2, boost::python::arg("clustering")=0.05, boost::python::arg("method")=bob::visioner::CVDetector::GroundTruth, boost::python::arg("threads")=0), "Basic constructor with the following parameters:\n\nmodel\n  file containing the model to be loaded; **note**: Serialization will use a native text format by default. Files that have their names suffixed with '.gz' will be automatically decompressed. If the filename ends in '.vbin' or '.vbgz' the format used will be the native binary format.\n\nthreshold\n  object classification threshold\n\nscanning_levels\n  scanning levels (the more, the faster)\n\nscale_variation\n  scale variation in pixels\n\nclustering\n  overlapping threshold for clustering detections\n\nmethod\n  Scanning or GroundTruth\n\nthreads\n  number of threads used for scanning (0 to scan in the current thread)"))
     .def_readwrite("threshold", &bob::visioner::CVDetector::m_threshold, "Object classification threshold")
     .add_property("scanning_levels", &bob::visioner::CVDetector::get_scan_levels, &bob::visioner::CVDetector::set_scan_levels, "Levels (the more, the faster)")
     .def_readwrite("scale_variation", &bob::visioner::CVDetector::m_ds, "Scale variation in pixels")
     .def_readwrite("clustering", &bob::visioner::CVDetector::m_cluster, "Overlapping threshold for clustering detections")
     .def_readwrite("method", &bob::visioner::CVDetector::m_type, "Scanning or GroundTruth (default)")
+    .add_property("threads", &bob::visioner::CVDetector::get_scan_threads, &bob::visioner::CVDetector::set_scan_threads, "Number of threads used for scanning (0 to scan in the current thread). The rows of sub-windows of every scale are split in bands, which are distributed to the threads.")
+    .add_property("param", boost::python::make_function(&bob::visioner::CVDetector::param, boost::python::return_value_policy<boost::python::copy_const_reference>()), "Parameters of the classification model (e.g. the size of the scanned sub-windows, in rows and cols)")
     .def("detect", &detect, (boost::python::arg("self"), boost::python::arg("image")), "Detects faces in the input (gray-scaled) image according to the current settings. The input image format should be a 2D array of dtype=uint8.")
     .def("detect_max", &detect_max, (boost::python::arg("self"), boost::python::arg("image")), "Detects the most probable face in the input (gray-scaled) image according to the current settings")
     .def("save", &bob::visioner::CVDetector::save, (boost::python::arg("self"), boost::python::arg("filename")), "Saves the model and parameters to a given file.\n\n**Note**: Serialization will use a native text format by default. Files that have their name suffixed with '.gz' will be automatically decompressed. If the filename ends in '.vbin' or '.vbgz' the format used will be the native binary format.")
@@ -136,6 +138,7 @@ void bind_visioner_localize() {
     ;
 
   boost::python::class_<bob::visioner::CVLocalizer>("CVLocalizer", "Keypoint localizer to be applied in tandem with ground-truth or detections from CVDetector", boost::python::init<const std::string&, bob::visioner::CVLocalizer::Type>((boost::python::arg("model"), boost::python::arg("method")=bob::visioner::CVLocalizer::MultipleShots_Median), "Basic constructor taking a model file and the localization method to use"))
+      .add_property("param", boost::python::make_function(&bob::visioner::CVLocalizer::param, boost::python::return_value_policy<boost::python::copy_const_reference>()), "Parameters of the localization model (e.g. the size of the sub-windows, in rows and cols)")
       .def_readwrite("method", &bob::visioner::CVLocalizer::m_type, "SingleShot, MultipleShots_Average or MultipleShots_Median (default)")
       .def("locate", &locate, (boost::python::arg("self"), boost::python::arg("detector"), boost::python::arg("image")), "Runs the keypoint localization on the first (highest scored) face location determined by the detector. The input image format should be a 2D array of dtype=uint8.")
     .def("save", &bob::visioner::CVLocalizer::save, (boost::python::arg("self"), boost::python::arg("filename")), "Saves the model and parameters to a given file.\n\n**Note**: Serialization will use a native text format by default. Files that have their name suffixed with '.gz' will be automatically decompressed. If the filename ends in '.vbin' or '.vbgz' the format used will be the native binary format.")